@@ -6,16 +6,21 @@ from logging.handlers import RotatingFileHandler
 
 import telebot
 
+from broadcast import get_broadcast_engine
 from config import Config
 from database.core import (
     check_connection_health,
     clear_user_state,
     get_pool_stats,
+    get_state_store,
     get_user_state,
 )
 from database.schema import init_database
+from database.slow_queries import install_slow_query_log
+from database.state_store import StateSweeper
 from database.users import get_user_by_id
 from database.vacancies import invalidate_vacancies_cache
+from digests import DigestScheduler
 from handlers.admin import AdminHandlers
 from handlers.auth import AuthHandlers
 from handlers.common import CommonHandlers
@@ -25,14 +30,20 @@ from handlers.seeker import SeekerHandlers
 from handlers.settings import SettingsHandlers
 from handlers.steps import StepHandlers
 import keyboards
-from localization import get_all_translations, get_text_by_lang
+from localization import TRANSLATIONS, get_text_by_lang, validate_translations
+from log_pipeline import start_log_pipeline
+from metrics import setup_metrics, start_metrics_server
 from middleware import setup_middleware
+from outbound import setup_outbound
+from profiler import install_signal_trigger
+from router import Router
+from update_executor import setup_update_executor
 import utils
 
 # Попытка импорта библиотек мониторинга
 try:
     import sentry_sdk
-    from prometheus_client import start_http_server
+    import prometheus_client  # noqa: F401
     MONITORING_AVAILABLE = True
 except ImportError:
     MONITORING_AVAILABLE = False
@@ -79,8 +90,9 @@ def setup_logging():
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
 
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(stream_handler)
+    # JSON, запись в файл и ротация выполняются фоновым потоком очереди логов
+    pipeline = start_log_pipeline([file_handler, stream_handler])
+    root_logger.addHandler(pipeline.handler)
 
     logging.getLogger("urllib3").setLevel(logging.WARNING)
 
@@ -88,15 +100,24 @@ def setup_logging():
 def create_bot():
     """Создает и настраивает экземпляр бота"""
     setup_logging()
+    validate_translations()
+    # Статические клавиатуры на всех языках строятся до приема обновлений
+    keyboards.warm_keyboards(TRANSLATIONS)
     init_database()
 
+    # Запросы дольше порога — в лог с планом выполнения, отчет /slow для админов
+    if Config.SLOW_QUERY_MS > 0:
+        install_slow_query_log(Config.SLOW_QUERY_MS)
+
     if not Config.TOKEN:
         logging.critical("❌ Ошибка: Токен бота не найден!")
         raise ValueError("Токен бота не найден! Проверьте файл .env")
 
-    # Настройка многопоточности (для PythonAnywhere лучше False)
-    threaded = os.getenv('BOT_THREADED', 'true').lower() == 'true'
-    bot = telebot.TeleBot(Config.TOKEN, threaded=threaded)
+    # Обработчики telebot выполняются в потоке шарда (или приема, если шарды отключены)
+    bot = telebot.TeleBot(Config.TOKEN, threaded=False)
+
+    # Все исходящие запросы к Bot API идут через очередь с лимитами Telegram
+    setup_outbound(bot)
 
     # Инициализация обработчиков
     common = CommonHandlers(bot)
@@ -113,14 +134,29 @@ def create_bot():
     steps.set_admin_handlers(admin)
 
     # Регистрация маршрутов
-    register_routes(bot, common, auth, seeker, employer, settings, profile, admin, steps)
+    router = register_routes(bot, common, auth, seeker, employer, settings, profile, admin, steps)
+
+    # Продолжаем рассылки, прерванные перезапуском
+    get_broadcast_engine(bot).resume_interrupted()
+
+    # Брошенные диалоги удаляются по времени жизни семейства шагов
+    if Config.STATE_SWEEP_INTERVAL > 0:
+        StateSweeper(get_state_store(), Config.STATE_SWEEP_INTERVAL).start()
+
+    # Часовые и суточные дайджесты откликов для работодателей
+    if Config.DIGEST_INTERVAL > 0:
+        DigestScheduler(bot, Config.DIGEST_INTERVAL).start()
 
     # Настройка мониторинга и middleware
+    metrics = None
     if MONITORING_AVAILABLE:
         # Запускаем Prometheus только если это разрешено (по умолчанию True)
         if os.getenv('ENABLE_MONITORING', 'true').lower() == 'true':
+            # Метрики обработчиков, БД, Bot API, кэшей и состояний
+            metrics = setup_metrics()
+            router.metrics = metrics
             try:
-                start_http_server(Config.PROMETHEUS_PORT)
+                start_metrics_server(Config.PROMETHEUS_PORT)
                 logging.info(f"✅ Prometheus metrics server running on port {Config.PROMETHEUS_PORT}")
             except Exception as e:
                 logging.error(f"❌ Failed to start Prometheus server: {e}")
@@ -129,39 +165,37 @@ def create_bot():
             sentry_sdk.init(dsn=Config.SENTRY_DSN, traces_sample_rate=1.0)
             logging.info("✅ Sentry initialized")
 
-    setup_middleware(bot, MONITORING_AVAILABLE)
+    setup_middleware(bot, MONITORING_AVAILABLE, metrics)
+
+    # Профилирование по запросу: kill -USR2 <pid> (без затрат, пока не запущено)
+    install_signal_trigger()
+
+    # Обновления одного пользователя — по порядку, разных пользователей — параллельно
+    if Config.UPDATE_WORKERS > 0:
+        setup_update_executor(bot)
 
     return bot
 
 
 def register_routes(bot, common, auth, seeker, employer, settings, profile, admin, steps):
-    """Регистрация всех обработчиков сообщений"""
+    """Регистрация всех обработчиков сообщений (маршруты собираются один раз)"""
+    router = Router()
 
     # --- Регистрация через классы ---
-    common.register(bot)
-    admin.register(bot)
-    seeker.register(bot)
-    employer.register(bot)
-    settings.register(bot)
-    profile.register(bot)
+    common.register(router)
+    admin.register(router)
+    seeker.register(router)
+    employer.register(router)
+    settings.register(router)
+    profile.register(router)
 
     # --- Авторизация и Меню ---
-    bot.register_message_handler(
-        auth.handle_role_selection,
-        func=lambda m: m.text in get_all_translations('role_seeker') or
-        m.text in get_all_translations('role_employer')
-    )
-    bot.register_message_handler(
-        auth.handle_registration_start,
-        func=lambda m: m.text in get_all_translations('register_button')
-    )
-    bot.register_message_handler(auth.handle_password_recovery, func=lambda m: m.text == '🔑 Забыли пароль?')
-    bot.register_message_handler(
-        auth.handle_logout,
-        func=lambda m: m.text == '🚪 Выйти' or m.text in get_all_translations('menu_logout')
-    )
+    router.translated(['role_seeker', 'role_employer'], auth.handle_role_selection)
+    router.translated('register_button', auth.handle_registration_start)
+    router.text('🔑 Забыли пароль?', auth.handle_password_recovery)
+    router.text('🚪 Выйти', auth.handle_logout)
+    router.translated('menu_logout', auth.handle_logout)
 
-    @bot.message_handler(func=lambda m: m.text in get_all_translations('cancel_button'))
     def cancel_btn_wrapper(message):
         user_id = message.from_user.id
         if get_user_state(user_id):
@@ -174,10 +208,8 @@ def register_routes(bot, common, auth, seeker, employer, settings, profile, admi
                 reply_markup=keyboards.main_menu('ru')
             )
 
-    bot.register_callback_query_handler(common.handle_start_chat, func=lambda c: c.data.startswith('start_chat_'))
+    router.translated('cancel_button', cancel_btn_wrapper)
 
-
-    @bot.message_handler(func=lambda m: m.text in get_all_translations('menu_chat'))
     def chat_menu_wrapper(message):
         user = get_user_by_id(message.from_user.id)
         if not user:
@@ -187,54 +219,60 @@ def register_routes(bot, common, auth, seeker, employer, settings, profile, admi
         elif 'company_name' in user:
             employer.handle_employer_chats(message)
 
+    router.translated('menu_chat', chat_menu_wrapper)
+
+    # --- Шаги FSM ---
+    # Админские шаги
+    router.step('admin_broadcast_segment', admin.process_broadcast_segment, admin_only=True)
+    router.step('admin_broadcast_message', admin.process_broadcast_message, admin_only=True)
+    router.step('admin_broadcast_confirm', admin.process_broadcast_confirm, admin_only=True)
+    router.step('admin_search_user', admin.process_search_user, admin_only=True)
+    router.step('admin_reply_message', admin.process_reply_message, admin_only=True)
+    router.step('admin_write_user', admin.process_write_message, admin_only=True)
+
+    # Поддержка и чат
+    router.step(['support_bug_report', 'support_complaint'], common.process_support_message)
+    router.step('reply_to_admin', common.process_reply_to_admin)
+    router.step('active_chat', common.handle_chat_message)
+
+    # Ключевое слово сохраненного поиска
+    router.step('saved_search_keyword', seeker.process_saved_search_keyword)
+
+    # Выбор региона и города в поиске
+    router.step('search_vacancy_region', seeker.process_vacancy_region_choice)
+    router.step('search_vacancy_city', seeker.process_vacancy_city_choice)
+    router.step('search_candidate_region', employer.process_candidate_region_choice)
+    router.step('search_candidate_city', employer.process_candidate_city_choice)
+
+    # Настройки соискателя и работодателя
+    def editing(action):
+        return lambda state: state.get('action') == action
+
+    router.step('enter_new_value', settings.process_seeker_field_update, guard=editing('edit_seeker_field'))
+    router.step(
+        'edit_seeker_profession_sphere', settings.process_seeker_profession_sphere,
+        guard=editing('edit_seeker_field')
+    )
+    router.step(
+        'edit_seeker_profession_specific', settings.process_seeker_profession_specific,
+        guard=editing('edit_seeker_field')
+    )
+    router.step('enter_new_value', settings.process_employer_field_update, guard=editing('edit_employer_field'))
+
     # --- Глобальный обработчик (Process All) ---
-    @bot.message_handler(content_types=['text', 'photo', 'contact'], func=lambda m: True)
     def process_all_messages(message):
         user_id = message.from_user.id
         try:
             user_state = get_user_state(user_id)
-
-            # Админские шаги
-            if user_id in Config.ADMIN_IDS and user_state:
-                if user_state.get('step') == 'admin_broadcast_message':
-                    return admin.process_broadcast_message(message)
-                if user_state.get('step') == 'admin_broadcast_confirm':
-                    return admin.process_broadcast_confirm(message)
-                if user_state.get('step') == 'admin_search_user':
-                    return admin.process_search_user(message)
-                if user_state.get('step') == 'admin_reply_message':
-                    return admin.process_reply_message(message)
-                if user_state.get('step') == 'admin_write_user':
-                    return admin.process_write_message(message)
-
-            # Поддержка и чат
-            if user_state and user_state.get('step') in ['support_bug_report', 'support_complaint']:
-                return common.process_support_message(message)
-            if user_state and user_state.get('step') == 'reply_to_admin':
-                return common.process_reply_to_admin(message)
-            if user_state and user_state.get('step') == 'active_chat':
-                return common.handle_chat_message(message)
-
-            # Настройки соискателя
-            if user_state and user_state.get('action') == 'edit_seeker_field':
-                step = user_state.get('step')
-                if step == 'enter_new_value':
-                    return settings.process_seeker_field_update(message)
-                if step == 'edit_seeker_profession_sphere':
-                    return settings.process_seeker_profession_sphere(message)
-                if step == 'edit_seeker_profession_specific':
-                    return settings.process_seeker_profession_specific(message)
-
-            # Настройки работодателя
-            if user_state and user_state.get('action') == 'edit_employer_field':
-                if user_state.get('step') == 'enter_new_value':
-                    return settings.process_employer_field_update(message)
+            handler = router.resolve_step(user_id, user_state)
+            if handler is not None:
+                return router.call(handler, message)
 
             # Steps (вакансии, регистрация)
-            if steps.handle_steps(message):
+            if router.call(steps.handle_steps, message):
                 return
 
-            common.handle_unknown(message)
+            router.call(common.handle_unknown, message)
 
         except Exception as e:
             logging.critical(f"❌ Critical error in process_all_messages: {e}", exc_info=True)
@@ -245,4 +283,8 @@ def register_routes(bot, common, auth, seeker, employer, settings, profile, admi
                     reply_markup=keyboards.main_menu()
                 )
             except Exception:
-                pass
\ No newline at end of file
+                pass
+
+    router.fallback = process_all_messages
+    router.install(bot)
+    return router
\ No newline at end of file
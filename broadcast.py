@@ -0,0 +1,396 @@
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from telebot.apihelper import ApiTelegramException
+
+import keyboards
+from config import Config
+from database.broadcasts import (
+    BROADCAST_LANGUAGES,
+    broadcast_phases,
+    count_broadcast_recipients,
+    create_broadcast_job,
+    deactivate_recipients,
+    fetch_broadcast_recipients,
+    get_broadcast_job,
+    get_unfinished_broadcasts,
+    save_broadcast_batch,
+    set_broadcast_progress_message,
+    set_broadcast_status,
+)
+from database.core import close_connection
+from database.searches import resolve_location
+from outbound import resolve
+
+logger = logging.getLogger(__name__)
+
+STATUS_LABELS = {
+    "running": "⏳ Идет отправка",
+    "paused": "⏸ Приостановлена",
+    "cancelled": "✖️ Отменена",
+    "done": "✅ Завершена",
+}
+
+SENT, DEAD, FAILED = "sent", "dead", "failed"
+
+SEEKER_STATUSES = ("active", "inactive")
+ROLE_ALIASES = {
+    "all": "all",
+    "seekers": "seekers",
+    "seeker": "seekers",
+    "employers": "employers",
+    "employer": "employers",
+}
+# Маркеры переводов в тексте рассылки: [ru] ... [uz] ... [en] ...
+VARIANT_MARKER = re.compile(
+    r"^\[(" + "|".join(BROADCAST_LANGUAGES) + r")\]\s*$", re.MULTILINE
+)
+
+
+# ================= СЕГМЕНТЫ И ПЕРЕВОДЫ =================
+
+
+def _parse_date(value: str) -> str:
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+def parse_segment(text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Разбор сегмента из строк «ключ=значение»:
+    role, city, status, lang, registered, active.
+    Возвращает (сегмент, ошибки).
+    """
+    segment: Dict[str, Any] = {}
+    errors: List[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        key, sep, value = line.partition("=")
+        key, value = key.strip().lower(), value.strip()
+        if not sep or not value:
+            errors.append(f"Неверная строка: {line.strip()}")
+        elif key == "role":
+            if value.lower() not in ROLE_ALIASES:
+                errors.append(f"Неизвестная роль: {value}")
+            else:
+                segment["role"] = ROLE_ALIASES[value.lower()]
+        elif key == "city":
+            city, region = resolve_location(value)
+            if not region:
+                errors.append(f"Неизвестный город или регион: {value}")
+            else:
+                segment["location"] = city or region
+        elif key == "status":
+            if value.lower() not in SEEKER_STATUSES:
+                errors.append(f"Неизвестный статус: {value}")
+            else:
+                segment["status"] = value.lower()
+        elif key == "lang":
+            if value.lower() not in BROADCAST_LANGUAGES:
+                errors.append(f"Неизвестный язык: {value}")
+            else:
+                segment["language"] = value.lower()
+        elif key in ("registered", "active"):
+            try:
+                segment[f"{key}_since"] = _parse_date(value)
+            except ValueError:
+                errors.append(f"Дата должна быть в формате ГГГГ-ММ-ДД: {value}")
+        else:
+            errors.append(f"Неизвестный фильтр: {key}")
+    return segment, errors
+
+
+def describe_segment(segment: Dict[str, Any]) -> str:
+    """Человекочитаемое описание сегмента для админа"""
+    if not segment:
+        return "все пользователи"
+    labels = {
+        "role": "роль",
+        "location": "город/регион",
+        "status": "статус",
+        "language": "язык",
+        "registered_since": "зарегистрированы с",
+        "active_since": "активны с",
+    }
+    return ", ".join(f"{labels[k]}: {v}" for k, v in segment.items() if k in labels)
+
+
+def parse_variants(text: str) -> Dict[str, str]:
+    """
+    Переводы рассылки по маркерам [ru], [uz], [en] на отдельных строках.
+    Текст без маркеров — один вариант для всех языков (ключ "").
+    """
+    parts = VARIANT_MARKER.split(text)
+    if len(parts) == 1:
+        return {"": text.strip()}
+    variants = {"": parts[0].strip()} if parts[0].strip() else {}
+    for lang, body in zip(parts[1::2], parts[2::2]):
+        if body.strip():
+            variants[lang] = body.strip()
+    return variants
+
+
+def is_dead_recipient(error: ApiTelegramException) -> bool:
+    """Пользователь заблокировал бота или удалил аккаунт"""
+    if error.error_code == 403:
+        return True
+    return (
+        error.error_code == 400 and "chat not found" in str(error.description).lower()
+    )
+
+
+# ================= ФОНОВАЯ РАССЫЛКА =================
+
+
+class BroadcastEngine:
+    """
+    Рассылка как сохраненное задание с курсором по получателям.
+    Отправка идет пачками в фоне с ограниченной параллельностью; скорость
+    ограничивает диспетчер исходящих запросов. Прогресс — в одном сообщении.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        batch_size: int = Config.BROADCAST_BATCH_SIZE,
+        concurrency: int = Config.BROADCAST_CONCURRENCY,
+        progress_interval: float = Config.BROADCAST_PROGRESS_INTERVAL,
+    ):
+        self.bot = bot
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self._threads: Dict[int, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        admin_id: int,
+        chat_id: int,
+        text: str,
+        segment: Optional[Dict[str, Any]] = None,
+        variants: Optional[Dict[str, str]] = None,
+    ) -> Optional[int]:
+        """Создает задание для сегмента и запускает отправку"""
+        job_id = create_broadcast_job(
+            admin_id, text, count_broadcast_recipients(segment), segment, variants
+        )
+        if not job_id:
+            return None
+
+        job = get_broadcast_job(job_id)
+        try:
+            msg = resolve(
+                self.bot.send_message(
+                    chat_id,
+                    self._progress_text(job),
+                    parse_mode="Markdown",
+                    reply_markup=keyboards.broadcast_control_keyboard(
+                        job_id, "running"
+                    ),
+                )
+            )
+            if msg is not None:
+                set_broadcast_progress_message(job_id, chat_id, msg.message_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось отправить прогресс рассылки #{job_id}: {e}")
+
+        self._spawn(job_id)
+        logger.info(f"✅ Рассылка #{job_id} запущена ({job['total']} получателей)")
+        return job_id
+
+    def pause(self, job_id: int) -> bool:
+        """Приостановка: поток завершится после текущей пачки"""
+        return set_broadcast_status(job_id, "paused", expected=["running"])
+
+    def resume(self, job_id: int) -> bool:
+        """Продолжение с сохраненного курсора"""
+        if not set_broadcast_status(job_id, "running", expected=["paused"]):
+            return False
+        self._spawn(job_id)
+        return True
+
+    def cancel(self, job_id: int) -> bool:
+        """Отмена рассылки"""
+        if not set_broadcast_status(
+            job_id, "cancelled", expected=["running", "paused"]
+        ):
+            return False
+        job = get_broadcast_job(job_id)
+        if job:
+            self._update_progress(job)
+        return True
+
+    def resume_interrupted(self) -> int:
+        """Продолжает рассылки, прерванные перезапуском бота"""
+        try:
+            jobs = get_unfinished_broadcasts()
+        except Exception as e:
+            logger.error(f"❌ Ошибка поиска незавершенных рассылок: {e}")
+            return 0
+        for job in jobs:
+            logger.info(f"🔄 Продолжаю рассылку #{job['id']} после перезапуска")
+            self._spawn(job["id"])
+        return len(jobs)
+
+    def wait(self, job_id: Optional[int] = None, timeout: Optional[float] = None):
+        """Ожидание завершения потоков рассылки (тесты, остановка бота)"""
+        with self._lock:
+            threads = [
+                t for jid, t in self._threads.items() if job_id is None or jid == job_id
+            ]
+        for thread in threads:
+            thread.join(timeout)
+
+    def _spawn(self, job_id: int) -> None:
+        with self._lock:
+            if job_id in self._threads:
+                return  # Поток еще работает и сам увидит статус running
+            thread = threading.Thread(
+                target=self._run,
+                args=(job_id,),
+                name=f"broadcast-{job_id}",
+                daemon=True,
+            )
+            self._threads[job_id] = thread
+            thread.start()
+
+    def _deliver(self, telegram_id: int, text: str) -> str:
+        """Отправка одному получателю"""
+        try:
+            resolve(self.bot.send_message(telegram_id, text, parse_mode="Markdown"))
+            return SENT
+        except ApiTelegramException as e:
+            if is_dead_recipient(e):
+                return DEAD
+            logger.warning(f"⚠️ Рассылка: {telegram_id} не доставлено: {e.description}")
+            return FAILED
+        except Exception as e:
+            logger.error(f"❌ Рассылка: ошибка отправки {telegram_id}: {e}")
+            return FAILED
+
+    def _run(self, job_id: int) -> None:
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix=f"broadcast-{job_id}"
+            ) as pool:
+                while True:
+                    self._send_batches(job_id, pool)
+                    with self._lock:
+                        # Возобновление могло прийти, пока поток завершался
+                        job = get_broadcast_job(job_id)
+                        if job and job["status"] == "running":
+                            continue
+                        self._threads.pop(job_id, None)
+                        break
+
+            if job:
+                self._update_progress(job)
+                logger.info(
+                    f"📢 Рассылка #{job_id}: {job['status']}, отправлено {job['sent']}, "
+                    f"отключено {job['deactivated']}, ошибок {job['failed']}"
+                )
+        except Exception as e:
+            logger.error(f"❌ Ошибка рассылки #{job_id}: {e}", exc_info=True)
+            with self._lock:
+                self._threads.pop(job_id, None)
+        finally:
+            close_connection()
+
+    def _send_batches(self, job_id: int, pool: ThreadPoolExecutor) -> None:
+        """Отправляет пачки, пока задание в статусе running"""
+        last_progress = time.monotonic()
+        job = get_broadcast_job(job_id)
+        if not job:
+            return
+        segment = json.loads(job.get("segment") or "{}")
+        variants = json.loads(job.get("variants") or "{}")
+        phases = broadcast_phases(segment)
+
+        while True:
+            job = get_broadcast_job(job_id)
+            if not job or job["status"] != "running":
+                return
+
+            phase, cursor_id = job["cursor_phase"], job["cursor_id"]
+            batch = fetch_broadcast_recipients(
+                phase, cursor_id, self.batch_size, segment
+            )
+            if not batch:
+                if phase + 1 < len(phases):
+                    save_broadcast_batch(job_id, phase + 1, 0, 0, 0, 0)
+                    continue
+                set_broadcast_status(job_id, "done", expected=["running"])
+                return
+
+            recipients: List[int] = [r["telegram_id"] for r in batch]
+            # Получатели этапа говорят на одном языке — один текст на всю пачку
+            text = variants.get(phases[phase][1]) or job["message_text"]
+            results = list(pool.map(lambda tid: self._deliver(tid, text), recipients))
+            dead = [t for t, r in zip(recipients, results) if r == DEAD]
+            deactivate_recipients(dead)
+            save_broadcast_batch(
+                job_id,
+                phase,
+                batch[-1]["id"],
+                results.count(SENT),
+                results.count(FAILED),
+                len(dead),
+            )
+
+            if time.monotonic() - last_progress >= self.progress_interval:
+                last_progress = time.monotonic()
+                self._update_progress(get_broadcast_job(job_id))
+
+    def _progress_text(self, job: Dict[str, Any]) -> str:
+        processed = job["sent"] + job["failed"] + job["deactivated"]
+        total = job["total"] or 0
+        percent = min(100, processed * 100 // total) if total else 100
+        if job["status"] == "done":
+            header = f"✅ *Рассылка завершена!* (#{job['id']})"
+        else:
+            header = f"📢 *Рассылка #{job['id']}* — {STATUS_LABELS.get(job['status'], job['status'])}"
+        return (
+            f"{header}\n\n"
+            f"• Обработано: {processed}/{total} ({percent}%)\n"
+            f"• ✅ Отправлено: {job['sent']}\n"
+            f"• 🗑️ Отключено (неактив): {job['deactivated']}\n"
+            f"• ❌ Ошибок: {job['failed']}"
+        )
+
+    def _update_progress(self, job: Optional[Dict[str, Any]]) -> None:
+        """Обновляет сообщение с прогрессом через edit_message_text"""
+        if not job or not job.get("progress_message_id"):
+            return
+        try:
+            self.bot.edit_message_text(
+                self._progress_text(job),
+                chat_id=job["progress_chat_id"],
+                message_id=job["progress_message_id"],
+                parse_mode="Markdown",
+                reply_markup=keyboards.broadcast_control_keyboard(
+                    job["id"], job["status"]
+                ),
+            )
+        except Exception as e:
+            # "message is not modified" и подобные ошибки не влияют на рассылку
+            logger.debug(f"Прогресс рассылки #{job['id']} не обновлен: {e}")
+
+
+_engine: Optional[BroadcastEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_broadcast_engine(bot: Any) -> BroadcastEngine:
+    """Общий движок рассылок для бота"""
+    global _engine
+    with _engine_lock:
+        if _engine is None or _engine.bot is not bot:
+            _engine = BroadcastEngine(bot)
+        return _engine
@@ -0,0 +1,256 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+import keyboards
+import utils
+from config import Config
+from localization import get_text_by_lang, normalize_job_type
+
+# Отрисованная карточка: текст (Markdown) и reply_markup в JSON
+Card = Tuple[str, str]
+CardKey = Tuple[str, int, int, str, Hashable]
+
+
+# ================= ПЕРЕВОД ПОЛЕЙ =================
+
+
+def translate_title(value: Optional[str], lang: str) -> str:
+    """Название вакансии или профессия: ключ prof_* переводится"""
+    if value and value.startswith("prof_"):
+        return get_text_by_lang(value, lang)
+    return value or ""
+
+
+def translate_job_type(value: Optional[str], lang: str) -> str:
+    """Тип занятости (старые вакансии хранят текст вместо ключа)"""
+    return get_text_by_lang(normalize_job_type(value), lang)
+
+
+def translate_gender(value: Optional[str], lang: str, default_key: str) -> str:
+    if value == "male":
+        return get_text_by_lang("gender_male", lang)
+    if value == "female":
+        return get_text_by_lang("gender_female", lang)
+    return get_text_by_lang(default_key, lang)
+
+
+def translate_languages(raw: Any, lang: str, default: str) -> str:
+    """Список языков из JSON [{lang_key|lang_name, level_key}]; старый текст — как есть"""
+    if not raw:
+        return default
+    if not (isinstance(raw, str) and raw.strip().startswith("[")):
+        return str(raw)
+    try:
+        parts = []
+        for item in json.loads(raw):
+            name = (
+                get_text_by_lang(item["lang_key"], lang)
+                if item.get("lang_key")
+                else item.get("lang_name", "?")
+            )
+            level = get_text_by_lang(item.get("level_key"), lang)
+            parts.append(f"{name} ({level})")
+        return ", ".join(parts) or default
+    except (ValueError, TypeError, AttributeError, KeyError):
+        return raw
+
+
+# ================= КЭШ КАРТОЧЕК =================
+
+
+class CardCache:
+    """
+    LRU отрисованных карточек по (вид, id, версия строки, язык, вариант).
+    update_vacancy/update_seeker_profile увеличивают версию строки, поэтому
+    карточка изменившейся записи не находится в кэше; при сохранении новой
+    версии записи карточки старых версий удаляются.
+    """
+
+    def __init__(self, max_size: int = Config.CARD_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[CardKey, Card]" = OrderedDict()
+        # (вид, id) -> (версия, ключи карточек этой версии)
+        self._entities: Dict[Tuple[str, int], Tuple[int, Set[CardKey]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CardKey) -> Optional[Card]:
+        with self._lock:
+            card = self._items.get(key)
+            if card is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return card
+
+    def put(self, key: CardKey, card: Card) -> None:
+        if self.max_size <= 0:
+            return
+        kind, entity_id, version = key[0], key[1], key[2]
+        with self._lock:
+            known = self._entities.get((kind, entity_id))
+            if known is not None and known[0] != version:
+                self._drop_entity(kind, entity_id)
+                known = None
+            if known is None:
+                known = (version, set())
+                self._entities[(kind, entity_id)] = known
+            known[1].add(key)
+            self._items[key] = card
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                old_key, _ = self._items.popitem(last=False)
+                self._forget(old_key)
+                self.evictions += 1
+
+    def invalidate(self, kind: str, entity_id: int) -> None:
+        """Удаление всех карточек записи (все версии, языки и варианты)"""
+        with self._lock:
+            self._drop_entity(kind, entity_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._entities.clear()
+
+    def _drop_entity(self, kind: str, entity_id: int) -> None:
+        _, keys = self._entities.pop((kind, entity_id), (None, set()))
+        for key in keys:
+            self._items.pop(key, None)
+
+    def _forget(self, key: CardKey) -> None:
+        known = self._entities.get((key[0], key[1]))
+        if known is not None:
+            known[1].discard(key)
+            if not known[1]:
+                del self._entities[(key[0], key[1])]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика кэша карточек"""
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+card_cache = CardCache()
+
+
+def _cached(kind: str, row: Dict[str, Any], lang: str, variant: Hashable, render):
+    """
+    Карточка из кэша или отрисовка. Строки без id/version (собранные вручную,
+    старые выборки) не кэшируются.
+    """
+    entity_id, version = row.get("id"), row.get("version")
+    if entity_id is None or version is None:
+        return render()
+    key: CardKey = (kind, entity_id, version, lang, variant)
+    card = card_cache.get(key)
+    if card is None:
+        card = render()
+        card_cache.put(key, card)
+    return card
+
+
+# ================= КАРТОЧКИ =================
+
+
+def vacancy_card(vac: Dict[str, Any], lang: str, owner: bool = False) -> Card:
+    """
+    Карточка вакансии: для соискателя — с компанией и кнопкой отклика,
+    для владельца (owner=True) — с датой создания и кнопками управления.
+    """
+    return _cached(
+        "vacancy",
+        vac,
+        lang,
+        "owner" if owner else "seeker",
+        lambda: _render_vacancy(vac, lang, owner),
+    )
+
+
+def _render_vacancy(vac: Dict[str, Any], lang: str, owner: bool) -> Card:
+    esc = utils.escape_markdown
+    t = get_text_by_lang
+    gender = translate_gender(vac.get("gender", "any"), lang, "gender_any")
+    languages = translate_languages(
+        vac.get("languages"), lang, t("languages_not_specified_in_vacancy", lang)
+    )
+    lines = [f"💼 *{esc(translate_title(vac['title'], lang))}*"]
+    if not owner:
+        lines += [
+            f"{t('vacancy_card_company', lang)} *{esc(vac['company_name'])}*",
+            f"{t('vacancy_card_city', lang)} {esc(vac['city'])}",
+        ]
+    lines += [
+        f"{t('vacancy_card_salary', lang)} {esc(vac['salary'])}",
+        f"{t('gender_label', lang)} {esc(gender)}",
+        f"{t('vacancy_card_type', lang)} {esc(translate_job_type(vac['job_type'], lang))}",
+        f"{t('vacancy_card_languages', lang)} {esc(languages)}",
+        f"{t('vacancy_card_description', lang)} {esc(vac['description'])}",
+    ]
+    if owner:
+        created_at = utils.format_db_datetime_to_tashkent(vac["created_at"])
+        lines.append(f"\n{t('vacancy_card_created_at', lang)} {created_at}")
+        markup = keyboards.my_vacancy_actions.json(vac["id"], lang=lang)
+    else:
+        markup = keyboards.vacancy_actions.json(vac["id"], lang=lang)
+    return "\n".join(lines), markup
+
+
+def candidate_card(
+    seeker: Dict[str, Any], lang: str, vacancy_id: Optional[int] = None
+) -> Card:
+    """Карточка кандидата с кнопкой приглашения (на вакансию vacancy_id)"""
+    return _cached(
+        "seeker",
+        seeker,
+        lang,
+        # telegram_id в кнопке приглашения меняется без изменения версии строки
+        (seeker.get("telegram_id"), vacancy_id),
+        lambda: _render_candidate(seeker, lang, vacancy_id),
+    )
+
+
+def _render_candidate(
+    seeker: Dict[str, Any], lang: str, vacancy_id: Optional[int]
+) -> Card:
+    esc = utils.escape_markdown
+    t = get_text_by_lang
+    age = seeker.get("age")
+    age_text = f"{age} {t('age_years', lang)}" if age else t("age_not_specified", lang)
+    gender = translate_gender(seeker.get("gender"), lang, "age_not_specified")
+    profession = translate_title(seeker.get("profession"), lang) or t(
+        "education_not_specified", lang
+    )
+    languages = translate_languages(
+        seeker.get("languages"), lang, t("languages_not_specified", lang)
+    )
+    text = "\n".join(
+        [
+            f"👤 *{esc(str(seeker.get('full_name', '')))}*",
+            f"{t('gender_label', lang)} {esc(gender)}",
+            f"{t('candidate_card_city', lang)} "
+            f"{esc(seeker.get('city') or t('age_not_specified', lang))}",
+            f"{t('candidate_card_age', lang)} {age_text}",
+            f"{t('candidate_card_profession', lang)} {esc(profession)}",
+            f"{t('candidate_card_education', lang)} "
+            f"{esc(seeker.get('education') or t('education_not_specified', lang))}",
+            f"{t('candidate_card_languages', lang)} {esc(languages)}",
+            f"{t('candidate_card_experience', lang)} "
+            f"{esc(seeker.get('experience') or t('experience_not_specified', lang))}",
+            f"{t('candidate_card_skills', lang)} "
+            f"{esc(seeker.get('skills') or t('skills_not_specified', lang))}",
+        ]
+    )
+    markup = keyboards.employer_invite_keyboard.json(
+        seeker.get("telegram_id"), vacancy_id, lang=lang
+    )
+    return text, markup
@@ -45,6 +45,92 @@ class Config:
     SENTRY_DSN = os.getenv("SENTRY_DSN")
     PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", 8000))
 
+    # Исходящие запросы к Bot API (лимиты Telegram)
+    OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", 30))
+    OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", 1))
+    OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", 3))
+    OUTBOUND_GROUP_PER_MINUTE = float(os.getenv("OUTBOUND_GROUP_PER_MINUTE", 20))
+    OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", 3))
+    # Фоновые потоки отправки: обработчики не ждут лимитов чата
+    OUTBOUND_WORKERS = int(os.getenv("OUTBOUND_WORKERS", 4))
+
+    # Фоновые рассылки
+    BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", 100))
+    BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", 8))
+    BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", 5))
+
+    # Вебхук (flask_app): секрет, очередь обновлений и пул обработчиков.
+    # Без WEBHOOK_SECRET секрет выводится из токена, а обновления без заголовка
+    # секрета принимаются (старый вебхук); с ним заголовок обязателен
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 4))
+    WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 1000))
+    WEBHOOK_DEDUP_WINDOW = int(os.getenv("WEBHOOK_DEDUP_WINDOW", 10000))
+    WEBHOOK_RETRY_AFTER = int(os.getenv("WEBHOOK_RETRY_AFTER", 5))
+
+    # Обработка обновлений: шарды по from_user.id (0 — в потоке приема)
+    # BOT_THREADED=false (хостинги без потоков) по умолчанию отключает шарды
+    UPDATE_WORKERS = int(
+        os.getenv(
+            "UPDATE_WORKERS",
+            4 if os.getenv("BOT_THREADED", "true").lower() == "true" else 0,
+        )
+    )
+    UPDATE_QUEUE_SIZE = int(os.getenv("UPDATE_QUEUE_SIZE", 100))
+
+    # Фоновая очистка брошенных диалогов (0 — только при обращении к состоянию)
+    STATE_SWEEP_INTERVAL = float(
+        os.getenv(
+            "STATE_SWEEP_INTERVAL",
+            300 if os.getenv("BOT_THREADED", "true").lower() == "true" else 0,
+        )
+    )
+
+    # Кэш отрисованных карточек вакансий и кандидатов (0 — без кэша)
+    CARD_CACHE_SIZE = int(os.getenv("CARD_CACHE_SIZE", 5000))
+
+    # Кэш готовых PDF резюме (суммарный размер в байтах)
+    RESUME_CACHE_BYTES = int(os.getenv("RESUME_CACHE_BYTES", 32 * 1024 * 1024))
+    # Отрисовка PDF в пуле процессов (0 — в фоновом потоке без процессов),
+    # предел заданий в пуле и таймаут отрисовки (сек)
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", 2))
+    PDF_QUEUE_LIMIT = int(os.getenv("PDF_QUEUE_LIMIT", 20))
+    PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", 30))
+    # Отрисовка резюме на всех языках сразу после сохранения профиля
+    RESUME_PRERENDER = os.getenv("RESUME_PRERENDER", "true").lower() == "true"
+
+    # file_id загруженных документов по хешу содержимого (0 — без кэша)
+    DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", 5000))
+
+    # Как часто проверять, кому пора отправить дайджест откликов (сек, 0 — не отправлять)
+    DIGEST_INTERVAL = int(os.getenv("DIGEST_INTERVAL", 300))
+
+    # Логи пишет фоновый поток: размер очереди (при переполнении записи
+    # отбрасываются, обработка обновлений диск не ждет), не больше
+    # LOG_RATE_LIMIT записей с одного места в коде за LOG_RATE_PERIOD сек,
+    # сверх лимита — каждая LOG_SAMPLE_EVERY-я; лимиты отдельных логгеров
+    # строкой "database.users=5,root=50" (0 — без лимита)
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", 20))
+    LOG_RATE_PERIOD = float(os.getenv("LOG_RATE_PERIOD", 60))
+    LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 100))
+    LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "")
+
+    # Профилирование по запросу (/profile, сигнал SIGUSR2, /debug/profile на
+    # порту метрик): снимки стеков всех потоков раз в PROFILE_INTERVAL сек,
+    # не дольше PROFILE_MAX_SECONDS; по сигналу профиль пишется в PROFILE_DIR.
+    # HTTP-триггер работает только с заданным PROFILE_TOKEN
+    PROFILE_SECONDS = int(os.getenv("PROFILE_SECONDS", 30))
+    PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 120))
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.01))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+    # Лог медленных запросов: дольше SLOW_QUERY_MS мс (0 — выключен) пишутся
+    # в лог с планом выполнения; /slow показывает SLOW_QUERY_TOP самых дорогих
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+    SLOW_QUERY_TOP = int(os.getenv("SLOW_QUERY_TOP", 10))
+
     # Настройки базы данных
     DB_NAME = os.getenv("DB_PATH", "jobs_database.db")
 
@@ -1,4 +1,5 @@
 from .backup import create_backup  # noqa: F401
+from .broadcasts import mark_user_reachable  # noqa: F401
 from .core import (  # noqa: F401
     clear_user_state,
     close_all_connections,
@@ -6,7 +7,16 @@ from .core import (  # noqa: F401
     get_connection,
     get_user_state,
     set_user_state,
+    update_user_state,
 )
+from .digests import get_digest_mode, set_digest_mode  # noqa: F401
+from .matching import get_ranked_candidates, get_vacancy_for_matching  # noqa: F401
 from .schema import init_database  # noqa: F401
+from .searches import (  # noqa: F401
+    MAX_SAVED_SEARCHES,
+    create_saved_search,
+    delete_saved_search,
+    get_saved_searches,
+)
 from .users import *  # noqa: F401, F403
 from .vacancies import *  # noqa: F401, F403
@@ -0,0 +1,133 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core import execute_query
+
+# ================= ОТКЛИКИ ПОСТРАНИЧНО =================
+APPLICATION_STATUSES = ("pending", "accepted", "rejected")
+APPLICANTS_PAGE_SIZE = 5
+
+APPLICANT_COLUMNS = """
+    a.id AS application_id, a.status AS application_status, a.created_at AS applied_at,
+    js.id, js.version, js.full_name, js.gender, js.age, js.city, js.profession,
+    js.education, js.experience, js.skills, js.languages, js.phone, js.email,
+    js.telegram_id
+"""
+
+# Вакансии работодателя по его Telegram ID (проверка владельца в том же запросе)
+OWNED_VACANCIES = """
+    SELECT v.id FROM vacancies v
+    JOIN employers e ON e.id = v.employer_id
+    WHERE e.telegram_id = ?
+"""
+
+
+def get_owned_vacancy(vacancy_id: int, telegram_id: int) -> Optional[Dict[str, Any]]:
+    """Вакансия, если она принадлежит работодателю"""
+    return execute_query(
+        """
+        SELECT v.id, v.title FROM vacancies v
+        JOIN employers e ON e.id = v.employer_id
+        WHERE v.id = ? AND e.telegram_id = ?
+        """,
+        (vacancy_id, telegram_id),
+        fetchone=True,
+    )
+
+
+def get_application_counts(vacancy_id: int) -> Dict[str, int]:
+    """Количество откликов на вакансию по статусам (и total)"""
+    rows = execute_query(
+        """
+        SELECT a.status, COUNT(*) AS cnt
+        FROM applications a
+        JOIN job_seekers js ON js.id = a.seeker_id
+        WHERE a.vacancy_id = ? AND js.status = 'active'
+        GROUP BY a.status
+        """,
+        (vacancy_id,),
+        fetchall=True,
+    )
+    counts = {status: 0 for status in APPLICATION_STATUSES}
+    for row in rows or []:
+        # NULL (отклики до DEFAULT 'pending') и 'pending' — отдельные группы
+        status = row["status"] or "pending"
+        counts[status] = counts.get(status, 0) + row["cnt"]
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def get_applicants_page(
+    vacancy_id: int,
+    status: Optional[str] = None,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = APPLICANTS_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Страница откликов (новые сверху) по ключу (created_at, id): after_id —
+    страница после отклика, before_id — страница перед ним. Возвращает
+    отклики и признак, что в направлении листания есть еще страница.
+    """
+    conditions = ["a.vacancy_id = ?", "js.status = 'active'"]
+    params: List[Any] = [vacancy_id]
+    if status:
+        conditions.append("a.status = ?")
+        params.append(status)
+
+    cursor_id = after_id or before_id
+    order = "ASC" if before_id else "DESC"
+    if cursor_id:
+        op = ">" if before_id else "<"
+        cursor = "(SELECT created_at FROM applications WHERE id = ?)"
+        conditions.append(
+            f"(a.created_at {op} {cursor} OR (a.created_at = {cursor} AND a.id {op} ?))"
+        )
+        params += [cursor_id, cursor_id, cursor_id]
+
+    rows = execute_query(
+        f"""
+        SELECT {APPLICANT_COLUMNS}
+        FROM applications a
+        JOIN job_seekers js ON js.id = a.seeker_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY a.created_at {order}, a.id {order}
+        LIMIT ?
+        """,  # nosec B608
+        (*params, limit + 1),
+        fetchall=True,
+    )
+    rows = rows or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if before_id:
+        rows.reverse()
+    return rows, has_more
+
+
+def get_applicant(application_id: int, telegram_id: int) -> Optional[Dict[str, Any]]:
+    """Отклик с данными соискателя (только для владельца вакансии)"""
+    return execute_query(
+        f"""
+        SELECT {APPLICANT_COLUMNS}, a.vacancy_id
+        FROM applications a
+        JOIN job_seekers js ON js.id = a.seeker_id
+        WHERE a.id = ? AND a.vacancy_id IN ({OWNED_VACANCIES})
+        """,  # nosec B608
+        (application_id, telegram_id),
+        fetchone=True,
+    )
+
+
+def set_application_status(application_id: int, status: str, telegram_id: int) -> bool:
+    """Смена статуса отклика владельцем вакансии"""
+    if status not in APPLICATION_STATUSES:
+        raise ValueError(f"Неизвестный статус отклика: {status}")
+    result = execute_query(
+        f"""
+        UPDATE applications SET status = ?
+        WHERE id = ? AND vacancy_id IN ({OWNED_VACANCIES})
+        """,  # nosec B608
+        (status, application_id, telegram_id),
+        commit=True,
+    )
+    return bool(result)
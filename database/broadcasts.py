@@ -0,0 +1,238 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from .core import execute_query
+from .searches import location_aliases
+from .users import invalidate_user_cache
+
+# ================= РАССЫЛКИ =================
+RECIPIENT_TABLES = ("job_seekers", "employers")
+BROADCAST_LANGUAGES = ("ru", "uz", "en")
+SEGMENT_ROLES = {
+    "all": RECIPIENT_TABLES,
+    "seekers": ("job_seekers",),
+    "employers": ("employers",),
+}
+
+
+def segment_tables(segment: Dict[str, Any]) -> Tuple[str, ...]:
+    """Таблицы получателей сегмента (статус есть только у соискателей)"""
+    tables = SEGMENT_ROLES.get(segment.get("role") or "all", RECIPIENT_TABLES)
+    if segment.get("status"):
+        tables = tuple(t for t in tables if t == "job_seekers")
+    return tables
+
+
+def segment_languages(segment: Dict[str, Any]) -> Tuple[str, ...]:
+    """Языки получателей сегмента"""
+    lang = segment.get("language")
+    return (lang,) if lang else BROADCAST_LANGUAGES
+
+
+def broadcast_phases(segment: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Этапы рассылки (таблица, язык) — получатели идут группами по language_code.
+    Порядок детерминирован, поэтому cursor_phase остается валидным после перезапуска.
+    """
+    return [
+        (table, lang)
+        for table in segment_tables(segment)
+        for lang in segment_languages(segment)
+    ]
+
+
+def _segment_conditions(
+    table: str, segment: Dict[str, Any], alias: str, languages: Tuple[str, ...]
+) -> Tuple[List[str], List[Any]]:
+    """Условия WHERE сегмента для таблицы (alias — имя таблицы в запросе)"""
+    conditions = [f"{alias}.bot_blocked = 0"]
+    params: List[Any] = []
+
+    conditions.append(f"{alias}.language_code IN ({', '.join('?' for _ in languages)})")
+    params.extend(languages)
+
+    if segment.get("location"):
+        aliases = location_aliases(segment["location"])
+        conditions.append(f"{alias}.city IN ({', '.join('?' for _ in aliases)})")
+        params.extend(aliases)
+    if segment.get("status") and table == "job_seekers":
+        conditions.append(f"{alias}.status = ?")
+        params.append(segment["status"])
+    if segment.get("registered_since"):
+        conditions.append(f"{alias}.created_at >= ?")
+        params.append(segment["registered_since"])
+    if segment.get("active_since"):
+        # last_login обновляется middleware при каждом обращении (не чаще раза в час)
+        conditions.append(f"{alias}.last_login >= ?")
+        params.append(segment["active_since"])
+    return conditions, params
+
+
+def _recipient_filter(
+    table: str, segment: Dict[str, Any], languages: Tuple[str, ...]
+) -> Tuple[str, List[Any]]:
+    """WHERE для получателей таблицы в сегменте"""
+    conditions, params = _segment_conditions(table, segment, table, languages)
+    if table == "employers" and "job_seekers" in segment_tables(segment):
+        # Работодатель, который также получает рассылку как соискатель, получает одно сообщение
+        seeker_conditions, seeker_params = _segment_conditions(
+            "job_seekers", segment, "js", segment_languages(segment)
+        )
+        conditions.append(
+            "NOT EXISTS (SELECT 1 FROM job_seekers js "
+            "WHERE js.telegram_id = employers.telegram_id AND "
+            + " AND ".join(seeker_conditions)
+            + ")"
+        )
+        params.extend(seeker_params)
+    return " AND ".join(conditions), params
+
+
+def count_broadcast_recipients(segment: Optional[Dict[str, Any]] = None) -> int:
+    """Количество получателей сегмента"""
+    segment = segment or {}
+    total = 0
+    for table in segment_tables(segment):
+        where, params = _recipient_filter(table, segment, segment_languages(segment))
+        # fmt: off
+        query = f"SELECT COUNT(*) AS cnt FROM {table} WHERE {where}"  # nosec B608
+        # fmt: on
+        row = execute_query(query, tuple(params), fetchone=True)
+        total += row["cnt"] if row else 0
+    return total
+
+
+def fetch_broadcast_recipients(
+    phase: int, after_id: int, limit: int, segment: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Следующая пачка получателей этапа после курсора (keyset-пагинация по id)"""
+    segment = segment or {}
+    phases = broadcast_phases(segment)
+    if phase >= len(phases):
+        return []
+    table, lang = phases[phase]
+    where, params = _recipient_filter(table, segment, (lang,))
+    # fmt: off
+    query = (
+        f"SELECT id, telegram_id FROM {table} "  # nosec B608
+        f"WHERE id > ? AND {where} ORDER BY id LIMIT ?"
+    )
+    # fmt: on
+    return cast(
+        List[Dict[str, Any]],
+        execute_query(query, (after_id, *params, limit), fetchall=True),
+    )
+
+
+def create_broadcast_job(
+    admin_id: int,
+    message_text: str,
+    total: int,
+    segment: Optional[Dict[str, Any]] = None,
+    variants: Optional[Dict[str, str]] = None,
+) -> Optional[int]:
+    """Создание задания рассылки (сегмент и переводы хранятся в JSON)"""
+    try:
+        execute_query(
+            """
+            INSERT INTO broadcast_jobs (admin_id, message_text, total, segment, variants)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (
+                admin_id,
+                message_text,
+                total,
+                json.dumps(segment or {}, ensure_ascii=False),
+                json.dumps(variants or {}, ensure_ascii=False),
+            ),
+        )
+        row = execute_query(
+            "SELECT id FROM broadcast_jobs WHERE admin_id = ? ORDER BY id DESC LIMIT 1",
+            (admin_id,),
+            fetchone=True,
+        )
+        return row["id"] if row else None
+    except Exception as e:
+        logging.error(f"Ошибка создания рассылки: {e}", exc_info=True)
+        return None
+
+
+def get_broadcast_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Задание рассылки по id"""
+    return cast(
+        Optional[Dict[str, Any]],
+        execute_query(
+            "SELECT * FROM broadcast_jobs WHERE id = ?", (job_id,), fetchone=True
+        ),
+    )
+
+
+def get_unfinished_broadcasts() -> List[Dict[str, Any]]:
+    """Рассылки, прерванные перезапуском бота"""
+    return cast(
+        List[Dict[str, Any]],
+        execute_query(
+            "SELECT * FROM broadcast_jobs WHERE status = 'running' ORDER BY id",
+            (),
+            fetchall=True,
+        ),
+    )
+
+
+def set_broadcast_status(
+    job_id: int, status: str, expected: Optional[List[str]] = None
+) -> bool:
+    """Смена статуса рассылки (опционально — только из ожидаемых статусов)"""
+    query = "UPDATE broadcast_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+    params: List[Any] = [status, job_id]
+    if expected:
+        query += f" AND status IN ({', '.join('?' for _ in expected)})"
+        params.extend(expected)
+    return bool(execute_query(query, tuple(params)))
+
+
+def set_broadcast_progress_message(job_id: int, chat_id: int, message_id: int) -> None:
+    """Сообщение, в котором показывается прогресс рассылки"""
+    execute_query(
+        "UPDATE broadcast_jobs SET progress_chat_id = ?, progress_message_id = ? WHERE id = ?",
+        (chat_id, message_id, job_id),
+    )
+
+
+def save_broadcast_batch(
+    job_id: int, phase: int, cursor_id: int, sent: int, failed: int, deactivated: int
+) -> None:
+    """Фиксирует курсор и счетчики после отправленной пачки"""
+    execute_query(
+        """
+        UPDATE broadcast_jobs
+        SET cursor_phase = ?, cursor_id = ?, sent = sent + ?, failed = failed + ?,
+            deactivated = deactivated + ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """,
+        (phase, cursor_id, sent, failed, deactivated, job_id),
+    )
+
+
+def deactivate_recipients(telegram_ids: List[int]) -> int:
+    """Помечает недоступных получателей одним UPDATE на таблицу"""
+    if not telegram_ids:
+        return 0
+    placeholders = ", ".join("?" for _ in telegram_ids)
+    for table in RECIPIENT_TABLES:
+        # fmt: off
+        query = f"UPDATE {table} SET bot_blocked = 1 WHERE telegram_id IN ({placeholders})"  # nosec B608
+        # fmt: on
+        execute_query(query, tuple(telegram_ids))
+    return len(telegram_ids)
+
+
+def mark_user_reachable(telegram_id: int) -> None:
+    """Снимает отметку недоступности, когда пользователь снова пишет боту"""
+    for table in RECIPIENT_TABLES:
+        # fmt: off
+        query = f"UPDATE {table} SET bot_blocked = 0 WHERE telegram_id = ?"  # nosec B608
+        # fmt: on
+        execute_query(query, (telegram_id,))
+    invalidate_user_cache(telegram_id)
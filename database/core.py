@@ -2,10 +2,13 @@ import atexit
 import hashlib
 import logging
 import os
+import re
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -20,9 +23,9 @@ logger = logging.getLogger(__name__)
 # Храним подключения для каждого потока
 _local = threading.local()
 
-# Глобальный словарь для состояний пользователей (в памяти)
-_user_states: Dict[int, Dict[str, Any]] = {}
-_user_states_lock = threading.Lock()
+# Хранилище состояний пользователей (создается при первом обращении)
+_state_store = None
+_state_store_lock = threading.Lock()
 
 # Глобальный пул соединений PostgreSQL
 _pg_pool = None
@@ -156,24 +159,128 @@ def verify_password(stored_hash: str, password: str) -> bool:
 
 
 # ================= ФУНКЦИИ СОСТОЯНИЙ =================
+def get_state_store():
+    """
+    Хранилище состояний из STATE_BACKEND: memory, sqlite, postgres или auto.
+    Долговременные хранилища переживают перезапуск и общие для процессов.
+    STATE_TTL, STATE_TTLS и STATE_MAX_TRACKED ограничивают брошенные диалоги.
+    """
+    global _state_store
+    if _state_store is None:
+        with _state_store_lock:
+            if _state_store is None:
+                from .state_store import (
+                    DEFAULT_MAX_TRACKED,
+                    DEFAULT_STATE_TTL,
+                    create_state_store,
+                    parse_step_ttls,
+                )
+
+                _state_store = create_state_store(
+                    os.getenv("STATE_BACKEND", "auto"),
+                    cache_ttl=float(os.getenv("STATE_CACHE_TTL", 1.0)),
+                    cache_size=int(os.getenv("STATE_CACHE_SIZE", 10000)),
+                    ttls=parse_step_ttls(os.getenv("STATE_TTLS", "")),
+                    default_ttl=float(os.getenv("STATE_TTL", DEFAULT_STATE_TTL)),
+                    max_tracked=int(
+                        os.getenv("STATE_MAX_TRACKED", DEFAULT_MAX_TRACKED)
+                    ),
+                )
+                logger.info(f"✅ Хранилище состояний: {_state_store.name}")
+    return _state_store
+
+
+def set_state_store(store) -> None:
+    """Замена хранилища состояний (тесты, явная настройка)"""
+    global _state_store
+    with _state_store_lock:
+        _state_store = store
+
+
 def get_user_state(user_id: int) -> Dict[str, Any]:
     """Получение состояния пользователя"""
-    with _user_states_lock:
-        state = _user_states.get(user_id, {})
-        return state.copy() if state else {}
+    return get_state_store().get(user_id)
 
 
 def set_user_state(user_id: int, state: Dict[str, Any]) -> None:
     """Установка состояния пользователя"""
-    with _user_states_lock:
-        _user_states[user_id] = state.copy() if state else {}
+    get_state_store().set(user_id, dict(state) if state else {})
 
 
 def clear_user_state(user_id: int) -> None:
     """Очистка состояния пользователя"""
-    with _user_states_lock:
-        if user_id in _user_states:
-            del _user_states[user_id]
+    get_state_store().clear(user_id)
+
+
+def update_user_state(
+    user_id: int,
+    updater: Callable[[Dict[str, Any]], Dict[str, Any]],
+    retries: int = 5,
+) -> Dict[str, Any]:
+    """
+    Чтение-изменение-запись без потерянных обновлений: при конкурентной
+    записи из другого процесса updater вызывается заново на свежем состоянии.
+    """
+    store = get_state_store()
+    for _ in range(retries):
+        state, version = store.get_versioned(user_id)
+        new_state = updater(dict(state))
+        if store.compare_and_set(user_id, new_state, version):
+            return new_state
+    raise RuntimeError(f"Не удалось обновить состояние пользователя {user_id}")
+
+
+# ================= НАБЛЮДЕНИЕ ЗА ЗАПРОСАМИ =================
+# Подписчики запросов: callback(запрос, параметры, секунды, ошибка или None)
+# после каждого execute_query. Пока подписчиков нет, время не измеряется.
+QueryObserver = Callable[[str, tuple, float, Optional[BaseException]], None]
+_query_observers: List[QueryObserver] = []
+
+_FINGERPRINT_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_FINGERPRINT_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_FINGERPRINT_TABLE = re.compile(
+    r"\b(?:from|into|update|table(?: if (?:not )?exists)?|index (?:if not exists )?\w+ on)\s+(\w+)"
+)
+
+
+def add_query_observer(callback: QueryObserver) -> None:
+    if callback not in _query_observers:
+        _query_observers.append(callback)
+
+
+def remove_query_observer(callback: QueryObserver) -> None:
+    if callback in _query_observers:
+        _query_observers.remove(callback)
+
+
+def _notify_query(
+    query: str, params: tuple, seconds: float, error: Optional[BaseException]
+) -> None:
+    for callback in _query_observers:
+        try:
+            callback(query, params, seconds, error)
+        except Exception as e:
+            logger.error(f"Ошибка наблюдателя запросов: {e}")
+
+
+@lru_cache(maxsize=2048)
+def normalize_query(query: str) -> str:
+    """Текст запроса в одну строку, литералы и списки IN (?, ?, ...) свернуты"""
+    normalized = _FINGERPRINT_LITERALS.sub("?", " ".join(query.split()).lower())
+    return _FINGERPRINT_LISTS.sub("(?+)", normalized)
+
+
+@lru_cache(maxsize=2048)
+def query_fingerprint(query: str) -> str:
+    """
+    Отпечаток запроса: "операция таблица хеш" нормализованного текста, поэтому
+    число разных отпечатков ограничено числом запросов в коде.
+    """
+    normalized = normalize_query(query)
+    operation = normalized.split(" ", 1)[0] if normalized else "-"
+    table = _FINGERPRINT_TABLE.search(normalized)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:8]
+    return f"{operation} {table.group(1) if table else '-'} {digest}"
 
 
 # ================= ОБЩИЕ ФУНКЦИИ БД =================
@@ -186,6 +293,9 @@ def execute_query(
     suppress_error: bool = False,
 ) -> Any:  # noqa: C901, E501
     """Универсальная функция выполнения запросов с обработкой ошибок"""
+    started = time.perf_counter() if _query_observers else None
+    error: Optional[BaseException] = None
+    text = query
     conn = get_connection()
 
     # Адаптация плейсхолдеров для PostgreSQL
@@ -214,10 +324,13 @@ def execute_query(
                 conn.commit()
             return cursor.rowcount
     except DBError as e:
+        error = e
         if not suppress_error:
-            logger.error(f"❌ Ошибка БД в execute_query: {e}")
-            logger.error(f"   Запрос: {query}")
-            logger.error(f"   Параметры: {params}")
+            logger.error(
+                f"❌ Ошибка БД в execute_query: {e}\n"
+                f"   Запрос: {query}\n"
+                f"   Параметры: {params}"
+            )
         if commit and not fetchone and not fetchall:
             try:
                 conn.rollback()
@@ -225,6 +338,7 @@ def execute_query(
                 pass
         raise
     except Exception as e:
+        error = e
         logger.error(f"❌ Неизвестная ошибка в execute_query: {e}")
         if commit and not fetchone and not fetchall:
             try:
@@ -242,6 +356,14 @@ def execute_query(
             # Для SELECT без необходимости в транзакции
             close_connection()
 
+        if started is not None:
+            _notify_query(text, params, time.perf_counter() - started, error)
+
+
+def is_postgres() -> bool:
+    """Запросы выполняются в PostgreSQL (иначе SQLite)"""
+    return _pg_pool is not None
+
 
 def get_pool_stats() -> Optional[Dict[str, Any]]:
     """Получение статистики пула соединений"""
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .core import execute_query
+from .users import invalidate_user_cache
+
+# ================= ДАЙДЖЕСТЫ ОТКЛИКОВ =================
+DIGEST_MODES = ("instant", "hourly", "daily")
+DIGEST_PERIODS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+# Отклик, записанный в ту же секунду, что и выборка, попадет в следующий дайджест
+DIGEST_LAG = timedelta(seconds=2)
+# Нижняя граница окна для первого дайджеста (PostgreSQL не сравнивает TIMESTAMP с '')
+DIGEST_EPOCH = "1970-01-01 00:00:00"
+DIGEST_EMPLOYER_COLUMNS = "id, telegram_id, language_code, digest_mode, digest_sent_at"
+
+
+def db_timestamp(moment: datetime) -> str:
+    """Время в формате CURRENT_TIMESTAMP (UTC)"""
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_digest_mode(telegram_id: int) -> str:
+    """Режим уведомлений работодателя об откликах"""
+    row = execute_query(
+        "SELECT digest_mode FROM employers WHERE telegram_id = ?",
+        (telegram_id,),
+        fetchone=True,
+    )
+    return (row and row.get("digest_mode")) or "instant"
+
+
+def set_digest_mode(telegram_id: int, mode: str) -> bool:
+    """
+    Смена режима уведомлений. При переходе из instant окно дайджеста
+    начинается с момента переключения: прежние отклики уже отправлены сразу.
+    Между часовым и суточным режимами окно сохраняется.
+    """
+    if mode not in DIGEST_MODES:
+        raise ValueError(f"Неизвестный режим дайджеста: {mode}")
+    result = execute_query(
+        """
+        UPDATE employers SET
+            digest_sent_at = CASE WHEN COALESCE(digest_mode, 'instant') = 'instant'
+                                  THEN ? ELSE digest_sent_at END,
+            digest_mode = ?
+        WHERE telegram_id = ?
+        """,
+        (db_timestamp(datetime.utcnow() - DIGEST_LAG), mode, telegram_id),
+        commit=True,
+    )
+    invalidate_user_cache(telegram_id)
+    return bool(result)
+
+
+def get_digest_employer(telegram_id: int) -> Optional[Dict[str, Any]]:
+    """Настройки дайджеста работодателя (для внеочередной отправки)"""
+    return execute_query(
+        f"SELECT {DIGEST_EMPLOYER_COLUMNS} FROM employers WHERE telegram_id = ?",  # nosec B608
+        (telegram_id,),
+        fetchone=True,
+    )
+
+
+def get_due_digest_employers(now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Работодатели, у которых подошло время очередного дайджеста"""
+    now = now or datetime.utcnow()
+    employers: List[Dict[str, Any]] = []
+    for mode, period in DIGEST_PERIODS.items():
+        rows = execute_query(
+            f"""
+            SELECT {DIGEST_EMPLOYER_COLUMNS}
+            FROM employers
+            WHERE digest_mode = ? AND COALESCE(bot_blocked, 0) = 0
+              AND (digest_sent_at IS NULL OR digest_sent_at <= ?)
+            """,  # nosec B608
+            (mode, db_timestamp(now - period)),
+            fetchall=True,
+        )
+        employers.extend(rows or [])
+    return employers
+
+
+def get_digest_applications(
+    employer_id: int, since: Optional[str], until: str
+) -> List[Dict[str, Any]]:
+    """
+    Новые отклики на вакансии работодателя за окно (since, until] по
+    индексу applications.created_at, сгруппированные по вакансиям.
+    """
+    rows = execute_query(
+        """
+        SELECT a.id AS application_id, a.vacancy_id, a.created_at AS applied_at,
+               v.title AS vacancy_title, js.*
+        FROM applications a
+        JOIN vacancies v ON v.id = a.vacancy_id
+        JOIN job_seekers js ON js.id = a.seeker_id
+        WHERE a.created_at > ? AND a.created_at <= ? AND v.employer_id = ?
+        ORDER BY a.vacancy_id, a.created_at, a.id
+        """,
+        (since or DIGEST_EPOCH, until, employer_id),
+        fetchall=True,
+    )
+    return rows or []
+
+
+def mark_digest_sent(employer_id: int, until: str) -> None:
+    """Сдвиг окна дайджеста на время последней выборки"""
+    execute_query(
+        "UPDATE employers SET digest_sent_at = ? WHERE id = ?",
+        (until, employer_id),
+        commit=True,
+    )
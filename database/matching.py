@@ -0,0 +1,185 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from .core import execute_query
+
+# ================= ПОДБОР КАНДИДАТОВ =================
+# Веса критериев ранжирования (сумма = 100)
+MATCH_WEIGHT_PROFESSION = 40
+MATCH_WEIGHT_SPHERE = 15  # Та же сфера, но другая профессия
+MATCH_WEIGHT_LANGUAGES = 30
+MATCH_WEIGHT_CITY = 20
+MATCH_WEIGHT_GENDER = 10
+
+# Уровни владения языком по возрастанию
+LANGUAGE_LEVELS = ["level_basic", "level_practical", "level_fluent", "level_proficient"]
+
+SHORTLIST_LIMIT = 10
+# Сколько самых свежих анкет берется из каждой ветки предварительного отбора
+MATCH_POOL_LIMIT = 3000
+# LIKE с явным экранирующим символом: одинаково в SQLite и PostgreSQL
+LIKE_ESCAPED = "LIKE ? ESCAPE '\\'"
+
+
+def _sphere_professions(title: str) -> List[str]:
+    """Профессии той же сферы, что и профессия вакансии"""
+    from localization import PROFESSION_SPHERES_KEYS
+
+    for prof_keys in PROFESSION_SPHERES_KEYS.values():
+        if title in prof_keys:
+            return [key for key in prof_keys if key != title]
+    return []
+
+
+def parse_required_languages(raw: Optional[str]) -> List[Dict[str, str]]:
+    """Разбор JSON требований к языкам вакансии (старые текстовые значения игнорируются)"""
+    if not raw or not isinstance(raw, str) or not raw.strip().startswith("["):
+        return []
+    try:
+        items = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return [item for item in items if isinstance(item, dict) and item.get("level_key")]
+
+
+def _like_escape(text: str) -> str:
+    # В PostgreSQL обратная косая черта в LIKE — экранирующий символ по умолчанию
+    return text.replace("\\", "\\\\")
+
+
+def _language_like_patterns(item: Dict[str, str]) -> Tuple[List[str], str]:
+    """
+    LIKE-шаблоны для поиска языка в JSON профиля соискателя.
+    Возвращает шаблоны для уровней не ниже требуемого и шаблон «язык есть, уровень любой».
+    """
+    # Сериализация как при сохранении профиля: json.dumps с \uXXXX для не-ASCII
+    if item.get("lang_key"):
+        name_part = _like_escape(json.dumps({"lang_key": item["lang_key"]})[1:-1])
+    else:
+        name_part = _like_escape(
+            json.dumps({"lang_name": item.get("lang_name", "")})[1:-1]
+        )
+
+    level = item.get("level_key")
+    required_idx = LANGUAGE_LEVELS.index(level) if level in LANGUAGE_LEVELS else 0
+    covering = [
+        f"%{name_part}, {json.dumps({'level_key': lvl})[1:-1]}%"
+        for lvl in LANGUAGE_LEVELS[required_idx:]
+    ]
+    return covering, f"%{name_part}%"
+
+
+def build_candidate_query(
+    vacancy: Dict[str, Any], limit: int = SHORTLIST_LIMIT
+) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Строит один SQL-запрос, который отбирает кандидатов по индексам
+    (статус + профессия/сфера или город) и вычисляет балл прямо в БД.
+    """
+    title = vacancy.get("title") or ""
+    city = vacancy.get("city") or ""
+    gender = vacancy.get("gender") or "any"
+    sphere = _sphere_professions(title)
+    required_langs = parse_required_languages(vacancy.get("languages"))
+
+    score_parts: List[str] = []
+    score_params: List[Any] = []
+
+    # 1. Профессия
+    profession_sql = f"CASE WHEN js.profession = ? THEN {MATCH_WEIGHT_PROFESSION}"
+    score_params.append(title)
+    if sphere:
+        placeholders = ", ".join("?" for _ in sphere)
+        profession_sql += (
+            f" WHEN js.profession IN ({placeholders}) THEN {MATCH_WEIGHT_SPHERE}"
+        )
+        score_params.extend(sphere)
+    score_parts.append(profession_sql + " ELSE 0 END")
+
+    # 2. Языки: полное покрытие уровня = 1, язык ниже уровнем = 0.5
+    if required_langs:
+        per_lang = []
+        for item in required_langs:
+            covering, any_level = _language_like_patterns(item)
+            conditions = " OR ".join(f"js.languages {LIKE_ESCAPED}" for _ in covering)
+            per_lang.append(
+                f"(CASE WHEN {conditions} THEN 1.0 "
+                f"WHEN js.languages {LIKE_ESCAPED} THEN 0.5 ELSE 0 END)"
+            )
+            score_params.extend(covering)
+            score_params.append(any_level)
+        score_parts.append(
+            f"({' + '.join(per_lang)}) * {MATCH_WEIGHT_LANGUAGES} / {len(required_langs)}"
+        )
+    else:
+        score_parts.append(str(MATCH_WEIGHT_LANGUAGES))
+
+    # 3. Город
+    score_parts.append(f"CASE WHEN js.city = ? THEN {MATCH_WEIGHT_CITY} ELSE 0 END")
+    score_params.append(city)
+
+    # 4. Пол
+    if gender in ("male", "female"):
+        score_parts.append(
+            f"CASE WHEN js.gender = ? THEN {MATCH_WEIGHT_GENDER} ELSE 0 END"
+        )
+        score_params.append(gender)
+    else:
+        score_parts.append(str(MATCH_WEIGHT_GENDER))
+
+    # Предварительный отбор по индексам (status, profession) и (status, city):
+    # из каждой ветки берутся самые свежие анкеты, чтобы объем работы был ограничен
+    professions = [title, *sphere]
+    profession_filter = ", ".join("?" for _ in professions)
+    filter_params: List[Any] = [*professions, MATCH_POOL_LIMIT, city, MATCH_POOL_LIMIT]
+
+    # fmt: off
+    query = (
+        f"SELECT js.*, ({' + '.join(score_parts)}) AS match_score "  # nosec B608
+        "FROM job_seekers js "
+        "WHERE js.id IN ("
+        "SELECT id FROM (SELECT id FROM job_seekers WHERE status = 'active' "
+        f"AND profession IN ({profession_filter}) ORDER BY +id DESC LIMIT ?) AS by_profession "
+        "UNION "
+        "SELECT id FROM (SELECT id FROM job_seekers WHERE status = 'active' "
+        "AND city = ? ORDER BY +id DESC LIMIT ?) AS by_city"
+        ") "
+        "ORDER BY match_score DESC, js.id DESC LIMIT ?"
+    )
+    # fmt: on
+    return query, tuple(score_params + filter_params + [limit])
+
+
+def get_vacancy_for_matching(vacancy_id: int) -> Optional[Dict[str, Any]]:
+    """Вакансия с городом и Telegram ID работодателя"""
+    try:
+        return cast(
+            Optional[Dict[str, Any]],
+            execute_query(
+                """
+            SELECT v.id, v.title, v.gender, v.languages, v.status,
+                   COALESCE(v.city, e.city) AS city, e.telegram_id AS employer_telegram_id
+            FROM vacancies v
+            JOIN employers e ON v.employer_id = e.id
+            WHERE v.id = ?
+        """,
+                (vacancy_id,),
+                fetchone=True,
+            ),
+        )
+    except Exception as e:
+        logging.error(f"Ошибка получения вакансии {vacancy_id} для подбора: {e}")
+        return None
+
+
+def get_ranked_candidates(
+    vacancy: Dict[str, Any], limit: int = SHORTLIST_LIMIT
+) -> List[Dict[str, Any]]:
+    """Ранжированный список активных соискателей для вакансии"""
+    query, params = build_candidate_query(vacancy, limit)
+    try:
+        return cast(List[Dict[str, Any]], execute_query(query, params, fetchall=True))
+    except Exception as e:
+        logging.error(f"Ошибка подбора кандидатов: {e}", exc_info=True)
+        return []
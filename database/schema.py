@@ -27,7 +27,8 @@ def init_database():  # noqa: C901
                 education TEXT DEFAULT 'Не указано',
                 status TEXT DEFAULT 'active',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                last_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                version INTEGER NOT NULL DEFAULT 1
             )
         """,
             commit=False,
@@ -48,7 +49,9 @@ def init_database():  # noqa: C901
                 description TEXT DEFAULT 'Описание не указано',
                 business_activity TEXT DEFAULT 'Не указана',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                last_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                digest_mode TEXT DEFAULT 'instant',
+                digest_sent_at TIMESTAMP
             )
         """,
             commit=False,
@@ -68,6 +71,7 @@ def init_database():  # noqa: C901
                 languages TEXT DEFAULT 'Не указаны',
                 status TEXT DEFAULT 'active',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                version INTEGER NOT NULL DEFAULT 1,
                 FOREIGN KEY (employer_id) REFERENCES employers (id) ON DELETE CASCADE
             )
         """,
@@ -106,6 +110,62 @@ def init_database():  # noqa: C901
             commit=False,
         )
 
+        # Сохраненные поиски соискателей ('' = любое значение критерия)
+        execute_query(
+            """
+            CREATE TABLE IF NOT EXISTS saved_searches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                seeker_id INTEGER NOT NULL,
+                location TEXT NOT NULL DEFAULT '',  -- город или регион (ru)
+                profession TEXT NOT NULL DEFAULT '',  -- ключ профессии или сферы
+                job_type TEXT NOT NULL DEFAULT '',
+                keyword TEXT NOT NULL DEFAULT '',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (seeker_id) REFERENCES job_seekers (id) ON DELETE CASCADE
+            )
+        """,
+            commit=False,
+        )
+
+        # Задания рассылок (курсор позволяет продолжить после перезапуска)
+        execute_query(
+            """
+            CREATE TABLE IF NOT EXISTS broadcast_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                admin_id INTEGER NOT NULL,
+                message_text TEXT NOT NULL,
+                segment TEXT DEFAULT '{}',  -- JSON: role, location, status, language, даты
+                variants TEXT DEFAULT '{}',  -- JSON: {язык: текст}
+                status TEXT DEFAULT 'running',  -- running, paused, cancelled, done
+                cursor_phase INTEGER DEFAULT 0,  -- индекс этапа (таблица, язык)
+                cursor_id INTEGER DEFAULT 0,  -- последний обработанный id
+                total INTEGER DEFAULT 0,
+                sent INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                deactivated INTEGER DEFAULT 0,
+                progress_chat_id INTEGER,
+                progress_message_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+            commit=False,
+        )
+
+        # Состояния FSM (хранилище STATE_BACKEND=sqlite)
+        execute_query(
+            """
+            CREATE TABLE IF NOT EXISTS user_states (
+                user_id BIGINT PRIMARY KEY,
+                state TEXT NOT NULL,
+                version BIGINT NOT NULL DEFAULT 1,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at DOUBLE PRECISION
+            )
+        """,
+            commit=False,
+        )
+
         # Миграции через PRAGMA (безопасный способ)
 
         # 1. Проверка job_seekers
@@ -207,6 +267,105 @@ def init_database():  # noqa: C901
                     commit=True,
                 )
 
+        # 5. Отметка недоступности бота (пользователь заблокировал бота)
+        for table in ["job_seekers", "employers"]:
+            cols = execute_query(f"PRAGMA table_info({table})", fetchall=True)
+            if cols and "bot_blocked" not in [c["name"] for c in cols]:
+                logging.info(
+                    f"⚠️ Колонка bot_blocked не найдена в {table}, добавляем..."
+                )
+                execute_query(
+                    f"ALTER TABLE {table} ADD COLUMN bot_blocked INTEGER DEFAULT 0",
+                    commit=True,
+                )
+
+        # 6. Индексы для подбора кандидатов (предварительный отбор в SQL)
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_job_seekers_status_profession "
+            "ON job_seekers (status, profession)",
+            commit=True,
+        )
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_job_seekers_status_city "
+            "ON job_seekers (status, city)",
+            commit=True,
+        )
+
+        # 7. Индексы для инкрементального сопоставления сохраненных поисков
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_saved_searches_criteria "
+            "ON saved_searches (location, profession, job_type)",
+            commit=True,
+        )
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_saved_searches_seeker "
+            "ON saved_searches (seeker_id)",
+            commit=True,
+        )
+
+        # 8. Индексы для выборки получателей рассылки по языку (keyset по id)
+        for table in ["job_seekers", "employers"]:
+            # fmt: off
+            execute_query(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_broadcast "  # nosec B608
+                f"ON {table} (language_code, bot_blocked)",
+                commit=True,
+            )
+            # fmt: on
+
+        # 9. Время жизни состояний FSM (очистка брошенных диалогов)
+        cols = execute_query("PRAGMA table_info(user_states)", fetchall=True)
+        if cols and "expires_at" not in [c["name"] for c in cols]:
+            logging.info("⚠️ Колонка expires_at не найдена в user_states, добавляем...")
+            execute_query(
+                "ALTER TABLE user_states ADD COLUMN expires_at DOUBLE PRECISION",
+                commit=True,
+            )
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_user_states_expires "
+            "ON user_states (expires_at)",
+            commit=True,
+        )
+
+        # 10. Версия строки для кэша отрисованных карточек (cards.py)
+        for table in ["job_seekers", "vacancies"]:
+            cols = execute_query(f"PRAGMA table_info({table})", fetchall=True)
+            if cols and "version" not in [c["name"] for c in cols]:
+                logging.info(f"⚠️ Колонка version не найдена в {table}, добавляем...")
+                execute_query(
+                    f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+                    commit=True,
+                )
+
+        # 11. Дайджесты откликов для работодателей (выборка по времени отклика)
+        cols = execute_query("PRAGMA table_info(employers)", fetchall=True)
+        column_names = [c["name"] for c in cols or []]
+        if cols and "digest_mode" not in column_names:
+            logging.info("⚠️ Колонка digest_mode не найдена в employers, добавляем...")
+            execute_query(
+                "ALTER TABLE employers ADD COLUMN digest_mode TEXT DEFAULT 'instant'",
+                commit=True,
+            )
+        if cols and "digest_sent_at" not in column_names:
+            logging.info(
+                "⚠️ Колонка digest_sent_at не найдена в employers, добавляем..."
+            )
+            execute_query(
+                "ALTER TABLE employers ADD COLUMN digest_sent_at TIMESTAMP", commit=True
+            )
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_applications_created "
+            "ON applications (created_at)",
+            commit=True,
+        )
+
+        # 12. Постраничный просмотр откликов на вакансию (keyset по created_at)
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_applications_vacancy_created "
+            "ON applications (vacancy_id, created_at)",
+            commit=True,
+        )
+
         get_connection().commit()
         logging.info("✅ База данных создана/проверена")
         return True
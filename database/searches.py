@@ -0,0 +1,216 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from .core import execute_query
+
+# ================= СОХРАНЕННЫЕ ПОИСКИ =================
+MAX_SAVED_SEARCHES = 5
+KEYWORD_MAX_LENGTH = 50
+
+# Канонические названия (ru) для городов и регионов на всех языках
+_location_index: Dict[str, Tuple[str, str]] = {}
+# Каноническое название -> {lang: название на языке}
+_location_names: Dict[str, Dict[str, str]] = {}
+# Канонический регион -> канонические города
+_region_cities: Dict[str, List[str]] = {}
+
+
+def _build_location_index() -> None:
+    """Индекс «название на любом языке -> (город, регион)» строится один раз"""
+    from localization import REGIONS
+
+    canonical_regions = list(REGIONS["ru"].items())
+    for lang, regions in REGIONS.items():
+        for (canon_region, canon_cities), (region, cities) in zip(
+            canonical_regions, regions.items()
+        ):
+            _location_index.setdefault(region.lower(), ("", canon_region))
+            _location_names.setdefault(canon_region, {})[lang] = region
+            _region_cities[canon_region] = list(canon_cities)
+            for canon_city, city in zip(canon_cities, cities):
+                _location_index.setdefault(city.lower(), (canon_city, canon_region))
+                _location_names.setdefault(canon_city, {})[lang] = city
+
+
+def resolve_location(name: Optional[str]) -> Tuple[str, str]:
+    """Канонические (город, регион) для названия на любом языке"""
+    if not _location_index:
+        _build_location_index()
+    if not name:
+        return "", ""
+    return _location_index.get(name.strip().lower(), (name.strip(), ""))
+
+
+def localize_location(canonical: str, lang: str) -> str:
+    """Название города/региона на языке пользователя"""
+    if not _location_names:
+        _build_location_index()
+    return _location_names.get(canonical, {}).get(lang, canonical)
+
+
+def location_aliases(canonical: str) -> List[str]:
+    """
+    Все написания города на всех языках; для региона — также все его города.
+    Используется для фильтрации по колонке city, где хранится выбор пользователя.
+    """
+    if not _location_names:
+        _build_location_index()
+    places = [canonical] + _region_cities.get(canonical, [])
+    aliases = {canonical}
+    for place in places:
+        aliases.update(_location_names.get(place, {}).values())
+    return sorted(aliases)
+
+
+def _sphere_of(profession: str) -> str:
+    """Ключ сферы для ключа профессии"""
+    from localization import PROFESSION_SPHERES_KEYS
+
+    for sphere, prof_keys in PROFESSION_SPHERES_KEYS.items():
+        if profession in prof_keys:
+            return sphere
+    return ""
+
+
+def create_saved_search(
+    seeker_id: int,
+    location: str = "",
+    profession: str = "",
+    job_type: str = "",
+    keyword: str = "",
+) -> bool:
+    """Сохранение поиска соискателя"""
+    try:
+        count = execute_query(
+            "SELECT COUNT(*) AS cnt FROM saved_searches WHERE seeker_id = ?",
+            (seeker_id,),
+            fetchone=True,
+        )
+        if count and count["cnt"] >= MAX_SAVED_SEARCHES:
+            return False
+        execute_query(
+            """
+            INSERT INTO saved_searches (seeker_id, location, profession, job_type, keyword)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (
+                seeker_id,
+                location,
+                profession,
+                job_type,
+                keyword.strip().lower()[:KEYWORD_MAX_LENGTH],
+            ),
+        )
+        return True
+    except Exception as e:
+        logging.error(f"Ошибка сохранения поиска: {e}", exc_info=True)
+        return False
+
+
+def get_saved_searches(seeker_id: int) -> List[Dict[str, Any]]:
+    """Сохраненные поиски соискателя"""
+    try:
+        return cast(
+            List[Dict[str, Any]],
+            execute_query(
+                "SELECT * FROM saved_searches WHERE seeker_id = ? ORDER BY id",
+                (seeker_id,),
+                fetchall=True,
+            ),
+        )
+    except Exception as e:
+        logging.error(f"Ошибка получения сохраненных поисков: {e}")
+        return []
+
+
+def delete_saved_search(search_id: int, seeker_id: int) -> bool:
+    """Удаление сохраненного поиска (только своего)"""
+    try:
+        result = execute_query(
+            "DELETE FROM saved_searches WHERE id = ? AND seeker_id = ?",
+            (search_id, seeker_id),
+        )
+        return bool(result and result > 0)
+    except Exception as e:
+        logging.error(f"Ошибка удаления сохраненного поиска: {e}")
+        return False
+
+
+def get_vacancy_for_notification(vacancy_id: int) -> Optional[Dict[str, Any]]:
+    """Вакансия с компанией и городом для уведомления подписчиков"""
+    try:
+        return cast(
+            Optional[Dict[str, Any]],
+            execute_query(
+                """
+            SELECT v.id, v.title, v.description, v.salary, v.job_type, v.status,
+                   COALESCE(v.city, e.city) AS city, e.company_name
+            FROM vacancies v
+            JOIN employers e ON v.employer_id = e.id
+            WHERE v.id = ?
+        """,
+                (vacancy_id,),
+                fetchone=True,
+            ),
+        )
+    except Exception as e:
+        logging.error(f"Ошибка получения вакансии {vacancy_id} для уведомлений: {e}")
+        return None
+
+
+def _keyword_haystack(vacancy: Dict[str, Any]) -> str:
+    """Текст вакансии для поиска ключевого слова (название на всех языках)"""
+    from localization import TRANSLATIONS, get_text_by_lang
+
+    title = vacancy.get("title") or ""
+    parts = [title, vacancy.get("description") or ""]
+    if title.startswith("prof_"):
+        parts.extend(get_text_by_lang(title, lang) for lang in TRANSLATIONS)
+    return " ".join(parts).lower()
+
+
+def find_matching_subscribers(vacancy: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Подписчики, чьи сохраненные поиски подходят под новую вакансию.
+    Индекс (location, profession, job_type) отбирает только подписки
+    с совпадающими критериями, ключевое слово проверяется на этой выборке.
+    """
+    city, region = resolve_location(vacancy.get("city"))
+    title = vacancy.get("title") or ""
+    job_type = vacancy.get("job_type") or ""
+
+    try:
+        rows = execute_query(
+            """
+            SELECT ss.keyword, js.telegram_id, js.language_code
+            FROM saved_searches ss
+            JOIN job_seekers js ON js.id = ss.seeker_id
+            WHERE ss.location IN (?, ?, '')
+              AND ss.profession IN (?, ?, '')
+              AND ss.job_type IN (?, '')
+              AND js.status = 'active'
+            ORDER BY ss.id
+        """,
+            (city, region, title, _sphere_of(title), job_type),
+            fetchall=True,
+        )
+    except Exception as e:
+        logging.error(f"Ошибка поиска подписчиков: {e}", exc_info=True)
+        return []
+
+    haystack: Optional[str] = None
+    subscribers: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        if row["telegram_id"] in subscribers:
+            continue
+        keyword = row["keyword"]
+        if keyword:
+            if haystack is None:
+                haystack = _keyword_haystack(vacancy)
+            if keyword not in haystack:
+                continue
+        subscribers[row["telegram_id"]] = {
+            "telegram_id": row["telegram_id"],
+            "language_code": row["language_code"] or "ru",
+        }
+    return list(subscribers.values())
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .core import (
+    add_query_observer,
+    execute_query,
+    is_postgres,
+    normalize_query,
+    query_fingerprint,
+    remove_query_observer,
+)
+
+logger = logging.getLogger(__name__)
+
+# Сколько разных медленных запросов хранить (вытесняются самые дешевые)
+MAX_FINGERPRINTS = 500
+# Операции, для которых снимается план выполнения
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+def redact_params(params: Any) -> str:
+    """Параметры запроса без значений: только типы (и длины строк)"""
+
+    def tag(value: Any) -> str:
+        if value is None:
+            return "NULL"
+        if isinstance(value, (str, bytes, bytearray)):
+            return f"<{type(value).__name__}:{len(value)}>"
+        return f"<{type(value).__name__}>"
+
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {tag(v)}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(tag(value) for value in params or ()) + ")"
+
+
+@dataclass
+class SlowQuery:
+    """Статистика медленного запроса по отпечатку"""
+
+    fingerprint: str
+    query: str  # Нормализованный текст
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last_params: str = ""
+    last_seen: float = 0.0
+    plan: Optional[List[str]] = None
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class SlowQueryLog:
+    """
+    Подписчик execute_query: запросы дольше threshold_ms пишутся в лог с
+    отпечатком, параметрами без значений и временем, а план выполнения
+    (EXPLAIN QUERY PLAN в SQLite, EXPLAIN в PostgreSQL) снимается один раз
+    на отпечаток. Статистика по отпечаткам — для отчета администраторам.
+    """
+
+    def __init__(self, threshold_ms: float, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.threshold = threshold_ms / 1000
+        self.max_fingerprints = max_fingerprints
+        self._entries: Dict[str, SlowQuery] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def observe(
+        self,
+        query: str,
+        params: Any,
+        seconds: float,
+        error: Optional[BaseException],
+    ) -> None:
+        if seconds < self.threshold or getattr(self._local, "explaining", False):
+            return
+        fingerprint = query_fingerprint(query)
+        redacted = redact_params(params)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    cheapest = min(self._entries.values(), key=lambda e: e.total)
+                    del self._entries[cheapest.fingerprint]
+                entry = SlowQuery(fingerprint, normalize_query(query))
+                self._entries[fingerprint] = entry
+            entry.count += 1
+            entry.total += seconds
+            entry.max = max(entry.max, seconds)
+            entry.last_params = redacted
+            entry.last_seen = time.time()
+            explain = entry.plan is None and error is None
+            if explain:
+                entry.plan = []  # Другие потоки план уже не снимают
+
+        plan_text = ""
+        if explain:
+            entry.plan = self.explain(query, params)
+            if entry.plan:
+                plan_text = "\n   План:\n   " + "\n   ".join(entry.plan)
+        logger.warning(
+            f"🐢 Медленный запрос {seconds * 1000:.0f} мс [{fingerprint}]: "
+            f"{entry.query} | параметры: {redacted}{plan_text}"
+        )
+
+    def explain(self, query: str, params: Any) -> List[str]:
+        """План выполнения запроса (пустой для DDL и служебных команд)"""
+        if normalize_query(query).split(" ", 1)[0] not in EXPLAINABLE:
+            return []
+        prefix = "EXPLAIN " if is_postgres() else "EXPLAIN QUERY PLAN "
+        self._local.explaining = True
+        try:
+            rows = execute_query(
+                prefix + query, params, fetchall=True, suppress_error=True
+            )
+        except Exception as e:
+            return [f"план недоступен: {e}"]
+        finally:
+            self._local.explaining = False
+
+        lines = []
+        depth: Dict[Any, int] = {}
+        for row in rows or []:
+            if "detail" in row:
+                # SQLite: дерево плана по id/parent
+                level = depth.get(row.get("parent"), -1) + 1
+                depth[row.get("id")] = level
+                lines.append("  " * level + str(row["detail"]))
+            else:
+                lines.append(str(next(iter(row.values()), "")))
+        return lines
+
+    def top(self, limit: int = 10) -> List[SlowQuery]:
+        """Медленные запросы по суммарному времени"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=lambda e: e.total, reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def report(self, limit: int = 10) -> str:
+        """Отчет с нормализованными запросами и планами выполнения"""
+        blocks = []
+        for number, entry in enumerate(self.top(limit), 1):
+            plan = "\n".join(f"    {line}" for line in entry.plan or []) or "    —"
+            blocks.append(
+                f"{number}. [{entry.fingerprint}] {entry.count} раз, "
+                f"всего {entry.total:.2f} с, среднее {entry.avg * 1000:.0f} мс, "
+                f"макс {entry.max * 1000:.0f} мс\n"
+                f"  {entry.query}\n"
+                f"  Параметры: {entry.last_params}\n"
+                f"  План:\n{plan}"
+            )
+        return "\n\n".join(blocks)
+
+
+_slow_log: Optional[SlowQueryLog] = None
+
+
+def install_slow_query_log(threshold_ms: float) -> SlowQueryLog:
+    """Подключение лога медленных запросов (повторный вызов заменяет порог)"""
+    global _slow_log
+    if _slow_log is not None:
+        remove_query_observer(_slow_log.observe)
+    _slow_log = SlowQueryLog(threshold_ms)
+    add_query_observer(_slow_log.observe)
+    return _slow_log
+
+
+def get_slow_query_log() -> Optional[SlowQueryLog]:
+    return _slow_log
@@ -0,0 +1,490 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .core import close_connection, execute_query, init_postgres_pool
+
+logger = logging.getLogger(__name__)
+
+# Версия 0 — состояния нет; каждая запись увеличивает версию на 1
+StateVersion = Tuple[Dict[str, Any], int]
+
+# Время жизни брошенного диалога (секунды с последней записи, 0 — бессрочно)
+DEFAULT_STATE_TTL = 24 * 60 * 60
+# Семейства шагов (префикс step) с собственным временем жизни
+DEFAULT_STEP_TTLS: Dict[str, float] = {
+    "captcha": 15 * 60,
+    "search_": 15 * 60,
+    "admin_": 60 * 60,
+    "support_": 60 * 60,
+    "reply_to_admin": 60 * 60,
+    "saved_search_": 60 * 60,
+}
+# Жесткий предел числа отслеживаемых диалогов (вытесняются давно не активные)
+DEFAULT_MAX_TRACKED = 50000
+
+
+def parse_step_ttls(value: str) -> Dict[str, float]:
+    """
+    Время жизни семейств шагов из строки вида "admin_=3600,captcha=600"
+    поверх значений по умолчанию.
+    """
+    ttls = dict(DEFAULT_STEP_TTLS)
+    for item in (value or "").split(","):
+        prefix, sep, seconds = item.partition("=")
+        if not sep or not prefix.strip():
+            continue
+        try:
+            ttls[prefix.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"⚠️ Неверное время жизни состояния: {item.strip()}")
+    return ttls
+
+
+# ================= ХРАНИЛИЩА СОСТОЯНИЙ (FSM) =================
+
+
+class StateStore:
+    """Интерфейс хранилища состояний пользователей"""
+
+    name = "base"
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_STATE_TTL,
+        max_tracked: int = DEFAULT_MAX_TRACKED,
+    ):
+        self.ttls = DEFAULT_STEP_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_tracked = max_tracked
+        # Длинные префиксы проверяются первыми
+        self._prefixes = sorted(self.ttls, key=len, reverse=True)
+
+    def ttl_for(self, state: Dict[str, Any]) -> float:
+        """Время жизни состояния по семейству его шага"""
+        step = state.get("step")
+        if isinstance(step, str):
+            for prefix in self._prefixes:
+                if step.startswith(prefix):
+                    return self.ttls[prefix]
+        return self.default_ttl
+
+    def expires_at(self, state: Dict[str, Any], now: float) -> Optional[float]:
+        """Момент истечения состояния (None — бессрочно)"""
+        ttl = self.ttl_for(state)
+        return now + ttl if ttl > 0 else None
+
+    def get(self, user_id: int) -> Dict[str, Any]:
+        """Текущее состояние (пустой dict, если нет)"""
+        return self.get_versioned(user_id)[0]
+
+    def get_versioned(self, user_id: int) -> StateVersion:
+        """Состояние и его версия"""
+        raise NotImplementedError
+
+    def set(self, user_id: int, state: Dict[str, Any]) -> None:
+        """Безусловная запись состояния"""
+        raise NotImplementedError
+
+    def clear(self, user_id: int) -> None:
+        """Удаление состояния"""
+        raise NotImplementedError
+
+    def compare_and_set(
+        self, user_id: int, state: Dict[str, Any], expected_version: int
+    ) -> bool:
+        """Запись, только если версия не изменилась с момента чтения"""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Удаление истекших и лишних (сверх max_tracked) состояний"""
+        raise NotImplementedError
+
+    def tracked(self) -> int:
+        """Количество отслеживаемых диалогов"""
+        raise NotImplementedError
+
+    def step_counts(self) -> Dict[str, int]:
+        """
+        Количество диалогов по шагам. Хранилища в БД не разбирают состояния
+        ради статистики и возвращают пустой словарь.
+        """
+        return {}
+
+
+class MemoryStateStore(StateStore):
+    """
+    Состояния в памяти процесса (теряются при перезапуске).
+    Истекшие состояния отбрасываются при чтении и фоновой очисткой,
+    при превышении max_tracked вытесняются давно не активные (LRU).
+    """
+
+    name = "memory"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # user_id -> (состояние, версия, момент истечения); порядок — LRU
+        self._states: "OrderedDict[int, Tuple[Dict[str, Any], int, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    def _entry(self, user_id: int, now: float) -> StateVersion:
+        entry = self._states.get(user_id)
+        if entry is None:
+            return {}, 0
+        state, version, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._states[user_id]
+            self.expired += 1
+            return {}, 0
+        self._states.move_to_end(user_id)
+        return state, version
+
+    def _store(self, user_id: int, state: Dict[str, Any], version: int, now: float):
+        if not state:
+            self._states.pop(user_id, None)
+            return
+        self._states[user_id] = (dict(state), version, self.expires_at(state, now))
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_tracked:
+            self._states.popitem(last=False)
+            self.evicted += 1
+
+    def get_versioned(self, user_id: int) -> StateVersion:
+        with self._lock:
+            state, version = self._entry(user_id, time.monotonic())
+            return dict(state), version
+
+    def set(self, user_id: int, state: Dict[str, Any]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            version = self._entry(user_id, now)[1]
+            self._store(user_id, state, version + 1, now)
+
+    def clear(self, user_id: int) -> None:
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def compare_and_set(
+        self, user_id: int, state: Dict[str, Any], expected_version: int
+    ) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self._entry(user_id, now)[1] != expected_version:
+                return False
+            self._store(user_id, state, expected_version + 1, now)
+            return True
+
+    def sweep(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            expired = [
+                user_id
+                for user_id, (_, _, expires_at) in self._states.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            for user_id in expired:
+                del self._states[user_id]
+            self.expired += len(expired)
+            return len(expired)
+
+    def tracked(self) -> int:
+        return len(self._states)
+
+    def step_counts(self) -> Dict[str, int]:
+        with self._lock:
+            steps = [state.get("step") for state, _, _ in self._states.values()]
+        counts: Dict[str, int] = {}
+        for step in steps:
+            name = step if isinstance(step, str) else "-"
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+class SQLStateStore(StateStore):
+    """
+    Состояния в таблице user_states, общей для всех процессов бота.
+    Локальный write-through кэш с коротким TTL снимает чтения из БД на
+    каждом сообщении; версия строки используется для compare-and-set.
+    """
+
+    name = "sql"
+
+    def __init__(self, cache_ttl: float = 1.0, cache_size: int = 10000, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # user_id -> (состояние, версия или None, если неизвестна, время записи)
+        self._cache: "OrderedDict[int, Tuple[Dict[str, Any], Optional[int], float]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def ensure_table(self) -> None:
+        """Создание таблицы состояний (один раз на процесс)"""
+        if self._table_ready:
+            return
+        execute_query(
+            """
+            CREATE TABLE IF NOT EXISTS user_states (
+                user_id BIGINT PRIMARY KEY,
+                state TEXT NOT NULL,
+                version BIGINT NOT NULL DEFAULT 1,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at DOUBLE PRECISION
+            )
+        """
+        )
+        self._migrate_table()
+        execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_user_states_expires "
+            "ON user_states (expires_at)"
+        )
+        self._table_ready = True
+
+    def _migrate_table(self) -> None:
+        """Добавление expires_at в таблицу, созданную до появления TTL"""
+        columns = execute_query("PRAGMA table_info(user_states)", fetchall=True)
+        if columns and "expires_at" not in [col["name"] for col in columns]:
+            execute_query(
+                "ALTER TABLE user_states ADD COLUMN expires_at DOUBLE PRECISION"
+            )
+
+    def _remember(
+        self, user_id: int, state: Dict[str, Any], version: Optional[int]
+    ) -> None:
+        with self._lock:
+            self._cache[user_id] = (dict(state), version, time.monotonic())
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cached(self, user_id: int, need_version: bool) -> Optional[StateVersion]:
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is None:
+                return None
+            state, version, stored_at = entry
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self._cache[user_id]
+                return None
+            if need_version and version is None:
+                return None
+            return dict(state), version or 0
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Сброс локального кэша (всего или одного пользователя)"""
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+
+    def _load(self, user_id: int) -> StateVersion:
+        self.ensure_table()
+        row = execute_query(
+            "SELECT state, version, expires_at FROM user_states WHERE user_id = ?",
+            (user_id,),
+            fetchone=True,
+        )
+        if not row:
+            result: StateVersion = ({}, 0)
+        elif row["expires_at"] is not None and row["expires_at"] <= time.time():
+            # Истекшее, но еще не удаленное состояние: пустое, версия сохраняется
+            result = ({}, int(row["version"]))
+        else:
+            result = (json.loads(row["state"]), int(row["version"]))
+        self._remember(user_id, *result)
+        return result
+
+    def get(self, user_id: int) -> Dict[str, Any]:
+        cached = self._cached(user_id, need_version=False)
+        if cached is not None:
+            return cached[0]
+        return self._load(user_id)[0]
+
+    def get_versioned(self, user_id: int) -> StateVersion:
+        cached = self._cached(user_id, need_version=True)
+        if cached is not None:
+            return cached
+        return self._load(user_id)
+
+    def set(self, user_id: int, state: Dict[str, Any]) -> None:
+        self.ensure_table()
+        execute_query(
+            """
+            INSERT INTO user_states (user_id, state, version, expires_at)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT (user_id) DO UPDATE
+            SET state = excluded.state, version = user_states.version + 1,
+                updated_at = CURRENT_TIMESTAMP, expires_at = excluded.expires_at
+        """,
+            (
+                user_id,
+                json.dumps(state, ensure_ascii=False),
+                self.expires_at(state, time.time()),
+            ),
+        )
+        # Версию после безусловной записи не знаем — ее прочитает get_versioned
+        self._remember(user_id, state, None)
+
+    def clear(self, user_id: int) -> None:
+        self.ensure_table()
+        execute_query("DELETE FROM user_states WHERE user_id = ?", (user_id,))
+        self._remember(user_id, {}, 0)
+
+    def compare_and_set(
+        self, user_id: int, state: Dict[str, Any], expected_version: int
+    ) -> bool:
+        self.ensure_table()
+        payload = json.dumps(state, ensure_ascii=False)
+        expires_at = self.expires_at(state, time.time())
+        if expected_version == 0:
+            updated = execute_query(
+                "INSERT INTO user_states (user_id, state, version, expires_at) "
+                "VALUES (?, ?, 1, ?) ON CONFLICT (user_id) DO NOTHING",
+                (user_id, payload, expires_at),
+            )
+        else:
+            updated = execute_query(
+                "UPDATE user_states SET state = ?, version = version + 1, "
+                "updated_at = CURRENT_TIMESTAMP, expires_at = ? "
+                "WHERE user_id = ? AND version = ?",
+                (payload, expires_at, user_id, expected_version),
+            )
+        if updated == 1:
+            self._remember(user_id, state, expected_version + 1)
+            return True
+        # Состояние изменил другой процесс — следующее чтение пойдет в БД
+        self.invalidate(user_id)
+        return False
+
+    def sweep(self) -> int:
+        self.ensure_table()
+        removed = execute_query(
+            "DELETE FROM user_states WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        removed = removed if isinstance(removed, int) and removed > 0 else 0
+        # Сверх предела удаляются диалоги с самой давней последней записью
+        cutoff = execute_query(
+            "SELECT updated_at FROM user_states ORDER BY updated_at DESC "
+            "LIMIT 1 OFFSET ?",
+            (self.max_tracked,),
+            fetchone=True,
+        )
+        if cutoff:
+            evicted = execute_query(
+                "DELETE FROM user_states WHERE updated_at <= ?",
+                (cutoff["updated_at"],),
+            )
+            removed += evicted if isinstance(evicted, int) and evicted > 0 else 0
+        if removed:
+            self.invalidate()
+        return removed
+
+    def tracked(self) -> int:
+        self.ensure_table()
+        row = execute_query("SELECT COUNT(*) AS cnt FROM user_states", fetchone=True)
+        return int(row["cnt"]) if row else 0
+
+
+class SQLiteStateStore(SQLStateStore):
+    """Состояния в таблице основной SQLite-базы"""
+
+    name = "sqlite"
+
+
+class PostgresStateStore(SQLStateStore):
+    """Состояния в PostgreSQL (общий пул соединений DATABASE_URL)"""
+
+    name = "postgres"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        if init_postgres_pool() is None:
+            raise RuntimeError(
+                "PostgreSQL недоступен: проверьте DATABASE_URL и psycopg2"
+            )
+        super().__init__(*args, **kwargs)
+
+    def _migrate_table(self) -> None:
+        execute_query(
+            "ALTER TABLE user_states ADD COLUMN IF NOT EXISTS "
+            "expires_at DOUBLE PRECISION"
+        )
+
+
+def create_state_store(
+    backend: str, cache_ttl: float = 1.0, cache_size: int = 10000, **limits: Any
+) -> StateStore:
+    """
+    Создание хранилища: memory, sqlite, postgres или auto
+    (postgres при наличии DATABASE_URL, иначе sqlite).
+    limits — ttls, default_ttl и max_tracked (см. StateStore).
+    """
+    backend = backend.lower()
+    if backend == "auto":
+        backend = "postgres" if init_postgres_pool() is not None else "sqlite"
+    if backend == "memory":
+        return MemoryStateStore(**limits)
+    if backend == "sqlite":
+        return SQLiteStateStore(cache_ttl, cache_size, **limits)
+    if backend == "postgres":
+        return PostgresStateStore(cache_ttl, cache_size, **limits)
+    raise ValueError(f"Неизвестное хранилище состояний: {backend}")
+
+
+# ================= ФОНОВАЯ ОЧИСТКА =================
+
+
+class StateSweeper:
+    """Периодическое удаление брошенных диалогов из хранилища состояний"""
+
+    def __init__(self, store: StateStore, interval: float):
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запуск потока очистки"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="state-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановка потока очистки"""
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def run_once(self) -> int:
+        """Один проход очистки; возвращает число удаленных состояний"""
+        try:
+            removed = self.store.sweep()
+        except Exception as e:
+            logger.error(f"❌ Ошибка очистки состояний: {e}", exc_info=True)
+            return 0
+        if removed:
+            logger.info(f"🧹 Удалено брошенных диалогов: {removed}")
+        return removed
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.interval):
+                self.run_once()
+        finally:
+            close_connection()
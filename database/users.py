@@ -1,7 +1,7 @@
 import logging
 import sqlite3
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .core import clear_user_state, execute_query, hash_password
 
@@ -12,6 +12,12 @@ _seekers_cache: Dict[
     Tuple[int, int, Optional[str], Optional[str]], Tuple[float, List[Dict[str, Any]]]
 ] = {}
 SEEKERS_CACHE_TTL = 60
+# Попадания и промахи кэша пользователей (для метрик)
+_user_cache_stats = {"hits": 0, "misses": 0}
+# Последняя запись активности по пользователю (last_login обновляется не чаще интервала)
+_activity_cache: Dict[int, float] = {}
+ACTIVITY_INTERVAL = 3600
+MAX_ACTIVITY_ENTRIES = 100000
 
 
 def invalidate_user_cache(user_id: int) -> None:
@@ -25,6 +31,56 @@ def invalidate_seekers_cache():
     _seekers_cache.clear()
 
 
+def get_user_cache_stats() -> Dict[str, int]:
+    """Статистика кэша пользователей"""
+    return {"size": len(_user_cache), **_user_cache_stats}
+
+
+# Подписчики изменения профиля соискателя (производные кэши вне слоя БД)
+_seeker_update_listeners: List[Callable[[int], None]] = []
+
+
+def add_seeker_update_listener(callback: Callable[[int], None]) -> None:
+    """callback(telegram_id) вызывается после обновления профиля соискателя"""
+    if callback not in _seeker_update_listeners:
+        _seeker_update_listeners.append(callback)
+
+
+def _notify_seeker_updated(telegram_id: int) -> None:
+    for callback in _seeker_update_listeners:
+        try:
+            callback(telegram_id)
+        except Exception as e:
+            logging.error(f"Ошибка обработчика обновления профиля: {e}", exc_info=True)
+
+
+def record_activity(telegram_id: int) -> bool:
+    """
+    Отмечает активность пользователя в last_login (сегмент рассылки
+    «активны с»). Запись в БД не чаще раза в ACTIVITY_INTERVAL секунд;
+    True — last_login обновлен.
+    """
+    now = time.time()
+    if now - _activity_cache.get(telegram_id, 0.0) < ACTIVITY_INTERVAL:
+        return False
+    if len(_activity_cache) >= MAX_ACTIVITY_ENTRIES:
+        for user_id in [
+            u for u, t in _activity_cache.items() if now - t >= ACTIVITY_INTERVAL
+        ]:
+            del _activity_cache[user_id]
+    _activity_cache[telegram_id] = now
+    try:
+        for table in ("job_seekers", "employers"):
+            execute_query(
+                f"UPDATE {table} SET last_login = CURRENT_TIMESTAMP WHERE telegram_id = ?",  # nosec B608
+                (telegram_id,),
+            )
+        return True
+    except Exception as e:
+        logging.error(f"Ошибка записи активности {telegram_id}: {e}")
+        return False
+
+
 # ================= ФУНКЦИИ ПОЛЬЗОВАТЕЛЕЙ =================
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     """Получение пользователя по Telegram ID - разрешаем NULL результат"""
@@ -32,8 +88,10 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     if user_id in _user_cache:
         timestamp, cached_user = _user_cache[user_id]
         if time.time() - timestamp < CACHE_TTL:
+            _user_cache_stats["hits"] += 1
             # Возвращаем копию, чтобы случайные изменения не затронули кэш
             return cached_user.copy() if cached_user else None
+    _user_cache_stats["misses"] += 1
 
     try:
         # Сначала ищем в соискателях
@@ -333,6 +391,8 @@ def update_seeker_profile(telegram_id: int, **updates: Any) -> bool:  # noqa: C9
 
         values.append(telegram_id)
 
+        # version — для кэша отрисованных карточек кандидатов
+        set_parts.append("version = version + 1")
         query = f"UPDATE job_seekers SET {', '.join(set_parts)} WHERE telegram_id = ?"  # nosec
         result = execute_query(query, tuple(values))
 
@@ -340,6 +400,7 @@ def update_seeker_profile(telegram_id: int, **updates: Any) -> bool:  # noqa: C9
             logging.info(f"Профиль соискателя {telegram_id} обновлен")
             invalidate_user_cache(telegram_id)
             invalidate_seekers_cache()
+            _notify_seeker_updated(telegram_id)
             return True
         else:
             logging.warning(f"Соискатель с ID {telegram_id} не найден для обновления")
@@ -383,8 +444,15 @@ def update_employer_profile(telegram_id: int, **updates: Any) -> bool:
         result = execute_query(query, tuple(values))
 
         if result > 0:
-            logging.info(f"Профиль работодателя {telegram_id} обновлен")
+            logging.debug(f"Профиль работодателя {telegram_id} обновлен")
             invalidate_user_cache(telegram_id)
+            if {"company_name", "city"} & set(updates):
+                # Компания и город выводятся в карточках вакансий
+                execute_query(
+                    "UPDATE vacancies SET version = version + 1 WHERE employer_id = "
+                    "(SELECT id FROM employers WHERE telegram_id = ?)",
+                    (telegram_id,),
+                )
             return True
         else:
             logging.warning(f"Работодатель с ID {telegram_id} не найден для обновления")
@@ -51,7 +51,7 @@ def update_vacancy(vacancy_id: int, **kwargs: Any) -> bool:
 
     try:
         # fmt: off
-        query = f"UPDATE vacancies SET {set_clause} WHERE id = ?"  # nosec B608
+        query = f"UPDATE vacancies SET {set_clause}, version = version + 1 WHERE id = ?"  # nosec B608
         # fmt: on
         result = execute_query(query, tuple(values))
         if result > 0:
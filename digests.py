@@ -0,0 +1,187 @@
+import io
+import logging
+import threading
+import zipfile
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+from telebot import types
+
+import utils
+from cards import translate_title
+from config import Config
+from database.core import close_connection
+from database.digests import (
+    DIGEST_LAG,
+    db_timestamp,
+    get_digest_applications,
+    get_due_digest_employers,
+    mark_digest_sent,
+)
+from documents import content_hash, document_cache, send_cached_document
+from localization import get_text_by_lang
+from resume_service import get_resume_renderer
+
+logger = logging.getLogger(__name__)
+
+MEDIA_GROUP_LIMIT = 10  # Больше документов Telegram в одну группу не принимает
+
+# ================= ОТПРАВКА ДАЙДЖЕСТА =================
+
+
+def format_digest(title: str, applications: List[Dict[str, Any]], lang: str) -> str:
+    """Сводка новых откликов на одну вакансию"""
+    esc = utils.escape_markdown
+    lines = [
+        get_text_by_lang("digest_header", lang),
+        get_text_by_lang("digest_vacancy", lang).format(
+            title=esc(translate_title(title, lang))
+        ),
+        get_text_by_lang("digest_count", lang).format(count=len(applications)),
+        "",
+    ]
+    for number, app in enumerate(applications, 1):
+        details = [
+            translate_title(app.get("profession"), lang),
+            app.get("city") or "",
+        ]
+        details_text = ", ".join(esc(d) for d in details if d)
+        line = f"{number}. *{esc(app.get('full_name') or '')}*"
+        lines.append(f"{line} — {details_text}" if details_text else line)
+    return "\n".join(lines)
+
+
+def resume_filename(seeker: Dict[str, Any]) -> str:
+    return f"Resume_{seeker.get('full_name', 'Candidate')}.pdf"
+
+
+def send_resumes(bot: Any, chat_id: int, resumes: List[Tuple[str, bytes]]) -> None:
+    """
+    Резюме одной вакансии одним сообщением: документ, группа документов
+    (уже загруженные файлы — по file_id) или ZIP-архив, если резюме больше 10.
+    """
+    if not resumes:
+        return
+    if len(resumes) == 1:
+        filename, pdf = resumes[0]
+        send_cached_document(bot, chat_id, pdf, filename)
+        return
+    if len(resumes) > MEDIA_GROUP_LIMIT:
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            for filename, pdf in resumes:
+                zf.writestr(filename, pdf)
+        archive.name = f"Resumes_{datetime.utcnow():%Y%m%d_%H%M}.zip"
+        archive.seek(0)
+        bot.send_document(chat_id, archive)
+        return
+
+    media: List[types.InputMediaDocument] = []
+    uploads: List[Optional[str]] = []  # хеш для файлов, загружаемых впервые
+    for filename, pdf in resumes:
+        digest = content_hash(pdf)
+        file_id = document_cache.get(digest)
+        if file_id is not None:
+            media.append(types.InputMediaDocument(file_id))
+            uploads.append(None)
+            continue
+        document = io.BytesIO(pdf)
+        document.name = filename
+        media.append(types.InputMediaDocument(document))
+        uploads.append(digest)
+    messages = bot.send_media_group(chat_id, media)
+    for digest, message in zip(uploads, messages or []):
+        file_id = getattr(getattr(message, "document", None), "file_id", None)
+        if digest is not None and isinstance(file_id, str):
+            document_cache.put(digest, file_id)
+
+
+def send_employer_digest(
+    bot: Any, employer: Dict[str, Any], now: Optional[datetime] = None
+) -> int:
+    """
+    Дайджест одного работодателя: отклики с прошлого дайджеста, по сообщению
+    и группе резюме на вакансию. Возвращает число отправленных откликов.
+    """
+    until = db_timestamp((now or datetime.utcnow()) - DIGEST_LAG)
+    applications = get_digest_applications(
+        employer["id"], employer.get("digest_sent_at"), until
+    )
+    chat_id = employer["telegram_id"]
+    lang = employer.get("language_code") or "ru"
+    renderer = get_resume_renderer()
+
+    for _, group in groupby(applications, key=lambda app: app["vacancy_id"]):
+        vacancy_apps = list(group)
+        bot.send_message(
+            chat_id,
+            format_digest(vacancy_apps[0]["vacancy_title"], vacancy_apps, lang),
+            parse_mode="Markdown",
+        )
+        resumes = []
+        for app in vacancy_apps:
+            pdf = renderer.render(app, lang)
+            if pdf is not None:
+                resumes.append((resume_filename(app), pdf))
+        send_resumes(bot, chat_id, resumes)
+
+    mark_digest_sent(employer["id"], until)
+    return len(applications)
+
+
+# ================= ПЛАНИРОВЩИК =================
+
+
+class DigestScheduler:
+    """Периодическая отправка дайджестов откликов (часовых и суточных)"""
+
+    def __init__(self, bot: Any, interval: float = Config.DIGEST_INTERVAL):
+        self.bot = bot
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запуск потока дайджестов"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="application-digests", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановка потока дайджестов"""
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Один проход: дайджесты всем, у кого подошло время; возвращает число откликов"""
+        try:
+            employers = get_due_digest_employers(now)
+        except Exception as e:
+            logger.error(f"❌ Ошибка выборки дайджестов: {e}", exc_info=True)
+            return 0
+        sent = 0
+        for employer in employers:
+            try:
+                sent += send_employer_digest(self.bot, employer, now)
+            except Exception as e:
+                logger.error(
+                    f"❌ Ошибка дайджеста работодателя {employer['telegram_id']}: {e}",
+                    exc_info=True,
+                )
+        if sent:
+            logger.info(f"📬 Дайджесты: {len(employers)} работодателей, {sent} откликов")
+        return sent
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.interval):
+                self.run_once()
+        finally:
+            close_connection()
@@ -0,0 +1,105 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from telebot.apihelper import ApiTelegramException
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: bytes) -> str:
+    """Хеш содержимого документа"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class DocumentCache:
+    """
+    LRU file_id загруженных документов по хешу содержимого. После первой
+    загрузки тот же файл отправляется по file_id (короткий JSON-запрос вместо
+    multipart-загрузки). Измененное содержимое дает новый хеш.
+    """
+
+    def __init__(self, max_size: int = Config.DOCUMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uploads = 0
+        self.evictions = 0
+
+    def get(self, digest: str) -> Optional[str]:
+        with self._lock:
+            file_id = self._items.get(digest)
+            if file_id is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(digest)
+            self.hits += 1
+            return file_id
+
+    def put(self, digest: str, file_id: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[digest] = file_id
+            self._items.move_to_end(digest)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def forget(self, digest: str) -> None:
+        with self._lock:
+            self._items.pop(digest, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика кэша документов"""
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "uploads": self.uploads,
+            "evictions": self.evictions,
+        }
+
+
+document_cache = DocumentCache()
+
+
+def send_cached_document(
+    bot: Any, chat_id: int, content: bytes, filename: str, **kwargs: Any
+) -> Any:
+    """
+    Отправка документа: по сохраненному file_id, если такое содержимое уже
+    загружалось, иначе загрузка файла и запоминание полученного file_id.
+    Документ, отправленный по file_id, сохраняет имя первой загрузки.
+    """
+    digest = content_hash(content)
+    file_id = document_cache.get(digest)
+    if file_id is not None:
+        try:
+            return bot.send_document(chat_id, file_id, **kwargs)
+        except ApiTelegramException as e:
+            if e.error_code != 400:
+                raise
+            # file_id больше не принимается (например, сменился токен бота)
+            logger.warning(f"⚠️ file_id документа отклонен, повторная загрузка: {e}")
+            document_cache.forget(digest)
+
+    document = io.BytesIO(content)
+    document.name = filename
+    message = bot.send_document(chat_id, document, **kwargs)
+    document_cache.uploads += 1
+    file_id = getattr(getattr(message, "document", None), "file_id", None)
+    if isinstance(file_id, str):
+        document_cache.put(digest, file_id)
+    return message
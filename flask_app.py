@@ -1,5 +1,4 @@
 import os
-import sys
 
 # Устанавливаем рабочую директорию в папку проекта, чтобы находились .env, БД и логи
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -15,32 +14,32 @@ if "PYTHONANYWHERE_DOMAIN" in os.environ:
     os.environ["ENABLE_MONITORING"] = "false"
     # Отключаем многопоточность (ограничения WSGI)
     os.environ["BOT_THREADED"] = "false"
+    os.environ.setdefault("WEBHOOK_WORKERS", "0")
 
-import telebot
-from flask import Flask, abort, request
+from flask import Flask, request
 
 from bot_factory import create_bot
 from config import Config
+from webhook import UpdateIngestor, handle_webhook_request, webhook_secret
 
 # Инициализируем бота (подключаем БД, роуты и т.д.)
 bot = create_bot()
 app = Flask(__name__)
 
+# Обновления обрабатываются в фоне: Telegram получает ответ сразу
+ingestor = UpdateIngestor(bot)
+ingestor.start()
+
 # Секретный путь для вебхука
 WEBHOOK_PATH = f"/{Config.TOKEN}"
 
 
 @app.route(WEBHOOK_PATH, methods=["POST"])
 def webhook():
-    """Принимает обновления от Telegram"""
-    if request.headers.get("content-type") == "application/json":
-        print("DEBUG: Получено обновление от Telegram", file=sys.stderr)
-        json_string = request.get_data().decode("utf-8")
-        update = telebot.types.Update.de_json(json_string)
-        bot.process_new_updates([update])
-        return "", 200
-    else:
-        abort(403)
+    """Принимает обновления от Telegram и ставит их в очередь"""
+    return handle_webhook_request(
+        ingestor, request.headers, request.get_data(), webhook_secret()
+    )
 
 
 @app.route("/set_webhook")
@@ -49,7 +48,7 @@ def set_webhook():
     host = request.host
     webhook_url = f"https://{host}{WEBHOOK_PATH}"
     bot.remove_webhook()
-    bot.set_webhook(url=webhook_url)
+    bot.set_webhook(url=webhook_url, secret_token=webhook_secret())
     return f"Webhook set to {webhook_url}", 200
 
 
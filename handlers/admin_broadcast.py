@@ -1,14 +1,19 @@
-import time
-from typing import Any
+from typing import Any, Dict
 
 from telebot import types
-from telebot.apihelper import ApiTelegramException
 
 import keyboards
 import utils
+from broadcast import (
+    describe_segment,
+    get_broadcast_engine,
+    parse_segment,
+    parse_variants,
+)
+from config import Config
+from database.broadcasts import count_broadcast_recipients
 from database.core import (
     clear_user_state,
-    execute_query,
     get_user_state,
     set_user_state,
 )
@@ -18,14 +23,54 @@ class AdminBroadcastMixin:
     bot: Any
 
     def handle_broadcast_start(self, message):
-        """Начало создания рассылки"""
-        set_user_state(message.from_user.id, {'step': 'admin_broadcast_message'})
+        """Начало создания рассылки: выбор сегмента получателей"""
+        set_user_state(message.from_user.id, {'step': 'admin_broadcast_segment'})
         self.bot.send_message(
             message.chat.id,
             "📢 *Создание рассылки*\n\n"
-            "Введите текст сообщения для рассылки. "
-            "Вы можете использовать Markdown для форматирования.\n\n"
-            "Сообщение будет отправлено ВСЕМ пользователям бота (соискателям и работодателям).",
+            "Выберите получателей: нажмите «Всем пользователям» или отправьте фильтры, "
+            "по одному в строке:\n\n"
+            "`role=seekers` — seekers / employers / all\n"
+            "`city=Ташкент` — город или регион на любом языке\n"
+            "`status=active` — статус соискателя (active / inactive)\n"
+            "`lang=uz` — язык пользователя (ru / uz / en)\n"
+            "`registered=2024-01-31` — зарегистрированы с даты\n"
+            "`active=2024-06-01` — пользовались ботом с даты",
+            parse_mode='Markdown',
+            reply_markup=keyboards.broadcast_segment_keyboard()
+        )
+
+    def process_broadcast_segment(self, message):
+        """Получение сегмента и запрос текста рассылки"""
+        user_id = message.from_user.id
+        if utils.cancel_request(message.text):
+            clear_user_state(user_id)
+            self.bot.send_message(user_id, "❌ Рассылка отменена.", reply_markup=keyboards.admin_menu())
+            return
+
+        segment: Dict[str, Any] = {}
+        if message.text != '👥 Всем пользователям':
+            segment, errors = parse_segment(message.text or '')
+            if errors:
+                self.bot.send_message(user_id, "❌ Ошибка в фильтрах:\n" + "\n".join(errors))
+                return
+
+        total = count_broadcast_recipients(segment)
+        if not total:
+            self.bot.send_message(user_id, "⚠️ В этом сегменте нет получателей. Измените фильтры.")
+            return
+
+        set_user_state(user_id, {
+            'step': 'admin_broadcast_message', 'broadcast_segment': segment, 'broadcast_total': total
+        })
+        self.bot.send_message(
+            user_id,
+            f"👥 Получатели: {describe_segment(segment)}\n"
+            f"Найдено: *{total}*\n\n"
+            "Введите текст сообщения. Вы можете использовать Markdown для форматирования.\n\n"
+            "Для переводов разделите текст маркерами `[ru]`, `[uz]`, `[en]` на отдельных строках — "
+            "каждый пользователь получит версию на своем языке (без перевода — текст до маркеров "
+            "или русскую версию).",
             parse_mode='Markdown',
             reply_markup=keyboards.cancel_keyboard()
         )
@@ -38,20 +83,30 @@ class AdminBroadcastMixin:
             self.bot.send_message(user_id, "❌ Рассылка отменена.", reply_markup=keyboards.admin_menu())
             return
 
+        variants = parse_variants(message.text or '')
+        default = variants.pop('', None) or variants.get('ru') or next(iter(variants.values()), '')
+        if not default:
+            self.bot.send_message(user_id, "❌ Текст рассылки пуст. Введите сообщение.")
+            return
+
         user_state = get_user_state(user_id) or {}
-        user_state['broadcast_message'] = message.text
+        segment = user_state.get('broadcast_segment') or {}
+        user_state['broadcast_message'] = default
+        user_state['broadcast_variants'] = variants
         user_state['step'] = 'admin_broadcast_confirm'
         set_user_state(user_id, user_state)
 
         markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
         markup.row('✅ Да, отправить', '❌ Нет, отменить')
 
+        languages = ', '.join(sorted(variants)) if variants else 'один текст для всех'
         self.bot.send_message(
             user_id,
             f"🤔 *Подтверждение рассылки*\n\n"
             f"Вы уверены, что хотите отправить следующее сообщение?\n\n"
             f"----------\n{message.text}\n----------\n\n"
-            f"Сообщение будет отправлено всем пользователям.",
+            f"Получатели: {describe_segment(segment)} ({user_state.get('broadcast_total', 0)})\n"
+            f"Переводы: {languages}",
             parse_mode='Markdown',
             reply_markup=markup
         )
@@ -81,38 +136,41 @@ class AdminBroadcastMixin:
             return
 
         clear_user_state(user_id)
-        self.bot.send_message(
-            user_id, "⏳ *Начинаю рассылку...*", parse_mode='Markdown', reply_markup=keyboards.admin_menu()
+        self.bot.send_message(user_id, "⏳ *Рассылка запущена в фоне.*", parse_mode='Markdown',
+                              reply_markup=keyboards.admin_menu())
+        job_id = get_broadcast_engine(self.bot).start(
+            user_id, user_id, broadcast_message,
+            segment=user_state.get('broadcast_segment') or {},
+            variants=user_state.get('broadcast_variants') or {}
         )
+        if not job_id:
+            self.bot.send_message(user_id, "❌ Не удалось создать рассылку.")
 
-        all_users = set()
-        for table in ['job_seekers', 'employers']:
-            query = f"SELECT telegram_id FROM {table}"  # nosec B608
-            users = execute_query(query, (), fetchall=True)
-            if users:
-                for u in users:
-                    all_users.add(u['telegram_id'])
-
-        sent_count, failed_count, deactivated_count = 0, 0, 0
-
-        for telegram_id in all_users:
-            try:
-                self.bot.send_message(telegram_id, broadcast_message, parse_mode='Markdown')
-                sent_count += 1
-                time.sleep(0.05)
-            except ApiTelegramException as e:
-                if e.error_code in [400, 403]:  # noqa
-                    execute_query("DELETE FROM job_seekers WHERE telegram_id = ?", (telegram_id,), commit=True)
-                    execute_query("DELETE FROM employers WHERE telegram_id = ?", (telegram_id,), commit=True)
-                    deactivated_count += 1
-                else:
-                    failed_count += 1
-            except Exception:
-                failed_count += 1
+    def handle_broadcast_control(self, call):
+        """Пауза, продолжение и отмена рассылки из сообщения с прогрессом"""
+        if call.from_user.id not in Config.ADMIN_IDS:
+            self.bot.answer_callback_query(call.id, "⛔ Доступ запрещен")
+            return
 
-        self.bot.send_message(
-            user_id,
-            f"✅ *Рассылка завершена!*\n\n• ✅ Отправлено: {sent_count}\n"
-            f"• 🗑️ Удалено (неактив): {deactivated_count}\n• ❌ Ошибок: {failed_count}",
-            parse_mode='Markdown'
-        )
\ No newline at end of file
+        action, _, job_id = call.data[len('admin_bc_'):].partition('_')
+        engine = get_broadcast_engine(self.bot)
+        handlers = {'pause': engine.pause, 'resume': engine.resume, 'cancel': engine.cancel}
+        if action not in handlers or not job_id.isdigit():
+            self.bot.answer_callback_query(call.id, "❌ Неизвестное действие")
+            return
+
+        if not handlers[action](int(job_id)):
+            self.bot.answer_callback_query(call.id, "⚠️ Рассылка уже в другом статусе")
+            return
+
+        replies = {'pause': "⏸ Рассылка приостановлена", 'resume': "▶️ Рассылка продолжена",
+                   'cancel': "✖️ Рассылка отменена"}
+        self.bot.answer_callback_query(call.id, replies[action])
+        if action != 'cancel':
+            # При отмене сообщение обновляет сам движок
+            self.bot.edit_message_reply_markup(
+                call.message.chat.id, call.message.message_id,
+                reply_markup=keyboards.broadcast_control_keyboard(
+                    int(job_id), 'paused' if action == 'pause' else 'running'
+                )
+            )
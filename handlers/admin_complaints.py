@@ -12,6 +12,7 @@ from database.core import (
     set_user_state,
 )
 from database.users import get_user_by_id
+from outbound import resolve
 
 
 class AdminComplaintsMixin:
@@ -115,8 +116,10 @@ class AdminComplaintsMixin:
             self.bot.send_message(message.chat.id, "❌ Отменено", reply_markup=keyboards.admin_menu())
             return
         try:
-            self.bot.send_message(state['target_user_id'], f"🔔 *Сообщение от администрации:*\n\n{message.text}",
-                                  parse_mode='Markdown')
+            # Ждем доставки: статус жалобы меняется, только если ответ дошел
+            resolve(self.bot.send_message(state['target_user_id'],
+                                          f"🔔 *Сообщение от администрации:*\n\n{message.text}",
+                                          parse_mode='Markdown'))
             self.bot.send_message(message.chat.id, "✅ Сообщение отправлено.", reply_markup=keyboards.admin_menu())
             if state.get('complaint_id'):
                 execute_query("UPDATE complaints SET is_replied = 1 WHERE id = ?", (state['complaint_id'],), commit=True)
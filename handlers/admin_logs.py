@@ -0,0 +1,181 @@
+import io
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from telebot import types
+
+import utils
+from config import Config
+from log_viewer import (
+    LogCursor,
+    LogQuery,
+    export_logs,
+    parse_line,
+    parse_log_args,
+    search_logs,
+)
+
+LOGS_USAGE = (
+    "Использование: /logs [N] [level=ERROR] [logger=database] [user=ID] "
+    "[since=2h|2024-05-01T10:00] [until=...] [file]"
+)
+
+# Последний запрос /logs администратора: фильтр, размер страницы и курсор
+_log_pages: Dict[int, Tuple[LogQuery, int, Optional[LogCursor]]] = {}
+
+
+def format_log_lines(lines: List[str]) -> str:
+    """Записи лога для сообщения (в хронологическом порядке)"""
+    formatted_logs = ""
+    for line in lines:
+        entry = parse_line(line)
+        if entry is None:
+            formatted_logs += f"`{utils.escape_markdown(line.strip())}`\n"
+            continue
+        moment = str(entry.get("time", ""))
+        dt = moment.split(" ")[1].split(",")[0] if " " in moment else moment
+        level = entry.get("level", "INFO")
+        msg = str(entry.get("message", ""))
+        icon = (
+            "🔴"
+            if level in ["ERROR", "CRITICAL"]
+            else "⚠️"
+            if level == "WARNING"
+            else "ℹ️"
+        )
+        formatted_logs += f"{icon} `{dt}` *{level}*: {utils.escape_markdown(msg)}\n"
+    return formatted_logs
+
+
+class AdminLogsMixin:
+    bot: Any
+
+    def handle_logs(self, message):
+        """/logs: последние записи лога с фильтрами, листание и выгрузка файлом"""
+        if message.from_user.id not in Config.ADMIN_IDS:
+            return
+
+        try:
+            log_file = os.getenv("LOG_FILE", "bot.json.log")
+            if not os.path.exists(log_file):
+                self.bot.reply_to(message, "❌ Лог-файл не найден.")
+                return
+
+            try:
+                request = parse_log_args((message.text or "").split()[1:])
+            except ValueError as e:
+                self.bot.reply_to(message, f"❌ {e}\n\n{LOGS_USAGE}")
+                return
+
+            if request.as_file:
+                self._send_logs_file(message.chat.id, log_file, request.query)
+                return
+
+            page = self._logs_page(
+                message.from_user.id, log_file, request.query, request.count
+            )
+            if page is None:
+                self.bot.reply_to(message, "❌ Ошибка доступа к файлу логов.")
+                return
+            text, markup = page
+            if text is None:
+                self.bot.reply_to(
+                    message,
+                    (
+                        "📭 Лог пуст."
+                        if request.query.is_empty()
+                        else "📭 Записей по фильтру нет."
+                    ),
+                )
+                return
+            self.bot.reply_to(message, text, parse_mode="Markdown", reply_markup=markup)
+
+        except Exception as e:
+            logging.error(f"Error in logs command: {e}", exc_info=True)
+            self.bot.reply_to(message, "❌ Произошла ошибка при получении логов.")
+
+    def handle_logs_callback(self, call):
+        """Колбэки /logs: admin_logs_older — старее, admin_logs_file — файлом"""
+        if call.from_user.id not in Config.ADMIN_IDS:
+            return
+        log_file = os.getenv("LOG_FILE", "bot.json.log")
+        session = _log_pages.get(call.from_user.id)
+        if session is None:
+            self.bot.answer_callback_query(call.id, "⌛ Запрос устарел, повторите /logs")
+            return
+
+        query, count, cursor = session
+        self.bot.answer_callback_query(call.id)
+        if call.data == "admin_logs_file":
+            self._send_logs_file(call.message.chat.id, log_file, query)
+            return
+
+        page = self._logs_page(call.from_user.id, log_file, query, count, cursor)
+        if page is None or page[0] is None:
+            self.bot.send_message(call.message.chat.id, "📭 Более старых записей нет.")
+            return
+        text, markup = page
+        self.bot.edit_message_text(
+            text,
+            call.message.chat.id,
+            call.message.message_id,
+            parse_mode="Markdown",
+            reply_markup=markup,
+        )
+
+    def _logs_page(
+        self,
+        admin_id: int,
+        log_file: str,
+        query: LogQuery,
+        count: int,
+        cursor: Optional[LogCursor] = None,
+    ) -> Optional[Tuple[Optional[str], Optional[types.InlineKeyboardMarkup]]]:
+        """
+        Страница записей от cursor назад: (текст, кнопки), (None, None) — записей
+        нет, None — лог не прочитать.
+        """
+        try:
+            lines, next_cursor = search_logs(log_file, query, count, cursor)
+        except Exception as e:
+            logging.error(f"Error reading log file: {e}")
+            return None
+        if not lines:
+            return None, None
+
+        _log_pages[admin_id] = (query, count, next_cursor)
+        formatted_logs = format_log_lines(list(reversed(lines)))
+        if len(formatted_logs) > 4000:
+            formatted_logs = formatted_logs[-4000:]
+        header = "📋 *Последние логи:*"
+        if not query.is_empty():
+            header += f"\n🔎 {utils.escape_markdown(query.describe())}"
+
+        markup = types.InlineKeyboardMarkup()
+        buttons = [
+            types.InlineKeyboardButton("📦 Файлом", callback_data="admin_logs_file")
+        ]
+        if next_cursor is not None:
+            buttons.insert(
+                0,
+                types.InlineKeyboardButton(
+                    "⬅️ Раньше", callback_data="admin_logs_older"
+                ),
+            )
+        markup.row(*buttons)
+        return f"{header}\n\n{formatted_logs}", markup
+
+    def _send_logs_file(self, chat_id: int, log_file: str, query: LogQuery) -> None:
+        """Все записи по фильтру (со всех ротированных файлов) архивом .gz"""
+        try:
+            content = export_logs(log_file, query)
+        except Exception as e:
+            logging.error(f"Error exporting log file: {e}")
+            self.bot.send_message(chat_id, "❌ Ошибка доступа к файлу логов.")
+            return
+        document = io.BytesIO(content)
+        document.name = f"logs_{datetime.now():%Y%m%d_%H%M}.jsonl.gz"
+        caption = f"📦 Логи {query.describe()}".strip()
+        self.bot.send_document(chat_id, document, caption=caption)
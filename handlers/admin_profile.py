@@ -0,0 +1,46 @@
+import io
+import logging
+from typing import Any
+
+from config import Config
+from profiler import Profile, ProfileBusy, clamp_seconds, start_profile
+
+PROFILE_USAGE = "Использование: /profile [секунды]"
+
+
+class AdminProfileMixin:
+    bot: Any
+
+    def handle_profile(self, message):
+        """/profile [N]: профилирование всех потоков на N секунд в фоне"""
+        if message.from_user.id not in Config.ADMIN_IDS:
+            return
+
+        args = (message.text or "").split()[1:]
+        if args and not args[0].isdigit():
+            self.bot.reply_to(message, f"❌ {PROFILE_USAGE}")
+            return
+        seconds = clamp_seconds(int(args[0]) if args else Config.PROFILE_SECONDS)
+        chat_id = message.chat.id
+
+        try:
+            start_profile(seconds, lambda profile: self._send_profile(chat_id, profile))
+        except ProfileBusy:
+            self.bot.reply_to(message, "⏳ Профилирование уже идет, дождитесь отчета.")
+            return
+        logging.info(f"Admin {message.from_user.id} started profiling for {seconds:g}s")
+        self.bot.reply_to(
+            message, f"⏱ Профилирую {seconds:g} сек, отчет придет отдельным сообщением."
+        )
+
+    def _send_profile(self, chat_id: int, profile: Profile) -> None:
+        """Топ функций сообщением и collapsed-стеки для flamegraph файлом"""
+        report = profile.report()
+        if len(report) > 3900:
+            report = report[:3900]
+        self.bot.send_message(chat_id, f"```\n{report}\n```", parse_mode="Markdown")
+        document = io.BytesIO(profile.collapsed().encode("utf-8"))
+        document.name = f"profile_{profile.started_at:%Y%m%d_%H%M%S}.collapsed"
+        self.bot.send_document(
+            chat_id, document, caption="🔥 Стеки для flamegraph.pl / speedscope"
+        )
@@ -1,12 +1,19 @@
+import io
 import logging
 import os
+from datetime import datetime
 from typing import Any
 
 from telebot import types
 
 import keyboards
+from config import Config
 from database.backup import create_backup
 from database.core import execute_query
+from database.slow_queries import get_slow_query_log
+from documents import send_cached_document
+from outbound import get_dispatcher
+from update_executor import get_update_executor
 
 
 class AdminStatsMixin:
@@ -25,17 +32,79 @@ class AdminStatsMixin:
         employers_count = employers_res["cnt"] if employers_res else 0
         total_count = seekers_count + employers_count
 
+        outbound_text = ""
+        dispatcher = get_dispatcher()
+        if dispatcher:
+            stats = dispatcher.get_stats()
+            outbound_text = (
+                f"\n📤 *Исходящие сообщения*\n"
+                f"• Очередь: {stats['queue_depth']} (в работе: {stats['in_flight']})\n"
+                f"• Задержка: {stats['avg_latency_ms']} мс (p95: {stats['p95_latency_ms']} мс)\n"
+                f"• Ошибок: {stats['failed']}, повторов после 429: {stats['retries_429']}\n"
+            )
+
+        executor = get_update_executor()
+        if executor:
+            stats = executor.get_stats()
+            outbound_text += (
+                f"\n📥 *Обработка обновлений*\n"
+                f"• Шардов: {stats['workers']}, очередь: {stats['queue_depth']} "
+                f"(макс. в шарде: {stats['max_queue_depth']})\n"
+                f"• По шардам: {', '.join(str(d) for d in stats['queue_depths'])}\n"
+                f"• Обработано: {stats['processed']}, ошибок: {stats['errors']}\n"
+            )
+
         self.bot.send_message(
             message.chat.id,
             f"📊 *Статистика бота*\n\n"
             f"• 👤 Соискатели: {seekers_count}\n"
             f"• 🏢 Работодатели: {employers_count}\n"
             f"• 👥 Всего пользователей: {total_count}\n"
+            f"{outbound_text}"
             f"\nДля возврата в админ-меню нажмите /admin",
             parse_mode="Markdown",
             reply_markup=keyboards.admin_menu(),
         )
 
+    def handle_slow_queries(self, message):
+        """/slow [N] — самые медленные запросы к БД, /slow reset — сброс"""
+        if message.from_user.id not in Config.ADMIN_IDS:
+            return
+        slow_log = get_slow_query_log()
+        if slow_log is None:
+            self.bot.reply_to(
+                message, "ℹ️ Лог медленных запросов выключен (SLOW_QUERY_MS=0)."
+            )
+            return
+
+        args = (message.text or "").split()[1:]
+        if args and args[0] == "reset":
+            slow_log.reset()
+            self.bot.reply_to(message, "✅ Статистика медленных запросов сброшена.")
+            return
+        limit = int(args[0]) if args and args[0].isdigit() else Config.SLOW_QUERY_TOP
+        entries = slow_log.top(max(1, min(limit, 50)))
+        if not entries:
+            self.bot.reply_to(
+                message,
+                f"📭 Запросов дольше {slow_log.threshold * 1000:g} мс не было.",
+            )
+            return
+
+        lines = [f"🐢 Медленные запросы (дольше {slow_log.threshold * 1000:g} мс):"]
+        for number, entry in enumerate(entries, 1):
+            lines.append(
+                f"\n{number}. {entry.fingerprint}\n"
+                f"   {entry.count} раз, всего {entry.total:.2f} с, "
+                f"среднее {entry.avg * 1000:.0f} мс, макс {entry.max * 1000:.0f} мс"
+            )
+        self.bot.reply_to(message, "\n".join(lines)[:4000])
+
+        # Полные запросы и планы выполнения — файлом
+        document = io.BytesIO(slow_log.report(len(entries)).encode("utf-8"))
+        document.name = f"slow_queries_{datetime.now():%Y%m%d_%H%M}.txt"
+        self.bot.send_document(message.chat.id, document, caption="📄 Запросы и планы")
+
     def handle_admin_settings(self, message):
         """Обработка настроек админ-панели"""
         markup = types.InlineKeyboardMarkup(row_width=1)
@@ -63,12 +132,17 @@ class AdminStatsMixin:
         if success:
             try:
                 with open(result, "rb") as f:
-                    self.bot.send_document(
-                        message.chat.id,
-                        f,
-                        caption=f"✅ *Бэкап успешно создан*\n📁 Файл: `{os.path.basename(result)}`",
-                        parse_mode="Markdown",  # noqa
-                    )
+                    content = f.read()
+                # Неизменившаяся база дает тот же файл: повторно не загружается
+                send_cached_document(
+                    self.bot,
+                    message.chat.id,
+                    content,
+                    os.path.basename(result),
+                    caption=f"✅ *Бэкап успешно создан*\n📁 Файл: `{os.path.basename(result)}`",
+                    parse_mode="Markdown",  # noqa
+                )
+                return
             except Exception as e:
                 logging.error(f"Failed to send backup file: {e}")
             self.bot.send_message(
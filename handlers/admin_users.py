@@ -11,6 +11,7 @@ from database.core import (
     get_user_state,
     set_user_state,
 )
+from outbound import resolve
 
 
 class AdminUsersMixin:
@@ -184,10 +185,11 @@ class AdminUsersMixin:
             self.bot.send_message(message.chat.id, "❌ Отменено", reply_markup=keyboards.admin_users_menu())
             return
         try:
-            self.bot.send_message(
+            # Ждем доставки, чтобы сообщить администратору об ошибке
+            resolve(self.bot.send_message(
                 target_id, f"🔔 *Сообщение от администрации:*\n\n{message.text}",
                 parse_mode='Markdown', reply_markup=keyboards.user_reply_keyboard(user_id)
-            )
+            ))
             self.bot.send_message(message.chat.id, "✅ Сообщение отправлено.", reply_markup=keyboards.admin_users_menu())
         except Exception:
             self.bot.send_message(message.chat.id, "❌ Ошибка отправки (возможно, бот заблокирован).",
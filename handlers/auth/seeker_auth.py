@@ -434,7 +434,8 @@ class SeekerAuth:
             # Принудительно обновляем пол, так как create_job_seeker может не сохранять его
             if "gender" in reg_data:
                 database.execute_query(
-                    "UPDATE job_seekers SET gender = ? WHERE telegram_id = ?",
+                    "UPDATE job_seekers SET gender = ?, version = version + 1 "
+                    "WHERE telegram_id = ?",
                     (reg_data["gender"], user_id),
                     commit=True,
                 )
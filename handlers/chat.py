@@ -3,6 +3,7 @@ from typing import Any, Optional
 
 import database
 import keyboards
+from outbound import resolve
 from utils import formatters, misc, security
 
 
@@ -75,13 +76,15 @@ class ChatMixin:
             return
 
         try:
-            # Отправляем получателю
-            self.bot.send_message(
-                target_id,
-                f"📩 *Сообщение от {formatters.escape_markdown(sender_name)}:*\n\n"
-                f"{formatters.escape_markdown(message.text)}",
-                parse_mode="Markdown",
-                reply_markup=keyboards.reply_keyboard(user_id),
+            # Отправляем получателю и ждем доставки
+            resolve(
+                self.bot.send_message(
+                    target_id,
+                    f"📩 *Сообщение от {formatters.escape_markdown(sender_name)}:*\n\n"
+                    f"{formatters.escape_markdown(message.text)}",
+                    parse_mode="Markdown",
+                    reply_markup=keyboards.reply_keyboard.json(user_id),
+                )
             )
             # Подтверждаем отправителю и автоматически завершаем чат
             self.handle_stop_chat(message, "✅ Сообщение отправлено.")
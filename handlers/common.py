@@ -13,7 +13,6 @@ from handlers.chat import ChatMixin
 from handlers.support import SupportMixin
 from localization import (
     LANGUAGE_MAP,
-    TRANSLATIONS,
     get_text_by_lang,
     get_user_language,
 )
@@ -23,54 +22,39 @@ class CommonHandlers(ChatMixin, SupportMixin):
     def __init__(self, bot):
         self.bot = bot
 
-    def register(self, bot):
+    def register(self, router):
         """Регистрация обработчиков общих команд"""
-        bot.register_message_handler(self.handle_start, commands=['start', 'restart'])
-        bot.register_message_handler(self.handle_help, commands=['help', 'помощь'])
-        bot.register_message_handler(self.handle_admin, commands=['admin'])
-        bot.register_message_handler(self.handle_health, commands=['health'])
-        bot.register_message_handler(self.handle_version, commands=['version'])
-        bot.register_message_handler(self.handle_cancel, commands=['cancel', 'отмена', 'отменить'])
-        bot.register_message_handler(self.handle_debug, commands=['debug', 'отладка'])
+        router.command(['start', 'restart'], self.handle_start)
+        router.command(['help', 'помощь'], self.handle_help)
+        router.command('admin', self.handle_admin)
+        router.command('health', self.handle_health)
+        router.command('version', self.handle_version)
+        router.command(['cancel', 'отмена', 'отменить'], self.handle_cancel)
+        router.command(['debug', 'отладка'], self.handle_debug)
 
         # Язык
-        bot.register_message_handler(
-            self.handle_language_selection,
-            func=self._is_initial_language_selection
-        )
-        bot.register_message_handler(
-            self.handle_back_to_lang,
-            func=lambda m: m.text in [d.get('back_to_lang', '') for d in TRANSLATIONS.values()]
+        router.text(
+            list(LANGUAGE_MAP), self.handle_language_selection,
+            guard=self._is_initial_language_selection
         )
+        router.translated('back_to_lang', self.handle_back_to_lang)
 
         # Навигация
-        bot.register_message_handler(
-            self.handle_back_to_main,
-            func=lambda m: m.text in [d.get('back_to_main_menu', '') for d in TRANSLATIONS.values()] or
-            m.text in ['🏠 На главную', '🏠 Главное меню']
-        )
-        bot.register_message_handler(
-            self.handle_back_to_profile,
-            func=lambda m: m.text in [d.get('btn_back_to_panel_menu', '') for d in TRANSLATIONS.values()]
-        )
+        router.translated('back_to_main_menu', self.handle_back_to_main)
+        router.text(['🏠 На главную', '🏠 Главное меню'], self.handle_back_to_main)
+        router.translated('btn_back_to_panel_menu', self.handle_back_to_profile)
 
         # Инфо и поддержка
-        bot.register_message_handler(self.handle_about, func=lambda m: m.text in [d.get('about_bot', '') for d in TRANSLATIONS.values()])
-        bot.register_message_handler(self.handle_support, func=lambda m: m.text in [d.get('menu_support', '') for d in TRANSLATIONS.values()])
-        bot.register_message_handler(self.handle_report_bug, func=lambda m: m.text in ['🐛 Ошибка', '🐛 Xato', '🐛 Bug'])
-        bot.register_message_handler(self.handle_complaint, func=lambda m: m.text in ['⚠️ Жалоба', '⚠️ Shikoyat', '⚠️ Complaint'])
+        router.translated('about_bot', self.handle_about)
+        router.translated('menu_support', self.handle_support)
+        router.text(['🐛 Ошибка', '🐛 Xato', '🐛 Bug'], self.handle_report_bug)
+        router.text(['⚠️ Жалоба', '⚠️ Shikoyat', '⚠️ Complaint'], self.handle_complaint)
 
         # Чат
-        bot.register_callback_query_handler(self.handle_start_chat, func=lambda c: c.data.startswith('start_chat_'))
-        bot.register_message_handler(self.handle_stop_chat, func=lambda m: m.text == '❌ Завершить чат')
-        bot.register_callback_query_handler(
-            self.handle_reply_admin_prompt,
-            func=lambda c: c.data.startswith('reply_admin_')
-        )
-        bot.register_message_handler(
-            self.handle_admin,
-            func=lambda m: m.text == '↩️ Назад в админку' and m.from_user.id in Config.ADMIN_IDS
-        )
+        router.callback('start_chat_', self.handle_start_chat)
+        router.text('❌ Завершить чат', self.handle_stop_chat)
+        router.callback('reply_admin_', self.handle_reply_admin_prompt)
+        router.text('↩️ Назад в админку', self.handle_admin, admin_only=True)
 
     def handle_health(self, message):
         if check_connection_health():
@@ -116,6 +100,8 @@ class CommonHandlers(ChatMixin, SupportMixin):
         # Проверяем, есть ли пользователь в базе (автоматический вход)
         existing_user = database.get_user_by_id(user_id)
         if existing_user:
+            if existing_user.get('bot_blocked'):
+                database.mark_user_reachable(user_id)
             lang = existing_user.get('language_code', 'ru')
             if 'full_name' in existing_user:
                 self.bot.send_message(
@@ -1,13 +1,30 @@
-import json
 import logging
 from typing import Any
 
 from telebot import types
+from telebot.apihelper import ApiTelegramException
 
+import cards
 import database
 import keyboards
 import utils
+from database.applications import (
+    APPLICATION_STATUSES,
+    get_applicant,
+    get_applicants_page,
+    get_application_counts,
+    get_owned_vacancy,
+    set_application_status,
+)
 from localization import get_text_by_lang, get_user_language
+from outbound import resolve
+
+# Фильтры списка откликов: код в callback_data -> статус (a — все)
+APPLICANT_FILTERS = {"a": None, "p": "pending", "y": "accepted", "r": "rejected"}
+APPLICANT_STATUS_CODES = {
+    status: code for code, status in APPLICANT_FILTERS.items() if status
+}
+APPLICANT_STATUS_ICONS = {"pending": "⏳", "accepted": "✅", "rejected": "❌"}
 
 
 class EmployerResponseMixin:
@@ -99,65 +116,20 @@ class EmployerResponseMixin:
                     fetchone=True,
                 )
                 if vac_data:
-                    raw_title = vac_data.get("title", "Не указана")
-                    vacancy_title = (
-                        get_text_by_lang(raw_title, seeker_lang)
-                        if raw_title.startswith("prof_")
-                        else raw_title
+                    vacancy_title = cards.translate_title(
+                        vac_data.get("title", "Не указана"), seeker_lang
                     )
                     vacancy_salary = vac_data.get("salary", "Не указана")
-
-                    # Перевод типа занятости для соискателя
-                    raw_type = vac_data.get("job_type", "Не указан")
-                    if raw_type and not raw_type.startswith("job_type_"):
-                        job_type_keys = [
-                            "job_type_full_time",
-                            "job_type_part_time",
-                            "job_type_remote",
-                            "job_type_internship",
-                        ]
-                        for key in job_type_keys:
-                            if any(
-                                get_text_by_lang(key, lang_code) == raw_type
-                                for lang_code in ["ru", "uz", "en"]
-                            ):  # noqa
-                                raw_type = key
-                                break
-
-                    vacancy_type = get_text_by_lang(raw_type, seeker_lang)
-
+                    vacancy_type = cards.translate_job_type(
+                        vac_data.get("job_type", "Не указан"), seeker_lang
+                    )
                     vacancy_desc = vac_data.get("description", "Нет описания")
-
-                    # Обработка пола
-                    gender_val = vac_data.get("gender", "any")
-                    if gender_val == "male":
-                        vacancy_gender = get_text_by_lang("gender_male", seeker_lang)
-                    elif gender_val == "female":
-                        vacancy_gender = get_text_by_lang("gender_female", seeker_lang)
-                    else:
-                        vacancy_gender = get_text_by_lang("gender_any", seeker_lang)
-
-                    # Перевод языков
-                    langs_json = vac_data.get("languages")
-                    if langs_json:
-                        try:
-                            l_list = json.loads(langs_json)
-                            parts = []
-                            for lang_item_data in l_list:
-                                l_name = (
-                                    get_text_by_lang(
-                                        lang_item_data.get("lang_key"), seeker_lang
-                                    )
-                                    if lang_item_data.get("lang_key")
-                                    else lang_item_data.get("lang_name")
-                                )
-                                l_level = get_text_by_lang(
-                                    lang_item_data.get("level_key"), seeker_lang
-                                )
-                                parts.append(f"{l_name} ({l_level})")
-                            vacancy_languages = ", ".join(parts)
-                        except Exception:
-                            vacancy_languages = langs_json
+                    vacancy_gender = cards.translate_gender(
+                        vac_data.get("gender", "any"), seeker_lang, "gender_any"
+                    )
+                    vacancy_languages = cards.translate_languages(
+                        vac_data.get("languages"), seeker_lang, vacancy_languages
+                    )
 
             invitation_text = (
                 f"🎉 *Вас пригласили на собеседование!*\n\n"
@@ -171,15 +143,17 @@ class EmployerResponseMixin:
                 f"Нажмите на кнопку ниже, чтобы написать сообщение работодателю."
             )
 
-            # Попытка отправить сообщение
+            # Попытка отправить сообщение (статус меняется только после доставки)
             try:
-                self.bot.send_message(
-                    seeker_telegram_id,
-                    invitation_text,
-                    parse_mode="Markdown",
-                    reply_markup=keyboards.contact_employer_keyboard(
-                        employer_telegram_id
-                    ),
+                resolve(
+                    self.bot.send_message(
+                        seeker_telegram_id,
+                        invitation_text,
+                        parse_mode="Markdown",
+                        reply_markup=keyboards.contact_employer_keyboard(
+                            employer_telegram_id
+                        ),
+                    )
                 )
             except Exception as e:
                 logging.error(
@@ -221,119 +195,205 @@ class EmployerResponseMixin:
             self.bot.answer_callback_query(call.id, "❌ Произошла системная ошибка.")
 
     def handle_vacancy_responses(self, call, vacancy_id):
-        """Показать отклики на вакансию"""
+        """Показать отклики на вакансию (первая страница, все статусы)"""
         self.bot.answer_callback_query(call.id)
+        user_id = call.from_user.id
+        lang = get_user_language(user_id)
 
-        # Получаем данные откликнувшихся соискателей
-        query = """
-            SELECT js.full_name, js.gender, js.age, js.city, js.profession, js.education, js.experience, js.skills, js.languages,
-                   js.phone,
-                   js.email,
-                   js.telegram_id
-            FROM applications a
-            JOIN job_seekers js ON a.seeker_id = js.id
-            WHERE a.vacancy_id = ?
-              AND js.status = 'active'
-        """
-        applicants = database.execute_query(query, (vacancy_id,), fetchall=True)
-
-        if not applicants:
+        page = self._applicants_page(user_id, vacancy_id, "a", "0", lang)
+        if page is None:
             self.bot.send_message(
                 call.message.chat.id, "📭 На эту вакансию пока нет откликов."
             )
             return
 
+        text, markup = page
+        self.bot.send_message(
+            call.message.chat.id, text, parse_mode="Markdown", reply_markup=markup
+        )
+
+    def handle_applicants_page_callback(self, call):
+        """Листание и фильтр откликов: apl_{вакансия}_{фильтр}_{курсор}"""
+        try:
+            _, vacancy_id, filter_code, cursor = call.data.split("_")
+            self._show_applicants_page(call, int(vacancy_id), filter_code, cursor)
+            self.bot.answer_callback_query(call.id)
+        except ValueError:
+            logging.error(f"❌ Неверный callback страницы откликов: {call.data}")
+            self.bot.answer_callback_query(call.id, "❌ Ошибка обработки команды.")
+
+    def handle_applicant_status_callback(self, call):
+        """Смена статуса отклика: aps_{отклик}_{статус}_{вакансия}_{фильтр}_{курсор}"""
+        try:
+            _, app_id, status_code, vacancy_id, filter_code, cursor = call.data.split(
+                "_"
+            )
+            status = APPLICANT_FILTERS[status_code]
+        except (ValueError, KeyError):
+            logging.error(f"❌ Неверный callback статуса отклика: {call.data}")
+            self.bot.answer_callback_query(call.id, "❌ Ошибка обработки команды.")
+            return
+
+        user_id = call.from_user.id
+        lang = get_user_language(user_id)
+        if not status or not set_application_status(int(app_id), status, user_id):
+            self.bot.answer_callback_query(call.id, "❌ Ошибка обработки команды.")
+            return
+
+        self.bot.answer_callback_query(
+            call.id,
+            get_text_by_lang("applicant_status_saved", lang).format(
+                status=get_text_by_lang(f"response_status_{status}", lang)
+            ),
+        )
+        self._show_applicants_page(call, int(vacancy_id), filter_code, cursor, lang)
+
+    def handle_applicant_card_callback(self, call):
+        """Полная карточка кандидата из списка откликов: apc_{отклик}"""
+        user_id = call.from_user.id
+        lang = get_user_language(user_id)
+        try:
+            applicant = get_applicant(int(call.data.split("_")[1]), user_id)
+        except (ValueError, IndexError):
+            applicant = None
+        if not applicant:
+            self.bot.answer_callback_query(call.id, "❌ Ошибка обработки команды.")
+            return
+
+        self.bot.answer_callback_query(call.id)
+        card, invite_markup = cards.candidate_card(
+            applicant, lang, applicant["vacancy_id"]
+        )
         self.bot.send_message(
             call.message.chat.id,
-            f"📋 *Отклики на вакансию ({len(applicants)}):*",
+            card,
             parse_mode="Markdown",
+            reply_markup=invite_markup,
         )
 
-        for app in applicants:
-            try:
-                # app - это словарь (Row), используем ключи
-                age_val = app.get("age")
-                # Проверяем, что возраст есть и он больше 0
-                age_text = (
-                    f"({age_val} лет)"
-                    if age_val and age_val > 0
-                    else "(возраст не указан)"
-                )
-                city_text = app.get("city", "Не указан")
-
-                # Обработка пола
-                gender_val = app.get("gender")
-                lang_code = get_user_language(call.from_user.id)
-                if gender_val == "male":
-                    gender_text = get_text_by_lang("gender_male", lang_code)
-                elif gender_val == "female":
-                    gender_text = get_text_by_lang("gender_female", lang_code)
-                else:
-                    gender_text = get_text_by_lang("age_not_specified", lang_code)
-                gender_line = f"{get_text_by_lang('gender_label', lang_code)} {utils.escape_markdown(gender_text)}\n"
-
-                # Перевод языков
-                langs_raw = app.get("languages")
-                langs_display = "Не указаны"
-                if langs_raw:
-                    try:
-                        l_list = json.loads(langs_raw)
-                        parts = []
-                        for lang_item_data in l_list:
-                            l_name = (
-                                get_text_by_lang(
-                                    lang_item_data.get("lang_key"),
-                                    get_user_language(call.from_user.id),
-                                )
-                                if lang_item_data.get("lang_key")
-                                else lang_item_data.get("lang_name", "?")
-                            )
-                            l_lvl = get_text_by_lang(
-                                lang_item_data.get("level_key"),
-                                get_user_language(call.from_user.id),
-                            )
-                            parts.append(f"{l_name} ({l_lvl})")
-                        langs_display = ", ".join(parts)
-                    except Exception:
-                        langs_display = langs_raw
-
-                # Перевод профессии
-                prof_raw = str(app.get("profession", ""))
-                prof_display = (
-                    get_text_by_lang(prof_raw, get_user_language(call.from_user.id))
-                    if prof_raw.startswith("prof_")
-                    else prof_raw
-                )
+    def _show_applicants_page(self, call, vacancy_id, filter_code, cursor, lang=None):
+        """Перерисовка страницы откликов в том же сообщении"""
+        lang = lang or get_user_language(call.from_user.id)
+        page = self._applicants_page(
+            call.from_user.id, vacancy_id, filter_code, cursor, lang
+        )
+        if page is None:
+            return
+        text, markup = page
+        try:
+            self.bot.edit_message_text(
+                text,
+                call.message.chat.id,
+                call.message.message_id,
+                parse_mode="Markdown",
+                reply_markup=markup,
+            )
+        except ApiTelegramException as e:
+            # Повторное нажатие на текущий фильтр не меняет сообщение
+            if "message is not modified" not in str(e.description):
+                raise
 
-                txt = (
-                    f"👤 *{utils.escape_markdown(str(app.get('full_name', '')))}* {age_text}\n"
-                    f"{gender_line}"
-                    f"🏙️ Город: {utils.escape_markdown(city_text)}\n"
-                    f"🎯 {utils.escape_markdown(prof_display)}\n"
-                    f"🎓 {utils.escape_markdown(str(app.get('education', '')))}\n"
-                    f"🗣 Языки: {utils.escape_markdown(langs_display)}\n"
-                    f"💼 {utils.escape_markdown(str(app.get('experience', '')))}\n"
-                    f"🎨 {utils.escape_markdown(str(app.get('skills', '')))}"
-                )
+    def _applicants_page(self, user_id, vacancy_id, filter_code, cursor, lang):
+        """
+        Страница откликов одним сообщением: список и кнопки статуса, фильтра и
+        листания. Три запроса на страницу (вакансия, счетчики, страница),
+        язык загружается вызывающим один раз. None — откликов нет или
+        вакансия чужая.
+        """
+        vacancy = get_owned_vacancy(vacancy_id, user_id)
+        if not vacancy:
+            return None
+        counts = get_application_counts(vacancy_id)
+        if not counts["total"]:
+            return None
+
+        after_id = int(cursor[1:]) if cursor.startswith("n") else None
+        before_id = int(cursor[1:]) if cursor.startswith("p") else None
+        applicants, has_more = get_applicants_page(
+            vacancy_id, APPLICANT_FILTERS.get(filter_code), after_id, before_id
+        )
+        has_prev = has_more if before_id else bool(after_id)
+        has_next = bool(before_id) or has_more
+
+        esc = utils.escape_markdown
+        t = get_text_by_lang
+        state = f"{vacancy_id}_{filter_code}_{cursor}"
+        lines = [
+            t("applicants_header", lang).format(
+                title=esc(cards.translate_title(vacancy["title"], lang))
+            ),
+            t("applicants_counts", lang).format(**counts),
+            "",
+        ]
+        markup = types.InlineKeyboardMarkup()
+        for number, app in enumerate(applicants, 1):
+            status = app.get("application_status") or "pending"
+            details = [
+                cards.translate_title(app.get("profession"), lang),
+                app.get("city"),
+                f"{app['age']} {t('age_years', lang)}" if app.get("age") else None,
+            ]
+            details_text = ", ".join(esc(str(d)) for d in details if d)
+            line = (
+                f"{number}. {APPLICANT_STATUS_ICONS[status]} *{esc(app['full_name'])}*"
+            )
+            lines.append(f"{line} — {details_text}" if details_text else line)
+            lines.append(
+                f"      📅 {utils.format_db_datetime_to_tashkent(app['applied_at'])}"
+            )
 
-                self.bot.send_message(
-                    call.message.chat.id,
-                    txt,
-                    parse_mode="Markdown",
-                    reply_markup=keyboards.employer_invite_keyboard(
-                        app.get("telegram_id"), vacancy_id
+            buttons = [
+                types.InlineKeyboardButton(
+                    f"👤 {number}", callback_data=f"apc_{app['application_id']}"
+                )
+            ]
+            for other in APPLICATION_STATUSES:
+                if other != status:
+                    buttons.append(
+                        types.InlineKeyboardButton(
+                            f"{APPLICANT_STATUS_ICONS[other]} {number}",
+                            callback_data=f"aps_{app['application_id']}_"
+                            f"{APPLICANT_STATUS_CODES[other]}_{state}",
+                        )
+                    )
+            markup.row(*buttons)
+        if not applicants:
+            lines.append(t("applicants_page_empty", lang))
+
+        markup.row(
+            *[
+                types.InlineKeyboardButton(
+                    ("• " if code == filter_code else "")
+                    + (
+                        t(f"response_status_{status}", lang)
+                        if status
+                        else t("applicants_filter_all", lang)
                     ),
+                    callback_data=f"apl_{vacancy_id}_{code}_0",
                 )
-            except Exception as e:
-                logging.error(
-                    f"❌ Ошибка при отправке карточки отклика для вакансии {vacancy_id}: "
-                    f"{e}",
-                    exc_info=True,  # noqa
+                for code, status in APPLICANT_FILTERS.items()
+            ]
+        )
+        nav = []
+        if has_prev and applicants:
+            nav.append(
+                types.InlineKeyboardButton(
+                    t("btn_page_prev", lang),
+                    callback_data=f"apl_{vacancy_id}_{filter_code}_"
+                    f"p{applicants[0]['application_id']}",
                 )
-                self.bot.send_message(
-                    call.message.chat.id,
-                    "⚠️ Не удалось загрузить карточку одного из кандидатов из-за ошибки.",
+            )
+        if has_next and applicants:
+            nav.append(
+                types.InlineKeyboardButton(
+                    t("btn_page_next", lang),
+                    callback_data=f"apl_{vacancy_id}_{filter_code}_"
+                    f"n{applicants[-1]['application_id']}",
                 )
+            )
+        if nav:
+            markup.row(*nav)
+        return "\n".join(lines), markup
 
     def handle_employer_chats(self, message):
         """Меню чатов работодателя (список соискателей с которыми есть связь)"""
@@ -1,13 +1,13 @@
-import json
 import logging
-from typing import Any
+from typing import Any, Dict
 
 from telebot import types
 
+import cards
 import database
 import keyboards
-import utils
 from localization import get_text_by_lang, get_user_language
+from outbound import send_message_nowait
 
 # Список регионов и городов для фильтрации
 UZB_REGIONS = {
@@ -42,6 +42,25 @@ UZB_REGIONS = {
     "Респ. Каракалпакстан": ["Нукус", "Беруни", "Кунград", "Тахиаташ", "Турткуль"],
 }
 
+# Поля шагов выбора города; остальное состояние (например, язык гостя) сохраняется
+SEARCH_STATE_KEYS = ("step", "region")
+
+
+def _without_search(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in state.items() if k not in SEARCH_STATE_KEYS}
+
+
+def _set_search_step(user_id: int, step: str, **fields: Any) -> None:
+    """Шаг выбора города поверх текущего состояния"""
+    database.update_user_state(
+        user_id, lambda state: {**_without_search(state), "step": step, **fields}
+    )
+
+
+def _end_search(user_id: int) -> None:
+    """Удаляет из состояния только поля выбора города"""
+    database.update_user_state(user_id, _without_search)
+
 
 class EmployerSearchMixin:
     bot: Any
@@ -70,24 +89,26 @@ class EmployerSearchMixin:
             return
 
         if message.text == "🏙 Выбрать город":
-            # Показываем список регионов
-            markup = types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
-            for region in UZB_REGIONS.keys():
-                markup.add(types.KeyboardButton(region))
-            markup.add("⬅️ Назад")
-
-            msg = self.bot.send_message(
-                message.chat.id, "Выберите область/регион:", reply_markup=markup
-            )
-            self.bot.register_next_step_handler(
-                msg, self.process_candidate_region_choice
-            )
+            self._ask_candidate_region(message)
         else:
             # Все города
             self.show_candidates(message, city=None)
 
+    def _ask_candidate_region(self, message):
+        """Список регионов; ответ обрабатывается шагом search_candidate_region"""
+        markup = types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
+        for region in UZB_REGIONS.keys():
+            markup.add(types.KeyboardButton(region))
+        markup.add("⬅️ Назад")
+
+        _set_search_step(message.from_user.id, "search_candidate_region")
+        self.bot.send_message(
+            message.chat.id, "Выберите область/регион:", reply_markup=markup
+        )
+
     def process_candidate_region_choice(self, message):
         if message.text == "⬅️ Назад":
+            _end_search(message.from_user.id)
             self.handle_find_candidates(message)
             return
 
@@ -99,34 +120,26 @@ class EmployerSearchMixin:
                 markup.add(types.KeyboardButton(city))
             markup.add("⬅️ Назад")
 
-            msg = self.bot.send_message(
+            _set_search_step(
+                message.from_user.id, "search_candidate_city", region=region
+            )
+            self.bot.send_message(
                 message.chat.id,
                 f"Выберите город/район в {region}:",
                 reply_markup=markup,
             )
-            self.bot.register_next_step_handler(msg, self.process_candidate_city_choice)
         else:
             self.bot.send_message(message.chat.id, "❌ Выберите регион из списка.")
-            # Перезапускаем шаг, имитируя нажатие кнопки "Выбрать город"
-            message.text = "🏙 Выбрать город"
-            self.process_candidate_filter_choice(message)
+            # Повторно показываем список регионов
+            self._ask_candidate_region(message)
 
     def process_candidate_city_choice(self, message):
         if message.text == "⬅️ Назад":
             # Возвращаемся к выбору региона
-            markup = types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
-            for region in UZB_REGIONS.keys():
-                markup.add(types.KeyboardButton(region))
-            markup.add("⬅️ Назад")
-
-            msg = self.bot.send_message(
-                message.chat.id, "Выберите область/регион:", reply_markup=markup
-            )
-            self.bot.register_next_step_handler(
-                msg, self.process_candidate_region_choice
-            )
+            self._ask_candidate_region(message)
             return
 
+        _end_search(message.from_user.id)
         city = message.text
         self.show_candidates(message, city)
 
@@ -163,83 +176,62 @@ class EmployerSearchMixin:
 
         for seeker in seekers:
             try:
-                age_text = (
-                    f"{seeker.get('age')} {get_text_by_lang('age_years', lang)}"
-                    if seeker.get("age")
-                    else get_text_by_lang("age_not_specified", lang)
+                card, invite_markup = cards.candidate_card(seeker, lang)
+                # Обработчик не ждет, пока лимит чата пропустит все карточки
+                send_message_nowait(
+                    self.bot,
+                    message.chat.id,
+                    card,
+                    parse_mode="Markdown",
+                    reply_markup=invite_markup,
                 )
-                city_text = seeker.get(
-                    "city", get_text_by_lang("age_not_specified", lang)
+            except Exception as e:
+                logging.error(
+                    f"❌ Ошибка при отправке карточки кандидата: {e}", exc_info=True
                 )
 
-                # Обработка пола
-                gender_val = seeker.get("gender")
-                if gender_val == "male":
-                    gender_text = get_text_by_lang("gender_male", lang)
-                elif gender_val == "female":
-                    gender_text = get_text_by_lang("gender_female", lang)
-                else:
-                    gender_text = get_text_by_lang("age_not_specified", lang)
-                gender_line = f"{get_text_by_lang('gender_label', lang)} {utils.escape_markdown(gender_text)}\n"
-
-                # Перевод профессии
-                prof_raw = seeker.get("profession", "")
-                prof_display = (
-                    get_text_by_lang(prof_raw, lang)
-                    if prof_raw and prof_raw.startswith("prof_")
-                    else (prof_raw or get_text_by_lang("education_not_specified", lang))
-                )
+    def handle_vacancy_candidates(self, call, vacancy_id):
+        """Подбор кандидатов под вакансию (ранжированный шортлист)"""
+        user_id = call.from_user.id
+        lang = get_user_language(user_id)
 
-                # Перевод языков
-                langs_raw = seeker.get("languages")
-                langs_display = get_text_by_lang("languages_not_specified", lang)
-                if langs_raw:
-                    try:
-                        if isinstance(langs_raw, str) and langs_raw.strip().startswith(
-                            "["
-                        ):
-                            l_list = json.loads(langs_raw)
-                            parts = []
-                            for lang_item in l_list:
-                                l_name = (
-                                    get_text_by_lang(lang_item.get("lang_key"), lang)
-                                    if lang_item.get("lang_key")
-                                    else lang_item.get("lang_name", "?")
-                                )
-                                l_lvl = get_text_by_lang(
-                                    lang_item.get("level_key"), lang
-                                )
-                                parts.append(f"{l_name} ({l_lvl})")
-                            langs_display = ", ".join(parts)
-                        else:
-                            langs_display = langs_raw
-                    except Exception:  # noqa: E722
-                        langs_display = langs_raw
-
-                card = (
-                    f"👤 *{seeker['full_name']}*\n"
-                    f"{gender_line}{get_text_by_lang('candidate_card_city', lang)} {city_text}\n"
-                    f"{get_text_by_lang('candidate_card_age', lang)} {age_text}\n"
-                    f"{get_text_by_lang('candidate_card_profession', lang)} "
-                    f"{utils.escape_markdown(prof_display)}\n"
-                    f"{get_text_by_lang('candidate_card_education', lang)} "
-                    f"{utils.escape_markdown(seeker.get('education', get_text_by_lang('education_not_specified', lang)))}\n"
-                    f"{get_text_by_lang('candidate_card_languages', lang)} {utils.escape_markdown(langs_display)}\n"
-                    f"{get_text_by_lang('candidate_card_experience', lang)} "
-                    f"{utils.escape_markdown(seeker.get('experience', get_text_by_lang('experience_not_specified', lang)))}\n"
-                    f"{get_text_by_lang('candidate_card_skills', lang)} {utils.escape_markdown(seeker.get('skills', get_text_by_lang('skills_not_specified', lang)))}"
-                )
+        vacancy = database.get_vacancy_for_matching(vacancy_id)
+        if not vacancy or vacancy.get("employer_telegram_id") != user_id:
+            self.bot.answer_callback_query(
+                call.id, get_text_by_lang("vacancy_not_found", lang)
+            )
+            return
 
-                self.bot.send_message(
-                    message.chat.id,
-                    card,
+        self.bot.answer_callback_query(call.id)
+        candidates = database.get_ranked_candidates(vacancy)
+
+        if not candidates:
+            self.bot.send_message(
+                call.message.chat.id,
+                get_text_by_lang("shortlist_empty", lang),
+                parse_mode="Markdown",
+            )
+            return
+
+        self.bot.send_message(
+            call.message.chat.id,
+            get_text_by_lang("shortlist_header", lang).format(count=len(candidates)),
+            parse_mode="Markdown",
+        )
+
+        for seeker in candidates:
+            try:
+                # Приглашение сразу привязано к вакансии
+                card, invite_markup = cards.candidate_card(seeker, lang, vacancy_id)
+                send_message_nowait(
+                    self.bot,
+                    call.message.chat.id,
+                    f"{get_text_by_lang('shortlist_match_score', lang)} "
+                    f"{round(seeker.get('match_score') or 0)}%\n{card}",
                     parse_mode="Markdown",
-                    # Добавляем кнопку "Пригласить"
-                    reply_markup=keyboards.employer_invite_keyboard(
-                        seeker["telegram_id"], lang=lang
-                    ),
+                    reply_markup=invite_markup,
                 )
             except Exception as e:
                 logging.error(
-                    f"❌ Ошибка при отправке карточки кандидата: {e}", exc_info=True
+                    f"❌ Ошибка при отправке карточки из шортлиста: {e}", exc_info=True
                 )
@@ -4,23 +4,29 @@ from typing import Any, Dict
 
 from telebot import types
 
+import cards
 import database
 import keyboards
+import notifications
 import utils
 from localization import (
+    JOB_TYPE_KEYS,
     LANGUAGES_I18N,
     LEVELS_I18N,
     PROFESSION_SPHERES_KEYS,
-    TRANSLATIONS,
     get_text_by_lang,
     get_user_language,
+    key_for_text,
+    normalize_job_type,
 )
 from models import dict_to_employer
+from outbound import send_message_nowait
 
 
 class EmployerVacancyMixin:
     bot: Any
     handle_vacancy_responses: Any
+    handle_vacancy_candidates: Any
 
     def handle_create_vacancy(self, message):
         """Создание вакансии"""
@@ -367,7 +373,7 @@ class EmployerVacancyMixin:
             )
             return
 
-        lang_key = LANGUAGES_I18N[lang].get(text)
+        lang_key = key_for_text(text, prefix="lang_name_")
         if lang_key:
             user_state["current_lang_key_editing"] = lang_key
             self.show_vacancy_language_level(message.chat.id, user_id, user_state)
@@ -459,13 +465,13 @@ class EmployerVacancyMixin:
             self.show_vacancy_language_selection(message.chat.id, user_id, user_state)
             return
 
-        if text not in LEVELS_I18N[lang].keys():
+        level_key = key_for_text(text, prefix="level_")
+        if not level_key:
             self.bot.send_message(
                 message.chat.id, get_text_by_lang("select_level_from_menu", lang)
             )
             return
 
-        level_key = LEVELS_I18N[lang].get(text)
         lang_key = user_state.get("current_lang_key_editing")
         lang_name = user_state.get("current_lang_name_editing")
 
@@ -512,24 +518,11 @@ class EmployerVacancyMixin:
         lang = get_user_language(user_id)
 
         job_type_text = message.text.strip()
-        job_type_key = None
 
         # Проверяем валидность типа занятости на всех языках
-        job_type_keys = [
-            "job_type_full_time",
-            "job_type_part_time",
-            "job_type_remote",
-            "job_type_internship",
-        ]
-        for key in job_type_keys:  # noqa
-            for lang_code in TRANSLATIONS.keys():
-                if get_text_by_lang(key, lang_code) == job_type_text:
-                    job_type_key = key
-                    break  # noqa
-            if job_type_key:
-                break
+        job_type_key = normalize_job_type(job_type_text)
 
-        if not job_type_key:
+        if job_type_key not in JOB_TYPE_KEYS:
             self.bot.send_message(
                 message.chat.id,
                 get_text_by_lang("select_from_list", lang),
@@ -542,18 +535,21 @@ class EmployerVacancyMixin:
         # Сохраняем вакансию
         if database.create_vacancy(user_state["vacancy_data"]):
             # Принудительно обновляем пол, так как create_vacancy может не сохранять его
+            vacancy_id = None
             try:
                 employer_id = user_state["vacancy_data"].get("employer_id")
                 gender = user_state["vacancy_data"].get("gender")
-                if employer_id and gender:
+                if employer_id:
                     last_vac = database.execute_query(  # noqa
                         "SELECT id FROM vacancies WHERE employer_id = ? ORDER BY id DESC LIMIT 1",
                         (employer_id,),
                         fetchone=True,
                     )
                     if last_vac:
+                        vacancy_id = last_vac["id"]
+                    if last_vac and gender:
                         database.execute_query(
-                            "UPDATE vacancies SET gender = ? WHERE id = ?",
+                            "UPDATE vacancies SET gender = ?, version = version + 1 WHERE id = ?",
                             (gender, last_vac["id"]),
                             commit=True,
                         )
@@ -566,6 +562,10 @@ class EmployerVacancyMixin:
                 parse_mode="Markdown",
                 reply_markup=keyboards.employer_main_menu(lang=lang),
             )
+
+            # Уведомляем соискателей с подходящими сохраненными поисками
+            if vacancy_id:
+                notifications.notify_new_vacancy(self.bot, vacancy_id)
         else:
             self.bot.send_message(
                 message.chat.id,
@@ -603,98 +603,17 @@ class EmployerVacancyMixin:
             return
 
         for vac in vacancies:
-            # --- Логика перевода для отображения ---
-            # 1. Тип занятости
-            job_type_from_db = vac["job_type"]
-
-            # Обратная совместимость для старых вакансий (текст -> ключ)
-            if job_type_from_db and not job_type_from_db.startswith("job_type_"):
-                job_type_keys = [
-                    "job_type_full_time",
-                    "job_type_part_time",
-                    "job_type_remote",
-                    "job_type_internship",
-                ]
-                for key in job_type_keys:
-                    # Проверяем совпадение с любым из языков
-                    if any(
-                        get_text_by_lang(key, lang_code) == job_type_from_db
-                        for lang_code in ["ru", "uz", "en"]
-                    ):
-                        job_type_from_db = key
-                        break
-
-            # Переводим ключ в текст на нужном языке
-            job_type_text = get_text_by_lang(job_type_from_db, lang)
-
-            # 2. Профессия (Title)
-            title_from_db = vac["title"]  # noqa
-            title_text = (
-                get_text_by_lang(title_from_db, lang)
-                if title_from_db and title_from_db.startswith("prof_")
-                else title_from_db
-            )
-
-            # Gender
-            gender_val = vac.get("gender", "any")
-            if gender_val == "male":
-                gender_text = get_text_by_lang("gender_male", lang)
-            elif gender_val == "female":
-                gender_text = get_text_by_lang("gender_female", lang)
-            else:
-                gender_text = get_text_by_lang("gender_any", lang)
-
-            # 2. Языки
-            langs_json_str = vac.get("languages")
-            langs_display_str = get_text_by_lang(
-                "languages_not_specified_in_vacancy", lang
-            )
-            if langs_json_str:
-                try:
-                    # Try to parse as JSON
-                    try:
-                        langs_list = json.loads(langs_json_str)
-                    except json.JSONDecodeError:
-                        # If not JSON, treat as old string format
-                        langs_list = []
-                        langs_display_str = langs_json_str  # Fallback
-
-                    display_parts = []
-                    for lang_info in langs_list:
-                        lang_name = (
-                            get_text_by_lang(lang_info["lang_key"], lang)
-                            if "lang_key" in lang_info
-                            else lang_info.get("lang_name", "?")
-                        )
-                        level_name = get_text_by_lang(
-                            lang_info["level_key"], lang
-                        )  # noqa
-                        display_parts.append(f"{lang_name} ({level_name})")
-                    if display_parts:
-                        langs_display_str = ", ".join(display_parts)
-                except (json.JSONDecodeError, TypeError):
-                    langs_display_str = langs_json_str  # Fallback для старых данных
-
-            # Форматируем дату создания в ташкентское время
-            created_at_tashkent = utils.format_db_datetime_to_tashkent(
-                vac["created_at"]
-            )
-
-            self.bot.send_message(
+            card, markup = cards.vacancy_card(vac, lang, owner=True)
+            send_message_nowait(
+                self.bot,
                 message.chat.id,
-                f"💼 *{title_text}*\n"
-                f"{get_text_by_lang('vacancy_card_salary', lang)} {vac['salary']}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_type', lang)} {job_type_text}\n"  # noqa
-                f"{get_text_by_lang('gender_label', lang)} {gender_text}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_languages', lang)} {langs_display_str}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_description', lang)} {vac['description']}\n\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_created_at', lang)} {created_at_tashkent}",  # noqa
+                card,
                 parse_mode="Markdown",
-                reply_markup=keyboards.my_vacancy_actions(vac["id"], lang=lang),
+                reply_markup=markup,
             )
 
     def handle_my_vacancy_actions(self, call):
-        """Обработка кнопок 'Изменить', 'Удалить', 'Отклики'"""
+        """Обработка кнопок 'Изменить', 'Удалить', 'Отклики', 'Подобрать кандидатов'"""
         try:
             action, _, vacancy_id_str = call.data.partition("_vac_")
             vacancy_id = int(vacancy_id_str)
@@ -705,6 +624,8 @@ class EmployerVacancyMixin:
                 self.handle_delete_vacancy(call, vacancy_id)
             elif action == "responses":
                 self.handle_vacancy_responses(call, vacancy_id)
+            elif action == "match":
+                self.handle_vacancy_candidates(call, vacancy_id)
         except ValueError as e:
             logging.error(
                 f"❌ Ошибка разбора callback_data в handle_my_vacancy_actions: {e}",
@@ -894,23 +815,9 @@ class EmployerVacancyMixin:
         val = message.text.strip()
         if val != ".":
             # Определяем ключ по тексту
-            job_type_key = None
-            job_type_keys = [
-                "job_type_full_time",
-                "job_type_part_time",
-                "job_type_remote",
-                "job_type_internship",
-            ]
-
-            for key in job_type_keys:
-                if any(
-                    get_text_by_lang(key, lang_code) == val
-                    for lang_code in ["ru", "uz", "en"]
-                ):
-                    job_type_key = key
-                    break
+            job_type_key = normalize_job_type(val)
 
-            if not job_type_key:
+            if job_type_key not in JOB_TYPE_KEYS:
                 self.bot.send_message(
                     message.chat.id,
                     get_text_by_lang("select_from_list", lang),
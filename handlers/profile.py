@@ -12,15 +12,17 @@ from localization import (
     PROFESSION_SPHERES_KEYS,
     get_text_by_lang,
     get_user_language,
+    key_for_text,
 )
+from resume_service import prerender_resume
 
 
 class ProfileHandlers:
     def __init__(self, bot):
         self.bot = bot
 
-    def register(self, bot):
-        bot.register_message_handler(self.handle_complete_profile, func=lambda m: m.text in ['📝 Заполнить профиль', '🏢 Заполнить профиль компании'])
+    def register(self, router):
+        router.text(['📝 Заполнить профиль', '🏢 Заполнить профиль компании'], self.handle_complete_profile)
 
     def start_profile_setup(self, message, user_data):
         """Начало заполнения профиля после регистрации"""
@@ -344,7 +346,7 @@ class ProfileHandlers:
             return
 
         # Check standard languages
-        lang_key = LANGUAGES_I18N[lang].get(text)
+        lang_key = key_for_text(text, prefix='lang_name_')
         if lang_key:
             user_state['current_lang_key_editing'] = lang_key
             self.show_level_selection(message.chat.id, user_id, user_state)
@@ -456,11 +458,11 @@ class ProfileHandlers:
             self.show_language_selection(message.chat.id, user_id, user_state)
             return
 
-        if text not in LEVELS_I18N[lang].keys():
+        level_key = key_for_text(text, prefix='level_')
+        if not level_key:
             self.bot.send_message(message.chat.id, get_text_by_lang('select_level_from_menu', lang))
             return
 
-        level_key = LEVELS_I18N[lang].get(text)
         lang_key = user_state.get('current_lang_key_editing')
         lang_name = user_state.get('current_lang_name_editing')
 
@@ -597,6 +599,8 @@ class ProfileHandlers:
 
             if success:
                 print(f"✅ Профиль соискателя {user_id} обновлен")
+                # Резюме рисуется заранее: отклик возьмет готовый PDF
+                prerender_resume(user_id)
             else:
                 print(f"⚠️ Не удалось обновить профиль соискателя {user_id}")
 
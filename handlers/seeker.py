@@ -1,29 +1,20 @@
 from handlers.seeker_profile import SeekerProfileMixin
 from handlers.seeker_responses import SeekerResponseMixin
+from handlers.seeker_saved_searches import SavedSearchMixin
 from handlers.seeker_search import SeekerSearchMixin
-from localization import get_all_translations
 
 
-class SeekerHandlers(SeekerSearchMixin, SeekerProfileMixin, SeekerResponseMixin):
+class SeekerHandlers(
+    SeekerSearchMixin, SeekerProfileMixin, SeekerResponseMixin, SavedSearchMixin
+):
     def __init__(self, bot):
         self.bot = bot
 
-    def register(self, bot):
-        bot.register_message_handler(
-            self.handle_find_vacancies,
-            func=lambda m: m.text in get_all_translations("menu_find_vacancies"),
-        )
-        bot.register_message_handler(
-            self.handle_my_resume,
-            func=lambda m: m.text in get_all_translations("menu_my_resume"),
-        )
-        bot.register_message_handler(
-            self.handle_my_responses,
-            func=lambda m: m.text in get_all_translations("menu_my_responses"),
-        )
-        bot.register_callback_query_handler(
-            self.handle_application_callback, func=lambda c: c.data.startswith("apply_")
-        )
-        bot.register_callback_query_handler(
-            self.handle_download_resume, func=lambda c: c.data == "download_resume"
-        )
+    def register(self, router):
+        router.translated("menu_find_vacancies", self.handle_find_vacancies)
+        router.translated("menu_my_resume", self.handle_my_resume)
+        router.translated("menu_my_responses", self.handle_my_responses)
+        router.translated("menu_saved_searches", self.handle_saved_searches)
+        router.callback("ss_", self.handle_saved_search_callback)
+        router.callback("apply_", self.handle_application_callback)
+        router.callback("download_resume", self.handle_download_resume, exact=True)
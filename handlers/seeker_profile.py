@@ -7,9 +7,11 @@ from telebot import types
 import database
 import keyboards
 import utils
+from documents import send_cached_document
 from localization import get_text_by_lang, get_user_language
 from models import dict_to_job_seeker
-from pdf_generator import generate_resume_pdf
+from outbound import send_message_nowait
+from resume_service import get_resume_bytes
 
 
 class SeekerProfileMixin:
@@ -191,7 +193,7 @@ class SeekerProfileMixin:
             f"{get_text_by_lang('response_status_label', lang)} {status_text}"
         )
 
-        self.bot.send_message(chat_id, card, parse_mode="Markdown")
+        send_message_nowait(self.bot, chat_id, card, parse_mode="Markdown")
 
     def handle_download_resume(self, call):
         """Генерация и отправка PDF резюме"""
@@ -205,11 +207,12 @@ class SeekerProfileMixin:
             return
 
         try:
-            pdf_file = generate_resume_pdf(user_data, lang)
-            pdf_file.name = f"Resume_{user_data.get('full_name', 'user')}.pdf"
-
-            self.bot.send_document(
-                call.message.chat.id, pdf_file, caption="📄 Ваше резюме готово!"
+            send_cached_document(
+                self.bot,
+                call.message.chat.id,
+                get_resume_bytes(user_data, lang),
+                f"Resume_{user_data.get('full_name', 'user')}.pdf",
+                caption="📄 Ваше резюме готово!",
             )
         except Exception as e:
             import logging
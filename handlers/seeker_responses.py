@@ -4,8 +4,9 @@ from typing import Any
 import database
 import keyboards
 import utils
+from documents import send_cached_document
 from localization import get_text_by_lang, get_user_language
-from pdf_generator import generate_resume_pdf
+from resume_service import get_resume_renderer
 
 
 class SeekerResponseMixin:
@@ -56,7 +57,7 @@ class SeekerResponseMixin:
         try:
             # Получаем данные работодателя и вакансии
             query = """
-                SELECT v.title, e.telegram_id, e.language_code 
+                SELECT v.title, e.telegram_id, e.language_code, e.digest_mode
                 FROM vacancies v
                 JOIN employers e ON v.employer_id = e.id
                 WHERE v.id = ?
@@ -66,6 +67,10 @@ class SeekerResponseMixin:
             if not res:
                 return
 
+            # Отклик попадет в часовой или суточный дайджест (digests.py)
+            if (res.get("digest_mode") or "instant") != "instant":
+                return
+
             emp_id = res["telegram_id"]
             lang = res.get("language_code", "ru")
             title = res["title"]
@@ -74,14 +79,20 @@ class SeekerResponseMixin:
             if title.startswith("prof_"):
                 title = get_text_by_lang(title, lang)
 
-            # Генерируем PDF
-            pdf = generate_resume_pdf(seeker_data, lang)
-            pdf.name = f"Resume_{seeker_data.get('full_name', 'Candidate')}.pdf"
-
             caption = f"{get_text_by_lang('new_application_notify', lang)}\n\n💼 Вакансия: *{utils.escape_markdown(title)}*\n👤 Кандидат: *{utils.escape_markdown(seeker_data.get('full_name'))}*"
+            filename = f"Resume_{seeker_data.get('full_name', 'Candidate')}.pdf"
+
+            def send_pdf(pdf_bytes):
+                send_cached_document(
+                    self.bot, emp_id, pdf_bytes, filename, caption=caption, parse_mode="Markdown"
+                )
+
+            def send_text():
+                self.bot.send_message(emp_id, caption, parse_mode="Markdown")
 
-            # Отправляем PDF работодателю
-            self.bot.send_document(emp_id, pdf, caption=caption, parse_mode="Markdown")
+            # PDF рисуется в пуле процессов и отправляется работодателю в фоне;
+            # при переполнении пула или таймауте уходит текстовое уведомление
+            get_resume_renderer().submit(seeker_data, lang, send_pdf, send_text)
 
         except Exception as e:
             logging.error(f"Error notifying employer: {e}")
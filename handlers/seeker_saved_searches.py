@@ -0,0 +1,314 @@
+import logging
+from typing import Any, Dict
+
+import database
+import keyboards
+import utils
+from database.searches import localize_location
+from localization import (
+    PROFESSION_SPHERES_KEYS,
+    REGIONS,
+    get_text_by_lang,
+    get_user_language,
+)
+
+JOB_TYPE_KEYS = [
+    "job_type_full_time",
+    "job_type_part_time",
+    "job_type_remote",
+    "job_type_internship",
+]
+
+
+class SavedSearchMixin:
+    bot: Any
+
+    def handle_saved_searches(self, message):
+        """Список сохраненных поисков соискателя"""
+        user_id = message.from_user.id
+        lang = get_user_language(user_id)
+        user_data = database.get_user_by_id(user_id)
+
+        if not user_data or "full_name" not in user_data:
+            self.bot.send_message(
+                message.chat.id,
+                get_text_by_lang("auth_required_seeker", lang),
+                parse_mode="Markdown",
+            )
+            return
+
+        self._send_saved_searches(message.chat.id, user_data, lang)
+
+    def _send_saved_searches(self, chat_id, user_data, lang):
+        searches = database.get_saved_searches(user_data["id"])
+        text = get_text_by_lang("saved_searches_header", lang) + "\n\n"
+        if searches:
+            text += "\n".join(
+                f"{num}. {utils.escape_markdown(self._describe_saved_search(s, lang))}"
+                for num, s in enumerate(searches, 1)
+            )
+        else:
+            text += get_text_by_lang("saved_searches_empty", lang)
+
+        self.bot.send_message(
+            chat_id,
+            text,
+            parse_mode="Markdown",
+            reply_markup=keyboards.saved_searches_keyboard(searches, lang=lang),
+        )
+
+    def _describe_saved_search(self, search: Dict[str, Any], lang: str) -> str:
+        """Краткое описание критериев поиска"""
+        any_text = get_text_by_lang("saved_search_any", lang)
+        location = search.get("location")
+        profession = search.get("profession")
+        job_type = search.get("job_type")
+
+        parts = [
+            f"📍 {localize_location(location, lang) if location else any_text}",
+            f"💼 {get_text_by_lang(profession, lang) if profession else any_text}",
+            f"🕒 {get_text_by_lang(job_type, lang) if job_type else any_text}",
+        ]
+        if search.get("keyword"):
+            parts.append(f"🔎 {search['keyword']}")
+        return " · ".join(parts)
+
+    def handle_saved_search_callback(self, call):
+        """Инлайн-кнопки сохраненных поисков (ss_*)"""
+        user_id = call.from_user.id
+        lang = get_user_language(user_id)
+        user_data = database.get_user_by_id(user_id)
+
+        if not user_data or "full_name" not in user_data:
+            self.bot.answer_callback_query(
+                call.id,
+                get_text_by_lang("auth_required_seeker", lang).replace("*", ""),
+            )
+            return
+
+        try:
+            action, _, value = call.data[3:].partition("_")
+
+            if action == "new":
+                self._start_saved_search(call, user_data, lang)
+                return
+
+            if action == "del":
+                database.delete_saved_search(int(value), user_data["id"])
+                self.bot.answer_callback_query(
+                    call.id, get_text_by_lang("saved_search_deleted", lang)
+                )
+                self._send_saved_searches(call.message.chat.id, user_data, lang)
+                return
+
+            user_state = database.get_user_state(user_id)
+            draft = user_state.get("saved_search") if user_state else None
+            if draft is None:
+                self.bot.answer_callback_query(
+                    call.id, get_text_by_lang("select_from_list", lang)
+                )
+                return
+
+            self.bot.answer_callback_query(call.id)
+            if action == "reg":
+                self._saved_search_region(call, user_state, value, lang)
+            elif action == "city":
+                self._saved_search_city(call, user_state, value, lang)
+            elif action == "sph":
+                self._saved_search_sphere(call, user_state, value, lang)
+            elif action == "prof":
+                self._saved_search_profession(call, user_state, value, lang)
+            elif action == "jt":
+                self._saved_search_job_type(call, user_state, value, lang)
+            elif action == "kw":
+                self._finish_saved_search(
+                    call.message.chat.id, user_id, user_data, draft, "", lang
+                )
+        except Exception as e:
+            logging.error(f"❌ Ошибка сохраненного поиска: {e}", exc_info=True)
+
+    def _edit_picker(self, call, text, markup):
+        self.bot.edit_message_text(
+            text,
+            chat_id=call.message.chat.id,
+            message_id=call.message.message_id,
+            reply_markup=markup,
+        )
+
+    def _start_saved_search(self, call, user_data, lang):
+        """Начало создания сохраненного поиска: выбор региона"""
+        if len(database.get_saved_searches(user_data["id"])) >= (
+            database.MAX_SAVED_SEARCHES
+        ):
+            self.bot.answer_callback_query(
+                call.id,
+                get_text_by_lang("saved_search_limit", lang).format(
+                    limit=database.MAX_SAVED_SEARCHES
+                ),
+            )
+            return
+
+        database.set_user_state(
+            call.from_user.id, {"action": "saved_search", "saved_search": {}}
+        )
+        self.bot.answer_callback_query(call.id)
+        regions = REGIONS.get(lang, REGIONS["ru"])
+        options = [(region, f"ss_reg_{idx}") for idx, region in enumerate(regions)]
+        self.bot.send_message(
+            call.message.chat.id,
+            get_text_by_lang("saved_search_choose_region", lang),
+            reply_markup=keyboards.saved_search_picker(
+                options, get_text_by_lang("saved_search_any", lang), "ss_reg_any"
+            ),
+        )
+
+    def _saved_search_region(self, call, user_state, value, lang):
+        if value == "any":
+            user_state["saved_search"]["location"] = ""
+            database.set_user_state(call.from_user.id, user_state)
+            self._show_saved_search_spheres(call, lang)
+            return
+
+        regions = list(REGIONS.get(lang, REGIONS["ru"]).values())
+        idx = int(value)
+        user_state["saved_search"]["region"] = idx
+        database.set_user_state(call.from_user.id, user_state)
+
+        options = [
+            (city, f"ss_city_{city_idx}") for city_idx, city in enumerate(regions[idx])
+        ]
+        self._edit_picker(
+            call,
+            get_text_by_lang("saved_search_choose_city", lang),
+            keyboards.saved_search_picker(
+                options,
+                get_text_by_lang("saved_search_whole_region", lang),
+                "ss_city_all",
+            ),
+        )
+
+    def _saved_search_city(self, call, user_state, value, lang):
+        # Город и регион храним по-русски, чтобы совпадать с вакансиями на любом языке
+        region, cities = list(REGIONS["ru"].items())[
+            user_state["saved_search"]["region"]
+        ]
+        location = region if value == "all" else cities[int(value)]
+        user_state["saved_search"]["location"] = location
+        database.set_user_state(call.from_user.id, user_state)
+        self._show_saved_search_spheres(call, lang)
+
+    def _show_saved_search_spheres(self, call, lang):
+        options = [
+            (get_text_by_lang(sphere, lang), f"ss_sph_{sphere}")
+            for sphere in PROFESSION_SPHERES_KEYS
+        ]
+        self._edit_picker(
+            call,
+            get_text_by_lang("saved_search_choose_sphere", lang),
+            keyboards.saved_search_picker(
+                options, get_text_by_lang("saved_search_any", lang), "ss_sph_any"
+            ),
+        )
+
+    def _saved_search_sphere(self, call, user_state, value, lang):
+        if value not in PROFESSION_SPHERES_KEYS:
+            user_state["saved_search"]["profession"] = ""
+            database.set_user_state(call.from_user.id, user_state)
+            self._show_saved_search_job_types(call, lang)
+            return
+
+        user_state["saved_search"]["sphere"] = value
+        database.set_user_state(call.from_user.id, user_state)
+        options = [
+            (get_text_by_lang(prof, lang), f"ss_prof_{prof}")
+            for prof in PROFESSION_SPHERES_KEYS[value]
+        ]
+        self._edit_picker(
+            call,
+            get_text_by_lang("saved_search_choose_profession", lang),
+            keyboards.saved_search_picker(
+                options,
+                get_text_by_lang("saved_search_whole_sphere", lang),
+                "ss_prof_all",
+            ),
+        )
+
+    def _saved_search_profession(self, call, user_state, value, lang):
+        sphere = user_state["saved_search"].get("sphere", "")
+        if value in PROFESSION_SPHERES_KEYS.get(sphere, []):
+            user_state["saved_search"]["profession"] = value
+        else:
+            user_state["saved_search"]["profession"] = sphere
+        database.set_user_state(call.from_user.id, user_state)
+        self._show_saved_search_job_types(call, lang)
+
+    def _show_saved_search_job_types(self, call, lang):
+        options = [
+            (get_text_by_lang(key, lang), f"ss_jt_{key}") for key in JOB_TYPE_KEYS
+        ]
+        self._edit_picker(
+            call,
+            get_text_by_lang("saved_search_choose_job_type", lang),
+            keyboards.saved_search_picker(
+                options, get_text_by_lang("saved_search_any", lang), "ss_jt_any"
+            ),
+        )
+
+    def _saved_search_job_type(self, call, user_state, value, lang):
+        user_state["saved_search"]["job_type"] = value if value in JOB_TYPE_KEYS else ""
+        user_state["step"] = "saved_search_keyword"
+        database.set_user_state(call.from_user.id, user_state)
+        self._edit_picker(
+            call,
+            get_text_by_lang("saved_search_keyword_prompt", lang),
+            keyboards.saved_search_picker(
+                [], get_text_by_lang("skip_button_text", lang), "ss_kw_skip"
+            ),
+        )
+
+    def process_saved_search_keyword(self, message):
+        """Ввод ключевого слова и сохранение поиска"""
+        user_id = message.from_user.id
+        lang = get_user_language(user_id)
+        user_state = database.get_user_state(user_id)
+        user_data = database.get_user_by_id(user_id)
+
+        if (
+            utils.cancel_request(message.text)
+            or not user_data
+            or "full_name" not in user_data
+        ):
+            database.clear_user_state(user_id)
+            self.bot.send_message(
+                message.chat.id,
+                get_text_by_lang("action_cancelled", lang),
+                reply_markup=keyboards.seeker_main_menu(lang=lang),
+            )
+            return
+
+        self._finish_saved_search(
+            message.chat.id,
+            user_id,
+            user_data,
+            user_state.get("saved_search", {}),
+            message.text or "",
+            lang,
+        )
+
+    def _finish_saved_search(self, chat_id, user_id, user_data, draft, keyword, lang):
+        database.clear_user_state(user_id)
+        if database.create_saved_search(
+            user_data["id"],
+            location=draft.get("location", ""),
+            profession=draft.get("profession", ""),
+            job_type=draft.get("job_type", ""),
+            keyword=keyword,
+        ):
+            text = get_text_by_lang("saved_search_created", lang)
+        else:
+            text = get_text_by_lang("saved_search_limit", lang).format(
+                limit=database.MAX_SAVED_SEARCHES
+            )
+        self.bot.send_message(
+            chat_id, text, reply_markup=keyboards.seeker_main_menu(lang=lang)
+        )
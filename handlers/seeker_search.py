@@ -1,14 +1,14 @@
-import json
 import logging
-from typing import Any
+from typing import Any, Dict
 
 from telebot import types
 
+import cards
 import database
 import keyboards
-import utils
 from database.core import execute_query
 from localization import get_text_by_lang, get_user_language
+from outbound import send_message_nowait
 
 # Список регионов и городов для фильтрации
 UZB_REGIONS = {
@@ -43,6 +43,25 @@ UZB_REGIONS = {
     "Респ. Каракалпакстан": ["Нукус", "Беруни", "Кунград", "Тахиаташ", "Турткуль"],
 }
 
+# Поля шагов выбора города; остальное состояние (например, язык гостя) сохраняется
+SEARCH_STATE_KEYS = ("step", "region")
+
+
+def _without_search(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in state.items() if k not in SEARCH_STATE_KEYS}
+
+
+def _set_search_step(user_id: int, step: str, **fields: Any) -> None:
+    """Шаг выбора города поверх текущего состояния"""
+    database.update_user_state(
+        user_id, lambda state: {**_without_search(state), "step": step, **fields}
+    )
+
+
+def _end_search(user_id: int) -> None:
+    """Удаляет из состояния только поля выбора города"""
+    database.update_user_state(user_id, _without_search)
+
 
 class SeekerSearchMixin:
     bot: Any
@@ -71,21 +90,25 @@ class SeekerSearchMixin:
             return
 
         if message.text == "🏙 Выбрать город":
-            # Показываем список регионов
-            markup = types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
-            for region in UZB_REGIONS.keys():
-                markup.add(types.KeyboardButton(region))
-            markup.add("⬅️ Назад")
-
-            msg = self.bot.send_message(
-                message.chat.id, "Выберите область/регион:", reply_markup=markup
-            )
-            self.bot.register_next_step_handler(msg, self.process_vacancy_region_choice)
+            self._ask_vacancy_region(message)
         else:
             self.show_vacancies(message, city=None)
 
+    def _ask_vacancy_region(self, message):
+        """Список регионов; ответ обрабатывается шагом search_vacancy_region"""
+        markup = types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
+        for region in UZB_REGIONS.keys():
+            markup.add(types.KeyboardButton(region))
+        markup.add("⬅️ Назад")
+
+        _set_search_step(message.from_user.id, "search_vacancy_region")
+        self.bot.send_message(
+            message.chat.id, "Выберите область/регион:", reply_markup=markup
+        )
+
     def process_vacancy_region_choice(self, message):
         if message.text == "⬅️ Назад":
+            _end_search(message.from_user.id)
             self.handle_find_vacancies(message)
             return
 
@@ -97,32 +120,24 @@ class SeekerSearchMixin:
                 markup.add(types.KeyboardButton(city))
             markup.add("⬅️ Назад")
 
-            msg = self.bot.send_message(
+            _set_search_step(message.from_user.id, "search_vacancy_city", region=region)
+            self.bot.send_message(
                 message.chat.id,
                 f"Выберите город/район в {region}:",
                 reply_markup=markup,
             )
-            self.bot.register_next_step_handler(msg, self.process_vacancy_city_choice)
         else:
             self.bot.send_message(message.chat.id, "❌ Выберите регион из списка.")
-            # Перезапускаем шаг, имитируя нажатие кнопки "Выбрать город"
-            message.text = "🏙 Выбрать город"
-            self.process_vacancy_filter_choice(message)
+            # Повторно показываем список регионов
+            self._ask_vacancy_region(message)
 
     def process_vacancy_city_choice(self, message):
         if message.text == "⬅️ Назад":
             # Возвращаемся к выбору региона
-            markup = types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
-            for region in UZB_REGIONS.keys():
-                markup.add(types.KeyboardButton(region))
-            markup.add("⬅️ Назад")
-
-            msg = self.bot.send_message(
-                message.chat.id, "Выберите область/регион:", reply_markup=markup
-            )
-            self.bot.register_next_step_handler(msg, self.process_vacancy_region_choice)
+            self._ask_vacancy_region(message)
             return
 
+        _end_search(message.from_user.id)
         city = message.text
         self.show_vacancies(message, city)
 
@@ -174,87 +189,14 @@ class SeekerSearchMixin:
 
     def _send_vacancy_card(self, chat_id, vac, lang):
         try:
-            # --- Логика перевода для отображения ---
-            # 1. Тип занятости
-            job_type_from_db = vac["job_type"]
-
-            # Обратная совместимость для старых вакансий
-            if job_type_from_db and not job_type_from_db.startswith("job_type_"):
-                job_type_keys = [
-                    "job_type_full_time",
-                    "job_type_part_time",
-                    "job_type_remote",
-                    "job_type_internship",
-                ]
-                for key in job_type_keys:  # noqa
-                    if any(
-                        get_text_by_lang(key, l) == job_type_from_db
-                        for l in ["ru", "uz", "en"]
-                    ):
-                        job_type_from_db = key
-                        break
-
-            job_type_text = get_text_by_lang(job_type_from_db, lang)
-
-            # 2. Профессия (Title)
-            title_from_db = vac["title"]
-            title_text = (
-                get_text_by_lang(title_from_db, lang)
-                if title_from_db and title_from_db.startswith("prof_")
-                else title_from_db
-            )
-
-            # Gender
-            gender_val = vac.get("gender", "any")
-            if gender_val == "male":
-                gender_text = get_text_by_lang("gender_male", lang)
-            elif gender_val == "female":
-                gender_text = get_text_by_lang("gender_female", lang)
-            else:
-                gender_text = get_text_by_lang("gender_any", lang)
-
-            # 2. Языки
-            langs_json_str = vac.get("languages")
-            langs_display_str = get_text_by_lang(
-                "languages_not_specified_in_vacancy", lang
-            )
-            if langs_json_str:
-                try:
-                    try:
-                        langs_list = json.loads(langs_json_str)
-                    except json.JSONDecodeError:
-                        langs_list = []
-                        langs_display_str = langs_json_str  # noqa
-                    display_parts = []
-                    for lang_info in langs_list:  # noqa
-                        lang_name = (
-                            get_text_by_lang(lang_info["lang_key"], lang)
-                            if "lang_key" in lang_info
-                            else lang_info.get("lang_name", "?")
-                        )
-                        level_name = get_text_by_lang(lang_info["level_key"], lang)
-                        display_parts.append(f"{lang_name} ({level_name})")
-                    if display_parts:
-                        langs_display_str = ", ".join(display_parts)
-                except (json.JSONDecodeError, TypeError):
-                    langs_display_str = langs_json_str  # Fallback для старых данных
-
-            card = (
-                f"💼 *{utils.escape_markdown(title_text)}*\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_company', lang)} *{utils.escape_markdown(vac['company_name'])}*\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_city', lang)} {utils.escape_markdown(vac['city'])}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_salary', lang)} {utils.escape_markdown(vac['salary'])}\n"  # noqa
-                f"{get_text_by_lang('gender_label', lang)} {utils.escape_markdown(gender_text)}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_type', lang)} {utils.escape_markdown(job_type_text)}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_languages', lang)} {utils.escape_markdown(langs_display_str)}\n"  # noqa
-                f"{get_text_by_lang('vacancy_card_description', lang)} {utils.escape_markdown(vac['description'])}"  # noqa
-            )
-
-            self.bot.send_message(
+            card, markup = cards.vacancy_card(vac, lang)
+            # Обработчик не ждет, пока лимит чата пропустит все карточки
+            send_message_nowait(
+                self.bot,
                 chat_id,
                 card,
                 parse_mode="Markdown",
-                reply_markup=keyboards.vacancy_actions(vac["id"], lang=lang),
+                reply_markup=markup,
             )
         except Exception as e:
             logging.error(
@@ -11,40 +11,48 @@ from localization import (
     get_user_language,
 )
 
+# Кнопки настроек соискателя -> редактируемое поле
+SEEKER_SETTING_KEYS = {
+    'btn_profession': 'profession',
+    'btn_education': 'education',
+    'btn_languages': 'languages',
+    'btn_experience': 'experience',
+    'btn_skills': 'skills',
+}
+
 
 class SettingsHandlers(SeekerSettingsMixin, EmployerSettingsMixin):
     def __init__(self, bot):
         self.bot = bot
 
-    def register(self, bot):
-        bot.register_message_handler(self.handle_settings_menu,
-                                     func=lambda m: m.text in get_all_translations('menu_settings'))
-        bot.register_message_handler(self.handle_change_language,
-                                     func=lambda m: m.text in get_all_translations('change_language'))
+    def register(self, router):
+        router.translated('menu_settings', self.handle_settings_menu)
+        router.translated('change_language', self.handle_change_language)
 
         # Настройки соискателя
-        bot.register_message_handler(self.handle_seeker_settings_wrapper, func=self._is_seeker_setting)
+        router.translated(list(SEEKER_SETTING_KEYS), self.handle_seeker_settings_wrapper)
 
         # Статус
-        bot.register_message_handler(self.handle_status_settings,
-                                     func=lambda m: m.text in get_all_translations('btn_status'))
-        bot.register_message_handler(self.handle_set_status_wrapper,
-                                     func=lambda m: m.text in get_all_translations('status_active') or m.text in get_all_translations('status_inactive'))
+        router.translated('btn_status', self.handle_status_settings)
+        router.translated(['status_active', 'status_inactive'], self.handle_set_status_wrapper)
 
         # Подменю соискателя
-        bot.register_message_handler(self.handle_seeker_submenu_action, func=self._is_seeker_submenu)
+        router.text(
+            ['✏️ Изменить', '➕ Добавить', '↩️ Назад в настройки'],
+            self.handle_seeker_submenu_action,
+            guard=self._is_seeker_submenu
+        )
 
-        # Удаление аккаунта
-        bot.register_message_handler(self.handle_delete_account, func=lambda m: m.text in get_all_translations('btn_delete_account') or m.text in get_all_translations('btn_delete_company'))
-        bot.register_message_handler(self.confirm_delete_account, func=lambda m: m.text in get_all_translations('confirm_delete') or m.text in get_all_translations('cancel_delete'))
+        # Уведомления работодателя об откликах (сразу или дайджестом)
+        router.translated('btn_digest_settings', self.handle_digest_settings)
+        router.callback('digest_', self.handle_digest_mode_callback)
 
-    def _is_seeker_setting(self, m):
-        keys = ['btn_profession', 'btn_education', 'btn_languages', 'btn_experience', 'btn_skills']
-        return any(m.text in get_all_translations(k) for k in keys)
+        # Удаление аккаунта
+        router.translated(['btn_delete_account', 'btn_delete_company'], self.handle_delete_account)
+        router.translated(['confirm_delete', 'cancel_delete'], self.confirm_delete_account)
 
     def handle_seeker_settings_wrapper(self, message):
-        key_map = {'btn_profession': 'profession', 'btn_education': 'education', 'btn_languages': 'languages', 'btn_experience': 'experience', 'btn_skills': 'skills'}
-        for key, value in key_map.items():
+        for key, value in SEEKER_SETTING_KEYS.items():
             if message.text in get_all_translations(key):
                 self.handle_seeker_setting(message, value)
                 return
@@ -5,6 +5,8 @@ from telebot import types
 import database
 import keyboards
 import utils
+from database.digests import DIGEST_MODES, get_digest_employer
+from digests import send_employer_digest
 from localization import TRANSLATIONS, get_text_by_lang, get_user_language
 
 
@@ -54,6 +56,63 @@ class EmployerSettingsMixin:
                 reply_markup=keyboards.employer_main_menu(),
             )
 
+    def handle_digest_settings(self, message: types.Message) -> None:
+        """Выбор режима уведомлений об откликах: сразу, раз в час, раз в день"""
+        user_id = message.from_user.id
+        lang = get_user_language(user_id)
+        user_data = database.get_user_by_id(user_id)
+
+        if not user_data or "company_name" not in user_data:
+            self.bot.send_message(
+                message.chat.id,
+                "❌ *Сначала войдите как работодатель!*",
+                parse_mode="Markdown",
+                reply_markup=keyboards.main_menu(),
+            )
+            return
+
+        self.bot.send_message(
+            message.chat.id,
+            get_text_by_lang("digest_settings_prompt", lang),
+            parse_mode="Markdown",
+            reply_markup=keyboards.digest_mode_keyboard.json(
+                database.get_digest_mode(user_id), lang=lang
+            ),
+        )
+
+    def handle_digest_mode_callback(self, call: types.CallbackQuery) -> None:
+        """Сохранение режима уведомлений об откликах"""
+        user_id = call.from_user.id
+        lang = get_user_language(user_id)
+        mode = call.data[len("digest_"):]
+        if mode not in DIGEST_MODES:
+            self.bot.answer_callback_query(call.id)
+            return
+
+        # Перед переходом на мгновенные уведомления накопленные отклики
+        # отправляются дайджестом, иначе они не попадут ни в один режим
+        employer = get_digest_employer(user_id)
+        if not employer:
+            self.bot.answer_callback_query(call.id)
+            return
+        if mode == "instant" and (employer.get("digest_mode") or "instant") != "instant":
+            send_employer_digest(self.bot, employer)
+
+        database.set_digest_mode(user_id, mode)
+        self.bot.answer_callback_query(
+            call.id,
+            get_text_by_lang("digest_mode_saved", lang).format(
+                mode=get_text_by_lang(f"digest_mode_{mode}", lang)
+            ),
+        )
+        self.bot.edit_message_text(
+            get_text_by_lang("digest_settings_prompt", lang),
+            call.message.chat.id,
+            call.message.message_id,
+            parse_mode="Markdown",
+            reply_markup=keyboards.digest_mode_keyboard.json(mode, lang=lang),
+        )
+
     def handle_employer_setting(self, message: types.Message, field: str) -> None:
         """Обработка нажатия на кнопку настройки работодателя"""
         user_id = message.from_user.id
@@ -12,6 +12,7 @@ from localization import (
     get_text_by_lang,
     get_user_language,
 )
+from resume_service import prerender_resume
 
 
 class SeekerSettingsMixin:
@@ -427,6 +428,7 @@ class SeekerSettingsMixin:
 
         if success:
             database.clear_user_state(user_id)
+            prerender_resume(user_id)
             self.bot.send_message(
                 message.chat.id,  # noqa
                 f"✅ {field_display} успешно обновлено!\n\n"
@@ -57,6 +57,7 @@ class StepHandlers:
         # Обработка админских шагов
         if self.admin_handlers:
             admin_steps_map = {
+                "admin_broadcast_segment": self.admin_handlers.process_broadcast_segment,
                 "admin_broadcast_message": self.admin_handlers.process_broadcast_message,
                 "admin_broadcast_confirm": self.admin_handlers.process_broadcast_confirm,
                 "admin_search_user": self.admin_handlers.process_search_user,
@@ -376,6 +377,7 @@ class StepHandlers:
                 reply_markup=keyboards.employer_main_menu(lang=lang),
             )
         elif step in [
+            "admin_broadcast_segment",
             "admin_broadcast_message",
             "admin_broadcast_confirm",
             "admin_reply_message",
@@ -395,7 +397,9 @@ class StepHandlers:
                 parse_mode="Markdown",
                 reply_markup=keyboards.admin_users_menu(),
             )
-        elif step in ["support_bug_report", "support_complaint", "reply_to_admin"]:
+        elif step in ["support_bug_report", "support_complaint", "reply_to_admin"] or (
+            isinstance(step, str) and step.startswith("search_")
+        ):
             database.clear_user_state(user_id)
             user_data = database.get_user_by_id(user_id)
             markup = keyboards.main_menu(lang=lang)
@@ -1,11 +1,158 @@
 # keyboards.py
-from typing import Optional, Union
+import functools
+import inspect
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from telebot import types
 
 from localization import get_text_by_lang
 
 
+# ================= РЕЕСТР КЛАВИАТУР =================
+# Статические клавиатуры зависят только от (меню, язык): строятся один раз,
+# JSON сериализуется при построении, а не при каждой отправке.
+# Параметризованные инлайн-клавиатуры рендерятся в JSON по шаблону:
+# builder.json(vacancy_id, lang=lang).
+
+
+class _FrozenMarkup:
+    """Общая клавиатура реестра: готовый JSON, изменения запрещены"""
+
+    _json = ""
+
+    def to_json(self):
+        return self._json
+
+    def add(self, *args, **kwargs):
+        raise TypeError("Клавиатура реестра общая: создайте новую разметку")
+
+    row = add
+
+
+class FrozenReplyKeyboardMarkup(_FrozenMarkup, types.ReplyKeyboardMarkup):
+    pass
+
+
+def _freeze(markup: types.ReplyKeyboardMarkup) -> FrozenReplyKeyboardMarkup:
+    frozen = FrozenReplyKeyboardMarkup.__new__(FrozenReplyKeyboardMarkup)
+    frozen.__dict__.update(markup.__dict__)
+    frozen._json = markup.to_json()
+    return frozen
+
+
+# Зарегистрированные статические клавиатуры: (функция, варианты аргументов)
+_STATIC_KEYBOARDS: List[Tuple[Any, Tuple[Dict[str, Any], ...]]] = []
+
+
+def static_keyboard(*variants: Dict[str, Any]) -> Callable:
+    """
+    Кэширует клавиатуру по значениям аргументов (позиционных и именованных
+    одинаково). variants — аргументы (кроме lang) для прогрева при запуске.
+    """
+
+    def decorate(builder):
+        params = list(inspect.signature(builder).parameters.values())
+        names = [p.name for p in params]
+        defaults = [p.default for p in params]
+        cache: Dict[Tuple[Any, ...], FrozenReplyKeyboardMarkup] = {}
+
+        @functools.wraps(builder)
+        def cached(*args, **kwargs):
+            n = len(args)
+            key = args + tuple(kwargs.get(name, d) for name, d in zip(names[n:], defaults[n:]))
+            markup = cache.get(key)
+            if markup is None:
+                markup = cache[key] = _freeze(builder(*args, **kwargs))
+            return markup
+
+        cached.cache = cache  # type: ignore[attr-defined]
+        cached.takes_lang = "lang" in names  # type: ignore[attr-defined]
+        _STATIC_KEYBOARDS.append((cached, variants or ({},)))
+        return cached
+
+    return decorate
+
+
+# Маркер поля шаблона: \x00 в тексте кнопок не встречается, в JSON — \u0000
+_MARK = "\x00{}\x00"
+_JSON_MARK = json.dumps(_MARK)[1:-1]
+
+
+class _InlineTemplate:
+    """JSON инлайн-клавиатуры с подстановкой полей (id) без построения объектов"""
+
+    def __init__(self, builder: Callable, fields: int):
+        self.builder = builder
+        self.fields = fields
+        self._parts: Dict[Tuple[Any, ...], List[str]] = {}
+
+    def __call__(self, *values: Any, **kwargs: Any) -> str:
+        values, rest = values[:self.fields], values[self.fields:]
+        # None меняет структуру клавиатуры (if vacancy_id) — часть ключа шаблона
+        shape = tuple(v is None for v in values)
+        key = (shape, rest, tuple(sorted(kwargs.items())))
+        parts = self._parts.get(key)
+        if parts is None:
+            marks = [None if empty else _MARK.format(i) for i, empty in enumerate(shape)]
+            template = self.builder(*marks, *rest, **kwargs).to_json()
+            parts = self._parts[key] = self._split(template)
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            out.append(json.dumps(str(values[int(parts[i])]))[1:-1])
+            out.append(parts[i + 1])
+        return "".join(out)
+
+    @staticmethod
+    def _split(template: str) -> List[str]:
+        """Чередование: текст, номер поля, текст, ..."""
+        head, sep = _JSON_MARK.split("{}")
+        parts: List[str] = []
+        rest = template
+        while head in rest:
+            before, _, after = rest.partition(head)
+            index, _, rest = after.partition(sep)
+            parts += [before, index]
+        parts.append(rest)
+        return parts
+
+
+_TEMPLATES: List[_InlineTemplate] = []
+
+
+def inline_template(fields: int = 1) -> Callable:
+    """Добавляет builder.json(*значения, ...) — JSON клавиатуры по шаблону"""
+
+    def decorate(builder):
+        builder.json = _InlineTemplate(builder, fields)
+        _TEMPLATES.append(builder.json)
+        return builder
+
+    return decorate
+
+
+def warm_keyboards(langs: Iterable[str]) -> int:
+    """Построение всех статических клавиатур для языков; возвращает их число"""
+    langs = list(langs)
+    count = 0
+    for keyboard, variants in _STATIC_KEYBOARDS:
+        for variant in variants:
+            for lang in langs if keyboard.takes_lang else (None,):
+                kwargs = dict(variant, lang=lang) if lang else dict(variant)
+                keyboard(**kwargs)
+                count += 1
+    return count
+
+
+def clear_keyboard_cache() -> None:
+    """Сброс реестра (после изменения переводов)"""
+    for keyboard, _ in _STATIC_KEYBOARDS:
+        keyboard.cache.clear()
+    for template in _TEMPLATES:
+        template._parts.clear()
+
+
+@static_keyboard()
 def language_menu():
     """Меню выбора языка"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -13,6 +160,7 @@ def language_menu():
     return markup
 
 
+@static_keyboard()
 def main_menu(lang: str = "ru") -> types.ReplyKeyboardMarkup:
     """Главное меню (до выбора роли)"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -25,6 +173,7 @@ def main_menu(lang: str = "ru") -> types.ReplyKeyboardMarkup:
     return markup
 
 
+@static_keyboard()
 def seeker_menu(is_registered=False, lang="ru"):
     """Меню соискателя ДО авторизации (после выбора роли)"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -34,6 +183,7 @@ def seeker_menu(is_registered=False, lang="ru"):
     return markup
 
 
+@static_keyboard()
 def employer_menu(is_registered=False, lang="ru"):
     """Меню работодателя ДО авторизации (после выбора роли)"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -43,6 +193,7 @@ def employer_menu(is_registered=False, lang="ru"):
     return markup
 
 
+@static_keyboard()
 def seeker_main_menu(lang="ru"):
     """Главное меню для авторизованного соискателя"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -51,7 +202,9 @@ def seeker_main_menu(lang="ru"):
         get_text_by_lang("menu_my_resume", lang),
     )
     markup.row(
-        get_text_by_lang("menu_my_responses", lang), get_text_by_lang("menu_chat", lang)
+        get_text_by_lang("menu_my_responses", lang),
+        get_text_by_lang("menu_saved_searches", lang),
+        get_text_by_lang("menu_chat", lang),
     )
     markup.row(
         get_text_by_lang("menu_settings", lang),
@@ -61,6 +214,7 @@ def seeker_main_menu(lang="ru"):
     return markup
 
 
+@static_keyboard()
 def employer_main_menu(lang="ru"):
     """Главное меню для авторизованного работодателя"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -80,6 +234,7 @@ def employer_main_menu(lang="ru"):
     return markup
 
 
+@static_keyboard({"role": "seeker"}, {"role": "employer"})
 def settings_menu(role: str, lang: str = "ru") -> types.ReplyKeyboardMarkup:
     """Меню настроек"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -103,6 +258,7 @@ def settings_menu(role: str, lang: str = "ru") -> types.ReplyKeyboardMarkup:
             get_text_by_lang("btn_back_to_panel_menu", lang),
         )
     else:
+        markup.row(get_text_by_lang("btn_digest_settings", lang))
         markup.row(get_text_by_lang("btn_delete_company", lang))
         markup.row(get_text_by_lang("change_language", lang))
         markup.row(get_text_by_lang("btn_back_to_panel_menu", lang))
@@ -110,6 +266,7 @@ def settings_menu(role: str, lang: str = "ru") -> types.ReplyKeyboardMarkup:
     return markup
 
 
+@static_keyboard()
 def seeker_status_menu(lang="ru"):
     """Меню выбора статуса соискателя"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -123,19 +280,22 @@ def seeker_submenu(
     field_name: str, current_value: Optional[str], lang: str = "ru"
 ) -> types.ReplyKeyboardMarkup:
     """Подменю для настроек соискателя (профессия/образование/опыт/навыки)"""
-    markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
-
     empty_values = ["Не указана", "Не указано", "Не указаны", "Нет опыта", None, ""]
+    return _seeker_submenu(current_value not in empty_values, lang)
 
-    if current_value in empty_values:
-        markup.row(get_text_by_lang("add_button", lang))
-    else:
-        markup.row(get_text_by_lang("edit_button", lang))
 
+@static_keyboard({"filled": False}, {"filled": True})
+def _seeker_submenu(filled: bool, lang: str = "ru") -> types.ReplyKeyboardMarkup:
+    markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
+    if filled:
+        markup.row(get_text_by_lang("edit_button", lang))
+    else:
+        markup.row(get_text_by_lang("add_button", lang))
     markup.row(get_text_by_lang("btn_back_settings", lang))
     return markup
 
 
+@static_keyboard()
 def contact_request_keyboard(lang="ru"):
     """Клавиатура для запроса контакта"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -148,6 +308,7 @@ def contact_request_keyboard(lang="ru"):
     return markup
 
 
+@static_keyboard()
 def cancel_keyboard(lang="ru"):
     """Клавиатура с кнопкой отмены"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -155,6 +316,7 @@ def cancel_keyboard(lang="ru"):
     return markup
 
 
+@static_keyboard()
 def admin_menu():
     """Меню администратора"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -165,6 +327,7 @@ def admin_menu():
     return markup
 
 
+@static_keyboard()
 def admin_users_menu() -> types.ReplyKeyboardMarkup:
     """Меню управления пользователями"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -173,6 +336,7 @@ def admin_users_menu() -> types.ReplyKeyboardMarkup:
     return markup
 
 
+@static_keyboard()
 def support_menu(lang="ru"):
     """Меню поддержки"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -184,6 +348,7 @@ def support_menu(lang="ru"):
     return markup
 
 
+@static_keyboard()
 def recovery_menu():
     """Меню восстановления доступа"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -192,6 +357,7 @@ def recovery_menu():
     return markup
 
 
+@static_keyboard()
 def job_type_menu(lang="ru") -> types.ReplyKeyboardMarkup:
     """Меню выбора типа занятости"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -207,6 +373,7 @@ def job_type_menu(lang="ru") -> types.ReplyKeyboardMarkup:
     return markup
 
 
+@inline_template()
 def vacancy_actions(vacancy_id: int, lang: str = "ru") -> types.InlineKeyboardMarkup:
     """Клавиатура действий с вакансией"""
     markup = types.InlineKeyboardMarkup()
@@ -218,6 +385,7 @@ def vacancy_actions(vacancy_id: int, lang: str = "ru") -> types.InlineKeyboardMa
     return markup
 
 
+@inline_template(fields=2)
 def employer_invite_keyboard(
     seeker_telegram_id: int, vacancy_id: Union[int, None] = None, lang: str = "ru"
 ) -> types.InlineKeyboardMarkup:
@@ -235,6 +403,7 @@ def employer_invite_keyboard(
     return markup
 
 
+@inline_template()
 def my_vacancy_actions(vacancy_id: int, lang: str = "ru") -> types.InlineKeyboardMarkup:
     """Клавиатура действий с МОЕЙ вакансией (для работодателя)"""
     markup = types.InlineKeyboardMarkup(row_width=3)
@@ -251,11 +420,31 @@ def my_vacancy_actions(vacancy_id: int, lang: str = "ru") -> types.InlineKeyboar
             get_text_by_lang("btn_vacancy_responses", lang),
             callback_data=f"responses_vac_{vacancy_id}",
         ),
+        types.InlineKeyboardButton(
+            get_text_by_lang("btn_vacancy_candidates", lang),
+            callback_data=f"match_vac_{vacancy_id}",
+        ),
     ]
     markup.add(*buttons)
     return markup
 
 
+@inline_template(fields=0)
+def digest_mode_keyboard(current: str, lang: str = "ru") -> types.InlineKeyboardMarkup:
+    """Выбор режима уведомлений об откликах (текущий отмечен)"""
+    markup = types.InlineKeyboardMarkup()
+    for mode in ("instant", "hourly", "daily"):
+        text = get_text_by_lang(f"digest_mode_{mode}", lang)
+        markup.add(
+            types.InlineKeyboardButton(
+                f"✅ {text}" if mode == current else text,
+                callback_data=f"digest_{mode}",
+            )
+        )
+    return markup
+
+
+@inline_template()
 def delete_confirmation_keyboard(
     vacancy_id: int, lang: str = "ru"
 ) -> types.InlineKeyboardMarkup:
@@ -272,6 +461,7 @@ def delete_confirmation_keyboard(
     return markup
 
 
+@inline_template()
 def contact_employer_keyboard(employer_telegram_id: int) -> types.InlineKeyboardMarkup:
     """Клавиатура для связи с работодателем"""
     markup = types.InlineKeyboardMarkup()
@@ -283,6 +473,7 @@ def contact_employer_keyboard(employer_telegram_id: int) -> types.InlineKeyboard
     return markup
 
 
+@inline_template()
 def contact_seeker_keyboard(seeker_telegram_id: int) -> types.InlineKeyboardMarkup:
     """Клавиатура для связи с соискателем"""
     markup = types.InlineKeyboardMarkup()
@@ -294,6 +485,7 @@ def contact_seeker_keyboard(seeker_telegram_id: int) -> types.InlineKeyboardMark
     return markup
 
 
+@inline_template()
 def reply_keyboard(target_id: int) -> types.InlineKeyboardMarkup:
     """Клавиатура для ответа"""
     markup = types.InlineKeyboardMarkup()
@@ -305,6 +497,7 @@ def reply_keyboard(target_id: int) -> types.InlineKeyboardMarkup:
     return markup
 
 
+@static_keyboard()
 def stop_chat_keyboard():
     """Клавиатура завершения чата"""
     markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
@@ -312,6 +505,7 @@ def stop_chat_keyboard():
     return markup
 
 
+@inline_template()
 def admin_user_action_keyboard(user_id, is_blocked=False):
     """Клавиатура действий админа с пользователем"""
     markup = types.InlineKeyboardMarkup()
@@ -336,6 +530,7 @@ def admin_user_action_keyboard(user_id, is_blocked=False):
     return markup
 
 
+@inline_template()
 def block_duration_keyboard(user_id):
     """Клавиатура выбора длительности блокировки"""
     markup = types.InlineKeyboardMarkup(row_width=2)
@@ -357,6 +552,7 @@ def block_duration_keyboard(user_id):
     return markup
 
 
+@inline_template()
 def user_reply_keyboard(admin_id):
     """Клавиатура ответа админу"""
     markup = types.InlineKeyboardMarkup()
@@ -366,3 +562,70 @@ def user_reply_keyboard(admin_id):
         )
     )
     return markup
+
+
+def saved_searches_keyboard(
+    searches: List[Dict[str, Any]], lang: str = "ru"
+) -> types.InlineKeyboardMarkup:
+    """Список сохраненных поисков: удаление и создание нового"""
+    markup = types.InlineKeyboardMarkup(row_width=5)
+    if searches:
+        markup.add(
+            *[
+                types.InlineKeyboardButton(
+                    f"🗑 {num}", callback_data=f"ss_del_{search['id']}"
+                )
+                for num, search in enumerate(searches, 1)
+            ]
+        )
+    markup.add(
+        types.InlineKeyboardButton(
+            get_text_by_lang("btn_saved_search_new", lang), callback_data="ss_new"
+        )
+    )
+    return markup
+
+
+def saved_search_picker(
+    options: List[Tuple[str, str]], any_text: str, any_callback: str
+) -> types.InlineKeyboardMarkup:
+    """Инлайн-выбор критерия сохраненного поиска (варианты + «любой»)"""
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    markup.add(
+        *[types.InlineKeyboardButton(text, callback_data=data) for text, data in options]
+    )
+    markup.add(types.InlineKeyboardButton(any_text, callback_data=any_callback))
+    return markup
+
+
+@static_keyboard()
+def broadcast_segment_keyboard():
+    """Выбор получателей рассылки"""
+    markup = types.ReplyKeyboardMarkup(resize_keyboard=True)
+    markup.row("👥 Всем пользователям")
+    markup.row(get_text_by_lang("cancel_button", "ru"))
+    return markup
+
+
+def broadcast_control_keyboard(job_id: int, status: str) -> types.InlineKeyboardMarkup:
+    """Управление фоновой рассылкой: пауза/продолжение/отмена"""
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    if status == "running":
+        markup.add(
+            types.InlineKeyboardButton(
+                "⏸ Пауза", callback_data=f"admin_bc_pause_{job_id}"
+            ),
+            types.InlineKeyboardButton(
+                "✖️ Отменить", callback_data=f"admin_bc_cancel_{job_id}"
+            ),
+        )
+    elif status == "paused":
+        markup.add(
+            types.InlineKeyboardButton(
+                "▶️ Продолжить", callback_data=f"admin_bc_resume_{job_id}"
+            ),
+            types.InlineKeyboardButton(
+                "✖️ Отменить", callback_data=f"admin_bc_cancel_{job_id}"
+            ),
+        )
+    return markup
@@ -1,8 +1,11 @@
 import json
 import logging
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
 TRANSLATIONS = {}
+# Обратный индекс: переведенная строка -> [(ключ, язык), ...] во всех локалях
+REVERSE_INDEX: Dict[str, List[Tuple[str, str]]] = {}
 LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
 
 
@@ -491,6 +494,16 @@ PROFESSION_SPHERES_KEYS = {
     ],
 }
 
+JOB_TYPE_KEYS = (
+    "job_type_full_time",
+    "job_type_part_time",
+    "job_type_remote",
+    "job_type_internship",
+)
+
+# Семейства ключей, которые ищутся по тексту (текст не должен означать два ключа)
+REVERSE_LOOKUP_PREFIXES = ("job_type_", "lang_name_", "level_", "prof_", "sphere_")
+
 LANGUAGES_I18N = {
     "ru": {
         "🇺🇿 Узбекский": "lang_name_uz",
@@ -531,6 +544,72 @@ LEVELS_I18N = {
 }
 
 
+def build_reverse_index():
+    """Перестроение обратного индекса по TRANSLATIONS и кнопкам языков/уровней"""
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for lang, strings in TRANSLATIONS.items():
+        for key, text in strings.items():
+            if isinstance(text, str) and text:
+                index.setdefault(text, []).append((key, lang))
+    for catalog in (LANGUAGES_I18N, LEVELS_I18N):
+        for lang, buttons in catalog.items():
+            for text, key in buttons.items():
+                entries = index.setdefault(text, [])
+                if (key, lang) not in entries:
+                    entries.append((key, lang))
+    REVERSE_INDEX.clear()
+    REVERSE_INDEX.update(index)
+
+
+def key_for_text(
+    text: Optional[str], prefix: str = "", lang: Optional[str] = None
+) -> Optional[str]:
+    """
+    Ключ локализации по переведенному тексту на любом языке
+    (или только на lang); prefix ограничивает семейство ключей.
+    """
+    for key, text_lang in REVERSE_INDEX.get(text or "", ()):
+        if key.startswith(prefix) and (lang is None or text_lang == lang):
+            return key
+    return None
+
+
+def normalize_job_type(value: Optional[str]) -> Optional[str]:
+    """
+    Ключ типа занятости: старые вакансии хранят текст на одном из языков.
+    Неизвестное значение возвращается как есть.
+    """
+    if not value or value in JOB_TYPE_KEYS:
+        return value
+    key = key_for_text(value, prefix="job_type_")
+    return key if key in JOB_TYPE_KEYS else value
+
+
+def validate_translations(base_lang: str = "ru") -> Dict[str, Any]:
+    """
+    Проверка локалей при запуске: ключи, отсутствующие относительно base_lang,
+    и тексты, которые означают несколько ключей одного семейства.
+    """
+    base = set(TRANSLATIONS.get(base_lang, {}))
+    missing = {
+        lang: sorted(base - set(strings))
+        for lang, strings in TRANSLATIONS.items()
+        if base - set(strings)
+    }
+    ambiguous = {}
+    for text, entries in REVERSE_INDEX.items():
+        for prefix in REVERSE_LOOKUP_PREFIXES:
+            keys = sorted({key for key, _ in entries if key.startswith(prefix)})
+            if len(keys) > 1:
+                ambiguous[text] = keys
+
+    for lang, keys in missing.items():
+        logging.warning(f"⚠️ В локали {lang} нет ключей: {', '.join(keys)}")
+    for text, keys in ambiguous.items():
+        logging.warning(f"⚠️ Текст '{text}' соответствует нескольким ключам: {keys}")
+    return {"missing": missing, "ambiguous": ambiguous}
+
+
 def get_user_language(user_id):
     """Получает код языка пользователя из БД, по умолчанию 'ru'."""
     from database.core import execute_query, get_user_state
@@ -574,3 +653,6 @@ def get_text_by_lang(key, lang="ru"):
 def get_all_translations(key):
     """Возвращает список переводов для ключа на всех языках"""
     return [d.get(key, "") for d in TRANSLATIONS.values() if d.get(key)]
+
+
+build_reverse_index()
@@ -0,0 +1,238 @@
+import atexit
+import copy
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def parse_rate_limits(value: str) -> Dict[str, int]:
+    """Лимиты записей по логгерам из строки вида "database.users=5,root=50" """
+    limits: Dict[str, int] = {}
+    for item in (value or "").split(","):
+        name, sep, limit = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            limits[name.strip()] = int(limit)
+        except ValueError:
+            logger.warning(f"⚠️ Неверный лимит логгера: {item.strip()}")
+    return limits
+
+
+# ================= ПРОРЕЖИВАНИЕ ЗАПИСЕЙ =================
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ограничение частоты записей с одного места в коде: за период проходит не
+    больше limit записей, сверх лимита — каждая sample_every-я (0 — ни одной).
+    Первая запись следующего периода сообщает, сколько похожих пропущено.
+    Лимит логгера берется из limits по самому длинному совпадающему префиксу
+    имени; CRITICAL проходит всегда.
+    """
+
+    def __init__(
+        self,
+        limit: int = Config.LOG_RATE_LIMIT,
+        period: float = Config.LOG_RATE_PERIOD,
+        sample_every: int = Config.LOG_SAMPLE_EVERY,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        super().__init__()
+        self.limit = limit
+        self.period = period
+        self.sample_every = sample_every
+        self.limits = limits or {}
+        self.suppressed = 0
+        self._windows: Dict[Tuple[str, str, int], List[float]] = {}
+        self._logger_limits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, name: str) -> int:
+        limit = self._logger_limits.get(name)
+        if limit is None:
+            matches = [
+                prefix
+                for prefix in self.limits
+                if name == prefix or name.startswith(prefix + ".")
+            ]
+            limit = self.limits[max(matches, key=len)] if matches else self.limit
+            self._logger_limits[name] = limit
+        return limit
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+        limit = self.limit_for(record.name)
+        if limit <= 0:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = [now, 0, 0]
+            elif now - window[0] >= self.period:
+                skipped = int(window[2])
+                window[:] = [now, 0, 0]
+                if skipped:
+                    record.msg = (
+                        f"{record.getMessage()} (пропущено похожих записей: {skipped})"
+                    )
+                    record.args = None
+            window[1] += 1
+            over = window[1] - limit
+            if over <= 0 or (self.sample_every > 0 and over % self.sample_every == 0):
+                return True
+            window[2] += 1
+            self.suppressed += 1
+            return False
+
+
+# ================= ОЧЕРЕДЬ ЗАПИСЕЙ =================
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Запись кладется в очередь без ожидания: форматирование, запись на диск и
+    ротация выполняются потоком QueueListener. При переполненной очереди
+    (медленный диск) запись отбрасывается, а число отброшенных сообщается
+    предупреждением, как только очередь освободится.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Форматирование остается фоновому потоку: здесь только подстановка
+        # аргументов, пока они не изменились. Исключение форматируется там же.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.report_dropped()
+
+    def report_dropped(self, timeout: Optional[float] = None) -> None:
+        """Предупреждение о записях, отброшенных с прошлого отчета"""
+        lost = self.dropped - self._reported
+        if lost <= 0:
+            return
+        warning = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"⚠️ Очередь логов была переполнена, отброшено записей: {lost}",
+            }
+        )
+        try:
+            self.queue.put(warning, block=timeout is not None, timeout=timeout)
+        except queue.Full:
+            return
+        self._reported += lost
+
+
+class _DrainingListener(QueueListener):
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Остановка после записи всего, что было в очереди до нее. Зависший
+        диск не задерживает выход дольше timeout: поток записи — демон.
+        """
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self.queue.put(self._sentinel, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+
+class LogPipeline:
+    """Очередь логов и фоновый поток, пишущий записи в обработчики"""
+
+    def __init__(
+        self,
+        handlers: Iterable[logging.Handler],
+        queue_size: int = Config.LOG_QUEUE_SIZE,
+        sampling: Optional[SamplingFilter] = None,
+    ):
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.sampling = sampling
+        if sampling is not None:
+            # Прореженные записи не попадают даже в очередь
+            self.handler.addFilter(sampling)
+        self.listener = _DrainingListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self._running = False
+
+    def start(self) -> None:
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        """Остановка с записью всего, что осталось в очереди"""
+        if self._running:
+            self.handler.report_dropped(timeout=5.0)
+            self.listener.stop()
+            self._running = False
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика очереди логов"""
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled": self.sampling.suppressed if self.sampling else 0,
+        }
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def start_log_pipeline(handlers: Iterable[logging.Handler]) -> LogPipeline:
+    """
+    Запуск очереди логов с прореживанием по настройкам Config. Повторный
+    вызов останавливает предыдущую очередь.
+    """
+    global _pipeline
+    stop_log_pipeline()
+    sampling = SamplingFilter(limits=parse_rate_limits(Config.LOG_RATE_LIMITS))
+    _pipeline = LogPipeline(handlers, sampling=sampling)
+    _pipeline.start()
+    return _pipeline
+
+
+def stop_log_pipeline() -> None:
+    global _pipeline
+    pipeline, _pipeline = _pipeline, None
+    if pipeline is not None:
+        pipeline.stop()
+
+
+def get_log_pipeline() -> Optional[LogPipeline]:
+    return _pipeline
+
+
+atexit.register(stop_log_pipeline)
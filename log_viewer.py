@@ -0,0 +1,362 @@
+import gzip
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+ALL_LEVELS = (1 << len(LEVELS)) - 1
+BLOCK_SIZE = 64 * 1024  # Чтение файла с конца блоками
+INDEX_CHUNK = 256 * 1024  # Шаг индекса: кусок файла с диапазоном времени и уровнями
+INDEX_SUFFIX = ".idx"
+EXPORT_LIMIT = 100000  # Записей в выгрузке файлом
+MAX_TAIL = 100  # Записей на странице сообщения
+MAX_BACKUPS = 99  # Ротированных копий лога просматривается не больше
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_RELATIVE_RE = re.compile(r"^(\d+)([mhd])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+# (inode, смещение): продолжение листания с записи старше этой
+LogCursor = Tuple[int, int]
+
+
+def level_bit(level: Optional[str]) -> int:
+    """Бит уровня для маски куска индекса (неизвестный уровень — все биты)"""
+    if level in LEVELS:
+        return 1 << LEVELS.index(level)
+    return ALL_LEVELS
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """Запись JSON-лога или None для строки не в JSON"""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+# ================= ФИЛЬТР =================
+
+
+@dataclass
+class LogQuery:
+    """Фильтр записей: минимальный уровень, логгер (с дочерними), ID пользователя в тексте и время"""
+
+    level: Optional[str] = None
+    logger: Optional[str] = None
+    user_id: Optional[int] = None
+    since: Optional[str] = None
+    until: Optional[str] = None
+    _user_re: Optional["re.Pattern[str]"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.user_id is not None:
+            self._user_re = re.compile(rf"(?<!\d){self.user_id}(?!\d)")
+
+    @property
+    def level_mask(self) -> int:
+        if not self.level:
+            return ALL_LEVELS
+        return ALL_LEVELS & ~((1 << LEVELS.index(self.level)) - 1)
+
+    def is_empty(self) -> bool:
+        return self == LogQuery()
+
+    def describe(self) -> str:
+        parts = [
+            f"{name}={value}"
+            for name, value in [
+                ("level", self.level),
+                ("logger", self.logger),
+                ("user", self.user_id),
+                ("since", self.since),
+                ("until", self.until),
+            ]
+            if value is not None
+        ]
+        return " ".join(parts)
+
+    def matches(self, line: str) -> bool:
+        entry = parse_line(line)
+        if entry is None:
+            # Строки не в JSON показываются только без фильтров
+            return self.is_empty()
+        if not level_bit(entry.get("level")) & self.level_mask:
+            return False
+        if self.logger:
+            name = str(entry.get("name", ""))
+            if name != self.logger and not name.startswith(self.logger + "."):
+                return False
+        if self._user_re is not None and not self._user_re.search(
+            str(entry.get("message", ""))
+        ):
+            return False
+        moment = str(entry.get("time", ""))[:19]
+        if self.since and moment < self.since:
+            return False
+        if self.until and moment > self.until:
+            return False
+        return True
+
+
+@dataclass
+class LogRequest:
+    """Разобранные аргументы /logs"""
+
+    query: LogQuery
+    count: int = 15
+    as_file: bool = False
+
+
+def parse_time(value: str, now: datetime) -> str:
+    """Время фильтра: 2024-05-01, 2024-05-01T10:30 или назад от now: 15m, 2h, 1d"""
+    relative = _RELATIVE_RE.match(value)
+    if relative:
+        delta = timedelta(**{_UNITS[relative.group(2)]: int(relative.group(1))})
+        return (now - delta).strftime(TIME_FORMAT)
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt).strftime(TIME_FORMAT)
+        except ValueError:
+            continue
+    raise ValueError(f"Неверное время: {value}")
+
+
+def parse_log_args(args: List[str], now: Optional[datetime] = None) -> LogRequest:
+    """
+    Аргументы /logs: число записей, file (выгрузка .gz), level=, logger=,
+    user=, since=, until=. Неверный аргумент — ValueError с пояснением.
+    """
+    now = now or datetime.now()
+    request = LogRequest(LogQuery())
+    filters: Dict[str, Any] = {}
+    for arg in args:
+        key, sep, value = arg.partition("=")
+        key = key.lower()
+        if not sep:
+            if arg.isdigit():
+                request.count = max(1, min(int(arg), MAX_TAIL))
+            elif key in ("file", "gz"):
+                request.as_file = True
+            else:
+                raise ValueError(f"Неизвестный аргумент: {arg}")
+        elif key == "level":
+            level = {"WARN": "WARNING"}.get(value.upper(), value.upper())
+            if level not in LEVELS:
+                raise ValueError(f"Неизвестный уровень: {value}")
+            filters["level"] = level
+        elif key == "logger":
+            filters["logger"] = value
+        elif key == "user":
+            if not value.isdigit():
+                raise ValueError(f"Неверный ID пользователя: {value}")
+            filters["user_id"] = int(value)
+        elif key in ("since", "until"):
+            filters[key] = parse_time(value, now)
+        else:
+            raise ValueError(f"Неизвестный фильтр: {key}")
+    request.query = LogQuery(**filters)
+    return request
+
+
+# ================= ЧТЕНИЕ С КОНЦА =================
+
+
+def log_files(path: str) -> List[str]:
+    """Лог и его ротированные копии (.1, .2, ...) от новых к старым"""
+    files = [path] if os.path.exists(path) else []
+    for number in range(1, MAX_BACKUPS + 1):
+        if not os.path.exists(f"{path}.{number}"):
+            break
+        files.append(f"{path}.{number}")
+    return files
+
+
+def iter_lines_backwards(
+    f: BinaryIO, end: int, start: int = 0
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Строки файла между start и end от последней к первой: (смещение, строка).
+    Читаются только блоки, в которых лежат возвращенные строки.
+    """
+    pos = end
+    head = b""  # Начало строки, продолжение которой уже прочитано
+    while pos > start:
+        size = min(BLOCK_SIZE, pos - start)
+        pos -= size
+        f.seek(pos)
+        data = f.read(size) + head
+        lines = data.split(b"\n")
+        head = lines[0]
+        line_end = pos + len(data)
+        for line in reversed(lines[1:]):
+            line_start = line_end - len(line)
+            if line.strip():
+                yield line_start, line.rstrip(b"\r")
+            line_end = line_start - 1
+    if head.strip():
+        yield start, head.rstrip(b"\r")
+
+
+# ================= ИНДЕКС =================
+
+
+class LogIndex:
+    """
+    Индекс-спутник лога (файл .idx рядом с логом): для каждого файла по inode —
+    куски по INDEX_CHUNK байт с первым и последним временем и маской уровней.
+    Ротация переименовывает файлы, не меняя inode, поэтому индекс старых
+    файлов строится один раз, а текущий дочитывается только новыми строками.
+    """
+
+    def __init__(self, log_path: str):
+        self.path = log_path + INDEX_SUFFIX
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def chunks(self, file_path: str) -> Tuple[List[List[Any]], int]:
+        """Куски файла [смещение, первое время, последнее время, маска] и проиндексированный размер"""
+        stat = os.stat(file_path)
+        key = str(stat.st_ino)
+        entry = self.entries.get(key)
+        if entry is None or entry["size"] > stat.st_size:
+            entry = {"size": 0, "chunks": []}
+        if entry["size"] < stat.st_size:
+            self._extend(file_path, entry)
+            self.entries[key] = entry
+            self.dirty = True
+        return entry["chunks"], entry["size"]
+
+    def _extend(self, file_path: str, entry: Dict[str, Any]) -> None:
+        chunks = entry["chunks"]
+        offset = entry["size"]
+        # Незаполненный последний кусок переиндексируется целиком
+        if chunks and offset - chunks[-1][0] < INDEX_CHUNK:
+            offset = chunks.pop()[0]
+        current: Optional[List[Any]] = None
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Строка еще дописывается
+                if current is None or offset - current[0] >= INDEX_CHUNK:
+                    current = [offset, None, None, 0]
+                    chunks.append(current)
+                record = parse_line(line.decode("utf-8", "replace"))
+                if record is None:
+                    current[3] |= ALL_LEVELS
+                else:
+                    current[3] |= level_bit(record.get("level"))
+                    moment = str(record.get("time", ""))[:19]
+                    if moment:
+                        current[1] = min(current[1] or moment, moment)
+                        current[2] = max(current[2] or moment, moment)
+                offset += len(line)
+        entry["size"] = offset
+
+    def ranges(
+        self, file_path: str, query: LogQuery, end: int
+    ) -> List[Tuple[int, int]]:
+        """Участки файла до end, где могут быть записи по фильтру, от новых к старым"""
+        chunks, size = self.chunks(file_path)
+        ranges = [(size, end)] if end > size else []
+        mask = query.level_mask
+        for number in range(len(chunks) - 1, -1, -1):
+            start, first, last, levels = chunks[number]
+            stop = min(chunks[number + 1][0] if number + 1 < len(chunks) else size, end)
+            if start >= stop or not levels & mask:
+                continue
+            if query.since and last and last < query.since:
+                continue
+            if query.until and first and first > query.until:
+                continue
+            ranges.append((start, stop))
+        return ranges
+
+    def save(self, files: List[str]) -> None:
+        """Запись индекса без файлов, удаленных ротацией"""
+        if not self.dirty:
+            return
+        alive = {str(os.stat(path).st_ino) for path in files if os.path.exists(path)}
+        self.entries = {k: v for k, v in self.entries.items() if k in alive}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить индекс логов: {e}")
+
+
+# ================= ПОИСК =================
+
+
+def search_logs(
+    path: str,
+    query: LogQuery,
+    limit: int,
+    cursor: Optional[LogCursor] = None,
+) -> Tuple[List[str], Optional[LogCursor]]:
+    """
+    Записи по фильтру от новых к старым во всех ротированных файлах, не больше
+    limit, и курсор для следующей (более старой) страницы. Без фильтра читается
+    только хвост файла; с фильтром — куски, подходящие по индексу.
+    """
+    files = log_files(path)
+    first = 0
+    end: Optional[int] = None
+    if cursor is not None:
+        inodes = [os.stat(file_path).st_ino for file_path in files]
+        if cursor[0] not in inodes:
+            return [], None  # Файл удален ротацией
+        first, end = inodes.index(cursor[0]), cursor[1]
+
+    index = None if query.is_empty() else LogIndex(path)
+    results: List[str] = []
+    try:
+        for number in range(first, len(files)):
+            file_path = files[number]
+            file_end = os.path.getsize(file_path)
+            if number == first and end is not None:
+                file_end = min(end, file_end)
+            ranges = (
+                [(0, file_end)]
+                if index is None
+                else index.ranges(file_path, query, file_end)
+            )
+            with open(file_path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                for start, stop in ranges:
+                    for offset, raw in iter_lines_backwards(f, stop, start):
+                        line = raw.decode("utf-8", "replace")
+                        if not query.matches(line):
+                            continue
+                        results.append(line)
+                        if len(results) >= limit:
+                            return results, (inode, offset)
+        return results, None
+    finally:
+        if index is not None:
+            index.save(files)
+
+
+def export_logs(path: str, query: LogQuery, limit: int = EXPORT_LIMIT) -> bytes:
+    """Записи по фильтру в хронологическом порядке, сжатые gzip"""
+    lines, _ = search_logs(path, query, limit)
+    content = "\n".join(reversed(lines)) + "\n" if lines else ""
+    return gzip.compress(content.encode("utf-8"))
@@ -0,0 +1,329 @@
+import logging
+import threading
+import time
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from cards import card_cache
+from database.core import (
+    add_query_observer,
+    get_pool_stats,
+    get_state_store,
+    query_fingerprint,
+)
+from database.users import get_user_cache_stats
+from documents import document_cache
+from outbound import get_dispatcher
+from profiler import PROFILE_PATH, profile_wsgi_app
+from resume_service import resume_cache
+
+logger = logging.getLogger(__name__)
+
+# Попытка импорта prometheus_client (без него метрики не собираются)
+try:
+    from prometheus_client import REGISTRY, Counter, Histogram, make_wsgi_app
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Границы гистограмм (секунды): обработчики и Bot API, запросы к БД
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5)
+
+# Поля Update: тип обновления — первое заполненное
+UPDATE_TYPES = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "channel_post",
+    "edited_channel_post",
+    "shipping_query",
+    "pre_checkout_query",
+    "poll",
+    "poll_answer",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+
+
+def update_type(update: Any) -> str:
+    for name in UPDATE_TYPES:
+        if getattr(update, name, None) is not None:
+            return name
+    return "other"
+
+
+def route_name(handler: Callable[..., Any]) -> str:
+    """Имя маршрута для метки: класс и метод обработчика, а не пользователь"""
+    func = getattr(handler, "__func__", handler)
+    return getattr(func, "__qualname__", None) or type(handler).__name__
+
+
+# ================= МЕТРИКИ =================
+
+
+class BotMetrics:
+    """
+    Метрики бота для Prometheus. На горячем пути только счетчики и
+    гистограммы с закэшированными метками; размеры кэшей, пул соединений
+    и состояния FSM читаются при опросе (RuntimeCollector).
+    """
+
+    def __init__(self, registry: Any = None):
+        registry = registry if registry is not None else REGISTRY
+        self.updates = Counter(
+            "bot_updates", "Обновления Telegram по типу", ["type"], registry=registry
+        )
+        self.handler_seconds = Histogram(
+            "bot_handler_seconds",
+            "Время обработчика по маршруту",
+            ["route"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.handler_errors = Counter(
+            "bot_handler_errors",
+            "Исключения, вышедшие из обработчика",
+            ["route"],
+            registry=registry,
+        )
+        self.db_query_seconds = Histogram(
+            "bot_db_query_seconds",
+            "Время execute_query по отпечатку запроса",
+            ["query"],
+            buckets=QUERY_BUCKETS,
+            registry=registry,
+        )
+        self.db_errors = Counter(
+            "bot_db_errors", "Ошибки запросов к БД", ["query"], registry=registry
+        )
+        self.rate_limit_mutes = Counter(
+            "bot_rate_limit_mutes",
+            "Пользователи, заглушенные за превышение лимита",
+            registry=registry,
+        )
+        self.rate_limited = Counter(
+            "bot_rate_limited_updates",
+            "Обновления, отброшенные лимитом частоты",
+            ["type"],
+            registry=registry,
+        )
+        self.blocked_rejections = Counter(
+            "bot_blocked_rejections",
+            "Обновления заблокированных пользователей",
+            ["type"],
+            registry=registry,
+        )
+        self.api_seconds = Histogram(
+            "bot_api_seconds",
+            "Время запроса к Bot API по методу",
+            ["method"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.api_errors = Counter(
+            "bot_api_errors",
+            "Ошибки Bot API по методу и коду (429 — превышение лимита)",
+            ["method", "code"],
+            registry=registry,
+        )
+        self.collector = RuntimeCollector()
+        registry.register(self.collector)
+
+        self._children: Dict[Tuple[Any, ...], Any] = {}
+        self._routes: Dict[Callable[..., Any], str] = {}
+
+    def _child(self, metric: Any, *labels: str) -> Any:
+        # labels() берет блокировку метрики: дочерние метрики кэшируются
+        key = (id(metric),) + labels
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*labels)
+        return child
+
+    # --- Горячий путь ---
+
+    def count_update(self, kind: str) -> None:
+        self._child(self.updates, kind).inc()
+
+    def count_mute(self) -> None:
+        self.rate_limit_mutes.inc()
+
+    def count_rate_limited(self, kind: str) -> None:
+        self._child(self.rate_limited, kind).inc()
+
+    def count_blocked(self, kind: str) -> None:
+        self._child(self.blocked_rejections, kind).inc()
+
+    def time_handler(self, handler: Callable[[Any], Any], arg: Any) -> Any:
+        """Вызов обработчика с замером времени по имени маршрута"""
+        route = self._routes.get(handler)
+        if route is None:
+            route = self._routes[handler] = route_name(handler)
+        started = time.perf_counter()
+        try:
+            return handler(arg)
+        except Exception:
+            self._child(self.handler_errors, route).inc()
+            raise
+        finally:
+            self._child(self.handler_seconds, route).observe(
+                time.perf_counter() - started
+            )
+
+    def observe_query(
+        self,
+        query: str,
+        params: tuple,
+        seconds: float,
+        error: Optional[BaseException],
+    ) -> None:
+        fingerprint = query_fingerprint(query)
+        self._child(self.db_query_seconds, fingerprint).observe(seconds)
+        if error is not None:
+            self._child(self.db_errors, fingerprint).inc()
+
+    def observe_api(self, method: str, seconds: float, code: Optional[int]) -> None:
+        self._child(self.api_seconds, method).observe(seconds)
+        if code is not None:
+            self._child(self.api_errors, method, str(code)).inc()
+
+
+class RuntimeCollector:
+    """Показатели, которые читаются только при опросе /metrics"""
+
+    def describe(self) -> Iterator[Any]:
+        # Без описания реестр не вызывает collect при регистрации
+        return iter(())
+
+    def collect(self) -> Iterator[Any]:
+        for collect in (self._caches, self._pool, self._states):
+            try:
+                yield from collect()
+            except Exception as e:
+                logger.error(f"Ошибка сбора метрик {collect.__name__}: {e}")
+
+    def _caches(self) -> Iterator[Any]:
+        stats = {
+            "cards": card_cache.get_stats(),
+            "resumes": resume_cache.get_stats(),
+            "documents": document_cache.get_stats(),
+            "users": get_user_cache_stats(),
+        }
+        size = GaugeMetricFamily(
+            "bot_cache_entries", "Записей в кэше", labels=["cache"]
+        )
+        families = {
+            name: CounterMetricFamily(f"bot_cache_{name}", help_text, labels=["cache"])
+            for name, help_text in [
+                ("hits", "Попадания в кэш"),
+                ("misses", "Промахи кэша"),
+                ("evictions", "Вытеснения из кэша"),
+            ]
+        }
+        for cache, values in stats.items():
+            size.add_metric([cache], values.get("size", 0))
+            for name, family in families.items():
+                if name in values:
+                    family.add_metric([cache], values[name])
+        yield size
+        yield from families.values()
+
+    def _pool(self) -> Iterator[Any]:
+        stats = get_pool_stats()
+        if not stats:
+            return  # SQLite: соединение на поток, пула нет
+        connections = GaugeMetricFamily(
+            "bot_db_pool_connections", "Соединения пула PostgreSQL", labels=["state"]
+        )
+        connections.add_metric(["used"], stats.get("used", 0))
+        connections.add_metric(["available"], stats.get("available", 0))
+        yield connections
+        yield GaugeMetricFamily(
+            "bot_db_pool_max", "Размер пула PostgreSQL", value=stats.get("max", 0)
+        )
+
+    def _states(self) -> Iterator[Any]:
+        store = get_state_store()
+        yield GaugeMetricFamily(
+            "bot_fsm_tracked", "Отслеживаемые диалоги FSM", value=store.tracked()
+        )
+        counts = store.step_counts()
+        if counts:
+            steps = GaugeMetricFamily(
+                "bot_fsm_states", "Диалоги FSM по шагу", labels=["step"]
+            )
+            for step, count in sorted(counts.items()):
+                steps.add_metric([step], count)
+            yield steps
+        if hasattr(store, "evicted"):
+            removed = CounterMetricFamily(
+                "bot_fsm_removed",
+                "Диалоги FSM, удаленные по времени жизни или пределу",
+                labels=["reason"],
+            )
+            removed.add_metric(["expired"], store.expired)
+            removed.add_metric(["evicted"], store.evicted)
+            yield removed
+
+
+_metrics: Optional[BotMetrics] = None
+
+
+def setup_metrics(registry: Any = None) -> Optional[BotMetrics]:
+    """
+    Создание метрик и подписка на запросы к БД и вызовы Bot API.
+    Повторный вызов возвращает уже созданные метрики; без
+    prometheus_client возвращает None.
+    """
+    global _metrics
+    if not PROMETHEUS_AVAILABLE:
+        return None
+    if _metrics is None:
+        _metrics = BotMetrics(registry)
+        add_query_observer(_metrics.observe_query)
+        dispatcher = get_dispatcher()
+        if dispatcher is not None:
+            dispatcher.observers.append(_metrics.observe_api)
+    return _metrics
+
+
+def get_metrics() -> Optional[BotMetrics]:
+    return _metrics
+
+
+# ================= HTTP-СЕРВЕР =================
+
+
+class _MetricsServer(ThreadingMixIn, WSGIServer):
+    # Долгий запрос профиля не задерживает опрос метрик
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_metrics_server(port: int, addr: str = "0.0.0.0") -> WSGIServer:
+    """/metrics для Prometheus и /debug/profile (профилирование по запросу)"""
+    metrics_app = make_wsgi_app()
+
+    def app(
+        environ: Dict[str, Any], start_response: Callable[..., Any]
+    ) -> Iterable[bytes]:
+        if environ.get("PATH_INFO") == PROFILE_PATH:
+            return profile_wsgi_app(environ, start_response)
+        return metrics_app(environ, start_response)
+
+    httpd = make_server(addr, port, app, _MetricsServer, handler_class=_QuietHandler)
+    threading.Thread(
+        target=httpd.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    return httpd
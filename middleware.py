@@ -5,7 +5,9 @@ from datetime import datetime
 from typing import Dict, List
 
 from database.core import execute_query
+from database.users import record_activity
 from localization import get_text_by_lang, get_user_language
+from metrics import update_type
 
 RATE_LIMIT = 5
 TIME_WINDOW = 10
@@ -36,7 +38,7 @@ def check_user_blocked(user_id):
         return None
 
 
-def check_rate_limit(bot, obj):
+def check_rate_limit(bot, obj, metrics=None):
     user_id = obj.from_user.id
     current_time = time.time()
 
@@ -51,6 +53,8 @@ def check_rate_limit(bot, obj):
     ]
     if len(user_requests[user_id]) >= RATE_LIMIT:
         muted_users[user_id] = current_time + MUTE_DURATION
+        if metrics is not None:
+            metrics.count_mute()
         try:
             lang = get_user_language(user_id)
             if hasattr(obj, "chat"):  # Message
@@ -87,9 +91,14 @@ def setup_middleware(bot, monitoring=False, metrics=None):
                     bot.send_message(msg.chat.id, txt, parse_mode="Markdown")
                 except Exception:
                     pass
+                if metrics is not None:
+                    metrics.count_blocked("message")
                 continue
-            if check_rate_limit(bot, msg):
+            if check_rate_limit(bot, msg, metrics):
+                record_activity(msg.from_user.id)
                 valid.append(msg)
+            elif metrics is not None:
+                metrics.count_rate_limited("message")
         if valid:
             original_process_new_messages(valid)
 
@@ -103,11 +112,26 @@ def setup_middleware(bot, monitoring=False, metrics=None):
                     )
                 except Exception:
                     pass
+                if metrics is not None:
+                    metrics.count_blocked("callback_query")
                 continue
-            if check_rate_limit(bot, call):
+            if check_rate_limit(bot, call, metrics):
+                record_activity(call.from_user.id)
                 valid.append(call)
+            elif metrics is not None:
+                metrics.count_rate_limited("callback_query")
         if valid:
             original_process_new_callback_query(valid)
 
     bot.process_new_messages = custom_process_new_messages
     bot.process_new_callback_query = custom_process_new_callback_query
+
+    if metrics is not None:
+        original_process_new_updates = bot.process_new_updates
+
+        def counted_process_new_updates(updates):
+            for update in updates:
+                metrics.count_update(update_type(update))
+            original_process_new_updates(updates)
+
+        bot.process_new_updates = counted_process_new_updates
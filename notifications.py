@@ -0,0 +1,149 @@
+import logging
+import queue
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from telebot.apihelper import ApiTelegramException
+
+import keyboards
+import utils
+from database.searches import find_matching_subscribers, get_vacancy_for_notification
+from localization import get_text_by_lang
+from outbound import resolve
+
+logger = logging.getLogger(__name__)
+
+# ================= ОТПРАВКА УВЕДОМЛЕНИЙ =================
+
+
+class NotificationSender:
+    """
+    Фоновая очередь уведомлений: создание вакансии не ждет рассылки.
+    Лимиты Telegram и повтор после 429 обеспечивает диспетчер исходящих запросов.
+    """
+
+    def __init__(self, bot: Any):
+        self.bot = bot
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Количество уведомлений в очереди"""
+        return self._queue.qsize()
+
+    def enqueue(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        """Постановка уведомления в очередь"""
+        self._queue.put({"chat_id": chat_id, "text": text, "kwargs": kwargs})
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="notification-sender", daemon=True
+                )
+                self._thread.start()
+
+    def _send(self, item: Dict[str, Any]) -> None:
+        """Отправка одного уведомления"""
+        try:
+            # Поток уведомлений ждет отправки: очередь диспетчера не разрастается
+            resolve(
+                self.bot.send_message(item["chat_id"], item["text"], **item["kwargs"])
+            )
+        except ApiTelegramException as e:
+            logger.warning(
+                f"⚠️ Уведомление для {item['chat_id']} не доставлено: {e.description}"
+            )
+        except Exception as e:
+            logger.error(f"❌ Ошибка отправки уведомления {item['chat_id']}: {e}")
+
+    def _run(self) -> None:
+        while True:
+            self._send(self._queue.get())
+
+    def flush(self) -> None:
+        """Синхронная отправка всей очереди (тесты, остановка бота)"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._send(item)
+
+
+_sender: Optional[NotificationSender] = None
+_sender_lock = threading.Lock()
+
+
+def get_notification_sender(bot: Any) -> NotificationSender:
+    """Общий отправитель уведомлений для бота"""
+    global _sender
+    with _sender_lock:
+        if _sender is None or _sender.bot is not bot:
+            _sender = NotificationSender(bot)
+        return _sender
+
+
+def format_vacancy_notification(vacancy: Dict[str, Any], lang: str) -> str:
+    """Короткая карточка новой вакансии для подписчика"""
+    title = vacancy.get("title") or ""
+    if title.startswith("prof_"):
+        title = get_text_by_lang(title, lang)
+    job_type = vacancy.get("job_type") or ""
+    if job_type.startswith("job_type_"):
+        job_type = get_text_by_lang(job_type, lang)
+
+    return (
+        f"{get_text_by_lang('saved_search_new_vacancy', lang)}\n\n"
+        f"💼 *{utils.escape_markdown(title)}*\n"
+        f"{get_text_by_lang('vacancy_card_company', lang)} *{utils.escape_markdown(vacancy.get('company_name') or '')}*\n"  # noqa
+        f"{get_text_by_lang('vacancy_card_city', lang)} {utils.escape_markdown(vacancy.get('city') or '')}\n"  # noqa
+        f"{get_text_by_lang('vacancy_card_salary', lang)} {utils.escape_markdown(vacancy.get('salary') or '')}\n"  # noqa
+        f"{get_text_by_lang('vacancy_card_type', lang)} {utils.escape_markdown(job_type)}"  # noqa
+    )
+
+
+def notify_new_vacancy(bot: Any, vacancy_id: int) -> int:
+    """
+    Уведомляет подписчиков, чьи сохраненные поиски подходят под новую вакансию.
+    Возвращает количество поставленных в очередь уведомлений.
+    """
+    try:
+        vacancy = get_vacancy_for_notification(vacancy_id)
+        if not vacancy or vacancy.get("status") != "active":
+            return 0
+
+        subscribers = find_matching_subscribers(vacancy)
+        if not subscribers:
+            return 0
+
+        sender = get_notification_sender(bot)
+        # Текст и клавиатура (JSON) строятся один раз на язык
+        messages: Dict[str, Tuple[str, str]] = {}
+        for subscriber in subscribers:
+            lang = subscriber["language_code"]
+            if lang not in messages:
+                messages[lang] = (
+                    format_vacancy_notification(vacancy, lang),
+                    keyboards.vacancy_actions.json(vacancy_id, lang=lang),
+                )
+            text, markup = messages[lang]
+            sender.enqueue(
+                subscriber["telegram_id"],
+                text,
+                parse_mode="Markdown",
+                reply_markup=markup,
+            )
+
+        logger.info(
+            f"✅ Вакансия {vacancy_id}: {len(subscribers)} уведомлений в очереди"
+        )
+        return len(subscribers)
+    except Exception as e:
+        logger.error(
+            f"❌ Ошибка уведомления о вакансии {vacancy_id}: {e}", exc_info=True
+        )
+        return 0
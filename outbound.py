@@ -0,0 +1,442 @@
+import atexit
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from telebot.apihelper import ApiTelegramException
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ChatId = Union[int, str, None]
+BotMethods = Dict[str, Callable[..., Any]]
+# Наблюдатель вызовов: (метод, секунды запроса, код ошибки Bot API или None)
+CallObserver = Callable[[str, float, Optional[int]], None]
+
+# Методы Bot API, которые проходят через диспетчер: имя -> позиция chat_id
+# (None — метод не привязан к чату и ограничивается только глобальным лимитом)
+OUTBOUND_METHODS: Dict[str, Optional[int]] = {
+    "send_message": 0,
+    "send_document": 0,
+    "send_photo": 0,
+    "send_media_group": 0,
+    "forward_message": 0,
+    "copy_message": 0,
+    "delete_message": 0,
+    "edit_message_reply_markup": 0,
+    "edit_message_text": 1,
+    "edit_message_caption": 1,
+    "answer_callback_query": None,
+}
+
+LATENCY_WINDOW = 1000  # Сколько последних замеров хранить для статистики
+IDLE_BUCKET_TTL = 300  # Через сколько секунд простоя забывать лимит чата
+MAX_IDLE_BUCKETS = 10000
+WORKER_IDLE_TIMEOUT = 30  # Через сколько секунд простоя поток отправки завершается
+SHUTDOWN_TIMEOUT = 10  # Сколько ждать отправки очереди при остановке
+
+
+# ================= ОГРАНИЧЕНИЕ СКОРОСТИ =================
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity подряд"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Сколько секунд ждать до появления токена"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+def is_group_chat(chat_id: ChatId) -> bool:
+    """Группы и каналы имеют отрицательный id или @username"""
+    if isinstance(chat_id, str):
+        return chat_id.startswith("@") or chat_id.startswith("-")
+    return isinstance(chat_id, int) and chat_id < 0
+
+
+@dataclass(eq=False)
+class _Job:
+    """Запрос к Bot API в очереди чата"""
+
+    chat_id: ChatId
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: Dict[str, Any]
+    future: "Future[Any]" = field(default_factory=Future)
+    submitted: float = field(default_factory=time.monotonic)
+    granted: bool = False
+    attempts: int = 0
+
+
+class OutboundDispatcher:
+    """
+    Очередь исходящих запросов к Bot API.
+    Запросы ставятся в FIFO-очереди чатов и выполняются фоновыми потоками
+    отправки: вызывающий поток получает Future и не ждет лимитов.
+    Глобальный и per-chat лимиты (token bucket), пауза по retry_after при 429,
+    строгий порядок запросов внутри одного чата.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = Config.OUTBOUND_GLOBAL_RATE,
+        chat_rate: float = Config.OUTBOUND_CHAT_RATE,
+        chat_burst: float = Config.OUTBOUND_CHAT_BURST,
+        group_per_minute: float = Config.OUTBOUND_GROUP_PER_MINUTE,
+        max_retries: int = Config.OUTBOUND_MAX_RETRIES,
+        workers: int = Config.OUTBOUND_WORKERS,
+    ):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_per_minute / 60
+        self.max_retries = max_retries
+        self.max_workers = max(1, workers)
+
+        self._cond = threading.Condition()
+        self._global = TokenBucket(global_rate, global_rate)
+        self._global_paused_until = 0.0
+        self._buckets: Dict[ChatId, TokenBucket] = {}
+        self._paused_until: Dict[ChatId, float] = {}
+        # Очереди по чатам в порядке обхода; запрос без чата — отдельная очередь
+        self._chat_queues: Dict[Any, Deque[_Job]] = {}
+        # Чаты, запрос в которые сейчас выполняется (следующий ждет его завершения)
+        self._busy: Set[Any] = set()
+        self._workers = 0
+
+        self._pending = 0
+        self._in_flight = 0
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._waits: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        # Пока наблюдателей нет, отдельные запросы не измеряются
+        self.observers: List[CallObserver] = []
+
+    def _chat_bucket(self, chat_id: ChatId) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            if len(self._buckets) >= MAX_IDLE_BUCKETS:
+                self._prune_buckets()
+            if is_group_chat(chat_id):
+                bucket = TokenBucket(self.group_rate, self.chat_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._buckets[chat_id] = bucket
+        return bucket
+
+    def _prune_buckets(self) -> None:
+        """Удаляет лимиты давно неактивных чатов"""
+        now = time.monotonic()
+        for chat_id in [
+            c
+            for c, b in self._buckets.items()
+            if now - b.updated > IDLE_BUCKET_TTL
+            and c not in self._chat_queues
+            and c not in self._busy
+        ]:
+            del self._buckets[chat_id]
+            self._paused_until.pop(chat_id, None)
+
+    def submit(
+        self, chat_id: ChatId, func: Callable[..., Any], /, *args, **kwargs
+    ) -> "Future[Any]":
+        """Ставит запрос в очередь чата; результат (Message) — в Future"""
+        job = _Job(chat_id, func, args, kwargs)
+        key = job if chat_id is None else chat_id
+        with self._cond:
+            self._chat_queues.setdefault(key, deque()).append(job)
+            self._pending += 1
+            if self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(
+                    target=self._run, name="outbound-sender", daemon=True
+                ).start()
+            self._cond.notify_all()
+        return job.future
+
+    def call(
+        self, chat_id: ChatId, func: Callable[..., Any], /, *args, **kwargs
+    ) -> Any:
+        """Выполняет запрос с соблюдением лимитов и ждет результата"""
+        return self.submit(chat_id, func, *args, **kwargs).result()
+
+    def _next_job(self) -> Optional[Tuple[Any, _Job]]:
+        """
+        Первый запрос чата, которому позволяют лимиты (вызывается под _cond).
+        None — очередь пуста дольше WORKER_IDLE_TIMEOUT, поток завершается.
+        """
+        while True:
+            now = time.monotonic()
+            wait: Optional[float] = max(
+                self._global.wait_time(now), self._global_paused_until - now
+            )
+            if wait is not None and wait <= 0:
+                wait = None
+                for key, queue in self._chat_queues.items():
+                    if key in self._busy:
+                        continue  # Ждем завершения предыдущего запроса в чат
+                    chat_id = queue[0].chat_id
+                    chat_wait = 0.0
+                    if chat_id is not None:
+                        chat_wait = max(
+                            self._chat_bucket(chat_id).wait_time(now),
+                            self._paused_until.get(chat_id, 0.0) - now,
+                        )
+                    if chat_wait <= 0:
+                        job = queue.popleft()
+                        # Чат уходит в конец обхода, чтобы не обгонять остальные
+                        del self._chat_queues[key]
+                        if queue:
+                            self._chat_queues[key] = queue
+                        self._busy.add(key)
+                        self._global.consume(now)
+                        if chat_id is not None:
+                            self._chat_bucket(chat_id).consume(now)
+                        return key, job
+                    wait = chat_wait if wait is None else min(wait, chat_wait)
+                if wait is None and not self._chat_queues:
+                    if (
+                        not self._cond.wait(timeout=WORKER_IDLE_TIMEOUT)
+                        and not self._chat_queues
+                    ):
+                        self._workers -= 1
+                        return None
+                    continue
+            self._cond.wait(timeout=wait)
+
+    def _run(self) -> None:
+        """Поток отправки: выполняет запросы, пока очередь не опустеет"""
+        while True:
+            with self._cond:
+                picked = self._next_job()
+            if picked is None:
+                return
+            self._execute(*picked)
+
+    def _execute(self, key: Any, job: _Job) -> None:
+        if not job.granted:
+            job.granted = True
+            self._waits.append(time.monotonic() - job.submitted)
+        with self._cond:
+            self._pending -= 1
+            self._in_flight += 1
+
+        started = time.monotonic() if self.observers else None
+        try:
+            result = job.func(*job.args, **job.kwargs)
+        except ApiTelegramException as e:
+            if started is not None:
+                self._observe(job.func, started, e.error_code)
+            if e.error_code == 429 and job.attempts < self.max_retries:
+                self._retry(key, job, e)
+            else:
+                self._finish(key, job, error=e)
+        except Exception as e:
+            self._finish(key, job, error=e)
+        else:
+            if started is not None:
+                self._observe(job.func, started, None)
+            self._finish(key, job, result=result)
+
+    def _retry(self, key: Any, job: _Job, error: ApiTelegramException) -> None:
+        """429: пауза чата (или всей очереди) и повтор запроса первым в очереди"""
+        job.attempts += 1
+        retry_after = (
+            (error.result_json or {}).get("parameters", {}).get("retry_after", 1)
+        )
+        logger.warning(
+            f"⚠️ 429 от Telegram для чата {job.chat_id}, пауза {retry_after} сек"
+        )
+        with self._cond:
+            until = time.monotonic() + retry_after
+            if job.chat_id is None:
+                self._global_paused_until = max(self._global_paused_until, until)
+            else:
+                self._paused_until[job.chat_id] = until
+            self._retries += 1
+            queue = self._chat_queues.setdefault(key, deque())
+            queue.appendleft(job)
+            self._busy.discard(key)
+            self._in_flight -= 1
+            self._pending += 1
+            self._cond.notify_all()
+
+    def _finish(
+        self,
+        key: Any,
+        job: _Job,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._cond:
+            self._busy.discard(key)
+            self._in_flight -= 1
+            if error is None:
+                self._sent += 1
+            else:
+                self._failed += 1
+            self._cond.notify_all()
+        self._latencies.append(time.monotonic() - job.submitted)
+        if error is None:
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(error)
+
+    def _observe(
+        self, func: Callable[..., Any], started: float, error_code: Optional[int]
+    ) -> None:
+        method = getattr(func, "__name__", "unknown")
+        seconds = time.monotonic() - started
+        for observer in self.observers:
+            try:
+                observer(method, seconds, error_code)
+            except Exception as e:
+                logger.error(f"Ошибка наблюдателя Bot API: {e}")
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Ждет отправки всей очереди (остановка бота); False — не успели"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество запросов, ожидающих отправки"""
+        return self._pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика очереди: глубина, задержки, ошибки"""
+        latencies = sorted(self._latencies)
+        waits = list(self._waits)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        return {
+            "queue_depth": self._pending,
+            "in_flight": self._in_flight,
+            "sent": self._sent,
+            "failed": self._failed,
+            "retries_429": self._retries,
+            "avg_latency_ms": (
+                round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0
+            ),
+            "p95_latency_ms": round(p95 * 1000, 1),
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+        }
+
+
+_dispatcher: Optional[OutboundDispatcher] = None
+# Боты, подключенные к диспетчеру: диспетчер и исходные (не обернутые) методы
+_connected: "weakref.WeakKeyDictionary[Any, Tuple[OutboundDispatcher, BotMethods]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_dispatcher() -> Optional[OutboundDispatcher]:
+    """Диспетчер, подключенный к боту (None, если не настроен)"""
+    return _dispatcher
+
+
+def _chat_id_from_args(position: Optional[int], args: tuple, kwargs: dict) -> ChatId:
+    if position is None:
+        return None
+    if "chat_id" in kwargs:
+        return kwargs["chat_id"]
+    if len(args) > position:
+        return args[position]
+    return None
+
+
+def resolve(result: Any) -> Any:
+    """
+    Результат вызова метода бота: для отправки без ожидания (Future) ждет
+    Message (и исключение Bot API), иначе возвращает значение как есть.
+    """
+    if isinstance(result, Future):
+        return result.result()
+    return result
+
+
+def _log_failure(name: str, chat_id: ChatId, future: "Future[Any]") -> None:
+    error = future.exception()
+    if error is None:
+        return
+    if isinstance(error, ApiTelegramException):
+        logger.warning(f"⚠️ {name} в чат {chat_id} не выполнен: {error.description}")
+    else:
+        logger.error(f"❌ {name} в чат {chat_id} не выполнен: {error}")
+
+
+def send_message_nowait(bot, *args, **kwargs) -> Any:
+    """
+    send_message без ожидания отправки (карточки и списки, результат которых
+    не нужен): Future, ошибка Bot API пишется в лог. Порядок сообщений в чате
+    сохраняется. Бот без диспетчера отправляет синхронно.
+    """
+    connected = _connected.get(bot)
+    if connected is None or "send_message" not in connected[1]:
+        return bot.send_message(*args, **kwargs)
+    dispatcher, originals = connected
+    chat_id = _chat_id_from_args(OUTBOUND_METHODS["send_message"], args, kwargs)
+    future = dispatcher.submit(chat_id, originals["send_message"], *args, **kwargs)
+    future.add_done_callback(lambda done: _log_failure("send_message", chat_id, done))
+    return future
+
+
+def setup_outbound(bot, dispatcher: Optional[OutboundDispatcher] = None):
+    """
+    Пропускает все исходящие вызовы бота через диспетчер. Методы бота
+    ждут отправки и возвращают результат (или исключение Bot API);
+    без ожидания — только явно, через send_message_nowait.
+    """
+    global _dispatcher
+    dispatcher = dispatcher or OutboundDispatcher()
+    originals: BotMethods = {}
+
+    def wrap(name: str, position: Optional[int]):
+        original = originals[name] = getattr(bot, name)
+
+        def dispatched(*args, **kwargs):
+            chat_id = _chat_id_from_args(position, args, kwargs)
+            return dispatcher.call(chat_id, original, *args, **kwargs)
+
+        dispatched.__name__ = name
+        return dispatched
+
+    for name, position in OUTBOUND_METHODS.items():
+        if hasattr(bot, name):
+            setattr(bot, name, wrap(name, position))
+    _connected[bot] = (dispatcher, originals)
+
+    if _dispatcher is not None:
+        atexit.unregister(_dispatcher.drain)
+    atexit.register(dispatcher.drain, SHUTDOWN_TIMEOUT)
+    _dispatcher = dispatcher
+    return dispatcher
@@ -1,6 +1,7 @@
 import io
 import json
 import os
+import threading
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -19,6 +20,11 @@ from reportlab.platypus import (
 from localization import get_text_by_lang
 
 
+_font_lock = threading.Lock()
+_font_name = None
+_styles = {}
+
+
 def register_fonts():
     """Регистрация шрифтов с поддержкой кириллицы"""
     font_name = 'Helvetica' # Стандартный шрифт (не поддерживает кириллицу)
@@ -42,8 +48,74 @@ def register_fonts():
                 
     return font_name
 
+
+def get_font():
+    """Шрифт документа: поиск и регистрация TTF один раз на процесс"""
+    global _font_name
+    if _font_name is None:
+        with _font_lock:
+            if _font_name is None:
+                _font_name = register_fonts()
+    return _font_name
+
+
+def get_styles(font_name):
+    """Стили резюме (создаются один раз для шрифта)"""
+    styles = _styles.get(font_name)
+    if styles is not None:
+        return styles
+
+    base = getSampleStyleSheet()
+    styles = {
+        'title': ParagraphStyle(
+            'ResumeTitle',
+            parent=base['Heading1'],
+            fontName=font_name,
+            fontSize=24,
+            spaceAfter=20,
+            textColor=colors.darkblue
+        ),
+        'heading': ParagraphStyle(
+            'ResumeHeading',
+            parent=base['Heading2'],
+            fontName=font_name,
+            fontSize=14,
+            spaceBefore=15,
+            spaceAfter=10,
+            textColor=colors.HexColor('#2c3e50'),
+            borderPadding=(0, 0, 5, 0) # Линия снизу
+        ),
+        'body': ParagraphStyle(
+            'ResumeBody',
+            parent=base['Normal'],
+            fontName=font_name,
+            fontSize=10,
+            leading=14
+        ),
+        'small': ParagraphStyle(
+            'ResumeSmall',
+            parent=base['Normal'],
+            fontName=font_name,
+            fontSize=9,
+            textColor=colors.grey
+        ),
+        'contacts': TableStyle([
+            ('FONTNAME', (0,0), (-1,-1), font_name),
+            ('TEXTCOLOR', (0,0), (-1,-1), colors.darkgrey),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 10),
+        ]),
+    }
+    _styles[font_name] = styles
+    return styles
+
+
 def generate_resume_pdf(user_data, lang='ru'):
     """Генерация PDF резюме"""
+    return io.BytesIO(render_resume_pdf(user_data, lang))
+
+
+def render_resume_pdf(user_data, lang='ru'):
+    """Отрисовка PDF резюме (байты документа)"""
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -51,43 +123,12 @@ def generate_resume_pdf(user_data, lang='ru'):
         rightMargin=40, leftMargin=40,
         topMargin=40, bottomMargin=40
     )
-    
-    font_name = register_fonts()
-    styles = getSampleStyleSheet()
-    
-    # Стили
-    style_title = ParagraphStyle(
-        'ResumeTitle', 
-        parent=styles['Heading1'], 
-        fontName=font_name, 
-        fontSize=24, 
-        spaceAfter=20, 
-        textColor=colors.darkblue
-    )
-    style_heading = ParagraphStyle(
-        'ResumeHeading', 
-        parent=styles['Heading2'], 
-        fontName=font_name, 
-        fontSize=14, 
-        spaceBefore=15, 
-        spaceAfter=10,
-        textColor=colors.HexColor('#2c3e50'),
-        borderPadding=(0, 0, 5, 0) # Линия снизу
-    )
-    style_body = ParagraphStyle(
-        'ResumeBody', 
-        parent=styles['Normal'], 
-        fontName=font_name, 
-        fontSize=10, 
-        leading=14
-    )
-    style_small = ParagraphStyle(
-        'ResumeSmall', 
-        parent=styles['Normal'], 
-        fontName=font_name, 
-        fontSize=9, 
-        textColor=colors.grey
-    )
+
+    styles = get_styles(get_font())
+    style_title = styles['title']
+    style_heading = styles['heading']
+    style_body = styles['body']
+    style_small = styles['small']
 
     story = []
 
@@ -101,11 +142,7 @@ def generate_resume_pdf(user_data, lang='ru'):
         [f"🏙 {user_data.get('city', '')}", f"📅 {user_data.get('age', '')} лет/years"]
     ]
     t = Table(contact_data, colWidths=[250, 250])
-    t.setStyle(TableStyle([
-        ('FONTNAME', (0,0), (-1,-1), font_name),
-        ('TEXTCOLOR', (0,0), (-1,-1), colors.darkgrey),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-    ]))
+    t.setStyle(styles['contacts'])
     story.append(t)
     story.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceBefore=5, spaceAfter=15))
 
@@ -151,5 +188,4 @@ def generate_resume_pdf(user_data, lang='ru'):
     story.append(Paragraph(f"Generated by Telegram Job Bot • {user_data.get('phone', '')}", style_small))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer.getvalue()
\ No newline at end of file
@@ -0,0 +1,241 @@
+import hmac
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import CodeType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Путь HTTP-триггера на порту метрик
+PROFILE_PATH = "/debug/profile"
+TOP_FUNCTIONS = 20
+
+Stack = Tuple[str, ...]
+
+
+class ProfileBusy(RuntimeError):
+    """Профилирование уже идет (одновременно — только одно)"""
+
+
+@dataclass
+class Profile:
+    """
+    Снимки стеков всех потоков: стек (поток; внешняя функция; ...; текущая)
+    -> сколько раз он встретился. Один снимок стека ≈ interval секунд.
+    """
+
+    seconds: float
+    interval: float
+    started_at: datetime = field(default_factory=datetime.now)
+    ticks: int = 0
+    stacks: "Counter[Stack]" = field(default_factory=Counter)
+
+    def top(self, limit: int = TOP_FUNCTIONS) -> List[Tuple[str, float, float]]:
+        """Функции по суммарному времени: (функция, с вложенными, собственное), сек"""
+        cumulative: "Counter[str]" = Counter()
+        own: "Counter[str]" = Counter()
+        for stack, count in self.stacks.items():
+            # Рекурсивная функция учитывается в снимке один раз
+            for name in set(stack[1:]):
+                cumulative[name] += count
+            if len(stack) > 1:
+                own[stack[-1]] += count
+        return [
+            (name, count * self.interval, own[name] * self.interval)
+            for name, count in cumulative.most_common(limit)
+        ]
+
+    def collapsed(self) -> str:
+        """Стеки в формате collapsed (flamegraph.pl, speedscope): "a;b;c N" """
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items()
+        )
+
+    def report(self, limit: int = TOP_FUNCTIONS) -> str:
+        lines = [
+            f"Профиль {self.started_at:%Y-%m-%d %H:%M:%S}: {self.seconds:g} сек, "
+            f"{self.ticks} снимков раз в {self.interval * 1000:g} мс",
+            f"{'всего, с':>9} {'своё, с':>9}  функция",
+        ]
+        for name, total, own in self.top(limit):
+            lines.append(f"{total:9.2f} {own:9.2f}  {name}")
+        return "\n".join(lines)
+
+
+# ================= СЭМПЛИРОВАНИЕ =================
+
+_busy = threading.Lock()
+_labels: Dict[CodeType, str] = {}
+
+
+def _label(code: CodeType) -> str:
+    label = _labels.get(code)
+    if label is None:
+        name = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+        label = _labels[code] = name.replace(";", ",")
+    return label
+
+
+def clamp_seconds(seconds: float) -> float:
+    return max(1.0, min(float(seconds), Config.PROFILE_MAX_SECONDS))
+
+
+def _sample(seconds: float, interval: float) -> Profile:
+    """
+    Снимки стеков всех потоков (кроме своего) раз в interval секунд. Пока
+    профилирование не запущено, ни потока, ни хуков в интерпретаторе нет.
+    """
+    profile = Profile(seconds=seconds, interval=interval)
+    own = threading.get_ident()
+    names: Dict[int, str] = {}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frames = sys._current_frames()
+        if any(ident not in names for ident in frames):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in frames.items():
+            if ident == own:
+                continue
+            stack: List[str] = []
+            current: Any = frame
+            while current is not None:
+                stack.append(_label(current.f_code))
+                current = current.f_back
+            stack.append(names.get(ident, "thread"))
+            profile.stacks[tuple(reversed(stack))] += 1
+        profile.ticks += 1
+        del frames
+        time.sleep(interval)
+    return profile
+
+
+def _acquire() -> None:
+    if not _busy.acquire(blocking=False):
+        raise ProfileBusy("Профилирование уже идет")
+
+
+def run_profile(seconds: float, interval: Optional[float] = None) -> Profile:
+    """Профилирование в текущем потоке (блокирует его на seconds)"""
+    _acquire()
+    try:
+        return _sample(clamp_seconds(seconds), interval or Config.PROFILE_INTERVAL)
+    finally:
+        _busy.release()
+
+
+def start_profile(
+    seconds: float,
+    on_done: Callable[[Profile], None],
+    interval: Optional[float] = None,
+) -> threading.Thread:
+    """
+    Профилирование в фоновом потоке; on_done(profile) вызывается по окончании.
+    Если профилирование уже идет — ProfileBusy.
+    """
+    _acquire()
+
+    def run() -> None:
+        try:
+            profile = _sample(
+                clamp_seconds(seconds), interval or Config.PROFILE_INTERVAL
+            )
+        except Exception as e:
+            logger.error(f"❌ Ошибка профилирования: {e}", exc_info=True)
+            return
+        finally:
+            _busy.release()
+        try:
+            on_done(profile)
+        except Exception as e:
+            logger.error(f"❌ Ошибка отправки профиля: {e}", exc_info=True)
+
+    thread = threading.Thread(target=run, name="profiler", daemon=True)
+    thread.start()
+    return thread
+
+
+# ================= ТРИГГЕРЫ =================
+
+
+def save_profile(profile: Profile, directory: Optional[str] = None) -> str:
+    """Запись профиля в каталог: .collapsed для flamegraph и .txt с топом функций"""
+    directory = directory or Config.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"profile_{profile.started_at:%Y%m%d_%H%M%S}")
+    with open(base + ".collapsed", "w", encoding="utf-8") as f:
+        f.write(profile.collapsed())
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(profile.report() + "\n")
+    logger.info(f"✅ Профиль сохранен: {base}.collapsed, {base}.txt")
+    return base
+
+
+def install_signal_trigger() -> bool:
+    """
+    SIGUSR2 запускает профилирование на PROFILE_SECONDS с записью в
+    PROFILE_DIR. Без SIGUSR2 (Windows) или не из главного потока — False.
+    """
+    if not hasattr(signal, "SIGUSR2"):
+        return False
+
+    def on_signal(signum: int, frame: Any) -> None:
+        try:
+            start_profile(Config.PROFILE_SECONDS, save_profile)
+            logger.info(f"⏱ Профилирование по сигналу: {Config.PROFILE_SECONDS} сек")
+        except ProfileBusy:
+            logger.warning("⚠️ Профилирование уже идет, сигнал пропущен")
+
+    try:
+        signal.signal(signal.SIGUSR2, on_signal)
+    except ValueError:
+        return False
+    return True
+
+
+def profile_wsgi_app(
+    environ: Dict[str, Any], start_response: Callable[..., Any]
+) -> Iterable[bytes]:
+    """
+    GET /debug/profile?seconds=N[&format=top] с токеном PROFILE_TOKEN
+    (параметр token или заголовок X-Profile-Token): collapsed-стеки или топ
+    функций текстом. Без PROFILE_TOKEN триггер выключен.
+    """
+
+    def respond(status: str, body: str) -> List[bytes]:
+        data = body.encode("utf-8")
+        start_response(
+            status,
+            [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(data))),
+            ],
+        )
+        return [data]
+
+    if not Config.PROFILE_TOKEN:
+        return respond("404 Not Found", "Not Found\n")
+    params = parse_qs(environ.get("QUERY_STRING", ""))
+    token = environ.get("HTTP_X_PROFILE_TOKEN") or params.get("token", [""])[0]
+    if not hmac.compare_digest(token.encode(), Config.PROFILE_TOKEN.encode()):
+        return respond("403 Forbidden", "Forbidden\n")
+    try:
+        seconds = float(params.get("seconds", [Config.PROFILE_SECONDS])[0])
+    except ValueError:
+        return respond("400 Bad Request", "seconds must be a number\n")
+    try:
+        profile = run_profile(seconds)
+    except ProfileBusy as e:
+        return respond("409 Conflict", f"{e}\n")
+    if params.get("format", [""])[0] == "top":
+        return respond("200 OK", profile.report() + "\n")
+    return respond("200 OK", profile.collapsed())
@@ -0,0 +1,446 @@
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Set
+
+from config import Config
+from database.users import add_seeker_update_listener, get_user_by_id
+from localization import TRANSLATIONS
+from pdf_generator import get_font, render_resume_pdf
+
+logger = logging.getLogger(__name__)
+
+# Поля профиля, которые попадают в PDF (остальные не влияют на документ)
+RESUME_FIELDS = (
+    "full_name",
+    "phone",
+    "email",
+    "city",
+    "age",
+    "profession",
+    "experience",
+    "education",
+    "skills",
+    "languages",
+)
+
+
+def profile_hash(user_data: Dict[str, Any], lang: str) -> str:
+    """Хеш содержимого резюме: поля профиля и язык"""
+    payload = json.dumps(
+        [lang, [user_data.get(field) for field in RESUME_FIELDS]],
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResumeCache:
+    """LRU готовых PDF, ограниченный суммарным размером в байтах"""
+
+    def __init__(self, max_bytes: int = Config.RESUME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._by_user: Dict[Any, Set[str]] = {}
+        self._owner: Dict[str, Any] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._items.get(key)
+            if pdf is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return pdf
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def put(self, key: str, pdf: bytes, user_id: Any = None) -> None:
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return
+            self._items[key] = pdf
+            self._size += len(pdf)
+            if user_id is not None:
+                self._by_user.setdefault(user_id, set()).add(key)
+                self._owner[key] = user_id
+            while self._size > self.max_bytes:
+                old_key, _ = next(iter(self._items.items()))
+                self._drop(old_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """Удаление всех резюме пользователя (все языки и версии профиля)"""
+        with self._lock:
+            for key in self._by_user.pop(user_id, set()):
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._by_user.clear()
+            self._owner.clear()
+            self._size = 0
+
+    def _drop(self, key: str) -> None:
+        pdf = self._items.pop(key, None)
+        if pdf is not None:
+            self._size -= len(pdf)
+        user_id = self._owner.pop(key, None)
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика кэша резюме"""
+        return {
+            "size": len(self._items),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+resume_cache = ResumeCache()
+
+
+def get_resume_bytes(user_data: Dict[str, Any], lang: str = "ru") -> bytes:
+    """PDF резюме из кэша или отрисовка (неизменный профиль рисуется один раз)"""
+    key = profile_hash(user_data, lang)
+    pdf = resume_cache.get(key)
+    if pdf is None:
+        pdf = render_resume_pdf(user_data, lang)
+        resume_cache.put(key, pdf, user_data.get("telegram_id"))
+    return pdf
+
+
+def get_resume_pdf(user_data: Dict[str, Any], lang: str = "ru") -> io.BytesIO:
+    """PDF резюме как файл для send_document (новый буфер на каждую отправку)"""
+    return io.BytesIO(get_resume_bytes(user_data, lang))
+
+
+def invalidate_resume(telegram_id: int) -> None:
+    """Сброс резюме соискателя (вызывается при update_seeker_profile)"""
+    resume_cache.invalidate_user(telegram_id)
+
+
+add_seeker_update_listener(invalidate_resume)
+
+
+# ================= ФОНОВАЯ ОТРИСОВКА =================
+
+
+class _Delivery(NamedTuple):
+    future: "Future[bytes]"
+    deadline: float
+    on_ready: Callable[[bytes], Any]
+    on_fallback: Callable[[], Any]
+
+
+class ResumeRenderer:
+    """
+    Отрисовка PDF вне потоков обработчиков: ReportLab держит GIL, поэтому PDF
+    рисуются в пуле процессов, а готовые файлы отправляет поток доставки.
+    В пуле не больше max_pending заданий; при переполнении, ошибке или
+    превышении timeout вызывается on_fallback (уведомление без PDF).
+    """
+
+    def __init__(
+        self,
+        workers: int = Config.PDF_WORKERS,
+        max_pending: int = Config.PDF_QUEUE_LIMIT,
+        timeout: float = Config.PDF_RENDER_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._deliveries: "queue.Queue[_Delivery]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # RLock: done-callback уже завершенного задания вызывается сразу
+        self._lock = threading.RLock()
+        self._pending = 0
+        # Задания в пуле по ключу резюме: повторный запрос ждет то же задание
+        self._inflight: Dict[str, "Future[bytes]"] = {}
+        # Последняя версия профиля, пока у пользователя есть задания в пуле
+        self._versions: Dict[Any, int] = {}
+        self._user_jobs: Dict[Any, int] = {}
+        self.delivered = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.prerendered = 0
+        self.stale = 0
+
+    @property
+    def pending(self) -> int:
+        """Количество заданий в пуле (в очереди и в отрисовке)"""
+        return self._pending
+
+    def submit(
+        self,
+        user_data: Dict[str, Any],
+        lang: str,
+        on_ready: Callable[[bytes], Any],
+        on_fallback: Callable[[], Any],
+    ) -> bool:
+        """
+        Постановка резюме в отрисовку. on_ready(pdf) или on_fallback() вызываются
+        из потока доставки. False — пул переполнен, on_fallback уже вызван.
+        """
+        key = profile_hash(user_data, lang)
+        future: Optional["Future[bytes]"]
+        pdf = resume_cache.get(key)
+        if pdf is not None:
+            future = Future()
+            future.set_result(pdf)
+        else:
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is None and self._pending < self.max_pending:
+                    future = self._launch(key, user_data, lang)
+                if future is None:
+                    self.rejected += 1
+            if future is None:
+                logger.warning(
+                    f"⚠️ Пул PDF переполнен ({self.max_pending}), резюме без PDF"
+                )
+                self._call(on_fallback)
+                return False
+
+        self._deliveries.put(
+            _Delivery(future, time.monotonic() + self.timeout, on_ready, on_fallback)
+        )
+        self._ensure_worker()
+        return True
+
+    def render(self, user_data: Dict[str, Any], lang: str) -> Optional[bytes]:
+        """
+        Синхронная отрисовка в пуле для фоновых задач (дайджесты): поток ждет
+        результат, поэтому задания идут по одному и предел пула не проверяется.
+        None — ошибка или таймаут.
+        """
+        key = profile_hash(user_data, lang)
+        pdf = resume_cache.get(key)
+        if pdf is not None:
+            return pdf
+        with self._lock:
+            future = self._inflight.get(key) or self._launch(key, user_data, lang)
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"❌ Ошибка отрисовки PDF резюме: {e!r}")
+            return None
+
+    def prerender(self, user_data: Dict[str, Any], langs: Iterable[str]) -> int:
+        """
+        Фоновая отрисовка резюме на языках langs после сохранения профиля.
+        Готовые и уже рисующиеся резюме пропускаются; отклики важнее, поэтому
+        предварительная отрисовка занимает не больше половины пула.
+        Возвращает количество поставленных заданий.
+        """
+        user_id, version = user_data.get("telegram_id"), user_data.get("version")
+        started = 0
+        with self._lock:
+            if version is not None:
+                self._versions[user_id] = max(
+                    version, self._versions.get(user_id, version)
+                )
+            for lang in langs:
+                key = profile_hash(user_data, lang)
+                if key in resume_cache or key in self._inflight:
+                    continue
+                if self._pending >= self.max_pending // 2:
+                    logger.debug(f"Пул PDF занят, резюме {user_id} не рисуется заранее")
+                    break
+                self._launch(key, user_data, lang)
+                started += 1
+            self.prerendered += started
+        return started
+
+    def _launch(
+        self, key: str, user_data: Dict[str, Any], lang: str
+    ) -> "Future[bytes]":
+        """Постановка задания в пул (под self._lock)"""
+        user_id, version = user_data.get("telegram_id"), user_data.get("version")
+        future = self._start(user_data, lang)
+        self._pending += 1
+        self._inflight[key] = future
+        self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+        future.add_done_callback(
+            lambda done: self._finished(done, key, user_id, version)
+        )
+        return future
+
+    def _start(self, user_data: Dict[str, Any], lang: str) -> "Future[bytes]":
+        try:
+            return self._get_executor().submit(render_resume_pdf, dict(user_data), lang)
+        except BrokenExecutor:
+            # Процесс пула аварийно завершился: пул создается заново
+            logger.warning("⚠️ Пул отрисовки PDF сломан, пересоздание")
+            self._executor = None
+            return self._get_executor().submit(render_resume_pdf, dict(user_data), lang)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                # spawn: дочерние процессы не наследуют блокировки потоков бота
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=get_font,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="resume-render"
+                )
+        return self._executor
+
+    def _finished(
+        self, future: "Future[bytes]", key: str, user_id: Any, version: Optional[int]
+    ) -> None:
+        """
+        Завершение задания в пуле (в том числе после таймаута доставки).
+        Резюме устаревшей версии профиля в кэш не попадает.
+        """
+        with self._lock:
+            self._pending -= 1
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            latest = self._versions.get(user_id)
+            stale = version is not None and latest is not None and version < latest
+            self._user_jobs[user_id] -= 1
+            if not self._user_jobs[user_id]:
+                del self._user_jobs[user_id]
+                self._versions.pop(user_id, None)
+            if stale:
+                self.stale += 1
+        if stale or future.cancelled() or future.exception() is not None:
+            return
+        resume_cache.put(key, future.result(), user_id)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="resume-delivery", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            delivery = self._deliveries.get()
+            try:
+                self._deliver(delivery)
+            finally:
+                self._deliveries.task_done()
+
+    def _deliver(self, delivery: _Delivery) -> None:
+        try:
+            pdf = delivery.future.result(
+                timeout=max(0.0, delivery.deadline - time.monotonic())
+            )
+        except FutureTimeoutError:
+            delivery.future.cancel()
+            self.timeouts += 1
+            logger.warning(
+                f"⚠️ PDF резюме не готово за {self.timeout} сек, уведомление без PDF"
+            )
+            self._call(delivery.on_fallback)
+            return
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"❌ Ошибка отрисовки PDF резюме: {e}")
+            self._call(delivery.on_fallback)
+            return
+        self.delivered += 1
+        self._call(delivery.on_ready, pdf)
+
+    @staticmethod
+    def _call(callback: Callable[..., Any], *args: Any) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"❌ Ошибка доставки резюме: {e}", exc_info=True)
+
+    def join(self) -> None:
+        """Ожидание доставки всех поставленных резюме (тесты, остановка бота)"""
+        self._deliveries.join()
+
+    def shutdown(self) -> None:
+        """Остановка пула отрисовки"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика фоновой отрисовки"""
+        return {
+            "pending": self._pending,
+            "queued": self._deliveries.qsize(),
+            "delivered": self.delivered,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "prerendered": self.prerendered,
+            "stale": self.stale,
+        }
+
+
+_renderer: Optional[ResumeRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_resume_renderer() -> ResumeRenderer:
+    """Общий фоновый отрисовщик резюме"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ResumeRenderer()
+        return _renderer
+
+
+def prerender_resume(telegram_id: int) -> int:
+    """
+    Фоновая отрисовка резюме соискателя на всех языках бота (после сохранения
+    профиля), чтобы отклик и скачивание брали готовый файл из кэша.
+    """
+    if not Config.RESUME_PRERENDER:
+        return 0
+    try:
+        user_data = get_user_by_id(telegram_id)
+        if not user_data or user_data.get("role") != "seeker":
+            return 0
+        return get_resume_renderer().prerender(user_data, list(TRANSLATIONS))
+    except Exception as e:
+        logger.error(f"❌ Ошибка фоновой отрисовки резюме {telegram_id}: {e}")
+        return 0
@@ -0,0 +1,196 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from telebot import util
+
+from config import Config
+from localization import get_all_translations
+
+logger = logging.getLogger(__name__)
+
+# Типы сообщений, которые получает маршрутизатор (остальные бот не обрабатывает)
+MESSAGE_CONTENT_TYPES = ["text", "photo", "contact"]
+
+Handler = Callable[[Any], Any]
+Names = Union[str, Iterable[str]]
+
+
+def _as_list(names: Names) -> List[str]:
+    return [names] if isinstance(names, str) else list(names)
+
+
+class Route(NamedTuple):
+    handler: Handler
+    admin_only: bool = False
+    # Дополнительное условие: для текста — guard(message), для шага — guard(state)
+    guard: Optional[Callable[[Any], Any]] = None
+
+
+class PrefixTrie:
+    """Префиксное дерево: значение самого длинного префикса строки"""
+
+    _VALUE = ""  # Ключ значения в узле (ключи-символы всегда непустые)
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def add(self, prefix: str, value: Any) -> bool:
+        """Добавление префикса; повторная регистрация не заменяет первую"""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if self._VALUE in node:
+            return False
+        node[self._VALUE] = value
+        return True
+
+    def match(self, key: str) -> Optional[Any]:
+        """Значение самого длинного зарегистрированного префикса key"""
+        node = self._root
+        found = node.get(self._VALUE)
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(self._VALUE, found)
+        return found
+
+
+# ================= МАРШРУТИЗАТОР =================
+
+
+class Router:
+    """
+    Маршруты собираются один раз при запуске: хеш-таблицы текстов кнопок
+    (на всех языках), команд и шагов FSM и префиксное дерево callback_data.
+    Выбор обработчика не зависит от количества маршрутов и языков.
+    Для одного текста или шага маршруты проверяются в порядке регистрации.
+    """
+
+    def __init__(self):
+        self._texts: Dict[str, List[Route]] = {}
+        self._commands: Dict[str, Handler] = {}
+        self._steps: Dict[str, List[Route]] = {}
+        self._callbacks = PrefixTrie()
+        self._exact_callbacks: Dict[str, Handler] = {}
+        # Обработчик сообщений без маршрута (шаги регистрации, неизвестные команды)
+        self.fallback: Optional[Handler] = None
+        # Метрики времени обработчиков (metrics.BotMetrics), если включены
+        self.metrics: Optional[Any] = None
+
+    # --- Регистрация ---
+
+    def text(
+        self,
+        texts: Names,
+        handler: Handler,
+        admin_only: bool = False,
+        guard: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """Кнопки с фиксированным текстом"""
+        for text in _as_list(texts):
+            if text:
+                self._texts.setdefault(text, []).append(
+                    Route(handler, admin_only, guard)
+                )
+
+    def translated(self, keys: Names, handler: Handler, **kwargs: Any) -> None:
+        """Кнопки по ключам локализации (тексты на всех языках)"""
+        for key in _as_list(keys):
+            self.text(get_all_translations(key), handler, **kwargs)
+
+    def command(self, names: Names, handler: Handler) -> None:
+        """Команды /name (и /name@bot)"""
+        for name in _as_list(names):
+            self._commands.setdefault(name, handler)
+
+    def step(
+        self,
+        names: Names,
+        handler: Handler,
+        admin_only: bool = False,
+        guard: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """Шаги FSM (поле step состояния пользователя)"""
+        for name in _as_list(names):
+            self._steps.setdefault(name, []).append(Route(handler, admin_only, guard))
+
+    def callback(self, prefixes: Names, handler: Handler, exact: bool = False) -> None:
+        """callback_data по префиксу (или точному значению при exact=True)"""
+        for prefix in _as_list(prefixes):
+            if exact:
+                self._exact_callbacks.setdefault(prefix, handler)
+            else:
+                self._callbacks.add(prefix, handler)
+
+    # --- Выбор обработчика ---
+
+    @staticmethod
+    def _pick(routes: List[Route], user_id: int, arg: Any) -> Optional[Handler]:
+        for route in routes:
+            if route.admin_only and user_id not in Config.ADMIN_IDS:
+                continue
+            if route.guard is not None and not route.guard(arg):
+                continue
+            return route.handler
+        return None
+
+    def resolve_message(self, message: Any) -> Optional[Handler]:
+        """Обработчик команды или кнопки (None — маршрута нет)"""
+        text = getattr(message, "text", None)
+        if not isinstance(text, str):
+            return None
+        command = util.extract_command(text)
+        if command is not None and command in self._commands:
+            return self._commands[command]
+        routes = self._texts.get(text)
+        if not routes:
+            return None
+        return self._pick(routes, message.from_user.id, message)
+
+    def resolve_step(self, user_id: int, state: Dict[str, Any]) -> Optional[Handler]:
+        """Обработчик текущего шага FSM"""
+        step = state.get("step") if state else None
+        routes = self._steps.get(step) if isinstance(step, str) else None
+        if not routes:
+            return None
+        return self._pick(routes, user_id, state)
+
+    def resolve_callback(self, data: Optional[str]) -> Optional[Handler]:
+        """Обработчик callback_data"""
+        if not data:
+            return None
+        handler = self._exact_callbacks.get(data)
+        return handler if handler is not None else self._callbacks.match(data)
+
+    # --- Обработка ---
+
+    def call(self, handler: Handler, arg: Any) -> Any:
+        """Вызов обработчика (с замером времени, если подключены метрики)"""
+        if self.metrics is None:
+            return handler(arg)
+        return self.metrics.time_handler(handler, arg)
+
+    def dispatch_message(self, message: Any) -> None:
+        handler = self.resolve_message(message)
+        if handler is not None:
+            self.call(handler, message)
+        elif self.fallback is not None:
+            # Fallback сам выбирает обработчик и измеряет его через call
+            self.fallback(message)
+
+    def dispatch_callback(self, call: Any) -> None:
+        handler = self.resolve_callback(call.data)
+        if handler is None:
+            logger.debug(f"Нет обработчика для callback_data: {call.data}")
+            return
+        self.call(handler, call)
+
+    def install(self, bot: Any) -> None:
+        """Единственные обработчики telebot: все сообщения и все колбэки"""
+        bot.register_message_handler(
+            self.dispatch_message,
+            content_types=MESSAGE_CONTENT_TYPES,
+            func=lambda m: True,
+        )
+        bot.register_callback_query_handler(self.dispatch_callback, func=lambda c: True)
@@ -7,87 +7,157 @@ from datetime import datetime
 from typing import Tuple
 
 
+# Начала нецензурных слов (RU, EN, UZ): литеральная основа и при необходимости
+# хвост-регулярка. Продолжение слова (\w*) не указывается — совпадения по
+# началу слова достаточно.
+PROFANITY_STEMS = (
+    # RU
+    "хуй",
+    "хуе",
+    "хуё",
+    "хуя",
+    "пизд",
+    "еб(а|у|л)",
+    "бля(д|т)",
+    "муд(а|о)(к|ч)",
+    "пид(о|а|е)р",
+    "гандон",
+    "гондон",
+    "шлюх",
+    r"сук(а|и)\b",
+    "сукин",
+    "суч(к|а)",
+    "залуп",
+    r"манд(а|ы|у)\b",
+    "долбо(е|ё)б",
+    "хер",
+    "похер",
+    "нахер",
+    "чмо",
+    "лох",
+    "дроч",
+    "дурак",
+    "дебил",
+    "идиот",
+    # RU латиницей
+    "xu(y|i)",
+    "hu(y|i)",
+    "pizd",
+    "eb(a|l|u)(?!y)",
+    "blya(d|t)",
+    "mud(a|o)k",
+    "pid(o|a|e)r",
+    "gandon",
+    r"suk(a|i)\b",
+    "zalup",
+    "dolbo(e|y)b",
+    "xer",
+    "poher",
+    # EN
+    "fuck",
+    r"shit\b",
+    "bitch",
+    "dick",
+    "cock",
+    "pussy",
+    "asshole",
+    "cunt",
+    "bastard",
+    "nigger",
+    "whore",
+    "slut",
+    # EN кириллицей
+    r"фак\b",
+    "фак(и|е|о)",
+    "мазафак",
+    r"шит\b",
+    "булшит",
+    r"бич\b",
+    "пусси",
+    "дикх(е|э)д",
+    "асхол",
+    "эсхол",
+    "ка(н|м)шот",
+    "ниггер",
+    # UZ
+    "jalab",
+    "жала б",
+    "qotoq",
+    "qo'toq",
+    "коток",
+    "қотақ",
+    "siktir",
+    "сиктир",
+    "sikay",
+    "сикай",
+    "onangni",
+    "онангни",
+    "haromi",
+    "хароми",
+    "dalbayob",
+    "далбаёб",
+    "chumo",
+    "чумо",
+)
+
+# Похожие буквы другого алфавита (и цифры) в словах со смешанным написанием
+_TO_CYRILLIC = str.maketrans("aceopxykmtbh03", "асеорхукмтвноз")
+_TO_LATIN = str.maketrans("асеорхукмтвн", "aceopxykmtbh")
+_LATIN_RE = re.compile(r"[a-z03]")
+_CYRILLIC_RE = re.compile(r"[а-яёқғўҳ]")
+_MIXED_WORD_RE = re.compile(r"\b(?=\w*?[a-z03])(?=\w*?[а-яёқғўҳ])\w+")
+
+_REGEX_META = frozenset("\\()[]|?*+.{")
+
+
+def _compile_profanity(stems) -> "re.Pattern[str]":
+    """
+    Одна регулярка по всем основам: литеральные начала собраны в префиксное
+    дерево, поэтому на каждой границе слова проверяется одна ветка на букву,
+    а не все шаблоны по очереди.
+    """
+    trie: dict = {}
+    for stem in stems:
+        split = next((i for i, c in enumerate(stem) if c in _REGEX_META), len(stem))
+        node = trie
+        for char in stem[:split]:
+            node = node.setdefault(char, {})
+        node.setdefault("", set()).add(stem[split:])
+
+    def build(node: dict) -> str:
+        tails = node.get("", set())
+        # Пустой хвост: совпадение уже найдено, остальные ветки не нужны
+        branches = [""] if "" in tails else sorted(tails)
+        if "" not in tails:
+            branches += [
+                re.escape(char) + build(child)
+                for char, child in sorted(node.items())
+                if char
+            ]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return re.compile(r"\b" + build(trie))
+
+
+_PROFANITY_RE = _compile_profanity(PROFANITY_STEMS)
+
+
 def contains_profanity(text: str) -> bool:
     """Проверка текста на наличие нецензурной лексики (RU, EN, UZ)"""
     if not text:
         return False
     text_lower = text.lower()
-    patterns = [
-        r"\bхуй\w*",
-        r"\bхуе\w*",
-        r"\bхуё\w*",
-        r"\bхуя\w*",
-        r"\bпизд\w*",
-        r"\bеб(а|у|л)\w*",
-        r"\bеб(а|у|л)н\w*",
-        r"\bбля(д|т)\w*",
-        r"\bмуд(а|о)(к|ч)\w*",
-        r"\bпид(о|а|е)р\w*",
-        r"\bг(а|о)ндон\w*",
-        r"\bшлюх\w*",
-        r"\bсук(а|и)\b",
-        r"\bсукин\w*",
-        r"\bсуч(к|а)\w*",
-        r"\bзалуп\w*",
-        r"\bманд(а|ы|у)\b",
-        r"\bдолбо(е|ё)б\w*",
-        r"\bхер\w*",
-        r"\bпохер\w*",
-        r"\bнахер\w*",
-        r"\bчмо\w*",
-        r"\bлох\w*",
-        r"\bдроч\w*",
-        r"\bдурак\w*",
-        r"\bдебил\w*",
-        r"\bидиот\w*",
-        r"\b(x|h)u(y|i)\w*",
-        r"\bpizd\w*",
-        r"\beb(a|l|u)(?!y)\w*",
-        r"\bblya(d|t)\w*",
-        r"\bmud(a|o)k\w*",
-        r"\bpid(o|a|e)r\w*",
-        r"\bgandon\w*",
-        r"\bsuk(a|i)\b",
-        r"\bzalup\w*",
-        r"\bdolbo(e|y)b\w*",
-        r"\bxer\w*",
-        r"\bpoher\w*",
-        r"\bfuck\w*",
-        r"\bshit\b",
-        r"\bbitch\w*",
-        r"\bdick\w*",
-        r"\bcock\w*",
-        r"\bpussy\w*",
-        r"\basshole\w*",
-        r"\bcunt\w*",
-        r"\bbastard\w*",
-        r"\bnigger\w*",
-        r"\bwhore\w*",
-        r"\bslut\w*",
-        r"\bфак\b",
-        r"\bфак(и|е|о)\w*",
-        r"\bмазафак\w*",
-        r"\bшит\b",
-        r"\bбулшит\w*",
-        r"\bбич\b",
-        r"\bпусси\w*",
-        r"\bдикх(е|э)д\w*",
-        r"\b(а|э)схол\w*",
-        r"\bка(н|м)шот\w*",
-        r"\bниггер\w*",
-        r"\b(jalab|жала б)\w*",
-        r"\b(qotoq|qo\'toq|коток|қотақ)\w*",
-        r"\b(siktir|сиктир)\w*",
-        r"\b(sikay|сикай)\w*",
-        r"\b(onangni|онангни)\w*",
-        r"\b(haromi|хароми)\w*",
-        r"\b(dalbayob|далбаёб)\w*",
-        r"\b(gandon|гандон)\w*",
-        r"\b(chumo|чумо)\w*",
-    ]
-    for pattern in patterns:
-        if re.search(pattern, text_lower):
-            return True
+    if _PROFANITY_RE.search(text_lower):
+        return True
+    # Слова из смешанных букв («xуй», «fuсk») проверяются в обоих алфавитах
+    if _LATIN_RE.search(text_lower) and _CYRILLIC_RE.search(text_lower):
+        mixed = _MIXED_WORD_RE.findall(text_lower)
+        if mixed:
+            words = " ".join(mixed)
+            folded = f"{words.translate(_TO_CYRILLIC)} {words.translate(_TO_LATIN)}"
+            return _PROFANITY_RE.search(folded) is not None
     return False
 
 
@@ -13,6 +13,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 # чтобы config.py инициализировался корректно и не вызывал exit(1)
 os.environ["TELEGRAM_BOT_TOKEN"] = "123:test_token"
 os.environ["ADMIN_IDS"] = "123456"
+# Состояния FSM в памяти: тесты не должны писать в файл БД
+os.environ["STATE_BACKEND"] = "memory"
+# Без фоновой отрисовки резюме после сохранения профиля (тесты включают явно)
+os.environ["RESUME_PRERENDER"] = "false"
 
 # Глобальный мок для telebot, если библиотека не установлена
 try:
@@ -66,11 +70,20 @@ def test_db(monkeypatch):
 @pytest.fixture(autouse=True)
 def clear_caches():
     """Очистка кэшей перед каждым тестом"""
+    import cards
     import database.users
+    import documents
+    import keyboards
+    import resume_service
     import database.vacancies
 
+    cards.card_cache.clear()
+    keyboards.clear_keyboard_cache()
+    resume_service.resume_cache.clear()
+    documents.document_cache.clear()
     database.users.invalidate_seekers_cache()
     database.users._user_cache.clear()
+    database.users._activity_cache.clear()
 
     # Clear any cache dictionaries in vacancies module
     for attr in dir(database.vacancies):
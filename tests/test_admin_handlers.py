@@ -10,12 +10,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 import logging  # noqa: E402, F401
 
+import broadcast  # noqa: E402
+
 import database  # noqa: E402, F401
 import database.backup  # noqa: E402, F401
 import database.core  # noqa: E402, F401
 import database.users  # noqa: E402, F401
 import utils  # noqa: E402, F401
 from handlers.admin import AdminHandlers  # noqa: E402, F401
+from router import Router  # noqa: E402
 
 
 class TestAdminHandlers:
@@ -67,23 +70,32 @@ class TestAdminHandlers:
             # The function should just return, no message sent
             handler.bot.reply_to.assert_not_called()
 
-    def test_handle_logs_empty_file(self, handler, message):
+    @pytest.fixture
+    def log_file(self, tmp_path, monkeypatch):
+        """Лог-файл с заданным содержимым (LOG_FILE указывает на него)"""
+        path = tmp_path / "bot.json.log"
+        monkeypatch.setenv("LOG_FILE", str(path))
+
+        def write(content):
+            path.write_text(content, encoding="utf-8")
+            return path
+
+        return write
+
+    def test_handle_logs_empty_file(self, handler, message, log_file):
         """Тест /logs, когда лог-файл пуст"""
-        m = mock_open(read_data="")
-        with patch("os.path.exists", return_value=True), patch("builtins.open", m):
-            handler.handle_logs(message)
-            handler.bot.reply_to.assert_called_with(message, "📭 Лог пуст.")
+        log_file("")
+        handler.handle_logs(message)
+        handler.bot.reply_to.assert_called_with(message, "📭 Лог пуст.")
 
-    def test_handle_logs_success_json(self, handler, message):
+    def test_handle_logs_success_json(self, handler, message, log_file):
         """Тест /logs с валидными JSON-логами"""
         log_content = (
             '{"time": "2023-10-27 12:30:00,123", "level": "ERROR", "message": "Test error"}\n'
             '{"time": "2023-10-27 12:31:00,123", "level": "INFO", "message": "Test info"}\n'
         )
-        m = mock_open(read_data=log_content)
-        with patch("os.path.exists", return_value=True), patch(
-            "builtins.open", m
-        ), patch("utils.escape_markdown", side_effect=lambda x: x):
+        log_file(log_content)
+        with patch("utils.escape_markdown", side_effect=lambda x: x):
             handler.handle_logs(message)
             handler.bot.reply_to.assert_called()
             text = handler.bot.reply_to.call_args[0][1]
@@ -114,7 +126,7 @@ class TestAdminHandlers:
             handler.handle_broadcast_start(message)
 
             mock_set_state.assert_called_with(
-                123456, {"step": "admin_broadcast_message"}
+                123456, {"step": "admin_broadcast_segment"}
             )
             handler.bot.send_message.assert_called()
             assert "Создание рассылки" in handler.bot.send_message.call_args[0][1]
@@ -131,34 +143,23 @@ class TestAdminHandlers:
                 assert "Рассылка отменена" in handler.bot.send_message.call_args[0][1]
 
     def test_process_broadcast_confirm_send(self, handler, message):
-        """Подтверждение и отправка рассылки"""
+        """Подтверждение запускает фоновую рассылку"""
         message.text = "✅ Да, отправить"
         user_state: Dict[str, Any] = {"broadcast_message": "Hello World"}
+        engine = MagicMock()
+        engine.start.return_value = 1
 
         with patch(
             "handlers.admin_broadcast.get_user_state", return_value=user_state
         ), patch("handlers.admin_broadcast.clear_user_state") as mock_clear, patch(
-            "handlers.admin_broadcast.execute_query"
-        ) as mock_query:
-
-            # Мокаем получение пользователей (соискатели, затем работодатели)
-            mock_query.side_effect = [
-                [{"telegram_id": 111}],  # seekers
-                [{"telegram_id": 222}],  # employers
-            ]
-
+            "handlers.admin_broadcast.get_broadcast_engine", return_value=engine
+        ):
             handler.process_broadcast_confirm(message)
 
             mock_clear.assert_called_with(123456)
-
-            # Проверяем, что сообщения отправлялись
-            # bot.send_message вызывается для админа (статус) и для пользователей
-            calls = handler.bot.send_message.call_args_list
-            recipients = [call[0][0] for call in calls]
-
-            assert 111 in recipients
-            assert 222 in recipients
-            assert 123456 in recipients  # Админ
+            engine.start.assert_called_once_with(
+                123456, 123456, "Hello World", segment={}, variants={}
+            )
 
     def test_handle_list_seekers(self, handler, message):
         """Тест списка соискателей"""
@@ -182,7 +183,6 @@ class TestAdminHandlers:
         with patch("utils.cancel_request", return_value=False), patch(
             "handlers.admin_users.execute_query"
         ) as mock_query:
-
             # Мокаем поиск: сначала по соискателям, потом по работодателям
             mock_query.side_effect = [
                 1,  # for _ensure_blocked_table
@@ -212,7 +212,6 @@ class TestAdminHandlers:
         with patch("utils.cancel_request", return_value=False), patch(
             "handlers.admin_users.execute_query", return_value=[]
         ):  # Ничего не найдено
-
             handler.process_search_user(message)
 
             handler.bot.send_message.assert_called()
@@ -265,7 +264,6 @@ class TestAdminHandlers:
         with patch("utils.cancel_request", return_value=False), patch(
             "handlers.admin_users.execute_query"
         ) as mock_query:
-
             # Мокаем, что ничего не найдено, чтобы тест не упал на дальнейшей логике
             mock_query.return_value = []
 
@@ -286,7 +284,6 @@ class TestAdminHandlers:
         ), patch("builtins.open", mock_open(read_data=b"data")), patch(
             "os.path.basename", return_value="test.db"
         ):
-
             handler.handle_create_backup(message)
 
             handler.bot.send_document.assert_called()
@@ -319,35 +316,39 @@ class TestAdminHandlers:
                 in handler.bot.send_message.call_args[0][1]
             )
 
-    def test_broadcast_send_failure(self, handler, message):
+    def test_broadcast_send_failure(self, handler, message, test_db):
         """Test broadcast when sending to a user fails."""
+        test_db.execute(
+            "INSERT INTO job_seekers (telegram_id, full_name, phone, email, password_hash, age) "
+            "VALUES (111, 'S1', '1', 'e1', 'h', 25)"
+        )
+        test_db.execute(
+            "INSERT INTO employers (telegram_id, company_name, phone, email, password_hash, contact_person) "
+            "VALUES (222, 'E1', '2', 'e2', 'h', 'Contact')"
+        )
         message.text = "✅ Да, отправить"
         user_state: Dict[str, Any] = {"broadcast_message": "msg"}
         with patch(
             "handlers.admin_broadcast.get_user_state", return_value=user_state
-        ), patch(
-            "handlers.admin_broadcast.execute_query",
-            side_effect=[[{"telegram_id": 111}], [{"telegram_id": 222}]],
-        ), patch(
-            "handlers.admin_broadcast.clear_user_state"
-        ) as mock_clear:
-
+        ), patch("handlers.admin_broadcast.clear_user_state") as mock_clear:
             # Simulate failure for one user
             handler.bot.send_message.side_effect = [
                 None,
-                Exception("Blocked"),
-                None,
+                MagicMock(message_id=10),
                 None,
+                Exception("Blocked"),
             ]
 
             handler.process_broadcast_confirm(message)
+            broadcast.get_broadcast_engine(handler.bot).wait(timeout=5)
 
-            # Check final status message
+            # Check final progress message
             mock_clear.assert_called_with(message.from_user.id)
-            final_call = handler.bot.send_message.call_args
-            assert "Рассылка завершена" in final_call[0][1]
-            assert "Отправлено: 1" in final_call[0][1]
-            assert "Ошибок: 1" in final_call[0][1]
+            final_call = handler.bot.edit_message_text.call_args
+            assert final_call[1]["message_id"] == 10
+            assert "Рассылка завершена" in final_call[0][0]
+            assert "Отправлено: 1" in final_call[0][0]
+            assert "Ошибок: 1" in final_call[0][0]
 
     def test_handle_list_seekers_empty(self, handler, message):
         """Test listing seekers when the list is empty."""
@@ -382,7 +383,6 @@ class TestAdminHandlers:
         with patch(
             "handlers.admin_stats.create_backup", return_value=(True, "backups/test.db")
         ), patch("builtins.open", mock_open(read_data=b"data")):
-
             handler.bot.send_document.side_effect = Exception("Telegram API error")
 
             handler.handle_create_backup(message)
@@ -411,26 +411,25 @@ class TestAdminHandlers:
             handler.handle_logs(message)
             handler.bot.reply_to.assert_called_with(message, "❌ Лог-файл не найден.")
 
-    def test_handle_logs_read_error(self, handler, message):
+    def test_handle_logs_read_error(self, handler, message, log_file):
         """Тест /logs, ошибка чтения файла"""
-        with patch("os.path.exists", return_value=True), patch(
-            "builtins.open", side_effect=Exception("Read Error")
+        log_file("line\n")
+        with patch(
+            "handlers.admin_logs.search_logs", side_effect=Exception("Read Error")
         ):
             handler.handle_logs(message)
             handler.bot.reply_to.assert_called_with(
                 message, "❌ Ошибка доступа к файлу логов."
             )
 
-    def test_handle_logs_truncation(self, handler, message):
+    def test_handle_logs_truncation(self, handler, message, log_file):
         """Тест /logs, обрезка длинного сообщения"""
         # Создаем длинный лог
         long_msg = "a" * 5000
         log_entry = f'{{"time": "t", "level": "INFO", "message": "{long_msg}"}}\n'
 
-        with patch("os.path.exists", return_value=True), patch(
-            "builtins.open", mock_open(read_data=log_entry)
-        ), patch("utils.escape_markdown", side_effect=lambda x: x):
-
+        log_file(log_entry)
+        with patch("utils.escape_markdown", side_effect=lambda x: x):
             handler.handle_logs(message)
 
             handler.bot.reply_to.assert_called()
@@ -438,16 +437,14 @@ class TestAdminHandlers:
             # Проверяем, что текст обрезан (последние 4000 символов + заголовок)
             assert len(sent_text) <= 4050
 
-    def test_handle_logs_invalid_json_line(self, handler, message):
+    def test_handle_logs_invalid_json_line(self, handler, message, log_file):
         """Тест /logs с некорректной строкой JSON"""
         log_content = (
             'Invalid JSON Line\n{"time": "t", "level": "INFO", "message": "ok"}\n'
         )
 
-        with patch("os.path.exists", return_value=True), patch(
-            "builtins.open", mock_open(read_data=log_content)
-        ), patch("utils.escape_markdown", side_effect=lambda x: x):
-
+        log_file(log_content)
+        with patch("utils.escape_markdown", side_effect=lambda x: x):
             handler.handle_logs(message)
 
             handler.bot.reply_to.assert_called()
@@ -455,11 +452,34 @@ class TestAdminHandlers:
             assert "Invalid JSON Line" in text
             assert "INFO" in text
 
-    def test_register(self, handler, bot):
-        """Тест регистрации обработчиков"""
-        handler.register(bot)
-        assert bot.register_message_handler.call_count > 0
-        assert bot.register_callback_query_handler.call_count > 0
+    def test_register(self, handler):
+        """Тест регистрации маршрутов"""
+        router = Router()
+        handler.register(router)
+        msg = MagicMock()
+        msg.text = "📊 Статистика"
+        msg.from_user.id = 999
+        with patch("router.Config.ADMIN_IDS", [123]):
+            # Кнопки админки доступны только администраторам
+            assert router.resolve_message(msg) is None
+            msg.from_user.id = 123
+            assert router.resolve_message(msg) == handler.handle_statistics
+        assert router.resolve_callback("admin_block_menu_5") == (
+            handler.handle_admin_callbacks
+        )
+
+    def test_admin_callbacks_longest_prefix(self, handler):
+        """admin_block_menu_ не перехватывается более коротким admin_block_"""
+        call = MagicMock()
+        with patch.object(handler, "handle_block_menu") as menu, patch.object(
+            handler, "handle_block_confirm"
+        ) as confirm:
+            call.data = "admin_block_menu_5"
+            handler.handle_admin_callbacks(call)
+            call.data = "admin_block_5_1d"
+            handler.handle_admin_callbacks(call)
+        menu.assert_called_once()
+        confirm.assert_called_once()
 
 
 class TestAdminComplaints:
@@ -702,7 +722,6 @@ class TestAdminComplaints:
         ), patch(
             "logging.error"
         ):
-
             handler.handle_complaints(message)
 
             # Should fallback to text message
@@ -723,7 +742,6 @@ class TestAdminComplaints:
         with patch(
             "handlers.admin_complaints.get_user_state", return_value=state
         ), patch("handlers.admin_complaints.clear_user_state"):
-
             # First call fails (to user), second succeeds (error to admin)
             effects = [Exception("Send Error"), None]
 
@@ -818,7 +836,6 @@ class TestAdminComplaints:
         with patch(
             "handlers.admin_users.get_user_state", return_value=user_state
         ), patch("handlers.admin_users.clear_user_state") as mock_clear:
-
             handler.process_write_message(message)
 
             handler.bot.send_message.assert_any_call(
@@ -839,7 +856,6 @@ class TestAdminComplaints:
         ), patch("handlers.admin_users.clear_user_state"), patch.object(
             handler.bot, "send_message", side_effect=[Exception("Block"), None]
         ):
-
             handler.process_write_message(message)
 
             # Should send error message to admin
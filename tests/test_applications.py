@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+import database
+from database.applications import (
+    get_applicant,
+    get_applicants_page,
+    get_application_counts,
+    set_application_status,
+)
+from handlers.employer import EmployerHandlers
+
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def _employer(telegram_id=100):
+    database.create_employer(
+        {
+            "telegram_id": telegram_id,
+            "company_name": "Co",
+            "contact_person": "Boss",
+            "phone": f"+99890{telegram_id:07d}",
+            "email": f"co{telegram_id}@example.com",
+            "password": "secret1",
+            "city": "Ташкент",
+        }
+    )
+    employer = database.get_user_by_id(telegram_id)
+    database.create_vacancy(
+        {"employer_id": employer["id"], "title": "Dev", "description": "Desc"}
+    )
+    return database.execute_query(
+        "SELECT id FROM vacancies WHERE employer_id = ?",
+        (employer["id"],),
+        fetchone=True,
+    )["id"]
+
+
+def _apply(vacancy_id, telegram_id, created_at):
+    database.create_job_seeker(
+        {
+            "telegram_id": telegram_id,
+            "password": "secret1",
+            "phone": f"+99891{telegram_id:07d}",
+            "email": f"s{telegram_id}@example.com",
+            "full_name": f"Seeker {telegram_id}",
+            "age": 25,
+            "city": "Ташкент",
+        }
+    )
+    seeker = database.get_user_by_id(telegram_id)
+    database.create_application(vacancy_id, seeker["id"])
+    application = database.execute_query(
+        "SELECT id FROM applications WHERE seeker_id = ?",
+        (seeker["id"],),
+        fetchone=True,
+    )
+    database.execute_query(
+        "UPDATE applications SET created_at = ? WHERE id = ?",
+        (created_at.strftime("%Y-%m-%d %H:%M:%S"), application["id"]),
+        commit=True,
+    )
+    return application["id"]
+
+
+@pytest.fixture
+def vacancy_with_applicants(test_db):
+    """Вакансия с 12 откликами; у трех первых одинаковое время создания"""
+    vacancy_id = _employer()
+    for i in range(12):
+        _apply(vacancy_id, 200 + i, START + timedelta(minutes=max(i, 2)))
+    return vacancy_id
+
+
+def _names(rows):
+    return [row["full_name"] for row in rows]
+
+
+class TestApplicantsPage:
+    def test_keyset_pages_forward_and_back(self, vacancy_with_applicants):
+        first, more = get_applicants_page(vacancy_with_applicants)
+        assert more
+        assert _names(first)[0] == "Seeker 211"
+
+        second, more = get_applicants_page(
+            vacancy_with_applicants, after_id=first[-1]["application_id"]
+        )
+        third, more = get_applicants_page(
+            vacancy_with_applicants, after_id=second[-1]["application_id"]
+        )
+        assert not more
+        seen = _names(first) + _names(second) + _names(third)
+        # Отклики с одинаковым created_at не теряются и не повторяются
+        assert len(seen) == len(set(seen)) == 12
+
+        back, has_prev = get_applicants_page(
+            vacancy_with_applicants, before_id=second[0]["application_id"]
+        )
+        assert _names(back) == _names(first)
+        assert not has_prev
+
+    def test_status_filter_and_counts(self, vacancy_with_applicants):
+        rows, _ = get_applicants_page(vacancy_with_applicants)
+        assert set_application_status(rows[0]["application_id"], "accepted", 100)
+        assert set_application_status(rows[1]["application_id"], "rejected", 100)
+
+        accepted, more = get_applicants_page(vacancy_with_applicants, "accepted")
+        assert _names(accepted) == [rows[0]["full_name"]] and not more
+        assert get_application_counts(vacancy_with_applicants) == {
+            "pending": 10,
+            "accepted": 1,
+            "rejected": 1,
+            "total": 12,
+        }
+
+    def test_counts_merge_null_status_into_pending(
+        self, test_db, vacancy_with_applicants
+    ):
+        rows, _ = get_applicants_page(vacancy_with_applicants)
+        test_db.execute(
+            "UPDATE applications SET status = NULL WHERE id IN (?, ?)",
+            (rows[0]["application_id"], rows[1]["application_id"]),
+        )
+        assert get_application_counts(vacancy_with_applicants) == {
+            "pending": 12,
+            "accepted": 0,
+            "rejected": 0,
+            "total": 12,
+        }
+
+    def test_only_owner_sees_and_changes_applications(self, vacancy_with_applicants):
+        _employer(101)
+        rows, _ = get_applicants_page(vacancy_with_applicants)
+        app_id = rows[0]["application_id"]
+
+        assert get_applicant(app_id, 101) is None
+        assert not set_application_status(app_id, "accepted", 101)
+        assert get_applicant(app_id, 100)["application_status"] == "pending"
+        with pytest.raises(ValueError):
+            set_application_status(app_id, "hired", 100)
+
+
+class TestApplicantsHandlers:
+    def _call(self, data):
+        call = MagicMock()
+        call.from_user.id = 100
+        call.message.chat.id = 100
+        call.data = data
+        return call
+
+    def test_status_change_edits_same_page(self, vacancy_with_applicants):
+        handler = EmployerHandlers(MagicMock())
+        rows, _ = get_applicants_page(vacancy_with_applicants)
+        app_id = rows[0]["application_id"]
+
+        handler.handle_applicant_status_callback(
+            self._call(f"aps_{app_id}_y_{vacancy_with_applicants}_a_0")
+        )
+
+        assert get_applicant(app_id, 100)["application_status"] == "accepted"
+        handler.bot.send_message.assert_not_called()
+        text = handler.bot.edit_message_text.call_args[0][0]
+        assert f"✅ *{rows[0]['full_name']}*" in text
+
+    def test_next_page_callback(self, vacancy_with_applicants):
+        handler = EmployerHandlers(MagicMock())
+        rows, _ = get_applicants_page(vacancy_with_applicants)
+
+        handler.handle_applicants_page_callback(
+            self._call(f"apl_{vacancy_with_applicants}_a_n{rows[-1]['application_id']}")
+        )
+
+        text = handler.bot.edit_message_text.call_args[0][0]
+        assert rows[0]["full_name"] not in text
+        markup = handler.bot.edit_message_text.call_args[1]["reply_markup"]
+        nav = [b.callback_data for b in markup.keyboard[-1]]
+        assert nav[0].startswith(f"apl_{vacancy_with_applicants}_a_p")
+        assert nav[1].startswith(f"apl_{vacancy_with_applicants}_a_n")
@@ -9,6 +9,7 @@ import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import bot_factory  # noqa: E402
+from localization import get_all_translations  # noqa: E402
 
 
 @patch("bot_factory.Config")
@@ -26,17 +27,23 @@ class TestBotFactory:
             "bot_factory.setup_middleware"
         ) as mock_setup_middleware, patch(
             "bot_factory.register_routes"
-        ) as mock_register:
-
+        ) as mock_register, patch(
+            "bot_factory.setup_update_executor"
+        ) as mock_executor:
             mock_config.TOKEN = "test_token"
             mock_config.PROMETHEUS_PORT = 8000
             mock_config.SENTRY_DSN = None
+            mock_config.UPDATE_WORKERS = 4
+            mock_config.STATE_SWEEP_INTERVAL = 0
+            mock_config.DIGEST_INTERVAL = 0
+            mock_config.SLOW_QUERY_MS = 0
 
             bot = bot_factory.create_bot()
 
             # mock_setup_log.assert_called_once()
             # mock_init_db.assert_called_once()
-            mock_telebot.assert_called_with("test_token", threaded=True)
+            mock_telebot.assert_called_with("test_token", threaded=False)
+            mock_executor.assert_called_once_with(mock_telebot.return_value)
             # mock_register.assert_called_once()
             mock_setup_middleware.assert_called_once()
             assert bot == mock_telebot.return_value
@@ -49,7 +56,6 @@ class TestBotFactory:
         ) as mock_exit, patch(
             "logging.critical"
         ) as mock_log:
-
             mock_config.TOKEN = None
 
             with pytest.raises((SystemExit, TypeError, ValueError)):
@@ -69,13 +75,18 @@ class TestBotFactory:
         ), patch(
             "bot_factory.register_routes"
         ), patch(
-            "bot_factory.start_http_server"
+            "bot_factory.start_metrics_server"
         ) as mock_prom, patch(
+            "bot_factory.setup_metrics"
+        ) as mock_metrics, patch(
             "bot_factory.sentry_sdk.init"
         ) as mock_sentry:
-
             mock_config.TOKEN = "token"
             mock_config.PROMETHEUS_PORT = 9090
+            mock_config.UPDATE_WORKERS = 0
+            mock_config.STATE_SWEEP_INTERVAL = 0
+            mock_config.DIGEST_INTERVAL = 0
+            mock_config.SLOW_QUERY_MS = 0
             mock_config.SENTRY_DSN = "dsn"
 
             # Enable monitoring
@@ -83,6 +94,7 @@ class TestBotFactory:
                 bot_factory.create_bot()
                 mock_prom.assert_called_with(9090)
                 mock_sentry.assert_called()
+                mock_metrics.assert_called_once()
 
             # Disable monitoring
             mock_prom.reset_mock()
@@ -112,17 +124,22 @@ class TestBotFactory:
     def test_setup_logging(self, mock_config_class):
         with patch("bot_factory.RotatingFileHandler") as mock_file_handler, patch(
             "logging.StreamHandler"
-        ), patch("logging.getLogger"):
-
+        ), patch("logging.getLogger"), patch(
+            "bot_factory.start_log_pipeline"
+        ) as mock_pipeline:
             bot_factory.setup_logging()
 
             mock_file_handler.assert_called_with(
                 "bot.json.log", maxBytes=10485760, backupCount=5, encoding="utf-8"
             )
 
-            # Проверяем, что хендлеры были добавлены к корневому логгеру
+            # Файл и консоль пишет фоновый поток, к корневому логгеру — только очередь
+            handlers = mock_pipeline.call_args[0][0]
+            assert mock_file_handler.return_value in handlers
             root_logger = logging.getLogger()
-            assert root_logger.addHandler.call_count >= 2
+            root_logger.addHandler.assert_called_once_with(
+                mock_pipeline.return_value.handler
+            )
 
     def test_json_formatter(self, mock_config_class):
         formatter = bot_factory.JSONFormatter()
@@ -160,13 +177,16 @@ class TestBotFactory:
         ), patch(
             "bot_factory.register_routes"
         ), patch(
-            "bot_factory.start_http_server", side_effect=Exception("Port in use")
-        ) as mock_prom, patch(
+            "bot_factory.start_metrics_server", side_effect=Exception("Port in use")
+        ) as mock_prom, patch("bot_factory.setup_metrics"), patch(
             "logging.error"
         ) as mock_log:
-
             mock_config.TOKEN = "token"
             mock_config.PROMETHEUS_PORT = 9090
+            mock_config.UPDATE_WORKERS = 0
+            mock_config.STATE_SWEEP_INTERVAL = 0
+            mock_config.DIGEST_INTERVAL = 0
+            mock_config.SLOW_QUERY_MS = 0
             mock_config.SENTRY_DSN = None
 
             with patch("bot_factory.MONITORING_AVAILABLE", True):
@@ -185,38 +205,25 @@ class TestBotFactory:
             },
         ):
             # Test a key that exists everywhere
-            results1 = bot_factory.get_all_translations("key1")
+            results1 = get_all_translations("key1")
             assert "Привет" in results1
             assert "Hello" in results1
             assert "Salom" in results1
             assert len(results1) == 3
 
             # Test a key that exists in one place
-            results2 = bot_factory.get_all_translations("key2")
+            results2 = get_all_translations("key2")
             assert "Мир" in results2
             assert len(results2) == 1
 
             # Test a non-existent key
-            results3 = bot_factory.get_all_translations("non_existent")
+            results3 = get_all_translations("non_existent")
             assert len(results3) == 0
 
     def test_register_routes_inner_logic(self, mock_config_class):
         """Test inner functions defined inside register_routes"""
         bot = MagicMock()
 
-        # Capture decorators to access inner functions
-        handlers = {}
-
-        def capture_handler(*args, **kwargs):
-            def decorator(func):
-                handlers[func.__name__] = func
-                return func
-
-            return decorator
-
-        bot.message_handler.side_effect = capture_handler
-        bot.callback_query_handler.side_effect = capture_handler
-
         # Mocks for handlers passed to register_routes
         common = MagicMock()
         auth = MagicMock()
@@ -227,17 +234,25 @@ class TestBotFactory:
         admin = MagicMock()
         steps = MagicMock()
 
-        bot_factory.register_routes(
+        router = bot_factory.register_routes(
             bot, common, auth, seeker, employer, settings, profile, admin, steps
         )
 
+        # Внутренние функции register_routes — обработчики маршрутов
+        handlers = {
+            route.handler.__name__: route.handler
+            for routes in router._texts.values()
+            for route in routes
+            if getattr(route.handler, "__name__", None)
+        }
+        handlers["process_all_messages"] = router.fallback
+
         # 1. Test cancel_command
         assert "cancel_btn_wrapper" in handlers
         msg = MagicMock(from_user=MagicMock(id=123), chat=MagicMock(id=123))
         with patch("bot_factory.clear_user_state") as mock_clear, patch(
             "localization.get_user_language", return_value="ru"
         ), patch("bot_factory.keyboards.main_menu"):
-
             handlers["cancel_btn_wrapper"](msg)
             mock_clear.assert_called_with(123)
             bot.send_message.assert_called()
@@ -353,7 +368,7 @@ class TestBotFactory:
         msg.from_user.id = 123
 
         # Case: Admin broadcast (corrected with block)
-        with patch("bot_factory.Config.ADMIN_IDS", [123]), patch(
+        with patch("router.Config.ADMIN_IDS", [123]), patch(
             "bot_factory.keyboards.main_menu"
         ), patch(
             "bot_factory.get_user_state",
@@ -363,7 +378,7 @@ class TestBotFactory:
             admin.process_broadcast_message.assert_called_with(msg)
 
         # Case: Admin search user
-        with patch("bot_factory.Config.ADMIN_IDS", [123]), patch(
+        with patch("router.Config.ADMIN_IDS", [123]), patch(
             "bot_factory.get_user_state", return_value={"step": "admin_search_user"}
         ):
             handler(msg)
@@ -0,0 +1,323 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import database
+import database.broadcasts as broadcasts
+from broadcast import BroadcastEngine, parse_segment, parse_variants
+from handlers.admin import AdminHandlers
+
+
+def _add_seeker(conn, telegram_id, **fields):
+    row = {
+        "telegram_id": telegram_id,
+        "phone": f"+998{telegram_id}",
+        "email": f"s{telegram_id}@test.uz",
+        "password_hash": "hash",
+        "full_name": "S",
+        "age": 25,
+    }
+    row.update(fields)
+    conn.execute(
+        f"INSERT INTO job_seekers ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+        tuple(row.values()),
+    )
+
+
+def _add_employer(conn, telegram_id):
+    conn.execute(
+        "INSERT INTO employers (telegram_id, company_name, phone, email, password_hash, contact_person) "
+        "VALUES (?, 'Comp', ?, ?, 'hash', 'Contact')",
+        (telegram_id, f"+998{telegram_id}", f"e{telegram_id}@test.uz"),
+    )
+
+
+def _error(code, description):
+    return ApiTelegramException(
+        "sendMessage", None, {"error_code": code, "description": description}
+    )
+
+
+@pytest.fixture
+def bot():
+    bot = MagicMock()
+    bot.send_message.return_value = MagicMock(message_id=77)
+    return bot
+
+
+@pytest.fixture
+def engine(bot):
+    return BroadcastEngine(bot, batch_size=2, concurrency=2, progress_interval=0)
+
+
+class TestRecipients:
+    def test_employer_who_is_seeker_counted_once(self, test_db):
+        _add_seeker(test_db, 1)
+        _add_employer(test_db, 1)
+        _add_employer(test_db, 2)
+        assert broadcasts.count_broadcast_recipients() == 2
+        # Этапы: соискатели ru/uz/en, затем работодатели ru/uz/en
+        assert [
+            r["telegram_id"] for r in broadcasts.fetch_broadcast_recipients(3, 0, 10)
+        ] == [2]
+
+    def test_deactivated_excluded_and_reactivated(self, test_db):
+        _add_seeker(test_db, 1)
+        _add_seeker(test_db, 2)
+        assert broadcasts.deactivate_recipients([1]) == 1
+        assert broadcasts.count_broadcast_recipients() == 1
+
+        database.mark_user_reachable(1)
+        assert broadcasts.count_broadcast_recipients() == 2
+
+
+class TestSegments:
+    def test_parse_segment(self):
+        segment, errors = parse_segment(
+            "role=seekers\ncity=Farg'ona viloyati\nstatus=active\nlang=uz\n"
+            "registered=2024-01-31\nactive=2024-06-01"
+        )
+        assert errors == []
+        assert segment == {
+            "role": "seekers",
+            "location": "Ферганская обл.",
+            "status": "active",
+            "language": "uz",
+            "registered_since": "2024-01-31",
+            "active_since": "2024-06-01",
+        }
+
+    def test_parse_segment_errors(self):
+        segment, errors = parse_segment("city=Атлантида\nlang=de\nactive=вчера\nfoo")
+        assert segment == {}
+        assert len(errors) == 4
+
+    def test_parse_variants(self):
+        assert parse_variants("Привет") == {"": "Привет"}
+        assert parse_variants("[ru]\nПривет\n[uz]\nSalom\n[en]\n") == {
+            "ru": "Привет",
+            "uz": "Salom",
+        }
+
+    def test_filters_in_sql(self, test_db):
+        _add_seeker(test_db, 1, city="Toshkent", language_code="uz")
+        _add_seeker(test_db, 2, city="Ташкент", status="inactive")
+        _add_seeker(test_db, 3, city="Самарканд")
+        _add_seeker(test_db, 4, city="Tashkent", created_at="2023-01-01")
+        _add_seeker(test_db, 5, city="Ташкент", last_login="2023-01-01")
+        _add_employer(test_db, 6)
+
+        count = broadcasts.count_broadcast_recipients
+        assert count({"location": "Ташкент"}) == 4
+        assert count({"location": "Ташкентская обл.", "status": "active"}) == 3
+        assert count({"location": "Ташкент", "language": "uz"}) == 1
+        assert count({"registered_since": "2024-01-01", "role": "seekers"}) == 4
+        assert count({"active_since": "2024-01-01", "location": "Ташкент"}) == 3
+        assert count({"role": "employers"}) == 1
+        # Статус есть только у соискателей
+        assert count({"status": "active"}) == 4
+
+    def test_active_segment_follows_activity(self, test_db):
+        _add_seeker(test_db, 1, last_login="2023-01-01")
+        assert (
+            broadcasts.count_broadcast_recipients({"active_since": "2024-01-01"}) == 0
+        )
+
+        assert database.record_activity(1) is True
+        # Повторное обращение в течение часа не пишет в БД
+        assert database.record_activity(1) is False
+        assert (
+            broadcasts.count_broadcast_recipients({"active_since": "2024-01-01"}) == 1
+        )
+
+    def test_employer_in_other_segment_not_deduplicated(self, test_db):
+        _add_seeker(test_db, 1, city="Самарканд")
+        _add_employer(test_db, 1)
+        assert broadcasts.count_broadcast_recipients({"location": "Самарканд"}) == 1
+        assert broadcasts.count_broadcast_recipients({"role": "employers"}) == 1
+
+    def test_keyset_query_uses_language_index(self, test_db):
+        plan = test_db.execute(
+            "EXPLAIN QUERY PLAN SELECT id, telegram_id FROM job_seekers "
+            "WHERE id > ? AND job_seekers.bot_blocked = 0 "
+            "AND job_seekers.language_code IN (?) ORDER BY id LIMIT ?",
+            (0, "uz", 10),
+        ).fetchall()
+        details = " ".join(str(tuple(row)) for row in plan)
+        assert "idx_job_seekers_broadcast" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestBroadcastEngine:
+    def test_variants_grouped_by_language(self, engine, bot, test_db):
+        _add_seeker(test_db, 1, language_code="uz")
+        _add_seeker(test_db, 2, language_code="ru")
+        _add_seeker(test_db, 3, language_code="en")
+        _add_seeker(test_db, 4, language_code="uz", city="Самарканд")
+
+        engine.start(
+            999,
+            999,
+            "Привет",
+            segment={"role": "seekers"},
+            variants={"uz": "Salom"},
+        )
+        engine.wait(timeout=5)
+
+        sent = [c[0][:2] for c in bot.send_message.call_args_list[1:]]
+        assert sent == [(2, "Привет"), (1, "Salom"), (4, "Salom"), (3, "Привет")]
+
+    def test_full_run_with_dead_recipients(self, engine, bot, test_db):
+        for tid in (1, 2, 3):
+            _add_seeker(test_db, tid)
+        _add_employer(test_db, 4)
+
+        def send(chat_id, text, **kwargs):
+            if chat_id == 2:
+                raise _error(403, "Forbidden: bot was blocked by the user")
+            if chat_id == 3:
+                raise _error(400, "Bad Request: can't parse entities")
+            return MagicMock(message_id=77)
+
+        bot.send_message.side_effect = send
+        job_id = engine.start(999, 999, "Hello")
+        engine.wait(timeout=5)
+
+        job = broadcasts.get_broadcast_job(job_id)
+        assert job["status"] == "done"
+        assert (job["total"], job["sent"], job["deactivated"], job["failed"]) == (
+            4,
+            2,
+            1,
+            1,
+        )
+        # Заблокировавший бота помечен, но не удален
+        row = test_db.execute(
+            "SELECT bot_blocked FROM job_seekers WHERE telegram_id = 2"
+        ).fetchone()
+        assert row["bot_blocked"] == 1
+
+        final = bot.edit_message_text.call_args
+        assert final[1]["chat_id"] == 999 and final[1]["message_id"] == 77
+        assert "Рассылка завершена" in final[0][0]
+
+    def test_pause_resume_continues_from_cursor(self, engine, bot, test_db):
+        for tid in range(1, 6):
+            _add_seeker(test_db, tid)
+
+        paused = threading.Event()
+        release = threading.Event()
+        job_ids = []
+
+        def send(chat_id, text, **kwargs):
+            if chat_id == 1:
+                # Пауза приходит во время отправки первой пачки
+                engine.pause(job_ids[0])
+                paused.set()
+                release.wait(5)
+            return MagicMock(message_id=77)
+
+        bot.send_message.side_effect = send
+        job_ids.append(
+            broadcasts.create_broadcast_job(
+                999, "Hi", broadcasts.count_broadcast_recipients()
+            )
+        )
+        engine._spawn(job_ids[0])
+        assert paused.wait(5)
+        release.set()
+        engine.wait(timeout=5)
+
+        job = broadcasts.get_broadcast_job(job_ids[0])
+        assert job["status"] == "paused"
+        assert job["sent"] == 2  # Текущая пачка дослана, курсор сохранен
+        assert job["cursor_id"] == 2
+
+        assert engine.resume(job_ids[0])
+        engine.wait(timeout=5)
+        job = broadcasts.get_broadcast_job(job_ids[0])
+        assert job["status"] == "done"
+        assert job["sent"] == 5
+        recipients = [c[0][0] for c in bot.send_message.call_args_list]
+        assert sorted(recipients) == [1, 2, 3, 4, 5]
+
+    def test_resume_interrupted_after_restart(self, engine, bot, test_db):
+        for tid in (1, 2, 3):
+            _add_seeker(test_db, tid)
+        job_id = broadcasts.create_broadcast_job(999, "Hi", 3)
+        # Первая пачка была отправлена до перезапуска
+        broadcasts.save_broadcast_batch(job_id, 0, 2, 2, 0, 0)
+
+        assert engine.resume_interrupted() == 1
+        engine.wait(timeout=5)
+
+        assert [c[0][0] for c in bot.send_message.call_args_list] == [3]
+        assert broadcasts.get_broadcast_job(job_id)["status"] == "done"
+
+    def test_cancel(self, engine, bot, test_db):
+        _add_seeker(test_db, 1)
+        job_id = broadcasts.create_broadcast_job(999, "Hi", 1)
+        broadcasts.set_broadcast_status(job_id, "paused")
+
+        assert engine.cancel(job_id)
+        assert not engine.resume(job_id)
+        assert broadcasts.get_broadcast_job(job_id)["status"] == "cancelled"
+        bot.send_message.assert_not_called()
+
+
+class TestBroadcastControl:
+    def _call(self, data, user_id=123456):
+        call = MagicMock()
+        call.data = data
+        call.from_user.id = user_id
+        return call
+
+    def test_non_admin_rejected(self, test_db):
+        handler = AdminHandlers(MagicMock())
+        job_id = broadcasts.create_broadcast_job(999, "Hi", 0)
+        handler.handle_admin_callbacks(
+            self._call(f"admin_bc_pause_{job_id}", user_id=1)
+        )
+        assert broadcasts.get_broadcast_job(job_id)["status"] == "running"
+
+    def test_pause_button(self, test_db):
+        handler = AdminHandlers(MagicMock())
+        job_id = broadcasts.create_broadcast_job(999, "Hi", 0)
+        handler.handle_admin_callbacks(self._call(f"admin_bc_pause_{job_id}"))
+
+        assert broadcasts.get_broadcast_job(job_id)["status"] == "paused"
+        markup = handler.bot.edit_message_reply_markup.call_args[1]["reply_markup"]
+        assert markup.keyboard[0][0].callback_data == f"admin_bc_resume_{job_id}"
+
+    def test_segment_step(self, test_db):
+        _add_seeker(test_db, 1, language_code="uz")
+        _add_seeker(test_db, 2)
+        handler = AdminHandlers(MagicMock())
+        message = MagicMock()
+        message.from_user.id = 123456
+        message.text = "lang=uz"
+        handler.process_broadcast_segment(message)
+
+        state = database.get_user_state(123456)
+        assert state["step"] == "admin_broadcast_message"
+        assert state["broadcast_segment"] == {"language": "uz"}
+        assert state["broadcast_total"] == 1
+
+        message.text = "[ru]\nПривет\n[uz]\nSalom"
+        handler.process_broadcast_message(message)
+        state = database.get_user_state(123456)
+        assert state["broadcast_message"] == "Привет"
+        assert state["broadcast_variants"] == {"ru": "Привет", "uz": "Salom"}
+
+    def test_segment_step_errors_keep_step(self, test_db):
+        handler = AdminHandlers(MagicMock())
+        database.set_user_state(123456, {"step": "admin_broadcast_segment"})
+        message = MagicMock()
+        message.from_user.id = 123456
+        message.text = "lang=de"
+        handler.process_broadcast_segment(message)
+
+        assert database.get_user_state(123456)["step"] == "admin_broadcast_segment"
+        assert "Неизвестный язык: de" in handler.bot.send_message.call_args[0][1]
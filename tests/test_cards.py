@@ -0,0 +1,96 @@
+import json
+from unittest.mock import patch
+
+import cards
+import database
+from cards import CardCache, candidate_card, vacancy_card
+
+
+def _vacancy(**fields):
+    vac = {
+        "id": 7,
+        "version": 1,
+        "title": "prof_dev",
+        "company_name": "Co_1",
+        "city": "Ташкент",
+        "salary": "1000$",
+        "gender": "any",
+        "job_type": "job_type_remote",
+        "languages": '[{"lang_key": "lang_en", "level_key": "level_b2"}]',
+        "description": "Desc",
+        "created_at": "2024-01-01 10:00:00",
+    }
+    vac.update(fields)
+    return vac
+
+
+class TestCardRendering:
+    def test_vacancy_card_renders_once_per_language(self):
+        with patch("cards._render_vacancy", wraps=cards._render_vacancy) as render:
+            for _ in range(3):
+                text, markup = vacancy_card(_vacancy(), "ru")
+            vacancy_card(_vacancy(), "en")
+            vacancy_card(_vacancy(), "ru", owner=True)
+
+        assert render.call_count == 3
+        assert "Co\\_1" in text
+        assert json.loads(markup)["inline_keyboard"][0][0]["callback_data"] == "apply_7"
+
+    def test_new_version_replaces_old_cards(self):
+        first, _ = vacancy_card(_vacancy(), "ru")
+        second, _ = vacancy_card(_vacancy(version=2, salary="2000$"), "ru")
+
+        assert "1000$" in first and "2000$" in second
+        assert cards.card_cache.get_stats()["size"] == 1
+
+    def test_rows_without_version_are_not_cached(self):
+        seeker = {"id": 3, "full_name": "Ivan", "telegram_id": 55}
+        text, markup = candidate_card(seeker, "ru", vacancy_id=7)
+
+        assert "Ivan" in text
+        assert "invite_55_7" in markup
+        assert cards.card_cache.get_stats()["size"] == 0
+
+
+class TestCardCache:
+    def test_lru_eviction(self):
+        cache = CardCache(max_size=2)
+        for entity_id in (1, 2, 3):
+            cache.put(("vacancy", entity_id, 1, "ru", None), ("t", "{}"))
+
+        assert cache.get(("vacancy", 1, 1, "ru", None)) is None
+        assert cache.get(("vacancy", 3, 1, "ru", None)) == ("t", "{}")
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_invalidate_drops_all_variants(self):
+        cache = CardCache(max_size=10)
+        cache.put(("seeker", 1, 1, "ru", (5, None)), ("a", "{}"))
+        cache.put(("seeker", 1, 1, "en", (5, 7)), ("b", "{}"))
+        cache.invalidate("seeker", 1)
+        assert cache.get_stats()["size"] == 0
+
+
+class TestRowVersion:
+    def test_updates_bump_version(self, test_db):
+        database.create_employer(
+            {
+                "telegram_id": 100,
+                "company_name": "Co",
+                "contact_person": "Boss",
+                "phone": "+998901111111",
+                "email": "co@example.com",
+                "password": "secret1",
+                "city": "Ташкент",
+            }
+        )
+        employer = database.get_user_by_id(100)
+        database.create_vacancy(
+            {"employer_id": employer["id"], "title": "Dev", "description": "Desc"}
+        )
+        vac = database.get_employer_vacancies(employer["id"])[0]
+        assert vac["version"] == 1
+
+        database.update_vacancy(vac["id"], salary="500$")
+        database.update_employer_profile(100, company_name="New Co")
+        vac = database.get_employer_vacancies(employer["id"])[0]
+        assert vac["version"] == 3
@@ -3,6 +3,9 @@ import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
+from telebot.apihelper import ApiTelegramException
+
+import outbound
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from handlers.chat import ChatMixin
@@ -46,6 +49,28 @@ class TestChatHandlers:
                 456, "❌ Сообщение не отправлено: обнаружена нецензурная лексика."
             )
 
+    def test_handle_chat_message_delivery_error(self, handler, message):
+        """Ошибка доставки через диспетчер исходящих ведет в ветку ошибки"""
+        blocked = ApiTelegramException(
+            "sendMessage", None, {"error_code": 403, "description": "Forbidden"}
+        )
+        handler.bot.send_message.side_effect = blocked
+        outbound.setup_outbound(
+            handler.bot,
+            outbound.OutboundDispatcher(global_rate=1000, chat_rate=1000),
+        )
+        handler.handle_stop_chat = MagicMock()
+        with patch(
+            "handlers.chat.database.get_user_state", return_value={"target_id": 789}
+        ), patch(
+            "handlers.chat.database.get_user_by_id", return_value={"full_name": "User"}
+        ), patch(
+            "utils.security.contains_profanity", return_value=False
+        ):
+            handler.handle_chat_message(message)
+
+        assert "Не удалось отправить" in handler.handle_stop_chat.call_args[0][1]
+
     def test_process_reply_to_admin_cancel(self, handler, message):
         """Test cancel reply to admin"""
         message.text = "отмена"
@@ -0,0 +1,181 @@
+import zipfile
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import database
+import digests
+from database.digests import (
+    get_digest_applications,
+    get_digest_employer,
+    get_due_digest_employers,
+)
+from digests import DigestScheduler, send_resumes
+from handlers.settings import SettingsHandlers
+
+NOW = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def _employer(telegram_id=100):
+    database.create_employer(
+        {
+            "telegram_id": telegram_id,
+            "company_name": "Co",
+            "contact_person": "Boss",
+            "phone": f"+99890{telegram_id:07d}",
+            "email": f"co{telegram_id}@example.com",
+            "password": "secret1",
+            "city": "Ташкент",
+        }
+    )
+    return database.get_user_by_id(telegram_id)
+
+
+def _vacancy(employer, title):
+    database.create_vacancy(
+        {"employer_id": employer["id"], "title": title, "description": "Desc"}
+    )
+    return database.execute_query(
+        "SELECT id FROM vacancies WHERE title = ?", (title,), fetchone=True
+    )["id"]
+
+
+def _apply(vacancy_id, telegram_id, created_at):
+    database.create_job_seeker(
+        {
+            "telegram_id": telegram_id,
+            "password": "secret1",
+            "phone": f"+99891{telegram_id:07d}",
+            "email": f"s{telegram_id}@example.com",
+            "full_name": f"Seeker {telegram_id}",
+            "age": 25,
+            "city": "Ташкент",
+        }
+    )
+    seeker = database.get_user_by_id(telegram_id)
+    database.create_application(vacancy_id, seeker["id"])
+    database.execute_query(
+        "UPDATE applications SET created_at = ? WHERE seeker_id = ?",
+        (created_at.strftime("%Y-%m-%d %H:%M:%S"), seeker["id"]),
+        commit=True,
+    )
+
+
+def _hourly_employer_with_applications():
+    employer = _employer()
+    database.set_digest_mode(100, "hourly")
+    database.execute_query(
+        "UPDATE employers SET digest_sent_at = ?",
+        ((NOW - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),),
+        commit=True,
+    )
+    dev = _vacancy(employer, "Dev")
+    qa = _vacancy(employer, "QA")
+    _apply(dev, 201, NOW - timedelta(minutes=50))
+    _apply(dev, 202, NOW - timedelta(minutes=10))
+    _apply(qa, 203, NOW - timedelta(minutes=5))
+    # Отклик до прошлого дайджеста уже был отправлен
+    _apply(qa, 204, NOW - timedelta(hours=2))
+    return employer
+
+
+class TestDigestQueries:
+    def test_due_employers_and_window(self, test_db):
+        _hourly_employer_with_applications()
+        _employer(101)  # instant — дайджестов не получает
+
+        assert get_due_digest_employers(NOW - timedelta(minutes=30)) == []
+        due = get_due_digest_employers(NOW)
+        assert [e["telegram_id"] for e in due] == [100]
+
+        apps = get_digest_applications(
+            due[0]["id"], due[0]["digest_sent_at"], "2024-05-01 11:59:58"
+        )
+        assert [a["telegram_id"] for a in apps] == [201, 202, 203]
+        assert apps[0]["vacancy_title"] == "Dev"
+
+        # Первый дайджест: окно без нижней границы
+        apps = get_digest_applications(due[0]["id"], None, "2024-05-01 11:59:58")
+        assert [a["telegram_id"] for a in apps] == [201, 202, 204, 203]
+
+    def test_switch_between_digest_modes_keeps_window(self, test_db):
+        _hourly_employer_with_applications()
+        before = get_digest_employer(100)["digest_sent_at"]
+
+        database.set_digest_mode(100, "daily")
+
+        employer = get_digest_employer(100)
+        assert employer["digest_mode"] == "daily"
+        assert employer["digest_sent_at"] == before
+
+
+class TestSendDigest:
+    def test_one_summary_and_media_group_per_vacancy(self, test_db):
+        _hourly_employer_with_applications()
+        bot = MagicMock()
+        renderer = MagicMock()
+        renderer.render.side_effect = lambda app, lang: app["full_name"].encode()
+
+        with patch("digests.get_resume_renderer", return_value=renderer):
+            assert DigestScheduler(bot).run_once(NOW) == 3
+            # Окно сдвинулось: повторный проход ничего не отправляет
+            assert DigestScheduler(bot).run_once(NOW + timedelta(hours=1)) == 0
+
+        summaries = [c[0][1] for c in bot.send_message.call_args_list]
+        assert len(summaries) == 2
+        assert "Dev" in summaries[0] and "Seeker 202" in summaries[0]
+        assert "*2*" in summaries[0]
+        media = bot.send_media_group.call_args[0][1]
+        assert len(media) == 2
+        # Одно резюме на вакансию QA — обычный документ
+        assert bot.send_document.call_args[0][1].name == "Resume_Seeker 203.pdf"
+
+    def test_large_batch_is_archived(self):
+        bot = MagicMock()
+        resumes = [(f"Resume_{i}.pdf", b"%PDF") for i in range(12)]
+
+        send_resumes(bot, 1, resumes)
+
+        bot.send_media_group.assert_not_called()
+        archive = bot.send_document.call_args[0][1]
+        assert archive.name.endswith(".zip")
+        assert len(zipfile.ZipFile(archive).namelist()) == 12
+
+    def test_media_group_reuses_uploaded_file_ids(self):
+        digests.document_cache.put(digests.content_hash(b"%PDF-1"), "FILE1")
+        bot = MagicMock()
+
+        send_resumes(bot, 1, [("a.pdf", b"%PDF-1"), ("b.pdf", b"%PDF-2")])
+
+        media = bot.send_media_group.call_args[0][1]
+        assert media[0].media == "FILE1"
+        assert media[1].media != "FILE1"
+
+
+class TestDigestSettings:
+    def test_digest_mode_skips_instant_notification(self, test_db):
+        from handlers.seeker_responses import SeekerResponseMixin
+
+        employer = _hourly_employer_with_applications()
+        vacancy_id = _vacancy(employer, "Ops")
+        handler = SeekerResponseMixin()
+        handler.bot = MagicMock()
+
+        with patch("handlers.seeker_responses.get_resume_renderer") as renderer:
+            handler._notify_employer_with_pdf(vacancy_id, {"full_name": "X"})
+
+        renderer.assert_not_called()
+        handler.bot.send_message.assert_not_called()
+
+    def test_switch_to_instant_flushes_pending_digest(self, test_db):
+        _hourly_employer_with_applications()
+        handler = SettingsHandlers(MagicMock())
+        call = MagicMock()
+        call.from_user.id = 100
+        call.data = "digest_instant"
+
+        with patch("handlers.settings_employer.send_employer_digest") as send:
+            handler.handle_digest_mode_callback(call)
+
+        assert send.call_args[0][1]["telegram_id"] == 100
+        assert database.get_digest_mode(100) == "instant"
+        handler.bot.edit_message_text.assert_called_once()
@@ -0,0 +1,72 @@
+from unittest.mock import MagicMock
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import documents
+from documents import DocumentCache, send_cached_document
+
+
+def _bot(file_id="BQACAgIAAx0"):
+    bot = MagicMock()
+    bot.send_document.return_value.document.file_id = file_id
+    return bot
+
+
+def _api_error(code):
+    return ApiTelegramException(
+        "sendDocument",
+        None,
+        {"error_code": code, "description": "Bad Request: wrong file identifier"},
+    )
+
+
+class TestSendCachedDocument:
+    def test_second_send_reuses_file_id(self):
+        bot = _bot()
+        uploads = documents.document_cache.uploads
+        send_cached_document(bot, 1, b"%PDF-1", "Resume.pdf", caption="A")
+        send_cached_document(bot, 2, b"%PDF-1", "Resume.pdf", caption="B")
+
+        upload, reuse = bot.send_document.call_args_list
+        assert upload[0][1].name == "Resume.pdf"
+        assert upload[0][1].getvalue() == b"%PDF-1"
+        assert reuse[0] == (2, "BQACAgIAAx0")
+        assert reuse[1] == {"caption": "B"}
+        assert documents.document_cache.uploads == uploads + 1
+
+    def test_changed_content_is_uploaded(self):
+        bot = _bot()
+        uploads = documents.document_cache.uploads
+        send_cached_document(bot, 1, b"%PDF-1", "Resume.pdf")
+        send_cached_document(bot, 1, b"%PDF-2", "Resume.pdf")
+
+        assert documents.document_cache.uploads == uploads + 2
+
+    def test_rejected_file_id_falls_back_to_upload(self):
+        bot = _bot()
+        send_cached_document(bot, 1, b"%PDF-1", "Resume.pdf")
+        bot.send_document.side_effect = [_api_error(400), MagicMock()]
+
+        send_cached_document(bot, 1, b"%PDF-1", "Resume.pdf")
+
+        assert bot.send_document.call_args[0][1].getvalue() == b"%PDF-1"
+        assert documents.document_cache.get_stats()["size"] == 0
+
+    def test_other_api_errors_are_raised(self):
+        bot = _bot()
+        send_cached_document(bot, 1, b"%PDF-1", "Resume.pdf")
+        bot.send_document.side_effect = _api_error(403)
+
+        with pytest.raises(ApiTelegramException):
+            send_cached_document(bot, 1, b"%PDF-1", "Resume.pdf")
+
+
+class TestDocumentCache:
+    def test_lru_eviction(self):
+        cache = DocumentCache(max_size=2)
+        for digest in ("a", "b", "c"):
+            cache.put(digest, f"id-{digest}")
+
+        assert cache.get("a") is None
+        assert cache.get("c") == "id-c"
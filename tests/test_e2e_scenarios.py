@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 import bot  # noqa: F401, E402
+import broadcast  # noqa: E402
 import database  # noqa: E402
 import middleware  # noqa: E402
 from handlers.admin import AdminHandlers  # noqa: E402
@@ -565,16 +566,21 @@ class TestE2EScenarios:
 
         # Сбрасываем мок, чтобы проверить отправку
         handlers["admin"].bot.send_message.reset_mock()
+        handlers["admin"].bot.send_message.return_value = MagicMock(message_id=55)
 
         handlers["admin"].process_broadcast_confirm(message)
+        broadcast.get_broadcast_engine(handlers["admin"].bot).wait(timeout=5)
 
-        # Проверяем, что сообщение ушло пользователям (101, 102) и админу (отчет)
+        # Проверяем, что сообщение ушло пользователям (101, 102) и админу (прогресс)
         calls = handlers["admin"].bot.send_message.call_args_list
         recipients = [c[0][0] for c in calls]
 
         assert 101 in recipients
         assert 102 in recipients
-        assert 123456 in recipients  # Отчет админу
+        assert 123456 in recipients  # Прогресс рассылки админу
+        report = handlers["admin"].bot.edit_message_text.call_args
+        assert "Рассылка завершена" in report[0][0]
+        assert report[1]["chat_id"] == 123456
 
     def test_seeker_full_flow(self, handlers, message, test_db):
         """
@@ -661,7 +667,7 @@ class TestE2EScenarios:
         vacancy_card_kb = vacancy_card_args[1]["reply_markup"]
         assert "Awesome Job" in vacancy_card_text
         assert "Test Employer Inc." in vacancy_card_text
-        assert "apply_500" in vacancy_card_kb.keyboard[0][0].callback_data
+        assert '"callback_data": "apply_500"' in vacancy_card_kb
 
         # 4. Отклик на вакансию
         apply_call = MagicMock()
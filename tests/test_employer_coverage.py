@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from handlers.employer import EmployerHandlers
+from router import Router
 
 
 class TestEmployerCoverage:
@@ -40,7 +41,6 @@ class TestEmployerCoverage:
         with patch("database.get_user_by_id", side_effect=[employer, seeker]), patch(
             "database.execute_query", return_value=None
         ):  # Vacancy not found
-
             handler.handle_invitation_callback(call)
 
             # Should still send invitation but with default text
@@ -68,7 +68,6 @@ class TestEmployerCoverage:
         ), patch(
             "logging.error"
         ) as mock_log:
-
             handler.handle_employer_chats(message)
             mock_log.assert_called()
 
@@ -189,31 +188,21 @@ class TestEmployerCoverage:
             handler.bot.send_message.assert_called()
             assert "Слишком короткое" in handler.bot.send_message.call_args[0][1]
 
-    def test_register(self, handler, bot):
-        """Test registration of handlers and filters"""
-        # Mock translations to test lambdas
-        with patch(
-            "handlers.employer.get_all_translations", return_value=["Test Button"]
-        ):
-            handler.register(bot)
-
-            assert bot.register_message_handler.call_count >= 3
-
-            # Проверяем работу лямбда-фильтра для handle_create_vacancy
-            found = False
-            for call in bot.register_message_handler.call_args_list:
-                handler_func = call[0][0]
-                kwargs = call[1]
-                if handler_func == handler.handle_create_vacancy:
-                    filter_func = kwargs.get("func")
-                    if filter_func:
-                        msg = MagicMock()
-                        msg.text = "Test Button"
-                        assert filter_func(msg) is True
-                        msg.text = "Wrong"
-                        assert filter_func(msg) is False
-                        found = True
-            assert found
+    def test_register(self, handler):
+        """Test registration of routes"""
+        with patch("router.get_all_translations", return_value=["Test Button"]):
+            router = Router()
+            handler.register(router)
+
+        msg = MagicMock()
+        msg.text = "Test Button"
+        assert router.resolve_message(msg) == handler.handle_create_vacancy
+        msg.text = "Wrong"
+        assert router.resolve_message(msg) is None
+        assert (
+            router.resolve_callback("match_vac_5") == handler.handle_my_vacancy_actions
+        )
+        assert router.resolve_callback("confirm_del_5") == handler.handle_confirm_delete
 
     def test_handle_cancel_delete(self, handler, call):
         """Test cancel delete action"""
@@ -384,19 +373,17 @@ class TestEmployerCoverage:
 
         with patch("database.get_user_by_id", return_value=user_data), patch(
             "database.get_employer_vacancies", return_value=vacancies
-        ), patch(
-            "handlers.employer_vacancy.get_text_by_lang", side_effect=lambda k, l: k
-        ):
-
+        ), patch("cards.get_text_by_lang", side_effect=lambda k, l: k):
             handler.handle_my_vacancies(message)
 
             handler.bot.send_message.assert_called()
+            # Поля карточки экранируются для Markdown
             text = handler.bot.send_message.call_args[0][1]
-            assert "prof_dev" in text
-            assert "job_type_remote" in text
-            assert "gender_male" in text
-            assert "lang_en" in text
-            assert "level_b2" in text
+            assert "prof\\_dev" in text
+            assert "job\\_type\\_remote" in text
+            assert "gender\\_male" in text
+            assert "lang\\_en" in text
+            assert "level\\_b2" in text
 
     def test_process_vacancy_type_gender_patch(self, handler, message):
         """Test that gender is patched after vacancy creation"""
@@ -413,7 +400,6 @@ class TestEmployerCoverage:
         ), patch(
             "handlers.employer_vacancy.get_text_by_lang", side_effect=lambda k, l: k
         ):
-
             # Mock finding the last vacancy
             mock_query.side_effect = [
                 {"id": 99},
@@ -442,7 +428,6 @@ class TestEmployerCoverage:
         ) as mock_ask, patch(
             "handlers.employer_vacancy.get_text_by_lang", side_effect=lambda k, l: k
         ):
-
             handler.process_vacancy_language_selection(message)
 
             mock_ask.assert_called()
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+import database
 from handlers.employer import EmployerHandlers
 
 
@@ -49,6 +50,9 @@ class TestEmployerHandlers:
         ), patch(
             "handlers.employer_responses.get_text_by_lang",
             side_effect=lambda key, lang: key,
+        ), patch(
+            "cards.get_text_by_lang",
+            side_effect=lambda key, lang: key,
         ):
             yield
 
@@ -486,32 +490,44 @@ class TestEmployerHandlers:
             handler.bot.send_message.assert_called()
 
     def test_handle_vacancy_responses(self, handler):
-        """Тест просмотра откликов на вакансию"""
+        """Тест просмотра откликов на вакансию: одна страница одним сообщением"""
         call = MagicMock()
         call.data = "responses_vac_101"
         call.message.chat.id = 123
 
         applicants = [
             {
+                "application_id": 7,
+                "application_status": "pending",
+                "applied_at": "2024-05-01 10:00:00",
                 "full_name": "Applicant One",
                 "age": 30,
                 "city": "Tashkent",
                 "profession": "Tester",
-                "education": "None",
-                "experience": "None",
-                "skills": "None",
                 "telegram_id": 999,
             }
         ]
+        counts = {"pending": 1, "accepted": 0, "rejected": 0, "total": 1}
 
-        with patch("database.execute_query", return_value=applicants):
+        with patch(
+            "handlers.employer_responses.get_owned_vacancy",
+            return_value={"id": 101, "title": "Dev"},
+        ), patch(
+            "handlers.employer_responses.get_application_counts", return_value=counts
+        ), patch(
+            "handlers.employer_responses.get_applicants_page",
+            return_value=(applicants, False),
+        ):
             handler.handle_vacancy_responses(call, 101)
 
-            # Заголовок + карточка
-            assert handler.bot.send_message.call_count == 2
-            card_text = handler.bot.send_message.call_args[0][1]
-            assert "Applicant One" in card_text
-            assert "Tester" in card_text
+            handler.bot.send_message.assert_called_once()
+            page_text = handler.bot.send_message.call_args[0][1]
+            assert "Applicant One" in page_text
+            assert "Tester" in page_text
+            markup = handler.bot.send_message.call_args[1]["reply_markup"]
+            callbacks = [b.callback_data for row in markup.keyboard for b in row]
+            assert "apc_7" in callbacks
+            assert "aps_7_y_101_a_0" in callbacks
 
     def test_handle_employer_chats(self, handler, message):
         """Тест просмотра чатов работодателя"""
@@ -589,7 +605,13 @@ class TestEmployerHandlers:
         call.data = "responses_vac_101"
         call.message.chat.id = 123
 
-        with patch("database.execute_query", return_value=[]):
+        with patch(
+            "handlers.employer_responses.get_owned_vacancy",
+            return_value={"id": 101, "title": "Dev"},
+        ), patch(
+            "handlers.employer_responses.get_application_counts",
+            return_value={"total": 0},
+        ):
             handler.handle_vacancy_responses(call, 101)
             handler.bot.send_message.assert_called_with(
                 123, "📭 На эту вакансию пока нет откликов."
@@ -670,28 +692,21 @@ class TestEmployerHandlers:
             handler.bot.send_message.assert_called()
             assert "select_from_list" in handler.bot.send_message.call_args[0][1]
 
-    def test_handle_vacancy_responses_item_error(self, handler):
-        """Тест ошибки при обработке одного отклика"""
+    def test_handle_vacancy_responses_foreign_vacancy(self, handler):
+        """Отклики на чужую вакансию не показываются"""
         call = MagicMock()
         call.data = "responses_vac_101"
         call.message.chat.id = 123
 
-        # Один нормальный, один вызывающий ошибку
-        bad_applicant = MagicMock()
-        bad_applicant.get.side_effect = Exception("Data Error")
-
-        applicants = [{"full_name": "Good", "telegram_id": 1}, bad_applicant]
-
-        with patch("database.execute_query", return_value=applicants), patch(
-            "logging.error"
-        ) as mock_log:
-
+        with patch(
+            "handlers.employer_responses.get_owned_vacancy", return_value=None
+        ), patch("handlers.employer_responses.get_applicants_page") as page:
             handler.handle_vacancy_responses(call, 101)
 
-            # Должен отправить сообщение об ошибке
-            handler.bot.send_message.assert_called()
-            # Проверяем, что залогировано
-            mock_log.assert_called()
+            page.assert_not_called()
+            handler.bot.send_message.assert_called_with(
+                123, "📭 На эту вакансию пока нет откликов."
+            )
 
     def test_handle_employer_chats_item_error(self, handler, message):
         """Тест ошибки при обработке одного чата"""
@@ -781,12 +796,13 @@ class TestEmployerHandlers:
     def test_process_candidate_filter_choice_city(self, handler, message):
         """Фильтр кандидатов: Выбрать город"""
         message.text = "🏙 Выбрать город"
-        msg = MagicMock()
-        handler.bot.send_message.return_value = msg
+        database.set_user_state(456, {"language_code": "uz"})
         handler.process_candidate_filter_choice(message)
-        handler.bot.register_next_step_handler.assert_called_with(
-            msg, handler.process_candidate_region_choice
-        )
+        assert database.get_user_state(456) == {
+            "language_code": "uz",
+            "step": "search_candidate_region",
+        }
+        handler.bot.register_next_step_handler.assert_not_called()
 
     def test_process_candidate_filter_choice_all(self, handler, message):
         """Фильтр кандидатов: Все (по умолчанию)"""
@@ -805,31 +821,38 @@ class TestEmployerHandlers:
     def test_process_candidate_region_choice_valid(self, handler, message):
         """Выбор региона: Валидный"""
         message.text = "Ташкентская обл."
-        msg = MagicMock()
-        handler.bot.send_message.return_value = msg
-        handler.process_candidate_region_choice(message)
-        handler.bot.register_next_step_handler.assert_called_with(
-            msg, handler.process_candidate_city_choice
+        # Язык гостя хранится в состоянии и не теряется при выборе города
+        database.set_user_state(
+            456, {"language_code": "uz", "step": "search_candidate_region"}
         )
+        handler.process_candidate_region_choice(message)
+        assert database.get_user_state(456) == {
+            "language_code": "uz",
+            "step": "search_candidate_city",
+            "region": "Ташкентская обл.",
+        }
+
+        message.text = "Ташкент"
+        with patch.object(handler, "show_candidates"):
+            handler.process_candidate_city_choice(message)
+        assert database.get_user_state(456) == {"language_code": "uz"}
 
     def test_process_candidate_region_choice_invalid(self, handler, message):
         """Выбор региона: Невалидный"""
         message.text = "Invalid"
-        # Рекурсивный вызов process_candidate_filter_choice
-        with patch.object(handler, "process_candidate_filter_choice") as mock_filter:
+        with patch.object(handler, "_ask_candidate_region") as mock_ask:
             handler.process_candidate_region_choice(message)
             handler.bot.send_message.assert_called()
-            mock_filter.assert_called()
+            mock_ask.assert_called_with(message)
 
     def test_process_candidate_city_choice_back(self, handler, message):
         """Выбор города: Назад"""
         message.text = "⬅️ Назад"
-        msg = MagicMock()
-        handler.bot.send_message.return_value = msg
-        handler.process_candidate_city_choice(message)
-        handler.bot.register_next_step_handler.assert_called_with(
-            msg, handler.process_candidate_region_choice
+        database.set_user_state(
+            456, {"step": "search_candidate_city", "region": "Ташкентская обл."}
         )
+        handler.process_candidate_city_choice(message)
+        assert database.get_user_state(456) == {"step": "search_candidate_region"}
 
     def test_process_candidate_city_choice_valid(self, handler, message):
         """Выбор города: Валидный"""
@@ -959,24 +982,27 @@ class TestEmployerHandlers:
             handler.bot.send_message.assert_called()
             assert "Выберите вакансию" in handler.bot.send_message.call_args[0][1]
 
-    def test_handle_vacancy_responses_formatting(self, handler, call):
-        """Тест форматирования данных соискателя в откликах"""
-        call.data = "responses_vac_100"
-        applicants = [
-            {
-                "full_name": "App",
-                "age": 20,
-                "gender": "male",
-                "languages": '[{"lang_key": "lang_en", "level_key": "level_b2"}]',
-                "profession": "prof_dev",
-            }
-        ]
+    def test_handle_applicant_card_formatting(self, handler, call):
+        """Тест форматирования данных соискателя в полной карточке отклика"""
+        call.data = "apc_7"
+        applicant = {
+            "application_id": 7,
+            "vacancy_id": 100,
+            "full_name": "App",
+            "age": 20,
+            "gender": "male",
+            "languages": '[{"lang_key": "lang_en", "level_key": "level_b2"}]',
+            "profession": "prof_dev",
+            "telegram_id": 999,
+        }
 
-        with patch("database.execute_query", return_value=applicants):
-            handler.handle_vacancy_responses(call, 100)
+        with patch(
+            "handlers.employer_responses.get_applicant", return_value=applicant
+        ):
+            handler.handle_applicant_card_callback(call)
 
-            handler.bot.send_message.assert_called()
-            text = handler.bot.send_message.call_args_list[1][0][1]
+            handler.bot.send_message.assert_called_once()
+            text = handler.bot.send_message.call_args[0][1]
             assert (
                 "gender\\_male" in text
             )  # Mocked get_text returns key, which is then escaped
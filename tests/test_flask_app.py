@@ -25,3 +25,38 @@ with patch("config.Config.TOKEN", "test_token"), patch(
 @pytest.fixture
 def mock_bot():
     return _mock_bot_instance
+
+
+def test_webhook_requires_secret_and_returns_immediately(mock_bot):
+    import flask_app as module
+    from webhook import SECRET_HEADER, webhook_secret
+
+    client = flask_app.test_client()
+    body = json.dumps({"update_id": 424242})
+    assert (
+        client.post(
+            "/test_token",
+            data=body,
+            content_type="application/json",
+            headers={SECRET_HEADER: "wrong"},
+        ).status_code
+        == 403
+    )
+    # С явным WEBHOOK_SECRET заголовок обязателен
+    with patch("config.Config.WEBHOOK_SECRET", "s3cret"):
+        assert (
+            client.post(
+                "/test_token", data=body, content_type="application/json"
+            ).status_code
+            == 403
+        )
+
+    response = client.post(
+        "/test_token",
+        data=body,
+        content_type="application/json",
+        headers={SECRET_HEADER: webhook_secret()},
+    )
+    assert response.status_code == 200
+    module.ingestor.stop(timeout=5)
+    mock_bot.process_new_updates.assert_called_once()
@@ -52,6 +52,7 @@ class TestKeyboards:
         texts = {btn["text"] for row in markup.keyboard for btn in row}
         assert "menu_find_vacancies" in texts
         assert "menu_my_resume" in texts
+        assert "menu_saved_searches" in texts
         assert "menu_logout" in texts
 
     def test_employer_main_menu(self):
@@ -159,6 +160,7 @@ class TestKeyboards:
         assert buttons[0].callback_data == "edit_vac_456"
         assert buttons[1].callback_data == "delete_vac_456"
         assert buttons[2].callback_data == "responses_vac_456"
+        assert markup.keyboard[1][0].callback_data == "match_vac_456"
 
     def test_delete_confirmation_keyboard(self):
         markup = keyboards.delete_confirmation_keyboard(789)
@@ -211,3 +213,49 @@ class TestKeyboards:
     def test_user_reply_keyboard(self):
         markup = keyboards.user_reply_keyboard(admin_id=999)
         assert markup.keyboard[0][0].callback_data == "reply_admin_999"
+
+
+class TestKeyboardRegistry:
+    def test_static_keyboards_are_shared(self):
+        markup = keyboards.seeker_main_menu(lang="en")
+        assert keyboards.seeker_main_menu("en") is markup
+        assert keyboards.seeker_main_menu(lang="ru") is not markup
+        assert keyboards.settings_menu("seeker", "uz") is keyboards.settings_menu(
+            role="seeker", lang="uz"
+        )
+        # JSON сериализован заранее, общий объект изменить нельзя
+        assert markup.to_json() == markup._json
+        with pytest.raises(TypeError):
+            markup.row("Лишняя кнопка")
+
+    def test_seeker_submenu_uses_two_variants(self):
+        assert keyboards.seeker_submenu("skills", "Python") is keyboards.seeker_submenu(
+            "experience", "5 лет"
+        )
+        assert keyboards.seeker_submenu("skills", None) is keyboards.seeker_submenu(
+            "skills", "Не указаны"
+        )
+
+    def test_warm_keyboards(self):
+        count = keyboards.warm_keyboards(["ru", "en"])
+        assert count > 30
+        assert ("en",) in keyboards.main_menu.cache
+        assert ("employer", "ru") in keyboards.settings_menu.cache
+
+    @pytest.mark.parametrize(
+        "builder, args, kwargs",
+        [
+            (keyboards.vacancy_actions, (5,), {"lang": "en"}),
+            (keyboards.my_vacancy_actions, (12,), {}),
+            (keyboards.employer_invite_keyboard, (7, None), {"lang": "uz"}),
+            (keyboards.employer_invite_keyboard, (7, 9), {}),
+            (keyboards.admin_user_action_keyboard, (3, True), {}),
+            (keyboards.block_duration_keyboard, (4,), {}),
+        ],
+    )
+    def test_inline_templates_match_builders(self, builder, args, kwargs):
+        expected = builder(*args, **kwargs).to_json()
+        assert builder.json(*args, **kwargs) == expected
+        # Повторный рендер из готового шаблона
+        other = (args[0] + 100,) + args[1:]
+        assert builder.json(*other, **kwargs) == builder(*other, **kwargs).to_json()
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import localization
+from localization import (
+    JOB_TYPE_KEYS,
+    TRANSLATIONS,
+    get_text_by_lang,
+    key_for_text,
+    normalize_job_type,
+    validate_translations,
+)
+
+
+class TestReverseIndex:
+    def test_every_translation_resolves_to_its_key(self):
+        for lang in TRANSLATIONS:
+            for key in JOB_TYPE_KEYS:
+                text = get_text_by_lang(key, lang)
+                assert key_for_text(text, prefix="job_type_") == key
+                assert key_for_text(text, lang=lang) == key
+
+    def test_language_and_level_buttons(self):
+        assert key_for_text("🇬🇧 Английский", prefix="lang_name_") == "lang_name_en"
+        assert key_for_text("🇷🇺 Rus", prefix="lang_name_") == "lang_name_ru"
+        assert key_for_text("Fluent", prefix="level_") == "level_fluent"
+        assert key_for_text("Fluent", prefix="lang_name_") is None
+        assert key_for_text("Неизвестно") is None
+        assert key_for_text(None) is None
+
+    def test_normalize_job_type(self):
+        assert normalize_job_type("job_type_remote") == "job_type_remote"
+        for lang in TRANSLATIONS:
+            text = get_text_by_lang("job_type_part_time", lang)
+            assert normalize_job_type(text) == "job_type_part_time"
+        # Произвольный текст старых вакансий остается как есть
+        assert normalize_job_type("Вахта") == "Вахта"
+        assert normalize_job_type(None) is None
+
+
+class TestValidateTranslations:
+    def test_reports_missing_and_ambiguous(self):
+        translations = {
+            "ru": {"job_type_remote": "Удаленно", "job_type_part_time": "Удаленно"},
+            "en": {"job_type_remote": "Remote"},
+        }
+        with patch.dict(localization.TRANSLATIONS, translations, clear=True):
+            localization.build_reverse_index()
+            report = validate_translations()
+        localization.build_reverse_index()
+
+        assert report["missing"] == {"en": ["job_type_part_time"]}
+        assert report["ambiguous"]["Удаленно"] == [
+            "job_type_part_time",
+            "job_type_remote",
+        ]
+
+    def test_shipped_locales_have_no_ambiguous_lookups(self):
+        assert validate_translations()["ambiguous"] == {}
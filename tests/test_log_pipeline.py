@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from unittest.mock import patch
+
+from bot_factory import JSONFormatter
+from log_pipeline import LogPipeline, SamplingFilter, parse_rate_limits
+
+
+class ListHandler(logging.Handler):
+    """Обработчик, собирающий отформатированные записи; может «зависнуть»"""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.gate = gate
+        self.lines = []
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.lines.append(self.format(record))
+
+
+def _record(name="database.users", level=logging.INFO, lineno=10, msg="msg"):
+    return logging.LogRecord(name, level, "users.py", lineno, msg, None, None)
+
+
+class TestSamplingFilter:
+    def test_limit_then_sample_and_report_skipped(self):
+        sampling = SamplingFilter(limit=5, period=60, sample_every=10)
+
+        with patch("log_pipeline.time.monotonic", return_value=0.0):
+            passed = [sampling.filter(_record()) for _ in range(25)]
+        assert sum(passed) == 7  # 5 в лимите + каждая 10-я сверх него
+        assert sampling.suppressed == 18
+        # Другое место в коде считается отдельно
+        assert sampling.filter(_record(lineno=11))
+
+        record = _record()
+        with patch("log_pipeline.time.monotonic", return_value=61.0):
+            assert sampling.filter(record)
+        assert record.getMessage() == "msg (пропущено похожих записей: 18)"
+
+    def test_logger_limits_and_critical(self):
+        sampling = SamplingFilter(
+            limit=1, period=60, sample_every=0, limits=parse_rate_limits("root=0,x=bad")
+        )
+
+        assert all(sampling.filter(_record(name="root")) for _ in range(5))
+        assert sampling.filter(_record())
+        assert not sampling.filter(_record())
+        assert sampling.filter(_record(level=logging.CRITICAL))
+
+
+class TestLogPipeline:
+    def test_slow_disk_never_blocks_logging(self):
+        release = threading.Event()
+        target = ListHandler(release)
+        pipeline = LogPipeline([target], queue_size=2)
+        pipeline.start()
+        log = logging.getLogger("test.log_pipeline.slow")
+        log.propagate = False
+        log.addHandler(pipeline.handler)
+
+        start = time.perf_counter()
+        for i in range(50):
+            log.warning("запись %s", i)
+        elapsed = time.perf_counter() - start
+
+        release.set()
+        pipeline.stop()
+        log.removeHandler(pipeline.handler)
+
+        assert elapsed < 1
+        assert pipeline.handler.dropped > 0
+        assert target.lines[0] == "запись 0"
+        assert any("отброшено записей" in line for line in target.lines)
+
+    def test_json_and_exception_formatted_on_listener(self):
+        target = ListHandler()
+        target.setFormatter(JSONFormatter())
+        pipeline = LogPipeline([target])
+        pipeline.start()
+        log = logging.getLogger("test.log_pipeline.json")
+        log.propagate = False
+        log.addHandler(pipeline.handler)
+
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.error("ошибка %s", "БД", exc_info=True)
+        pipeline.stop()
+        log.removeHandler(pipeline.handler)
+
+        assert '"message": "ошибка БД"' in target.lines[0]
+        assert "ValueError: boom" in target.lines[0]
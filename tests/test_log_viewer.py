@@ -0,0 +1,187 @@
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import log_viewer
+from handlers.admin import AdminHandlers
+from log_viewer import (
+    LogIndex,
+    LogQuery,
+    iter_lines_backwards,
+    parse_log_args,
+    search_logs,
+)
+
+
+def _line(minute, level="INFO", name="bot", message="ok"):
+    return json.dumps(
+        {
+            "time": f"2024-05-01 10:{minute:02d}:00,000",
+            "level": level,
+            "name": name,
+            "message": message,
+        },
+        ensure_ascii=False,
+    )
+
+
+@pytest.fixture
+def rotated_logs(tmp_path, monkeypatch):
+    """Текущий лог и две ротированные копии: минуты 0-19, 20-39, 40-59"""
+    monkeypatch.setattr(log_viewer, "INDEX_CHUNK", 512)
+    path = tmp_path / "bot.json.log"
+    for suffix, minutes in [
+        (".2", range(0, 20)),
+        (".1", range(20, 40)),
+        ("", range(40, 60)),
+    ]:
+        lines = [
+            _line(
+                m,
+                "ERROR" if m % 10 == 0 else "INFO",
+                "database.core" if m % 10 == 0 else "bot",
+                f"user {1000 + m}",
+            )
+            for m in minutes
+        ]
+        (tmp_path / f"bot.json.log{suffix}").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+    return str(path)
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class TestReadBackwards:
+    def test_lines_and_offsets_across_blocks(self, monkeypatch):
+        monkeypatch.setattr(log_viewer, "BLOCK_SIZE", 7)
+        data = b"first\nsecond line\n\nthird\r\nlast"
+
+        lines = list(iter_lines_backwards(io.BytesIO(data), len(data)))
+
+        assert [line for _, line in lines] == [
+            b"last",
+            b"third",
+            b"second line",
+            b"first",
+        ]
+        assert all(data[offset:].startswith(line) for offset, line in lines)
+
+    def test_tail_reads_only_the_end(self):
+        data = b"".join(_line(i % 60).encode() + b"\n" for i in range(20000))
+        f = CountingFile(data)
+
+        lines = []
+        for _, line in iter_lines_backwards(f, len(data)):
+            lines.append(line)
+            if len(lines) == 15:
+                break
+
+        assert len(data) > 1_000_000
+        assert f.bytes_read <= log_viewer.BLOCK_SIZE
+
+
+class TestSearchLogs:
+    def test_filters_and_pages_across_rotated_files(self, rotated_logs):
+        query = LogQuery(level="ERROR", logger="database")
+
+        page, cursor = search_logs(rotated_logs, query, 4)
+        rest, end = search_logs(rotated_logs, query, 4, cursor)
+
+        minutes = [json.loads(line)["time"][14:16] for line in page + rest]
+        assert minutes == ["50", "40", "30", "20", "10", "00"]
+        assert end is None
+
+    def test_user_and_time_range(self, rotated_logs):
+        query = parse_log_args(
+            ["user=1025", "since=2024-05-01T10:20", "until=2024-05-01T10:30"]
+        ).query
+
+        lines, _ = search_logs(rotated_logs, query, 10)
+
+        assert [json.loads(line)["message"] for line in lines] == ["user 1025"]
+
+    def test_index_skips_chunks_and_survives_rotation(self, rotated_logs, tmp_path):
+        query = LogQuery(level="ERROR")
+        checked = []
+        original = LogQuery.matches
+
+        def counting(self, line):
+            checked.append(line)
+            return original(self, line)
+
+        with patch.object(LogQuery, "matches", counting):
+            search_logs(rotated_logs, query, 100)
+        assert len(checked) < 60
+        assert os.path.exists(rotated_logs + ".idx")
+
+        # Ротация: файлы сдвигаются, индекс старых копий остается верным
+        os.rename(tmp_path / "bot.json.log.2", tmp_path / "bot.json.log.3")
+        os.rename(tmp_path / "bot.json.log.1", tmp_path / "bot.json.log.2")
+        os.rename(rotated_logs, tmp_path / "bot.json.log.1")
+        (tmp_path / "bot.json.log").write_text(
+            _line(59, "ERROR") + "\n", encoding="utf-8"
+        )
+
+        with patch.object(
+            LogIndex, "_extend", side_effect=lambda path, entry: None
+        ) as extend:
+            lines, _ = search_logs(rotated_logs, query, 100)
+        assert extend.call_count == 1  # Только новый файл
+        assert len(lines) == 7
+
+    def test_parse_args(self):
+        now = datetime(2024, 5, 1, 12, 0, 0)
+
+        request = parse_log_args(["50", "level=warn", "since=2h", "file"], now)
+
+        assert request.count == 50 and request.as_file
+        assert request.query == LogQuery(level="WARNING", since="2024-05-01 10:00:00")
+        with pytest.raises(ValueError):
+            parse_log_args(["level=loud"], now)
+
+
+class TestLogsCommand:
+    def _admin(self, text="/logs"):
+        message = MagicMock()
+        message.from_user.id = 123456
+        message.chat.id = 123456
+        message.text = text
+        return message
+
+    def test_older_page_and_file_export(self, rotated_logs, monkeypatch):
+        monkeypatch.setenv("LOG_FILE", rotated_logs)
+        handler = AdminHandlers(MagicMock())
+
+        handler.handle_logs(self._admin("/logs 2 level=ERROR"))
+        first = handler.bot.reply_to.call_args[0][1]
+        assert "10:50:00" in first and "10:40:00" in first
+
+        call = MagicMock()
+        call.from_user.id = 123456
+        call.data = "admin_logs_older"
+        handler.handle_admin_callbacks(call)
+        older = handler.bot.edit_message_text.call_args[0][0]
+        assert "10:30:00" in older and "10:20:00" in older
+
+        call.data = "admin_logs_file"
+        handler.handle_admin_callbacks(call)
+        document = handler.bot.send_document.call_args[0][1]
+        assert document.name.endswith(".jsonl.gz")
+        lines = gzip.decompress(document.getvalue()).decode().splitlines()
+        assert len(lines) == 6
+        assert json.loads(lines[0])["time"].startswith("2024-05-01 10:00")
@@ -0,0 +1,284 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import database.matching as matching
+from handlers.employer import EmployerHandlers
+
+EN_FLUENT = json.dumps([{"lang_key": "lang_name_en", "level_key": "level_fluent"}])
+
+
+def _add_employer(conn, city="Ташкент"):
+    conn.execute(
+        "INSERT INTO employers (id, telegram_id, company_name, phone, email, password_hash, contact_person, city) "
+        "VALUES (1, 500, 'Comp', '998901234567', 'e@mail.com', 'hash', 'Contact', ?)",
+        (city,),
+    )
+
+
+def _add_seeker(conn, idx, **fields):
+    row = {
+        "telegram_id": 1000 + idx,
+        "phone": f"+99890{idx:07d}",
+        "email": f"s{idx}@test.uz",
+        "password_hash": "hash",
+        "full_name": f"Seeker {idx}",
+        "age": 25,
+        "gender": "male",
+        "city": "Самарканд",
+        "profession": "prof_cook",
+        "languages": "Не указаны",
+        "status": "active",
+    }
+    row.update(fields)
+    cols = ", ".join(row.keys())
+    placeholders = ", ".join("?" for _ in row)
+    conn.execute(
+        f"INSERT INTO job_seekers ({cols}) VALUES ({placeholders})", tuple(row.values())
+    )
+
+
+class TestCandidateQuery:
+    def test_parse_required_languages(self):
+        assert matching.parse_required_languages(EN_FLUENT) == [
+            {"lang_key": "lang_name_en", "level_key": "level_fluent"}
+        ]
+        assert matching.parse_required_languages("Не имеет значения") == []
+        assert matching.parse_required_languages("[broken") == []
+        assert matching.parse_required_languages(None) == []
+
+    def test_language_patterns_cover_higher_levels(self):
+        covering, any_level = matching._language_like_patterns(
+            {"lang_key": "lang_name_en", "level_key": "level_fluent"}
+        )
+        assert len(covering) == 2
+        assert any("level_proficient" in p for p in covering)
+        assert not any("level_basic" in p for p in covering)
+        assert any_level == '%"lang_key": "lang_name_en"%'
+
+    def test_query_uses_sphere_for_known_profession(self):
+        query, params = matching.build_candidate_query(
+            {"title": "prof_backend", "city": "Ташкент", "gender": "any"}
+        )
+        assert "prof_frontend" in params
+        assert "match_score" in query
+        assert params[-1] == matching.SHORTLIST_LIMIT
+
+
+class TestRankedCandidates:
+    def test_ranking_order(self, test_db):
+        _add_seeker(
+            test_db,
+            1,
+            profession="prof_backend",
+            city="Ташкент",
+            gender="female",
+            languages=json.dumps(
+                [{"lang_key": "lang_name_en", "level_key": "level_proficient"}]
+            ),
+        )
+        _add_seeker(
+            test_db,
+            2,
+            profession="prof_backend",
+            city="Ташкент",
+            languages=json.dumps(
+                [{"lang_key": "lang_name_en", "level_key": "level_basic"}]
+            ),
+        )
+        _add_seeker(test_db, 3, profession="prof_frontend")
+        _add_seeker(test_db, 4, profession="prof_cook", city="Ташкент")
+        # Не проходят предварительный отбор
+        _add_seeker(test_db, 5, profession="prof_backend", status="inactive")
+        _add_seeker(test_db, 6, profession="prof_cook", city="Бухара")
+
+        vacancy = {
+            "title": "prof_backend",
+            "city": "Ташкент",
+            "gender": "female",
+            "languages": EN_FLUENT,
+        }
+        result = matching.get_ranked_candidates(vacancy)
+
+        assert [r["telegram_id"] for r in result] == [1001, 1002, 1004, 1003]
+        assert result[0]["match_score"] == 100
+        # профессия 40 + половина языков 15 + город 20
+        assert result[1]["match_score"] == 75
+
+    def test_custom_language_with_cyrillic_name(self, test_db):
+        # Профиль сохраняется через json.dumps без ensure_ascii=False
+        _add_seeker(
+            test_db,
+            1,
+            profession="prof_cook",
+            languages=json.dumps(
+                [{"lang_name": "Корейский", "level_key": "level_fluent"}]
+            ),
+        )
+        _add_seeker(
+            test_db,
+            2,
+            profession="prof_cook",
+            languages=json.dumps(
+                [{"lang_name": "Корейский", "level_key": "level_basic"}]
+            ),
+        )
+        _add_seeker(test_db, 3, profession="prof_cook")
+        vacancy = {
+            "title": "prof_cook",
+            "city": "Ташкент",
+            "languages": json.dumps(
+                [{"lang_name": "Корейский", "level_key": "level_practical"}],
+                ensure_ascii=False,
+            ),
+        }
+        scores = {
+            r["telegram_id"]: r["match_score"]
+            for r in matching.get_ranked_candidates(vacancy)
+        }
+        # профессия 40 + языки 30 / 15 / 0 + пол 10
+        assert scores == {1001: 80, 1002: 65, 1003: 50}
+
+    def test_vacancy_without_requirements(self, test_db):
+        _add_seeker(test_db, 1, profession="Бариста", city="Нукус", gender=None)
+        result = matching.get_ranked_candidates(
+            {"title": "Бариста", "city": "Нукус", "languages": "Не имеет значения"}
+        )
+        assert len(result) == 1
+        assert result[0]["match_score"] == 100
+
+    def test_get_vacancy_for_matching_uses_employer_city(self, test_db):
+        _add_employer(test_db, city="Фергана")
+        test_db.execute(
+            "INSERT INTO vacancies (id, employer_id, title, description) VALUES (7, 1, 'prof_cook', 'Desc')"
+        )
+        vacancy = matching.get_vacancy_for_matching(7)
+        assert vacancy["city"] == "Фергана"
+        assert vacancy["employer_telegram_id"] == 500
+        assert matching.get_vacancy_for_matching(999) is None
+
+    def test_db_error_returns_empty_list(self):
+        with patch("database.matching.execute_query", side_effect=Exception("DB")):
+            assert matching.get_ranked_candidates({"title": "x"}) == []
+
+    def test_shortlist_performance(self, test_db):
+        """Подбор из 100k соискателей укладывается в 100 мс"""
+        professions = [
+            "prof_backend",
+            "prof_frontend",
+            "prof_cook",
+            "prof_driver",
+            "prof_teacher",
+            "prof_nurse",
+        ]
+        cities = ["Ташкент", "Ташкент", "Самарканд", "Бухара", "Нукус"]
+        levels = matching.LANGUAGE_LEVELS
+        rows = [
+            (
+                i,
+                f"p{i}",
+                f"e{i}",
+                "h",
+                f"N{i}",
+                "female" if i % 2 else "male",
+                25,
+                cities[i % len(cities)],
+                professions[i % len(professions)],
+                json.dumps(
+                    [{"lang_key": "lang_name_en", "level_key": levels[i % len(levels)]}]
+                ),
+                "active" if i % 4 else "inactive",
+            )
+            for i in range(100_000)
+        ]
+        test_db.executemany(
+            "INSERT INTO job_seekers (telegram_id, phone, email, password_hash, full_name, gender, "
+            "age, city, profession, languages, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        vacancy = {
+            "title": "prof_backend",
+            "city": "Ташкент",
+            "gender": "female",
+            "languages": EN_FLUENT,
+        }
+
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            result = matching.get_ranked_candidates(vacancy)
+            best = min(best, time.perf_counter() - start)
+
+        print(f"\nShortlist over 100k seekers: {best * 1000:.1f} ms")
+        assert len(result) == matching.SHORTLIST_LIMIT
+        assert best < 0.1
+
+
+class TestVacancyCandidatesHandler:
+    @pytest.fixture
+    def handler(self):
+        return EmployerHandlers(MagicMock())
+
+    @pytest.fixture
+    def call(self):
+        c = MagicMock()
+        c.id = "call_id"
+        c.from_user.id = 500
+        c.message.chat.id = 500
+        c.data = "match_vac_7"
+        return c
+
+    @pytest.fixture(autouse=True)
+    def mock_i18n(self):
+        with patch(
+            "handlers.employer_search.get_user_language", return_value="ru"
+        ), patch(
+            "handlers.employer_search.get_text_by_lang",
+            side_effect=lambda key, lang: key,
+        ):
+            yield
+
+    def test_routed_from_vacancy_actions(self, handler, call):
+        with patch.object(handler, "handle_vacancy_candidates") as mock_match:
+            handler.handle_my_vacancy_actions(call)
+            mock_match.assert_called_once_with(call, 7)
+
+    def test_foreign_vacancy_rejected(self, handler, call):
+        vacancy = {"id": 7, "title": "prof_cook", "employer_telegram_id": 999}
+        with patch("database.get_vacancy_for_matching", return_value=vacancy), patch(
+            "database.get_ranked_candidates"
+        ) as mock_rank:
+            handler.handle_vacancy_candidates(call, 7)
+            mock_rank.assert_not_called()
+            handler.bot.answer_callback_query.assert_called_with(
+                "call_id", "vacancy_not_found"
+            )
+
+    def test_empty_shortlist(self, handler, call):
+        vacancy = {"id": 7, "title": "prof_cook", "employer_telegram_id": 500}
+        with patch("database.get_vacancy_for_matching", return_value=vacancy), patch(
+            "database.get_ranked_candidates", return_value=[]
+        ):
+            handler.handle_vacancy_candidates(call, 7)
+            assert handler.bot.send_message.call_args[0][1] == "shortlist_empty"
+
+    def test_cards_invite_for_vacancy(self, handler, call):
+        vacancy = {"id": 7, "title": "prof_cook", "employer_telegram_id": 500}
+        seeker = {
+            "telegram_id": 1001,
+            "full_name": "Ivan",
+            "profession": "prof_cook",
+            "match_score": 87.5,
+        }
+        with patch("database.get_vacancy_for_matching", return_value=vacancy), patch(
+            "database.get_ranked_candidates", return_value=[seeker]
+        ):
+            handler.handle_vacancy_candidates(call, 7)
+
+        assert handler.bot.send_message.call_count == 2
+        card_call = handler.bot.send_message.call_args_list[1]
+        assert "88%" in card_call[0][1]
+        markup = json.loads(card_call[1]["reply_markup"])
+        assert markup["inline_keyboard"][0][0]["callback_data"] == "invite_1001_7"
@@ -0,0 +1,182 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from prometheus_client import CollectorRegistry
+from telebot.apihelper import ApiTelegramException
+
+import middleware
+import outbound
+from cards import card_cache
+from database.core import (
+    add_query_observer,
+    execute_query,
+    query_fingerprint,
+    remove_query_observer,
+)
+from database.state_store import MemoryStateStore
+from metrics import BotMetrics, route_name
+from router import Router
+
+
+@pytest.fixture
+def registry():
+    return CollectorRegistry()
+
+
+@pytest.fixture
+def metrics(registry):
+    return BotMetrics(registry)
+
+
+class Handlers:
+    def handle_ok(self, call):
+        return "ok"
+
+    def handle_fail(self, call):
+        raise ValueError("boom")
+
+
+class TestHandlerMetrics:
+    def test_latency_by_route(self, metrics, registry):
+        handlers = Handlers()
+        router = Router()
+        router.callback("ok_", handlers.handle_ok)
+        router.callback("fail_", handlers.handle_fail)
+        router.metrics = metrics
+
+        for data in ("ok_1", "ok_2"):
+            router.dispatch_callback(MagicMock(data=data))
+        with pytest.raises(ValueError):
+            router.dispatch_callback(MagicMock(data="fail_1"))
+
+        assert route_name(handlers.handle_ok) == "Handlers.handle_ok"
+        assert (
+            registry.get_sample_value(
+                "bot_handler_seconds_count", {"route": "Handlers.handle_ok"}
+            )
+            == 2
+        )
+        assert (
+            registry.get_sample_value(
+                "bot_handler_errors_total", {"route": "Handlers.handle_fail"}
+            )
+            == 1
+        )
+
+
+class TestQueryMetrics:
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        first = query_fingerprint("SELECT * FROM users WHERE id IN (?, ?, ?) LIMIT 10")
+        second = query_fingerprint("SELECT *\n  FROM users WHERE id IN (?) LIMIT 5")
+
+        assert first == second
+        assert first.startswith("select users ")
+        assert query_fingerprint("SELECT * FROM vacancies") != first
+
+    def test_latency_and_errors_by_fingerprint(self, test_db, metrics, registry):
+        add_query_observer(metrics.observe_query)
+        try:
+            execute_query("SELECT COUNT(*) AS cnt FROM vacancies", fetchone=True)
+            with pytest.raises(Exception):
+                execute_query("SELECT * FROM missing_table", suppress_error=True)
+        finally:
+            remove_query_observer(metrics.observe_query)
+        execute_query("SELECT COUNT(*) AS cnt FROM vacancies", fetchone=True)
+
+        ok = query_fingerprint("SELECT COUNT(*) AS cnt FROM vacancies")
+        failed = query_fingerprint("SELECT * FROM missing_table")
+        assert (
+            registry.get_sample_value("bot_db_query_seconds_count", {"query": ok}) == 1
+        )
+        assert registry.get_sample_value("bot_db_errors_total", {"query": failed}) == 1
+
+
+class TestMiddlewareMetrics:
+    def test_updates_blocked_and_mutes(self, metrics, registry):
+        bot = MagicMock()
+        middleware.setup_middleware(bot, metrics=metrics)
+        update = MagicMock(spec=["message", "callback_query"])
+        update.message = None
+        bot.process_new_updates([update])
+
+        message = MagicMock()
+        message.from_user.id = 4242
+        with patch("middleware.check_user_blocked", side_effect=["forever", None]):
+            bot.process_new_messages([message])
+            bot.process_new_messages([message])
+        with patch("middleware.check_user_blocked", return_value=None), patch(
+            "middleware.get_user_language", return_value="ru"
+        ):
+            for _ in range(middleware.RATE_LIMIT + 1):
+                bot.process_new_messages([message])
+        middleware.user_requests.pop(4242, None)
+        middleware.muted_users.pop(4242, None)
+
+        assert (
+            registry.get_sample_value("bot_updates_total", {"type": "callback_query"})
+            == 1
+        )
+        assert (
+            registry.get_sample_value(
+                "bot_blocked_rejections_total", {"type": "message"}
+            )
+            == 1
+        )
+        assert registry.get_sample_value("bot_rate_limit_mutes_total") == 1
+        assert (
+            registry.get_sample_value(
+                "bot_rate_limited_updates_total", {"type": "message"}
+            )
+            == 2
+        )
+
+
+class TestApiMetrics:
+    def test_latency_and_429_by_method(self, metrics, registry):
+        dispatcher = outbound.OutboundDispatcher(global_rate=1000, chat_rate=1000)
+        dispatcher.observers.append(metrics.observe_api)
+        flood = ApiTelegramException(
+            "sendMessage",
+            None,
+            {
+                "error_code": 429,
+                "description": "Too Many Requests",
+                "parameters": {"retry_after": 0.01},
+            },
+        )
+        func = MagicMock(side_effect=[flood, "sent"])
+        func.__name__ = "send_message"
+
+        assert dispatcher.call(1, func, "text") == "sent"
+
+        labels = {"method": "send_message"}
+        assert registry.get_sample_value("bot_api_seconds_count", labels) == 2
+        assert (
+            registry.get_sample_value("bot_api_errors_total", {**labels, "code": "429"})
+            == 1
+        )
+
+
+class TestRuntimeCollector:
+    def test_caches_and_states_read_on_scrape(self, metrics, registry):
+        misses = card_cache.misses
+        card_cache.get(("vacancy", 1, 1, "ru", "full"))
+        store = MemoryStateStore()
+        store.set(1, {"step": "search_vacancy_region"})
+        store.set(2, {"step": "search_vacancy_region"})
+        store.set(3, {"step": "admin_search_user"})
+
+        with patch("metrics.get_state_store", return_value=store):
+            assert (
+                registry.get_sample_value("bot_cache_misses_total", {"cache": "cards"})
+                == misses + 1
+            )
+            assert (
+                registry.get_sample_value(
+                    "bot_fsm_states", {"step": "search_vacancy_region"}
+                )
+                == 2
+            )
+            assert registry.get_sample_value("bot_fsm_tracked") == 3
+        # SQLite без пула: метрик пула нет
+        assert registry.get_sample_value("bot_db_pool_max") is None
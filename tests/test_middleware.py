@@ -172,9 +172,21 @@ class TestMiddleware:
 
             bot.process_new_messages([message])
 
-            mock_rate_limit.assert_called_with(bot, message)
+            mock_rate_limit.assert_called_with(bot, message, None)
             original_processor.assert_not_called()
 
+    def test_activity_recorded_for_accepted_updates(self, bot, message):
+        """Активность (last_login) отмечается только для пропущенных обновлений"""
+        middleware.setup_middleware(bot)
+
+        with patch("middleware.check_user_blocked", return_value=None), patch(
+            "middleware.check_rate_limit", side_effect=[True, False]
+        ), patch("middleware.record_activity") as mock_activity:
+            bot.process_new_messages([message])
+            bot.process_new_messages([message])
+
+        mock_activity.assert_called_once_with(456)
+
     def test_custom_process_new_callback_query_send_error(self, bot):
         """Test exception when sending block callback answer."""
         middleware.setup_middleware(bot)
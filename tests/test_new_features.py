@@ -140,10 +140,11 @@ class TestNewFeatures:
         }
 
         with patch("database.execute_query", return_value=employer_info):
-            # Мокаем генератор PDF, чтобы не создавать реальный файл
-            with patch("handlers.seeker_responses.generate_resume_pdf") as mock_gen:
-                mock_pdf = io.BytesIO(b"%PDF-Mock")
-                mock_gen.return_value = mock_pdf
+            # Мокаем фоновый отрисовщик: PDF "готов" сразу
+            with patch("handlers.seeker_responses.get_resume_renderer") as mock_get:
+                mock_get.return_value.submit.side_effect = (
+                    lambda data, lang, on_ready, on_fallback: on_ready(b"%PDF-Mock")
+                )
 
                 # Вызываем приватный метод отправки (или можно вызвать handle_application_callback с моками)
                 seeker_handler._notify_employer_with_pdf(vacancy_id, seeker_data)
@@ -154,8 +155,9 @@ class TestNewFeatures:
 
                 # Проверяем получателя (ID работодателя)
                 assert call_args[0][0] == employer_tg_id
-                # Проверяем, что отправлен именно наш мок PDF
-                assert call_args[0][1] == mock_pdf
+                # Проверяем, что отправлен именно наш PDF
+                assert call_args[0][1].getvalue() == b"%PDF-Mock"
+                assert call_args[0][1].name == "Resume_John Doe.pdf"
                 # Проверяем подпись
                 assert (
                     "Новый отклик" in call_args[1]["caption"]
@@ -172,10 +174,9 @@ class TestNewFeatures:
         user_data = {"full_name": "Test User", "id": 1}
 
         with patch("database.get_user_by_id", return_value=user_data):
-            with patch("handlers.seeker_profile.generate_resume_pdf") as mock_gen:
-                mock_pdf = io.BytesIO(b"%PDF-Mock")
-                mock_gen.return_value = mock_pdf
-
+            with patch(
+                "handlers.seeker_profile.get_resume_bytes", return_value=b"%PDF-Mock"
+            ):
                 seeker_handler.handle_download_resume(call)
 
                 # Проверяем уведомление "Генерирую..."
@@ -0,0 +1,220 @@
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import outbound
+from handlers.seeker import SeekerHandlers
+
+
+def _flood(retry_after):
+    return ApiTelegramException(
+        "sendMessage",
+        None,
+        {
+            "error_code": 429,
+            "description": "Too Many Requests",
+            "parameters": {"retry_after": retry_after},
+        },
+    )
+
+
+@pytest.fixture
+def dispatcher():
+    return outbound.OutboundDispatcher(
+        global_rate=1000, chat_rate=20, chat_burst=1, group_per_minute=60
+    )
+
+
+class TestTokenBucket:
+    def test_burst_then_wait(self):
+        bucket = outbound.TokenBucket(rate=2, capacity=2)
+        now = bucket.updated
+        bucket.consume(now)
+        bucket.consume(now)
+        assert bucket.wait_time(now) == pytest.approx(0.5)
+        assert bucket.wait_time(now + 0.5) == 0.0
+
+    def test_group_detection(self):
+        assert outbound.is_group_chat(-100123)
+        assert outbound.is_group_chat("@channel")
+        assert not outbound.is_group_chat(12345)
+
+
+class TestOutboundDispatcher:
+    def test_per_chat_limit(self, dispatcher):
+        func = MagicMock(return_value="ok")
+        start = time.monotonic()
+        for _ in range(4):
+            assert dispatcher.call(1, func) == "ok"
+        # Первый запрос сразу, остальные — по одному в 50 мс
+        assert time.monotonic() - start >= 0.14
+
+        # Другой чат не ждет чужого лимита
+        start = time.monotonic()
+        dispatcher.call(2, func)
+        assert time.monotonic() - start < 0.05
+
+    def test_group_limit_is_stricter(self, dispatcher):
+        assert dispatcher._chat_bucket(-100).rate == 1
+        assert dispatcher._chat_bucket(100).rate == 20
+
+    def test_global_limit(self):
+        dispatcher = outbound.OutboundDispatcher(
+            global_rate=20, chat_rate=1000, chat_burst=1000
+        )
+        func = MagicMock()
+        start = time.monotonic()
+        for chat_id in range(30):
+            dispatcher.call(chat_id, func)
+        # 20 запросов сразу (запас), еще 10 — со скоростью 20/сек
+        assert time.monotonic() - start >= 0.45
+
+    def test_retry_after_honoured(self, dispatcher):
+        func = MagicMock(side_effect=[_flood(0.2), "sent"])
+        start = time.monotonic()
+        assert dispatcher.call(1, func, "text") == "sent"
+        assert time.monotonic() - start >= 0.2
+        assert func.call_count == 2
+        assert dispatcher.get_stats()["retries_429"] == 1
+
+    def test_retries_exhausted(self, dispatcher):
+        dispatcher.max_retries = 1
+        func = MagicMock(side_effect=_flood(0))
+        with pytest.raises(ApiTelegramException):
+            dispatcher.call(1, func)
+        assert func.call_count == 2
+        assert dispatcher.get_stats()["failed"] == 1
+
+    def test_other_errors_not_retried(self, dispatcher):
+        error = ApiTelegramException(
+            "sendMessage", None, {"error_code": 403, "description": "Forbidden"}
+        )
+        func = MagicMock(side_effect=error)
+        with pytest.raises(ApiTelegramException):
+            dispatcher.call(1, func)
+        assert func.call_count == 1
+
+    def test_per_chat_order_across_threads(self):
+        dispatcher = outbound.OutboundDispatcher(
+            global_rate=1000, chat_rate=1000, chat_burst=1000
+        )
+        delivered = []
+
+        def send(idx):
+            if idx == 0:
+                time.sleep(0.1)  # Медленный первый запрос не обгоняют
+            delivered.append(idx)
+
+        threads = []
+        for idx in range(5):
+            thread = threading.Thread(target=dispatcher.call, args=(7, send, idx))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+
+        assert delivered == [0, 1, 2, 3, 4]
+        stats = dispatcher.get_stats()
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 0
+        assert stats["sent"] == 5
+        assert dispatcher._chat_queues == {}
+
+    def test_stats_latency(self, dispatcher):
+        dispatcher.call(1, lambda: time.sleep(0.02))
+        stats = dispatcher.get_stats()
+        assert stats["avg_latency_ms"] >= 20
+        assert stats["p95_latency_ms"] >= 20
+
+
+class TestSetupOutbound:
+    def test_bot_methods_dispatched(self, dispatcher):
+        bot = MagicMock()
+        send_message = bot.send_message
+        edit_message_text = bot.edit_message_text
+        answer = bot.answer_callback_query
+        edit_message_text.return_value = "edited"
+
+        with patch.object(dispatcher, "submit", wraps=dispatcher.submit) as submit:
+            outbound.setup_outbound(bot, dispatcher)
+            # Методы бота по-прежнему возвращают результат, а не Future
+            assert (
+                bot.send_message(123, "hi", parse_mode="Markdown")
+                is send_message.return_value
+            )
+            assert bot.edit_message_text("new", chat_id=456, message_id=1) == "edited"
+            assert bot.answer_callback_query("cb", "ok") is answer.return_value
+
+        assert [c[0][0] for c in submit.call_args_list] == [123, 456, None]
+        send_message.assert_called_once_with(123, "hi", parse_mode="Markdown")
+        edit_message_text.assert_called_once_with("new", chat_id=456, message_id=1)
+        answer.assert_called_once_with("cb", "ok")
+        assert outbound.get_dispatcher() is dispatcher
+
+    def test_nowait_failure_logged(self, dispatcher, caplog):
+        bot = MagicMock()
+        bot.send_message.side_effect = ApiTelegramException(
+            "sendMessage", None, {"error_code": 403, "description": "Forbidden"}
+        )
+        outbound.setup_outbound(bot, dispatcher)
+
+        future = outbound.send_message_nowait(bot, 123, "hi")
+        assert isinstance(future, Future)
+        with pytest.raises(ApiTelegramException):
+            outbound.resolve(future)
+        assert dispatcher.drain(1)
+        assert "send_message в чат 123 не выполнен: Forbidden" in caplog.text
+
+        # Синхронный вызов отдает ошибку вызывающему коду
+        with pytest.raises(ApiTelegramException):
+            bot.send_message(123, "hi")
+
+    def test_nowait_without_dispatcher_sends_directly(self):
+        bot = MagicMock()
+        assert (
+            outbound.send_message_nowait(bot, 123, "hi")
+            is bot.send_message.return_value
+        )
+        bot.send_message.assert_called_once_with(123, "hi")
+
+    def test_card_search_does_not_hold_handler_thread(self):
+        # Лимит чата по умолчанию: запас 3, дальше 1 сообщение в секунду
+        dispatcher = outbound.OutboundDispatcher(
+            global_rate=1000, chat_rate=20, chat_burst=3
+        )
+        bot = MagicMock()
+        delivered = []
+        bot.send_message.side_effect = lambda chat_id, text, **kw: delivered.append(
+            text
+        )
+        outbound.setup_outbound(bot, dispatcher)
+        handler = SeekerHandlers(bot)
+        message = MagicMock()
+        message.chat.id = 123
+        message.from_user.id = 456
+        vacancies = [{"id": idx} for idx in range(20)]
+
+        with patch(
+            "handlers.seeker_search.execute_query", return_value=vacancies
+        ), patch(
+            "handlers.seeker_search.database.get_user_by_id", return_value=None
+        ), patch(
+            "handlers.seeker_search.get_user_language", return_value="ru"
+        ), patch(
+            "handlers.seeker_search.cards.vacancy_card",
+            side_effect=lambda vac, lang: (f"card {vac['id']}", None),
+        ):
+            start = time.monotonic()
+            handler.show_vacancies(message)
+            elapsed = time.monotonic() - start
+
+        # 21 сообщение при 20/сек заняло бы в обработчике ~0.9 сек
+        assert elapsed < 0.3
+        assert dispatcher.queue_depth > 0
+        assert dispatcher.drain(5)
+        assert delivered[1:] == [f"card {idx}" for idx in range(20)]
@@ -60,7 +60,7 @@ class TestPdfGenerator:
             "languages": '[{"lang_name": "English", "level_key": "level_b2"}]',
             "profession": "prof_backend",
         }
-        with patch("pdf_generator.register_fonts", return_value="Helvetica"), patch(
+        with patch("pdf_generator.get_font", return_value="Helvetica"), patch(
             "pdf_generator.get_text_by_lang", side_effect=lambda k, l: k
         ):
             pdf = pdf_generator.generate_resume_pdf(user_data)
@@ -70,13 +70,13 @@ class TestPdfGenerator:
     def test_generate_resume_pdf_string_languages(self):
         """Test PDF generation with languages as simple string"""
         user_data = {"full_name": "Test User", "languages": "English, Russian"}
-        with patch("pdf_generator.register_fonts", return_value="Helvetica"):
+        with patch("pdf_generator.get_font", return_value="Helvetica"):
             pdf = pdf_generator.generate_resume_pdf(user_data)
             assert isinstance(pdf, io.BytesIO)
 
     def test_generate_resume_pdf_json_error(self):
         """Test PDF generation with malformed JSON in languages"""
         user_data = {"full_name": "Test User", "languages": "[invalid json"}
-        with patch("pdf_generator.register_fonts", return_value="Helvetica"):
+        with patch("pdf_generator.get_font", return_value="Helvetica"):
             pdf = pdf_generator.generate_resume_pdf(user_data)
             assert isinstance(pdf, io.BytesIO)
@@ -59,3 +59,118 @@ class TestPerformance:
 
         # С кэшированием это должно быть мгновенно
         assert duration < 0.5
+
+    def test_keyboard_registry_send_cost(self):
+        """Сериализация клавиатур горячих меню: построение на каждую отправку vs реестр"""
+        import keyboards
+        from telebot.apihelper import _convert_markup
+
+        rounds = 2000
+        paths = [
+            (keyboards.seeker_main_menu, {"lang": "ru"}),
+            (keyboards.employer_main_menu, {"lang": "uz"}),
+            (keyboards.settings_menu, {"role": "seeker", "lang": "en"}),
+        ]
+        for keyboard, kwargs in paths:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                _convert_markup(keyboard.__wrapped__(**kwargs))
+            built = (time.perf_counter() - start) / rounds
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                _convert_markup(keyboard(**kwargs))
+            cached = (time.perf_counter() - start) / rounds
+
+            print(
+                f"\n{keyboard.__name__}: {built * 1e6:.1f} мкс -> {cached * 1e6:.1f} мкс "
+                f"на отправку"
+            )
+            assert cached * 3 < built
+
+        start = time.perf_counter()
+        for i in range(rounds):
+            keyboards.vacancy_actions(i, lang="ru").to_json()
+        built = (time.perf_counter() - start) / rounds
+        start = time.perf_counter()
+        for i in range(rounds):
+            keyboards.vacancy_actions.json(i, lang="ru")
+        templated = (time.perf_counter() - start) / rounds
+        print(f"vacancy_actions: {built * 1e6:.1f} мкс -> {templated * 1e6:.1f} мкс")
+        assert templated < built
+
+    def test_resume_pdf_per_application_cost(self):
+        """PDF резюме на отклик: прежний путь vs шрифты один раз vs кэш по профилю"""
+        import pdf_generator
+        import resume_service
+
+        seeker = {
+            "telegram_id": 1,
+            "full_name": "Иван Петров",
+            "phone": "+998901234567",
+            "city": "Ташкент",
+            "age": 25,
+            "profession": "prof_backend",
+            "skills": "Python, SQL",
+            "languages": '[{"lang_key": "lang_en", "level_key": "level_b2"}]',
+        }
+        rounds = 5
+
+        def legacy():
+            # Как раньше: поиск и регистрация шрифта и стили на каждый отклик
+            pdf_generator.register_fonts()
+            pdf_generator._styles.clear()
+            pdf_generator.render_resume_pdf(seeker, "ru")
+
+        timings = {}
+        for name, func in [
+            ("legacy", legacy),
+            ("render", lambda: pdf_generator.render_resume_pdf(seeker, "ru")),
+            ("cached", lambda: resume_service.get_resume_pdf(seeker, "ru")),
+        ]:
+            func()
+            start = time.perf_counter()
+            for _ in range(rounds):
+                func()
+            timings[name] = (time.perf_counter() - start) / rounds
+
+        print(
+            "\nPDF на отклик: "
+            + ", ".join(f"{k} {v * 1000:.2f} мс" for k, v in timings.items())
+        )
+        assert timings["render"] < timings["legacy"]
+        assert timings["cached"] * 10 < timings["render"]
+
+    def test_profanity_check_cost(self):
+        """Проверка сообщения на мат: шаблон за шаблоном vs одна регулярка-дерево"""
+        import re
+
+        import security
+
+        messages = [
+            "Здравствуйте! Интересует вакансия программиста, когда можно прийти?",
+            "Hello, I would like to apply. My experience is 5 years, salary 3000$.",
+            "Assalomu alaykum, men bu ishga qiziqaman. Qachon suhbatga kelsam bo'ladi?",
+        ]
+        patterns = [r"\b" + stem for stem in security.PROFANITY_STEMS]
+        rounds = 2000
+
+        def legacy(text):
+            return any(re.search(p, text.lower()) for p in patterns)
+
+        for text in messages:
+            timings = {}
+            for name, func in [
+                ("legacy", legacy),
+                ("compiled", security.contains_profanity),
+            ]:
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    func(text)
+                timings[name] = (time.perf_counter() - start) / rounds
+
+            print(
+                f"\ncontains_profanity: {timings['legacy'] * 1e6:.1f} мкс -> "
+                f"{timings['compiled'] * 1e6:.1f} мкс"
+            )
+            assert timings["compiled"] * 5 < timings["legacy"]
@@ -0,0 +1,119 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import profiler
+from handlers.admin import AdminHandlers
+from profiler import Profile, ProfileBusy, profile_wsgi_app, run_profile, save_profile
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _profile():
+    profile = Profile(seconds=1, interval=0.01, ticks=100)
+    profile.stacks[("MainThread", "bot.py:main", "router.py:dispatch")] += 30
+    profile.stacks[("MainThread", "bot.py:main")] += 70
+    return profile
+
+
+class TestSampling:
+    def test_worker_threads_sampled(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,), name="worker")
+        worker.start()
+        try:
+            profile = run_profile(1, interval=0.005)
+        finally:
+            stop.set()
+            worker.join()
+
+        names = [name for name, _, _ in profile.top()]
+        assert "test_profiler.py:_spin" in names
+        line = next(
+            line
+            for line in profile.collapsed().splitlines()
+            if line.startswith("worker;")
+        )
+        stack, count = line.rsplit(" ", 1)
+        assert "test_profiler.py:_spin" in stack.split(";") and int(count) > 0
+        assert profile.ticks > 50
+
+    def test_one_profile_at_a_time(self):
+        done = threading.Event()
+        with patch.object(profiler.Config, "PROFILE_MAX_SECONDS", 1):
+            profiler.start_profile(1, lambda profile: done.set(), interval=0.01)
+            with pytest.raises(ProfileBusy):
+                run_profile(1)
+        assert done.wait(5)
+
+    def test_top_and_save(self, tmp_path):
+        profile = _profile()
+
+        assert profile.top()[0] == (
+            "bot.py:main",
+            pytest.approx(1.0),
+            pytest.approx(0.7),
+        )
+        assert profile.top()[1] == (
+            "router.py:dispatch",
+            pytest.approx(0.3),
+            pytest.approx(0.3),
+        )
+
+        base = save_profile(profile, str(tmp_path))
+        with open(base + ".collapsed", encoding="utf-8") as f:
+            assert "MainThread;bot.py:main;router.py:dispatch 30" in f.read()
+
+
+class TestTriggers:
+    def _call(self, query):
+        start_response = MagicMock()
+        body = profile_wsgi_app({"QUERY_STRING": query}, start_response)
+        return start_response.call_args[0][0], b"".join(body).decode()
+
+    def test_http_trigger_requires_token(self):
+        with patch.object(profiler.Config, "PROFILE_TOKEN", ""):
+            assert self._call("token=")[0] == "404 Not Found"
+        with patch.object(profiler.Config, "PROFILE_TOKEN", "secret"), patch(
+            "profiler.run_profile", return_value=_profile()
+        ) as run:
+            assert self._call("token=wrong")[0] == "403 Forbidden"
+            status, body = self._call("token=secret&seconds=5")
+            run.assert_called_once_with(5.0)
+            assert status == "200 OK"
+            assert "bot.py:main 70" in body
+            assert "router.py:dispatch" in self._call("token=secret&format=top")[1]
+
+    def test_admin_command_sends_report_and_file(self):
+        handler = AdminHandlers(MagicMock())
+        message = MagicMock()
+        message.from_user.id = 123456
+        message.chat.id = 123456
+        message.text = "/profile 5"
+
+        with patch(
+            "handlers.admin_profile.start_profile",
+            side_effect=lambda seconds, on_done: on_done(_profile()),
+        ):
+            handler.handle_profile(message)
+
+        report = handler.bot.send_message.call_args[0][1]
+        assert "bot.py:main" in report
+        document = handler.bot.send_document.call_args[0][1]
+        assert document.name.endswith(".collapsed")
+        assert b"router.py:dispatch 30" in document.getvalue()
+
+        with patch("handlers.admin_profile.start_profile", side_effect=ProfileBusy):
+            handler.handle_profile(message)
+        assert "уже идет" in handler.bot.reply_to.call_args[0][1]
+
+    def test_no_overhead_when_off(self):
+        # Без запроса профиля нет ни потока, ни хуков интерпретатора
+        time.sleep(0.05)
+        assert not any(t.name == "profiler" for t in threading.enumerate())
+        assert threading.getprofile() is None
@@ -0,0 +1,220 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import database
+import resume_service
+from resume_service import (
+    prerender_resume,
+    ResumeCache,
+    ResumeRenderer,
+    get_resume_bytes,
+    get_resume_pdf,
+)
+
+SEEKER = {
+    "telegram_id": 501,
+    "full_name": "Иван Петров",
+    "phone": "+998901234567",
+    "email": "ivan@example.com",
+    "city": "Ташкент",
+    "age": 25,
+    "profession": "prof_backend",
+    "experience": "3 года",
+    "education": "ТУИТ",
+    "skills": "Python",
+    "languages": '[{"lang_key": "lang_en", "level_key": "level_b2"}]',
+}
+
+
+class TestResumeService:
+    def test_unchanged_profile_renders_once_per_language(self):
+        with patch(
+            "resume_service.render_resume_pdf", return_value=b"%PDF-1"
+        ) as render:
+            for _ in range(3):
+                assert get_resume_bytes(dict(SEEKER, last_login="now"), "ru")
+            get_resume_bytes(SEEKER, "en")
+            get_resume_bytes(dict(SEEKER, skills="Python, SQL"), "ru")
+
+        assert render.call_count == 3
+
+    def test_each_send_gets_own_buffer(self):
+        first, second = get_resume_pdf(SEEKER), get_resume_pdf(SEEKER)
+        assert first is not second
+        assert first.getvalue() == second.getvalue()
+        assert first.getvalue().startswith(b"%PDF")
+
+    def test_profile_update_invalidates(self, test_db):
+        database.create_job_seeker(
+            {
+                "telegram_id": 501,
+                "password": "secret1",
+                "phone": "+998901234567",
+                "email": "ivan@example.com",
+                "full_name": "Иван Петров",
+                "age": 25,
+                "city": "Ташкент",
+            }
+        )
+        with patch("resume_service.render_resume_pdf", return_value=b"%PDF-1"):
+            get_resume_bytes(SEEKER, "ru")
+            get_resume_bytes(SEEKER, "uz")
+        assert resume_service.resume_cache.get_stats()["size"] == 2
+
+        database.update_seeker_profile(501, skills="Go")
+        assert resume_service.resume_cache.get_stats()["size"] == 0
+
+
+class TestResumeCache:
+    def test_bounded_by_bytes(self):
+        cache = ResumeCache(max_bytes=10)
+        cache.put("a", b"1234", user_id=1)
+        cache.put("b", b"1234", user_id=2)
+        cache.put("c", b"1234", user_id=1)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == b"1234"
+        assert cache.get_stats()["bytes"] == 8
+        cache.invalidate_user(1)
+        assert cache.get_stats() == {
+            "size": 1,
+            "bytes": 4,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 1,
+        }
+
+    def test_oversized_document_not_cached(self):
+        cache = ResumeCache(max_bytes=3)
+        cache.put("a", b"1234")
+        assert cache.get_stats()["size"] == 0
+
+
+class TestResumeRenderer:
+    def test_process_pool_renders_and_caches(self):
+        renderer = ResumeRenderer(workers=1, max_pending=4, timeout=60)
+        on_ready, on_fallback = MagicMock(), MagicMock()
+        try:
+            assert renderer.submit(SEEKER, "ru", on_ready, on_fallback)
+            renderer.join()
+        finally:
+            renderer.shutdown()
+
+        pdf = on_ready.call_args[0][0]
+        assert pdf.startswith(b"%PDF")
+        on_fallback.assert_not_called()
+        assert get_resume_bytes(SEEKER, "ru") == pdf
+        assert renderer.get_stats()["pending"] == 0
+
+    def test_saturated_pool_falls_back_to_text(self):
+        release = threading.Event()
+
+        def slow_render(user_data, lang):
+            release.wait(5)
+            return b"%PDF-1"
+
+        renderer = ResumeRenderer(workers=0, max_pending=1, timeout=5)
+        on_ready, on_fallback = MagicMock(), MagicMock()
+        with patch("resume_service.render_resume_pdf", side_effect=slow_render):
+            assert renderer.submit(SEEKER, "ru", on_ready, on_fallback)
+            assert not renderer.submit(SEEKER, "en", on_ready, on_fallback)
+            on_fallback.assert_called_once_with()
+
+            release.set()
+            renderer.join()
+        renderer.shutdown()
+
+        on_ready.assert_called_once_with(b"%PDF-1")
+        assert renderer.get_stats()["rejected"] == 1
+
+    def test_timeout_falls_back_to_text(self):
+        release = threading.Event()
+
+        def hung_render(user_data, lang):
+            release.wait(5)
+            return b"%PDF-1"
+
+        renderer = ResumeRenderer(workers=0, max_pending=2, timeout=0.05)
+        on_ready, on_fallback = MagicMock(), MagicMock()
+        with patch("resume_service.render_resume_pdf", side_effect=hung_render):
+            renderer.submit(SEEKER, "ru", on_ready, on_fallback)
+            renderer.join()
+            release.set()
+        renderer.shutdown()
+
+        on_ready.assert_not_called()
+        on_fallback.assert_called_once_with()
+        assert renderer.get_stats()["timeouts"] == 1
+        # Дорисованное после таймаута резюме попадает в кэш
+        assert get_resume_bytes(SEEKER, "ru") == b"%PDF-1"
+
+
+class TestResumePrerender:
+    def test_profile_save_prerenders_every_language(self, test_db):
+        database.create_job_seeker(
+            {
+                "telegram_id": 501,
+                "password": "secret1",
+                "phone": "+998901234567",
+                "email": "ivan@example.com",
+                "full_name": "Иван Петров",
+                "age": 25,
+                "city": "Ташкент",
+            }
+        )
+        database.update_seeker_profile(501, skills="Go")
+        renderer = ResumeRenderer(workers=0, max_pending=10)
+        with patch("resume_service.Config.RESUME_PRERENDER", True), patch(
+            "resume_service.get_resume_renderer", return_value=renderer
+        ), patch("resume_service.render_resume_pdf", return_value=b"%PDF-1") as render:
+            assert prerender_resume(501) == 3
+            renderer.shutdown()
+            # Готовые резюме повторно не рисуются
+            assert prerender_resume(501) == 0
+
+            user_data = database.get_user_by_id(501)
+            on_ready = MagicMock()
+            renderer.submit(user_data, "uz", on_ready, MagicMock())
+            renderer.join()
+
+        assert render.call_count == 3
+        on_ready.assert_called_once_with(b"%PDF-1")
+
+    def test_stale_version_is_not_cached(self):
+        release = threading.Event()
+
+        def slow_render(user_data, lang):
+            release.wait(5)
+            return user_data["skills"].encode()
+
+        renderer = ResumeRenderer(workers=0, max_pending=10)
+        with patch("resume_service.render_resume_pdf", side_effect=slow_render):
+            renderer.prerender(dict(SEEKER, version=1), ["ru"])
+            renderer.prerender(dict(SEEKER, version=2, skills="Go"), ["ru"])
+            release.set()
+            renderer.shutdown()
+
+        assert renderer.get_stats()["stale"] == 1
+        assert resume_service.resume_cache.get_stats()["size"] == 1
+        assert get_resume_bytes(dict(SEEKER, skills="Go"), "ru") == b"Go"
+
+    def test_application_joins_inflight_render(self):
+        release = threading.Event()
+
+        def slow_render(user_data, lang):
+            release.wait(5)
+            return b"%PDF-1"
+
+        renderer = ResumeRenderer(workers=0, max_pending=10, timeout=5)
+        on_ready = MagicMock()
+        with patch(
+            "resume_service.render_resume_pdf", side_effect=slow_render
+        ) as render:
+            renderer.prerender(SEEKER, ["ru"])
+            renderer.submit(SEEKER, "ru", on_ready, MagicMock())
+            release.set()
+            renderer.join()
+        renderer.shutdown()
+
+        assert render.call_count == 1
+        on_ready.assert_called_once_with(b"%PDF-1")
@@ -0,0 +1,147 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import bot_factory
+from handlers.admin import AdminHandlers
+from handlers.auth import AuthHandlers
+from handlers.common import CommonHandlers
+from handlers.employer import EmployerHandlers
+from handlers.profile import ProfileHandlers
+from handlers.seeker import SeekerHandlers
+from handlers.settings import SettingsHandlers
+from handlers.steps import StepHandlers
+from localization import TRANSLATIONS
+from router import PrefixTrie, Router
+
+
+def _message(text, user_id=1):
+    msg = MagicMock()
+    msg.text = text
+    msg.from_user.id = user_id
+    return msg
+
+
+class TestPrefixTrie:
+    def test_longest_prefix(self):
+        trie = PrefixTrie()
+        trie.add("admin_", "admin")
+        trie.add("admin_block_", "block")
+        trie.add("admin_block_menu_", "menu")
+        assert trie.match("admin_block_menu_5") == "menu"
+        assert trie.match("admin_block_5") == "block"
+        assert trie.match("admin_stats") == "admin"
+        assert trie.match("adm") is None
+        assert trie.match("") is None
+
+    def test_first_registration_wins(self):
+        trie = PrefixTrie()
+        assert trie.add("ss_", "first")
+        assert not trie.add("ss_", "second")
+        assert trie.match("ss_del_1") == "first"
+
+
+class TestRouter:
+    @pytest.fixture
+    def router(self):
+        router = Router()
+        router.fallback = MagicMock(name="fallback")
+        return router
+
+    def test_commands(self, router):
+        start = MagicMock()
+        router.command(["start", "restart"], start)
+        for text in ("/start", "/restart now", "/start@job_bot"):
+            assert router.resolve_message(_message(text)) is start
+        assert router.resolve_message(_message("/unknown")) is None
+
+    def test_text_routes_in_registration_order(self, router):
+        admin, guarded, default = MagicMock(), MagicMock(), MagicMock()
+        router.text("Кнопка", admin, admin_only=True)
+        router.text("Кнопка", guarded, guard=lambda m: m.from_user.id == 2)
+        router.text("Кнопка", default)
+        with patch("router.Config.ADMIN_IDS", [1]):
+            assert router.resolve_message(_message("Кнопка", 1)) is admin
+            assert router.resolve_message(_message("Кнопка", 2)) is guarded
+            assert router.resolve_message(_message("Кнопка", 3)) is default
+
+    def test_steps(self, router):
+        seeker, employer = MagicMock(), MagicMock()
+        router.step("enter_new_value", seeker, guard=lambda s: s.get("action") == "a")
+        router.step("enter_new_value", employer, guard=lambda s: s.get("action") == "b")
+        state = {"step": "enter_new_value", "action": "b"}
+        assert router.resolve_step(1, state) is employer
+        assert router.resolve_step(1, {"step": "enter_new_value"}) is None
+        assert router.resolve_step(1, {}) is None
+
+    def test_dispatch(self, router):
+        handler, callback = MagicMock(), MagicMock()
+        router.text("Текст", handler)
+        router.callback("apply_", callback)
+
+        router.dispatch_message(_message("Текст"))
+        handler.assert_called_once()
+        photo = _message(None)
+        router.dispatch_message(photo)
+        router.fallback.assert_called_once_with(photo)
+
+        router.dispatch_callback(MagicMock(data="apply_3"))
+        router.dispatch_callback(MagicMock(data="unknown"))
+        callback.assert_called_once()
+
+    def test_install_registers_single_handlers(self, router):
+        bot = MagicMock()
+        router.install(bot)
+        assert bot.register_message_handler.call_count == 1
+        assert bot.register_callback_query_handler.call_count == 1
+
+
+class TestBotRoutes:
+    """Маршруты реального бота: все языки и все типы кнопок"""
+
+    @pytest.fixture
+    def routes(self):
+        bot = MagicMock()
+        steps = StepHandlers(bot)
+        handlers = dict(
+            common=CommonHandlers(bot),
+            auth=AuthHandlers(bot),
+            seeker=SeekerHandlers(bot),
+            employer=EmployerHandlers(bot),
+            settings=SettingsHandlers(bot),
+            profile=ProfileHandlers(bot),
+            admin=AdminHandlers(bot),
+        )
+        router = bot_factory.register_routes(bot, steps=steps, **handlers)
+        return router, handlers
+
+    @pytest.mark.parametrize("lang", sorted(TRANSLATIONS))
+    def test_menu_buttons_in_every_language(self, routes, lang):
+        router, h = routes
+        expected = {
+            "menu_find_vacancies": h["seeker"].handle_find_vacancies,
+            "menu_create_vacancy": h["employer"].handle_create_vacancy,
+            "menu_settings": h["settings"].handle_settings_menu,
+            "btn_profession": h["settings"].handle_seeker_settings_wrapper,
+            "menu_support": h["common"].handle_support,
+            "register_button": h["auth"].handle_registration_start,
+        }
+        for key, handler in expected.items():
+            text = TRANSLATIONS[lang][key]
+            assert router.resolve_message(_message(text)) == handler, key
+
+    def test_callbacks_and_steps(self, routes):
+        router, h = routes
+        assert router.resolve_callback("start_chat_5") == h["common"].handle_start_chat
+        assert router.resolve_callback("edit_vac_1") == (
+            h["employer"].handle_my_vacancy_actions
+        )
+        assert router.resolve_callback("admin_bc_pause_1") == (
+            h["admin"].handle_admin_callbacks
+        )
+        state = {"step": "search_candidate_city"}
+        assert router.resolve_step(1, state) == (
+            h["employer"].process_candidate_city_choice
+        )
+        # Шаги регистрации обрабатывает StepHandlers через fallback
+        assert router.resolve_step(1, {"step": "education"}) is None
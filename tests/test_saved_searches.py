@@ -0,0 +1,250 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import database
+import database.searches as searches
+import notifications
+from handlers.seeker import SeekerHandlers
+
+
+def _add_employer(conn, city="Toshkent"):
+    conn.execute(
+        "INSERT INTO employers (id, telegram_id, company_name, phone, email, password_hash, contact_person, city) "
+        "VALUES (1, 500, 'Comp', '998901234567', 'e@mail.com', 'hash', 'Contact', ?)",
+        (city,),
+    )
+
+
+def _add_vacancy(conn, vacancy_id=7, **fields):
+    row = {
+        "id": vacancy_id,
+        "employer_id": 1,
+        "title": "prof_backend",
+        "description": "Django, PostgreSQL",
+        "job_type": "job_type_remote",
+    }
+    row.update(fields)
+    cols = ", ".join(row.keys())
+    placeholders = ", ".join("?" for _ in row)
+    conn.execute(
+        f"INSERT INTO vacancies ({cols}) VALUES ({placeholders})", tuple(row.values())
+    )
+
+
+def _add_seeker(conn, idx, status="active", lang="ru"):
+    conn.execute(
+        "INSERT INTO job_seekers (id, telegram_id, phone, email, password_hash, full_name, age, "
+        "status, language_code) VALUES (?, ?, ?, ?, 'hash', ?, 25, ?, ?)",
+        (
+            idx,
+            1000 + idx,
+            f"+99890{idx:07d}",
+            f"s{idx}@test.uz",
+            f"S{idx}",
+            status,
+            lang,
+        ),
+    )
+
+
+class TestLocations:
+    def test_resolve_any_language(self):
+        assert searches.resolve_location("Toshkent") == ("Ташкент", "Ташкентская обл.")
+        assert searches.resolve_location("Samarqand") == (
+            "Самарканд",
+            "Самаркандская обл.",
+        )
+        assert searches.resolve_location("Fergana Region") == ("", "Ферганская обл.")
+        assert searches.resolve_location("Неизвестно") == ("Неизвестно", "")
+
+    def test_localize(self):
+        assert searches.localize_location("Ташкент", "uz") == "Toshkent"
+        assert searches.localize_location("Ферганская обл.", "en") == "Fergana Region"
+
+
+class TestSavedSearchStorage:
+    def test_create_list_delete(self, test_db):
+        _add_seeker(test_db, 1)
+        assert database.create_saved_search(1, "Ташкент", keyword="  Django ")
+        saved = database.get_saved_searches(1)
+        assert len(saved) == 1
+        assert saved[0]["keyword"] == "django"
+
+        # Чужой поиск удалить нельзя
+        assert not database.delete_saved_search(saved[0]["id"], 2)
+        assert database.delete_saved_search(saved[0]["id"], 1)
+        assert database.get_saved_searches(1) == []
+
+    def test_limit(self, test_db):
+        _add_seeker(test_db, 1)
+        for _ in range(database.MAX_SAVED_SEARCHES):
+            assert database.create_saved_search(1)
+        assert not database.create_saved_search(1)
+
+
+class TestIncrementalMatching:
+    def test_only_matching_subscriptions(self, test_db):
+        _add_employer(test_db)
+        _add_vacancy(test_db)
+        for idx in range(1, 9):
+            _add_seeker(test_db, idx, status="inactive" if idx == 8 else "active")
+
+        database.create_saved_search(1, "Ташкент", "prof_backend", "job_type_remote")
+        database.create_saved_search(2, "Ташкентская обл.", "sphere_it")
+        database.create_saved_search(3, keyword="django")
+        database.create_saved_search(4, "Самарканд")
+        database.create_saved_search(5, profession="prof_frontend")
+        database.create_saved_search(6, job_type="job_type_internship")
+        database.create_saved_search(7, keyword="golang")
+        database.create_saved_search(8)
+        # Два подходящих поиска одного соискателя — одно уведомление
+        database.create_saved_search(1)
+
+        vacancy = searches.get_vacancy_for_notification(7)
+        assert vacancy["city"] == "Toshkent"
+        result = searches.find_matching_subscribers(vacancy)
+        assert [r["telegram_id"] for r in result] == [1001, 1002, 1003]
+
+    def test_query_uses_criteria_index(self, test_db):
+        plan = test_db.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM saved_searches "
+            "WHERE location IN (?, ?, '') AND profession IN (?, ?, '') AND job_type IN (?, '')",
+            ("a", "b", "c", "d", "e"),
+        ).fetchall()
+        assert any("idx_saved_searches_criteria" in str(tuple(row)) for row in plan)
+
+    def test_notify_enqueues_per_subscriber(self, test_db):
+        _add_employer(test_db)
+        _add_vacancy(test_db)
+        _add_seeker(test_db, 1, lang="uz")
+        _add_seeker(test_db, 2, lang="en")
+        database.create_saved_search(1, "Ташкент")
+        database.create_saved_search(2, profession="sphere_it")
+
+        bot = MagicMock()
+        sender = notifications.NotificationSender(bot)
+        with patch(
+            "notifications.get_notification_sender", return_value=sender
+        ), patch.object(sender, "_ensure_worker"):
+            assert notifications.notify_new_vacancy(bot, 7) == 2
+            assert sender.pending == 2
+            sender.flush()
+
+        chats = [c[0][0] for c in bot.send_message.call_args_list]
+        assert chats == [1001, 1002]
+        assert "Backend" in bot.send_message.call_args_list[1][0][1]
+        markup = bot.send_message.call_args_list[0][1]["reply_markup"]
+        # Клавиатура уходит готовым JSON
+        assert json.loads(markup)["inline_keyboard"][0][0]["callback_data"] == "apply_7"
+
+    def test_notify_skips_inactive_vacancy(self, test_db):
+        _add_employer(test_db)
+        _add_vacancy(test_db, status="closed")
+        with patch("notifications.find_matching_subscribers") as mock_find:
+            assert notifications.notify_new_vacancy(MagicMock(), 7) == 0
+            mock_find.assert_not_called()
+
+
+class TestNotificationSender:
+    def test_blocked_user_does_not_stop_queue(self):
+        bot = MagicMock()
+        blocked = ApiTelegramException(
+            "sendMessage", None, {"error_code": 403, "description": "Forbidden"}
+        )
+        bot.send_message.side_effect = [blocked, None]
+        sender = notifications.NotificationSender(bot)
+        with patch.object(sender, "_ensure_worker"):
+            sender.enqueue(1, "a")
+            sender.enqueue(2, "b")
+            sender.flush()
+        assert bot.send_message.call_count == 2
+        assert sender.pending == 0
+
+
+class TestSavedSearchHandlers:
+    @pytest.fixture
+    def handler(self):
+        return SeekerHandlers(MagicMock())
+
+    @pytest.fixture(autouse=True)
+    def mock_i18n(self):
+        with patch(
+            "handlers.seeker_saved_searches.get_user_language", return_value="ru"
+        ), patch(
+            "handlers.seeker_saved_searches.get_text_by_lang",
+            side_effect=lambda key, lang: key,
+        ):
+            yield
+
+    def _call(self, data):
+        call = MagicMock()
+        call.id = "call_id"
+        call.from_user.id = 1001
+        call.message.chat.id = 1001
+        call.message.message_id = 5
+        call.data = data
+        return call
+
+    def test_guest_rejected(self, handler):
+        with patch("database.get_user_by_id", return_value=None):
+            handler.handle_saved_search_callback(self._call("ss_new"))
+        handler.bot.answer_callback_query.assert_called_once()
+        handler.bot.send_message.assert_not_called()
+
+    def test_full_flow(self, handler, test_db):
+        _add_seeker(test_db, 1)
+        for data in [
+            "ss_new",
+            "ss_reg_1",
+            "ss_city_0",
+            "ss_sph_sphere_it",
+            "ss_prof_prof_backend",
+            "ss_jt_job_type_remote",
+        ]:
+            handler.handle_saved_search_callback(self._call(data))
+
+        assert database.get_user_state(1001)["step"] == "saved_search_keyword"
+
+        message = MagicMock()
+        message.from_user.id = 1001
+        message.chat.id = 1001
+        message.text = "Django"
+        handler.process_saved_search_keyword(message)
+
+        saved = database.get_saved_searches(1)
+        assert len(saved) == 1
+        assert saved[0]["location"] == "Андижан"
+        assert saved[0]["profession"] == "prof_backend"
+        assert saved[0]["job_type"] == "job_type_remote"
+        assert saved[0]["keyword"] == "django"
+        assert database.get_user_state(1001) == {}
+        assert handler.bot.send_message.call_args[0][1] == "saved_search_created"
+
+    def test_any_criteria_and_skip(self, handler, test_db):
+        _add_seeker(test_db, 1)
+        for data in ["ss_new", "ss_reg_any", "ss_sph_any", "ss_jt_any", "ss_kw_skip"]:
+            handler.handle_saved_search_callback(self._call(data))
+
+        saved = database.get_saved_searches(1)
+        assert [(s["location"], s["profession"], s["job_type"]) for s in saved] == [
+            ("", "", "")
+        ]
+
+    def test_list_and_delete(self, handler, test_db):
+        _add_seeker(test_db, 1)
+        database.create_saved_search(1, "Ташкентская обл.", "sphere_it")
+        search_id = database.get_saved_searches(1)[0]["id"]
+
+        message = MagicMock()
+        message.from_user.id = 1001
+        message.chat.id = 1001
+        handler.handle_saved_searches(message)
+        text = handler.bot.send_message.call_args[0][1]
+        assert "Ташкентская обл." in text
+        assert "sphere\\_it" in text
+
+        handler.handle_saved_search_callback(self._call(f"ss_del_{search_id}"))
+        assert database.get_saved_searches(1) == []
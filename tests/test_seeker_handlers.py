@@ -5,6 +5,7 @@ from telebot import types
 
 import database  # noqa: F401
 from handlers.seeker import SeekerHandlers
+from router import Router
 
 
 class TestSeekerHandlers:
@@ -115,7 +116,6 @@ class TestSeekerHandlers:
         ), patch(
             "handlers.seeker_responses.database.create_application", return_value=True
         ):
-
             handler.handle_application_callback(callback)
 
             handler.bot.answer_callback_query.assert_called_with(
@@ -137,7 +137,6 @@ class TestSeekerHandlers:
             "handlers.seeker_responses.database.check_application_exists",
             return_value=True,
         ):
-
             handler.handle_application_callback(callback)
 
             handler.bot.answer_callback_query.assert_called()
@@ -198,7 +197,6 @@ class TestSeekerHandlers:
             "handlers.seeker_responses.database.get_seeker_applications",
             return_value=applications,
         ):
-
             handler.handle_my_responses(message)
 
             # Заголовок + 1 карточка
@@ -231,7 +229,6 @@ class TestSeekerHandlers:
         with patch(
             "handlers.seeker_search.database.get_user_by_id", return_value=user_data
         ), patch("handlers.seeker_search.execute_query", return_value=vacancies):
-
             # Мокаем ошибку при второй отправке сообщения (карточки)
             handler.bot.send_message.side_effect = [None, Exception("Send Error")]
 
@@ -271,7 +268,6 @@ class TestSeekerHandlers:
         ), patch(
             "handlers.seeker_responses.database.create_application", return_value=False
         ):  # DB error
-
             handler.handle_application_callback(callback)
             handler.bot.answer_callback_query.assert_called_with(
                 callback.id, "❌ Ошибка при отправке отклика."
@@ -328,7 +324,6 @@ class TestSeekerHandlers:
             "handlers.seeker_responses.database.get_seeker_applications",
             return_value=[],
         ):
-
             handler.handle_my_responses(message)
             handler.bot.send_message.assert_called()
             assert (
@@ -347,7 +342,6 @@ class TestSeekerHandlers:
         with patch(
             "handlers.seeker_responses.database.get_user_by_id", return_value=user_data
         ), patch("handlers.seeker_responses.database.execute_query", return_value=[]):
-
             handler.handle_seeker_chats(message)
             handler.bot.send_message.assert_called_with(
                 message.chat.id, "📭 У вас пока нет активных приглашений (чатов)."
@@ -371,7 +365,6 @@ class TestSeekerHandlers:
             "handlers.seeker_responses.database.get_seeker_applications",
             return_value=applications,
         ):
-
             handler.handle_my_responses(message)
 
             assert handler.bot.send_message.call_count == 2
@@ -389,12 +382,13 @@ class TestSeekerHandlers:
     def test_process_vacancy_filter_choice_city(self, handler, message):
         """Фильтр вакансий: Выбрать город"""
         message.text = "🏙 Выбрать город"
-        msg = MagicMock()
-        handler.bot.send_message.return_value = msg
+        database.set_user_state(456, {"language_code": "uz"})
         handler.process_vacancy_filter_choice(message)
-        handler.bot.register_next_step_handler.assert_called_with(
-            msg, handler.process_vacancy_region_choice
-        )
+        assert database.get_user_state(456) == {
+            "language_code": "uz",
+            "step": "search_vacancy_region",
+        }
+        handler.bot.register_next_step_handler.assert_not_called()
 
     def test_process_vacancy_filter_choice_all(self, handler, message):
         """Фильтр вакансий: Все"""
@@ -413,30 +407,38 @@ class TestSeekerHandlers:
     def test_process_vacancy_region_choice_valid(self, handler, message):
         """Выбор региона: Валидный"""
         message.text = "Ташкентская обл."
-        msg = MagicMock()
-        handler.bot.send_message.return_value = msg
-        handler.process_vacancy_region_choice(message)
-        handler.bot.register_next_step_handler.assert_called_with(
-            msg, handler.process_vacancy_city_choice
+        # Язык гостя хранится в состоянии и не теряется при выборе города
+        database.set_user_state(
+            456, {"language_code": "uz", "step": "search_vacancy_region"}
         )
+        handler.process_vacancy_region_choice(message)
+        assert database.get_user_state(456) == {
+            "language_code": "uz",
+            "step": "search_vacancy_city",
+            "region": "Ташкентская обл.",
+        }
+
+        message.text = "Ташкент"
+        with patch.object(handler, "show_vacancies"):
+            handler.process_vacancy_city_choice(message)
+        assert database.get_user_state(456) == {"language_code": "uz"}
 
     def test_process_vacancy_region_choice_invalid(self, handler, message):
         """Выбор региона: Невалидный"""
         message.text = "Invalid"
-        with patch.object(handler, "process_vacancy_filter_choice") as mock_filter:
+        with patch.object(handler, "_ask_vacancy_region") as mock_ask:
             handler.process_vacancy_region_choice(message)
             handler.bot.send_message.assert_called()
-            mock_filter.assert_called()
+            mock_ask.assert_called_with(message)
 
     def test_process_vacancy_city_choice_back(self, handler, message):
         """Выбор города: Назад"""
         message.text = "⬅️ Назад"
-        msg = MagicMock()
-        handler.bot.send_message.return_value = msg
-        handler.process_vacancy_city_choice(message)
-        handler.bot.register_next_step_handler.assert_called_with(
-            msg, handler.process_vacancy_region_choice
+        database.set_user_state(
+            456, {"step": "search_vacancy_city", "region": "Ташкентская обл."}
         )
+        handler.process_vacancy_city_choice(message)
+        assert database.get_user_state(456) == {"step": "search_vacancy_region"}
 
     def test_process_vacancy_city_choice_valid(self, handler, message):
         """Выбор города: Валидный"""
@@ -470,25 +472,19 @@ class TestSeekerHandlers:
             assert "lang\\_ru" in text
             assert "prof\\_design" in text
 
-    def test_register(self, handler, bot):
-        """Test registration of handlers and filters"""
-        with patch("handlers.seeker.get_all_translations", return_value=["Find Jobs"]):
-            handler.register(bot)
-
-            assert bot.register_message_handler.call_count >= 3
-
-            # Проверяем работу лямбда-фильтра для handle_find_vacancies
-            found = False
-            for call in bot.register_message_handler.call_args_list:
-                handler_func = call[0][0]
-                kwargs = call[1]
-                if handler_func == handler.handle_find_vacancies:
-                    filter_func = kwargs.get("func")
-                    if filter_func:
-                        msg = MagicMock()
-                        msg.text = "Find Jobs"
-                        assert filter_func(msg) is True
-                        msg.text = "Other"
-                        assert filter_func(msg) is False
-                        found = True
-            assert found
+    def test_register(self, handler):
+        """Test registration of routes"""
+        with patch("router.get_all_translations", return_value=["Find Jobs"]):
+            router = Router()
+            handler.register(router)
+
+        msg = MagicMock()
+        msg.text = "Find Jobs"
+        assert router.resolve_message(msg) == handler.handle_find_vacancies
+        msg.text = "Other"
+        assert router.resolve_message(msg) is None
+        assert (
+            router.resolve_callback("download_resume") == handler.handle_download_resume
+        )
+        assert router.resolve_callback("download_resume_1") is None
+        assert router.resolve_callback("apply_7") == handler.handle_application_callback
@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from handlers.settings import SettingsHandlers
+from localization import get_all_translations
+from router import Router
 
 
 class TestSettingsCoverage:
@@ -128,7 +130,6 @@ class TestSettingsCoverage:
         with patch("keyboards.language_menu") as mock_keyboard, patch(
             "handlers.settings.get_text_by_lang", return_value="Select language"
         ):
-
             handler.handle_change_language(message)
 
             handler.bot.send_message.assert_called_once_with(
@@ -151,7 +152,6 @@ class TestSettingsCoverage:
         ), patch(
             "keyboards.employer_main_menu"
         ) as mock_keyboard:
-
             handler.confirm_delete_account(message)
 
             mock_clear.assert_called_with(message.from_user.id)
@@ -170,7 +170,6 @@ class TestSettingsCoverage:
         ) as mock_set_state, patch(
             "handlers.settings.get_text_by_lang", side_effect=lambda key, lang: key
         ):
-
             handler.handle_delete_account(message)
 
             mock_set_state.assert_called()
@@ -230,20 +229,18 @@ class TestSettingsCoverage:
             handler.handle_seeker_settings_wrapper(message)
             mock_handle.assert_called_once_with(message, "profession")
 
-    def test_is_seeker_setting(self, handler, message):
-        """Test the _is_seeker_setting filter function."""
-        with patch("handlers.settings.get_all_translations") as mock_get_all:
-            mock_get_all.side_effect = lambda k: (
-                ["Профессия"] if k == "btn_profession" else []
-            )
-            message.text = "Профессия"
-            assert handler._is_seeker_setting(message) is True
-
-            mock_get_all.side_effect = lambda k: (
-                ["Профессия"] if k == "btn_profession" else []
+    def test_register_routes_seeker_settings(self, handler, message):
+        """Кнопки настроек соискателя на всех языках ведут в обертку"""
+        router = Router()
+        handler.register(router)
+        for text in get_all_translations("btn_profession"):
+            message.text = text
+            assert (
+                router.resolve_message(message)
+                == handler.handle_seeker_settings_wrapper
             )
-            message.text = "Неизвестная кнопка"
-            assert handler._is_seeker_setting(message) is False
+        message.text = "Неизвестная кнопка"
+        assert router.resolve_message(message) is None
 
     def test_handle_employer_action_back(self, handler, message):
         """Test employer action: back to menu"""
@@ -386,7 +383,6 @@ class TestSettingsCoverage:
         with patch("database.get_user_state", return_value=user_state), patch(
             "database.set_user_state"
         ) as mock_set:
-
             handler.handle_seeker_submenu_action(message)
 
             mock_set.assert_called()
@@ -424,7 +420,6 @@ class TestSettingsCoverage:
         ), patch(
             "utils.format_phone", return_value="+998901234567"
         ):
-
             handler.process_seeker_field_update(message)
 
             mock_clear.assert_called()
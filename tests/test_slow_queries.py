@@ -0,0 +1,95 @@
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from database.core import (
+    add_query_observer,
+    execute_query,
+    query_fingerprint,
+    remove_query_observer,
+)
+from database.slow_queries import SlowQueryLog, redact_params
+from handlers.admin import AdminHandlers
+
+QUERY = "SELECT * FROM job_seekers WHERE full_name = ?"
+
+
+@pytest.fixture
+def slow_log(test_db):
+    slow_log = SlowQueryLog(threshold_ms=0)
+    add_query_observer(slow_log.observe)
+    yield slow_log
+    remove_query_observer(slow_log.observe)
+
+
+class TestSlowQueryLog:
+    def test_logged_with_redacted_params_and_plan_once(self, slow_log, caplog):
+        explained = []
+        original = SlowQueryLog.explain
+
+        def counting(self, query, params):
+            explained.append(query)
+            return original(self, query, params)
+
+        with caplog.at_level(logging.WARNING, logger="database.slow_queries"):
+            with patch.object(SlowQueryLog, "explain", counting):
+                execute_query(QUERY, ("Секретов Иван",), fetchall=True)
+                execute_query(QUERY, ("Другой",), fetchall=True)
+
+        assert explained == [QUERY]
+        records = [r.getMessage() for r in caplog.records if "🐢" in r.getMessage()]
+        assert len(records) == 2
+        assert query_fingerprint(QUERY) in records[0]
+        assert "(<str:13>)" in records[0]
+        assert "Секретов" not in "".join(records)
+        assert "SCAN job_seekers" in records[0]
+        assert "План" not in records[1]
+
+        entry = slow_log.top(1)[0]
+        assert entry.count == 2
+        assert entry.plan == ["SCAN job_seekers"]
+        assert "where full_name = ?" in slow_log.report()
+
+    def test_threshold_ddl_and_limit(self, test_db):
+        slow_log = SlowQueryLog(threshold_ms=1000, max_fingerprints=2)
+        slow_log.observe(QUERY, (), 0.5, None)
+        assert slow_log.top() == []
+
+        with patch("database.slow_queries.execute_query") as explain_query:
+            slow_log.observe("CREATE INDEX IF NOT EXISTS i ON t (a)", (), 3.0, None)
+            slow_log.observe("SELECT 1 FROM a", (), 2.0, None)
+            slow_log.observe("SELECT 1 FROM b", (), 5.0, None)
+        explain_query.assert_called()
+        assert [e.query for e in slow_log.top()] == [
+            "select ? from b",
+            "create index if not exists i on t (a)",
+        ]
+        assert slow_log.top()[1].plan == []
+
+    def test_redact_params(self):
+        assert redact_params((1, None, "abc", b"xy", 1.5)) == (
+            "(<int>, NULL, <str:3>, <bytes:2>, <float>)"
+        )
+        assert redact_params({"id": 5}) == "{id: <int>}"
+
+
+class TestSlowCommand:
+    def test_report_for_admin(self, slow_log):
+        execute_query(QUERY, ("x",), fetchall=True)
+        handler = AdminHandlers(MagicMock())
+        message = MagicMock()
+        message.from_user.id = 123456
+        message.chat.id = 123456
+        message.text = "/slow 5"
+
+        with patch("handlers.admin_stats.get_slow_query_log", return_value=slow_log):
+            handler.handle_slow_queries(message)
+            text = handler.bot.reply_to.call_args[0][1]
+            assert query_fingerprint(QUERY) in text
+            document = handler.bot.send_document.call_args[0][1]
+            assert b"SCAN job_seekers" in document.getvalue()
+
+            message.text = "/slow reset"
+            handler.handle_slow_queries(message)
+            assert slow_log.top() == []
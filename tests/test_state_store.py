@@ -0,0 +1,194 @@
+import threading
+import time
+
+import pytest
+
+import database
+import database.core as core
+from database.state_store import (
+    DEFAULT_STEP_TTLS,
+    MemoryStateStore,
+    SQLiteStateStore,
+    StateSweeper,
+    create_state_store,
+    parse_step_ttls,
+)
+
+# Короткое время жизни для семейства search_, остальные состояния бессрочны
+SHORT_TTLS = {"search_": 0.05}
+
+
+@pytest.fixture
+def sqlite_store(test_db):
+    return SQLiteStateStore(cache_ttl=60)
+
+
+class TestMemoryStateStore:
+    def test_versions_and_cas(self):
+        store = MemoryStateStore()
+        assert store.get_versioned(1) == ({}, 0)
+        assert store.compare_and_set(1, {"step": "a"}, 0)
+        assert not store.compare_and_set(1, {"step": "b"}, 0)
+        store.set(1, {"step": "c"})
+        assert store.get_versioned(1) == ({"step": "c"}, 2)
+        store.clear(1)
+        assert store.get(1) == {}
+
+    def test_returns_copies(self):
+        store = MemoryStateStore()
+        store.set(1, {"step": "a"})
+        store.get(1)["step"] = "changed"
+        assert store.get(1) == {"step": "a"}
+
+    def test_ttl_per_step_family(self):
+        store = MemoryStateStore(ttls=SHORT_TTLS, default_ttl=0)
+        store.set(1, {"step": "search_vacancy_region"})
+        store.set(2, {"step": "full_name"})
+        time.sleep(0.1)
+        # Истекшее состояние не возвращается даже до фоновой очистки
+        assert store.get_versioned(1) == ({}, 0)
+        assert store.get(2) == {"step": "full_name"}
+        assert store.tracked() == 1
+
+    def test_sweep_removes_expired(self):
+        store = MemoryStateStore(ttls=SHORT_TTLS, default_ttl=0)
+        for user_id in range(10):
+            store.set(user_id, {"step": "search_candidate_city"})
+        store.set(100, {"step": "active_chat"})
+        time.sleep(0.1)
+        assert StateSweeper(store, interval=60).run_once() == 10
+        assert store.tracked() == 1
+
+    def test_lru_cap(self):
+        store = MemoryStateStore(max_tracked=3)
+        for user_id in (1, 2, 3):
+            store.set(user_id, {"step": "phone"})
+        store.get(1)  # 1 — недавно активен, вытесняется 2
+        store.set(4, {"step": "phone"})
+        assert [store.get(u) != {} for u in (1, 2, 3, 4)] == [True, False, True, True]
+        assert store.evicted == 1
+
+    def test_memory_flat_under_churn(self):
+        store = MemoryStateStore(max_tracked=100)
+        for user_id in range(10000):
+            store.set(user_id, {"step": "captcha"})
+            if user_id % 3:
+                store.clear(user_id)
+        assert store.tracked() == 100
+
+    def test_parse_step_ttls(self):
+        ttls = parse_step_ttls("admin_=10, vacancy_=120,broken,bad=x")
+        assert ttls["admin_"] == 10 and ttls["vacancy_"] == 120
+        assert "broken" not in ttls and "bad" not in ttls
+        assert ttls["captcha"] == DEFAULT_STEP_TTLS["captcha"]
+        store = MemoryStateStore(ttls=ttls, default_ttl=7)
+        assert store.ttl_for({"step": "admin_broadcast_message"}) == 10
+        assert store.ttl_for({"step": "saved_search_keyword"}) == 3600
+        assert store.ttl_for({"action": "edit"}) == 7
+
+
+class TestSQLiteStateStore:
+    def test_survives_restart(self, sqlite_store):
+        sqlite_store.set(1, {"step": "reg_name", "data": {"age": 25}})
+        # Новый процесс — новое хранилище с пустым кэшем
+        restarted = SQLiteStateStore()
+        assert restarted.get_versioned(1) == (
+            {"step": "reg_name", "data": {"age": 25}},
+            1,
+        )
+        restarted.clear(1)
+        assert SQLiteStateStore().get(1) == {}
+
+    def test_write_through_cache(self, sqlite_store, test_db):
+        sqlite_store.set(1, {"step": "a"})
+        # Чтение из кэша не обращается к БД
+        test_db.execute('UPDATE user_states SET state = \'{"step": "x"}\'')
+        assert sqlite_store.get(1) == {"step": "a"}
+        sqlite_store.invalidate(1)
+        assert sqlite_store.get(1) == {"step": "x"}
+
+    def test_cache_ttl_and_size(self, test_db):
+        store = SQLiteStateStore(cache_ttl=0, cache_size=2)
+        store.set(1, {"step": "a"})
+        SQLiteStateStore().set(1, {"step": "b"})
+        assert store.get(1) == {"step": "b"}  # TTL истек — читаем из БД
+
+        store = SQLiteStateStore(cache_ttl=60, cache_size=2)
+        for user_id in (1, 2, 3):
+            store.set(user_id, {})
+        assert list(store._cache) == [2, 3]
+
+    def test_compare_and_set_between_processes(self, test_db):
+        first, second = SQLiteStateStore(cache_ttl=60), SQLiteStateStore(cache_ttl=60)
+        assert first.compare_and_set(1, {"n": 1}, 0)
+        assert not second.compare_and_set(1, {"n": 100}, 0)
+
+        state, version = second.get_versioned(1)
+        assert (state, version) == ({"n": 1}, 1)
+        assert first.compare_and_set(1, {"n": 2}, 1)
+        # У второго процесса устаревшая версия — запись отклонена
+        assert not second.compare_and_set(1, {"n": state["n"] + 1}, version)
+        assert second.get_versioned(1) == ({"n": 2}, 2)
+
+    def test_ttl_and_sweep(self, test_db):
+        store = SQLiteStateStore(cache_ttl=0, ttls=SHORT_TTLS, default_ttl=0)
+        store.set(1, {"step": "search_vacancy_city"})
+        store.set(2, {"step": "email"})
+        time.sleep(0.1)
+        # Истекшее состояние пустое, но версия сохраняется для compare-and-set
+        assert store.get_versioned(1) == ({}, 1)
+        assert store.compare_and_set(1, {"step": "email"}, 1)
+
+        store.set(3, {"step": "search_candidate_region"})
+        time.sleep(0.1)
+        assert store.sweep() == 1
+        assert store.tracked() == 2
+
+    def test_sweep_enforces_cap(self, test_db):
+        store = SQLiteStateStore(cache_ttl=0, max_tracked=2)
+        for user_id, updated_at in ((1, "2024-01-01"), (2, "2024-01-02"), (3, None)):
+            store.set(user_id, {"step": "phone"})
+            if updated_at:
+                test_db.execute(
+                    "UPDATE user_states SET updated_at = ? WHERE user_id = ?",
+                    (updated_at, user_id),
+                )
+        assert store.sweep() == 1
+        assert store.get(1) == {} and store.get(3) == {"step": "phone"}
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_state_store("redis")
+        assert isinstance(create_state_store("memory"), MemoryStateStore)
+
+
+class TestCoreStateFunctions:
+    @pytest.fixture(autouse=True)
+    def store(self, test_db):
+        previous = core.get_state_store()
+        store = SQLiteStateStore(cache_ttl=0)
+        core.set_state_store(store)
+        yield store
+        core.set_state_store(previous)
+
+    def test_get_set_clear(self):
+        database.set_user_state(5, {"step": "vacancy_title"})
+        assert database.get_user_state(5) == {"step": "vacancy_title"}
+        database.clear_user_state(5)
+        assert database.get_user_state(5) == {}
+
+    def test_update_without_lost_updates(self):
+        database.set_user_state(5, {"count": 0})
+
+        def worker():
+            for _ in range(20):
+                database.update_user_state(
+                    5, lambda s: {**s, "count": s["count"] + 1}, retries=1000
+                )
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert database.get_user_state(5)["count"] == 80
@@ -0,0 +1,136 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import update_executor
+from update_executor import HashRing, ShardedUpdateExecutor, update_shard_key
+
+
+def _message_update(update_id, user_id):
+    return SimpleNamespace(
+        update_id=update_id,
+        message=SimpleNamespace(from_user=SimpleNamespace(id=user_id)),
+    )
+
+
+@pytest.fixture
+def executor():
+    executor = ShardedUpdateExecutor(workers=4, queue_size=100)
+    executor.start()
+    yield executor
+    executor.stop(timeout=5)
+
+
+class TestShardKey:
+    def test_user_fields(self):
+        assert update_shard_key(_message_update(1, 42)) == 42
+        callback = SimpleNamespace(
+            update_id=2,
+            message=None,
+            callback_query=SimpleNamespace(from_user=SimpleNamespace(id=7)),
+        )
+        assert update_shard_key(callback) == 7
+        poll = SimpleNamespace(
+            update_id=3, poll_answer=SimpleNamespace(user=SimpleNamespace(id=9))
+        )
+        assert update_shard_key(poll) == 9
+
+    def test_channel_post_and_fallback(self):
+        post = SimpleNamespace(
+            update_id=4, channel_post=SimpleNamespace(chat=SimpleNamespace(id=-100))
+        )
+        assert update_shard_key(post) == -100
+        assert update_shard_key(SimpleNamespace(update_id=5)) == 5
+
+
+class TestHashRing:
+    def test_stable_and_balanced(self):
+        ring = HashRing(4)
+        shards = [ring.shard_for(user_id) for user_id in range(4000)]
+        assert shards == [HashRing(4).shard_for(user_id) for user_id in range(4000)]
+        for shard in range(4):
+            assert 600 < shards.count(shard) < 1400
+
+    def test_resize_moves_few_keys(self):
+        before = HashRing(4)
+        after = HashRing(5)
+        moved = sum(before.shard_for(k) != after.shard_for(k) for k in range(4000))
+        # При добавлении шарда перемещается примерно 1/5 ключей, а не почти все
+        assert moved < 4000 * 0.35
+
+
+class TestShardedUpdateExecutor:
+    def test_per_user_order(self, executor):
+        results = {}
+        lock = threading.Lock()
+
+        def handle(update):
+            user_id, seq = update
+            if seq == 0:
+                time.sleep(0.05)  # Медленная первая задача пользователя
+            with lock:
+                results.setdefault(user_id, []).append(seq)
+
+        for seq in range(5):
+            for user_id in range(10):
+                executor.submit(user_id, handle, (user_id, seq))
+        executor.stop(timeout=5)
+
+        assert results == {user_id: [0, 1, 2, 3, 4] for user_id in range(10)}
+        assert executor.get_stats()["processed"] == 50
+
+    def test_users_run_in_parallel(self):
+        executor = ShardedUpdateExecutor(workers=2)
+        executor.start()
+        ring = HashRing(2)
+        a = next(k for k in range(100) if ring.shard_for(k) == 0)
+        b = next(k for k in range(100) if ring.shard_for(k) == 1)
+
+        release = threading.Event()
+        done = threading.Event()
+        executor.submit(a, lambda _: release.wait(5), None)
+        executor.submit(b, lambda _: done.set(), None)
+        # Пользователь b не ждет зависшего обработчика пользователя a
+        assert done.wait(2)
+        assert executor.queue_depths() == [0, 0]
+        release.set()
+        executor.stop(timeout=5)
+
+    def test_queue_depth_metrics(self):
+        executor = ShardedUpdateExecutor(workers=2)
+        shard = executor.submit(1, lambda _: None, None)
+        executor.submit(1, lambda _: None, None)
+        depths = executor.queue_depths()
+        assert depths[shard] == 2 and sum(depths) == 2
+        assert executor.get_stats()["max_queue_depth"] == 2
+
+    def test_errors_do_not_stop_shard(self, executor):
+        handled = []
+
+        def handle(update):
+            if update == 1:
+                raise ValueError("boom")
+            handled.append(update)
+
+        executor.submit(1, handle, 1)
+        executor.submit(1, handle, 2)
+        executor.stop(timeout=5)
+        assert handled == [2]
+        assert executor.get_stats()["errors"] == 1
+
+
+def test_setup_wraps_process_new_updates():
+    bot = MagicMock()
+    original = bot.process_new_updates
+    executor = ShardedUpdateExecutor(workers=2)
+    update_executor.setup_update_executor(bot, executor)
+    try:
+        bot.process_new_updates([_message_update(1, 42), _message_update(2, 43)])
+        executor.stop(timeout=5)
+        assert original.call_count == 2
+        assert update_executor.get_update_executor() is executor
+    finally:
+        update_executor._executor = None
@@ -1,10 +1,126 @@
+import glob
+import json
 import os
+import re
 import sys
 from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import security  # noqa: E402
 
+# Прежняя проверка: отдельный re.search на каждый шаблон
+LEGACY_PROFANITY_PATTERNS = [
+    r"\bхуй\w*",
+    r"\bхуе\w*",
+    r"\bхуё\w*",
+    r"\bхуя\w*",
+    r"\bпизд\w*",
+    r"\bеб(а|у|л)\w*",
+    r"\bеб(а|у|л)н\w*",
+    r"\bбля(д|т)\w*",
+    r"\bмуд(а|о)(к|ч)\w*",
+    r"\bпид(о|а|е)р\w*",
+    r"\bг(а|о)ндон\w*",
+    r"\bшлюх\w*",
+    r"\bсук(а|и)\b",
+    r"\bсукин\w*",
+    r"\bсуч(к|а)\w*",
+    r"\bзалуп\w*",
+    r"\bманд(а|ы|у)\b",
+    r"\bдолбо(е|ё)б\w*",
+    r"\bхер\w*",
+    r"\bпохер\w*",
+    r"\bнахер\w*",
+    r"\bчмо\w*",
+    r"\bлох\w*",
+    r"\bдроч\w*",
+    r"\bдурак\w*",
+    r"\bдебил\w*",
+    r"\bидиот\w*",
+    r"\b(x|h)u(y|i)\w*",
+    r"\bpizd\w*",
+    r"\beb(a|l|u)(?!y)\w*",
+    r"\bblya(d|t)\w*",
+    r"\bmud(a|o)k\w*",
+    r"\bpid(o|a|e)r\w*",
+    r"\bgandon\w*",
+    r"\bsuk(a|i)\b",
+    r"\bzalup\w*",
+    r"\bdolbo(e|y)b\w*",
+    r"\bxer\w*",
+    r"\bpoher\w*",
+    r"\bfuck\w*",
+    r"\bshit\b",
+    r"\bbitch\w*",
+    r"\bdick\w*",
+    r"\bcock\w*",
+    r"\bpussy\w*",
+    r"\basshole\w*",
+    r"\bcunt\w*",
+    r"\bbastard\w*",
+    r"\bnigger\w*",
+    r"\bwhore\w*",
+    r"\bslut\w*",
+    r"\bфак\b",
+    r"\bфак(и|е|о)\w*",
+    r"\bмазафак\w*",
+    r"\bшит\b",
+    r"\bбулшит\w*",
+    r"\bбич\b",
+    r"\bпусси\w*",
+    r"\bдикх(е|э)д\w*",
+    r"\b(а|э)схол\w*",
+    r"\bка(н|м)шот\w*",
+    r"\bниггер\w*",
+    r"\b(jalab|жала б)\w*",
+    r"\b(qotoq|qo\'toq|коток|қотақ)\w*",
+    r"\b(siktir|сиктир)\w*",
+    r"\b(sikay|сикай)\w*",
+    r"\b(onangni|онангни)\w*",
+    r"\b(haromi|хароми)\w*",
+    r"\b(dalbayob|далбаёб)\w*",
+    r"\b(gandon|гандон)\w*",
+    r"\b(chumo|чумо)\w*",
+]
+
+
+def legacy_contains_profanity(text):
+    text_lower = text.lower()
+    return any(re.search(p, text_lower) for p in LEGACY_PROFANITY_PATTERNS)
+
+
+def profanity_corpus():
+    """Тексты интерфейса на всех языках и слова из основ с разными окончаниями"""
+    locales = os.path.join(os.path.dirname(__file__), "..", "locales", "*.json")
+    corpus = []
+    for path in glob.glob(locales):
+        with open(path, encoding="utf-8") as f:
+            corpus.extend(str(v) for v in json.load(f).values())
+    corpus += [
+        "ebay",
+        "ebuy",
+        "скука",
+        "мандарин",
+        "манда!",
+        "сукин сын",
+        "шитьё",
+        "бичевать",
+        "shitty",
+        "Hershey",
+        "лохматый",
+        "хлопок",
+        "застрахуйся",
+        "qo'toq",
+        "жала бы",
+    ]
+    for stem in security.PROFANITY_STEMS:
+        base = re.split(r"[\\(]", stem)[0]
+        for prefix in ("", "по", "x", "-"):
+            for suffix in ("", "а", "ы", "ing", "y", "ый", " "):
+                corpus.append(f"Текст {prefix}{base}{suffix}, end")
+                corpus.append(f"{prefix}{base.upper()}{suffix}")
+    return corpus
+
 
 class TestUtilsSecurity:
     def test_contains_profanity(self):
@@ -15,6 +131,28 @@ class TestUtilsSecurity:
         assert security.contains_profanity(None) is False
         assert security.contains_profanity("") is False
 
+    def test_contains_profanity_matches_legacy_patterns(self):
+        corpus = profanity_corpus()
+        detected = [text for text in corpus if legacy_contains_profanity(text)]
+        assert len(detected) > 300
+
+        mismatched = [
+            text
+            for text in corpus
+            if bool(security._PROFANITY_RE.search(text.lower()))
+            != legacy_contains_profanity(text)
+        ]
+        assert mismatched == []
+        # Нормализация алфавитов только добавляет находки
+        assert all(security.contains_profanity(text) for text in detected)
+
+    def test_contains_profanity_mixed_alphabets(self):
+        assert security.contains_profanity("ну ты и xуй") is True  # латинская x
+        assert security.contains_profanity("fuсk off") is True  # кириллическая с
+        assert security.contains_profanity("пи3дец") is True
+        assert security.contains_profanity("зарплата 3000 $, опыт 2 года") is False
+        assert security.contains_profanity("Python и SQL, знаю Docker") is False
+
     def test_generate_strong_password(self):
         pwd = security.generate_strong_password(12)
         assert len(pwd) == 12
@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import webhook
+
+
+def _update(update_id):
+    return json.dumps({"update_id": update_id})
+
+
+def _headers(secret="s3cret", content_type="application/json"):
+    return {webhook.SECRET_HEADER: secret, "content-type": content_type}
+
+
+@pytest.fixture
+def bot():
+    return MagicMock()
+
+
+@pytest.fixture
+def ingestor(bot):
+    ingestor = webhook.UpdateIngestor(bot, workers=2, queue_size=10, dedup_window=3)
+    ingestor.start()
+    yield ingestor
+    ingestor.stop(timeout=5)
+
+
+class TestUpdateIngestor:
+    def test_processed_in_background(self, ingestor, bot):
+        assert ingestor.submit(_update(1)) == webhook.ACCEPTED
+        ingestor.stop(timeout=5)
+        bot.process_new_updates.assert_called_once()
+
+    def test_duplicates_dropped(self, ingestor, bot):
+        assert ingestor.submit(_update(1)) == webhook.ACCEPTED
+        assert ingestor.submit(_update(1)) == webhook.DUPLICATE
+        ingestor.stop(timeout=5)
+        assert bot.process_new_updates.call_count == 1
+        assert ingestor.get_stats()["duplicates"] == 1
+
+    def test_sliding_window(self, bot):
+        ingestor = webhook.UpdateIngestor(bot, workers=0, dedup_window=2)
+        ingestor.start()
+        for update_id in (1, 2, 3):
+            assert ingestor.submit(_update(update_id)) == webhook.ACCEPTED
+        # update_id=1 вытеснен из окна, 3 — еще в нем
+        assert ingestor.submit(_update(1)) == webhook.ACCEPTED
+        assert ingestor.submit(_update(3)) == webhook.DUPLICATE
+        # workers=0 — обработка в потоке запроса
+        assert bot.process_new_updates.call_count == 4
+
+    def test_overload_rejects_and_allows_redelivery(self, bot):
+        release = threading.Event()
+        bot.process_new_updates.side_effect = lambda updates: release.wait(5)
+        ingestor = webhook.UpdateIngestor(bot, workers=1, queue_size=1)
+        ingestor.start()
+        try:
+            assert ingestor.submit(_update(1)) == webhook.ACCEPTED
+            # Ждем, пока обработчик заберет первое обновление
+            while ingestor.queue_depth:
+                time.sleep(0.01)
+            assert ingestor.submit(_update(2)) == webhook.ACCEPTED
+            assert ingestor.submit(_update(3)) == webhook.OVERLOADED
+            assert ingestor.get_stats()["rejected"] == 1
+        finally:
+            release.set()
+            ingestor.stop(timeout=5)
+        # Повторная доставка после перегрузки не считается дубликатом
+        ingestor.start()
+        assert ingestor.submit(_update(3)) == webhook.ACCEPTED
+        ingestor.stop(timeout=5)
+
+    def test_handler_error_does_not_kill_worker(self, ingestor, bot):
+        bot.process_new_updates.side_effect = [Exception("boom"), None]
+        ingestor.submit(_update(1))
+        ingestor.submit(_update(2))
+        ingestor.stop(timeout=5)
+        assert bot.process_new_updates.call_count == 2
+        assert ingestor.get_stats()["errors"] == 1
+
+    def test_stopped_and_invalid(self, bot):
+        ingestor = webhook.UpdateIngestor(bot, workers=1)
+        assert ingestor.submit(_update(1)) == webhook.STOPPED
+        ingestor.start()
+        assert ingestor.submit("{}") == webhook.INVALID
+        ingestor.stop(timeout=5)
+
+
+class TestWebhookRequest:
+    def test_secret_required(self, ingestor, bot):
+        body = _update(1).encode()
+        with patch.object(webhook.Config, "WEBHOOK_SECRET", "s3cret"):
+            for headers in ({"content-type": "application/json"}, _headers("wrong")):
+                assert (
+                    webhook.handle_webhook_request(ingestor, headers, body, "s3cret")[1]
+                    == 403
+                )
+        ingestor.stop(timeout=5)
+        bot.process_new_updates.assert_not_called()
+
+    def test_missing_header_accepted_without_configured_secret(
+        self, ingestor, bot, caplog
+    ):
+        # Вебхук, зарегистрированный без secret_token, продолжает работать
+        headers = {"content-type": "application/json"}
+        with patch.object(webhook.Config, "WEBHOOK_SECRET", ""), patch.object(
+            webhook, "_missing_secret_warned", False
+        ):
+            for update_id in (1, 2):
+                assert (
+                    webhook.handle_webhook_request(
+                        ingestor, headers, _update(update_id).encode(), "derived"
+                    )[1]
+                    == 200
+                )
+            assert (
+                webhook.handle_webhook_request(
+                    ingestor, _headers("wrong"), _update(3).encode(), "derived"
+                )[1]
+                == 403
+            )
+        ingestor.stop(timeout=5)
+        assert bot.process_new_updates.call_count == 2
+        assert caplog.text.count("/set_webhook") == 1
+
+    def test_status_codes(self, bot):
+        ingestor = webhook.UpdateIngestor(bot, workers=1, queue_size=1)
+        body = _update(1).encode()
+        assert (
+            webhook.handle_webhook_request(ingestor, _headers(), body, "s3cret")[1]
+            == 503
+        )
+
+        ingestor.start()
+        assert (
+            webhook.handle_webhook_request(
+                ingestor, _headers(content_type="text/plain"), body, "s3cret"
+            )[1]
+            == 403
+        )
+        assert (
+            webhook.handle_webhook_request(ingestor, _headers(), body, "s3cret")[1]
+            == 200
+        )
+        ingestor.stop(timeout=5)
+
+        ingestor._running = True  # Очередь без обработчиков быстро заполняется
+        ingestor.submit(_update(2))
+        _, code, headers = webhook.handle_webhook_request(
+            ingestor, _headers(), _update(3).encode(), "s3cret"
+        )
+        assert code == 429
+        assert headers["Retry-After"]
+
+    def test_derived_secret_is_valid_for_telegram(self):
+        secret = webhook.webhook_secret()
+        assert secret.isalnum() and 1 <= len(secret) <= 256
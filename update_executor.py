@@ -0,0 +1,190 @@
+import bisect
+import hashlib
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from database.core import close_connection
+
+logger = logging.getLogger(__name__)
+
+VIRTUAL_NODES = 64  # Точек на кольце для каждого обработчика
+
+# Поля Update, из которых берется пользователь (в порядке проверки)
+USER_UPDATE_FIELDS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "poll_answer",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+CHAT_UPDATE_FIELDS = ("channel_post", "edited_channel_post")
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")  # nosec B324
+
+
+def update_shard_key(update: Any) -> Any:
+    """Ключ шардирования: from_user.id, для постов каналов — chat.id"""
+    for field in USER_UPDATE_FIELDS:
+        obj = getattr(update, field, None)
+        if obj is None:
+            continue
+        user = getattr(obj, "from_user", None) or getattr(obj, "user", None)
+        if user is not None:
+            return user.id
+    for field in CHAT_UPDATE_FIELDS:
+        obj = getattr(update, field, None)
+        if obj is not None:
+            return obj.chat.id
+    return getattr(update, "update_id", 0)
+
+
+class HashRing:
+    """Консистентное хеширование ключей на обработчики"""
+
+    def __init__(self, shards: int, virtual_nodes: int = VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f"shard-{shard}-{node}"), shard)
+            for shard in range(shards)
+            for node in range(virtual_nodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._shards = [s for _, s in points]
+
+    def shard_for(self, key: Any) -> int:
+        idx = bisect.bisect(self._hashes, _hash(str(key))) % len(self._hashes)
+        return self._shards[idx]
+
+
+# ================= ОБРАБОТКА ОБНОВЛЕНИЙ =================
+
+
+class ShardedUpdateExecutor:
+    """
+    Обновления одного пользователя выполняются строго по порядку в одном
+    обработчике, обновления разных пользователей — параллельно.
+    """
+
+    def __init__(
+        self,
+        workers: int = Config.UPDATE_WORKERS,
+        queue_size: int = Config.UPDATE_QUEUE_SIZE,
+    ):
+        self.workers = workers
+        self._ring = HashRing(workers)
+        self._queues: List["queue.Queue[Optional[Tuple[Callable, Any]]]"] = [
+            queue.Queue(maxsize=queue_size) for _ in range(workers)
+        ]
+        self._processed = [0] * workers
+        self._errors = 0
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Запуск обработчиков"""
+        with self._lock:
+            if self._threads:
+                return
+            for shard in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(shard,),
+                    name=f"updates-{shard}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановка после обработки уже принятых обновлений"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for shard_queue in self._queues[: len(threads)]:
+            shard_queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, key: Any, func: Callable[[Any], Any], update: Any) -> int:
+        """
+        Постановка обновления в очередь обработчика; возвращает номер шарда.
+        Блокируется, если очередь шарда заполнена (обратное давление на прием).
+        """
+        shard = self._ring.shard_for(key)
+        self._queues[shard].put((func, update))
+        return shard
+
+    def _run(self, shard: int) -> None:
+        shard_queue = self._queues[shard]
+        try:
+            while True:
+                item = shard_queue.get()
+                if item is None:
+                    return
+                func, update = item
+                try:
+                    func(update)
+                except Exception as e:
+                    self._errors += 1
+                    logger.error(
+                        f"❌ Ошибка обработки обновления в шарде {shard}: {e}",
+                        exc_info=True,
+                    )
+                finally:
+                    self._processed[shard] += 1
+        finally:
+            close_connection()
+
+    def queue_depths(self) -> List[int]:
+        """Глубина очереди каждого шарда"""
+        return [q.qsize() for q in self._queues]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика обработчиков обновлений"""
+        depths = self.queue_depths()
+        return {
+            "workers": self.workers,
+            "queue_depths": depths,
+            "queue_depth": sum(depths),
+            "max_queue_depth": max(depths) if depths else 0,
+            "processed": sum(self._processed),
+            "errors": self._errors,
+        }
+
+
+_executor: Optional[ShardedUpdateExecutor] = None
+
+
+def get_update_executor() -> Optional[ShardedUpdateExecutor]:
+    """Исполнитель, подключенный к боту (None — обработка в потоке приема)"""
+    return _executor
+
+
+def setup_update_executor(
+    bot: Any, executor: Optional[ShardedUpdateExecutor] = None
+) -> ShardedUpdateExecutor:
+    """Распределяет обновления бота по обработчикам по from_user.id"""
+    global _executor
+    executor = executor or ShardedUpdateExecutor()
+    original = bot.process_new_updates
+
+    def process_one(update):
+        original([update])
+
+    def process_new_updates(updates):
+        for update in updates:
+            executor.submit(update_shard_key(update), process_one, update)
+
+    bot.process_new_updates = process_new_updates
+    executor.start()
+    _executor = executor
+    return executor
@@ -0,0 +1,210 @@
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import telebot
+
+from config import Config
+from database.core import close_connection
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+ACCEPTED, DUPLICATE, OVERLOADED, STOPPED, INVALID = (
+    "accepted",
+    "duplicate",
+    "overloaded",
+    "stopped",
+    "invalid",
+)
+
+
+def webhook_secret() -> str:
+    """
+    Секрет вебхука: из WEBHOOK_SECRET или производный от токена
+    (Telegram допускает только A-Z, a-z, 0-9, _ и -).
+    """
+    if Config.WEBHOOK_SECRET:
+        return Config.WEBHOOK_SECRET
+    return hashlib.sha256(f"webhook:{Config.TOKEN}".encode()).hexdigest()
+
+
+_missing_secret_warned = False
+
+
+def _warn_missing_secret() -> None:
+    """Один раз за процесс: вебхук зарегистрирован без secret_token"""
+    global _missing_secret_warned
+    if not _missing_secret_warned:
+        _missing_secret_warned = True
+        logger.warning(
+            "⚠️ Обновление вебхука без заголовка секрета: вебхук зарегистрирован "
+            "без secret_token. Откройте /set_webhook или задайте WEBHOOK_SECRET"
+        )
+
+
+def is_valid_secret(header_value: Optional[str], secret: str) -> bool:
+    """Сравнение секрета за постоянное время"""
+    return bool(header_value) and hmac.compare_digest(
+        str(header_value).encode(), secret.encode()
+    )
+
+
+# ================= ПРИЕМ ОБНОВЛЕНИЙ =================
+
+
+class UpdateIngestor:
+    """
+    Прием обновлений вебхука: ограниченная очередь, пул обработчиков и
+    отбрасывание повторных доставок по update_id в скользящем окне.
+    Вебхук отвечает сразу, не дожидаясь обработки обновления.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        workers: int = Config.WEBHOOK_WORKERS,
+        queue_size: int = Config.WEBHOOK_QUEUE_SIZE,
+        dedup_window: int = Config.WEBHOOK_DEDUP_WINDOW,
+    ):
+        self.bot = bot
+        self.workers = workers
+        self.dedup_window = dedup_window
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        """Запуск пула обработчиков (workers=0 — обработка в потоке запроса)"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for idx in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"webhook-worker-{idx}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановка: обработчики доделывают очередь и завершаются"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество обновлений, ожидающих обработки"""
+        return self._queue.qsize()
+
+    def _remember(self, update_id: int) -> bool:
+        """Запоминает update_id; False — обновление уже было принято"""
+        if update_id in self._seen:
+            self._seen.move_to_end(update_id)
+            return False
+        self._seen[update_id] = None
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+        return True
+
+    def submit(self, raw: str) -> str:
+        """Постановка сырого обновления в очередь"""
+        if not self._running:
+            return STOPPED
+        try:
+            update_id = int(json.loads(raw)["update_id"])
+        except (ValueError, KeyError, TypeError):
+            return INVALID
+
+        with self._lock:
+            if not self._remember(update_id):
+                self.duplicates += 1
+                return DUPLICATE
+            if self.workers:
+                try:
+                    self._queue.put_nowait(raw)
+                except queue.Full:
+                    # Telegram доставит обновление повторно — не считаем его принятым
+                    del self._seen[update_id]
+                    self.rejected += 1
+                    return OVERLOADED
+            self.accepted += 1
+
+        if not self.workers:
+            self._process(raw)
+        return ACCEPTED
+
+    def _process(self, raw: str) -> None:
+        try:
+            update = telebot.types.Update.de_json(raw)
+            self.bot.process_new_updates([update])
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Ошибка обработки обновления: {e}", exc_info=True)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                raw = self._queue.get()
+                if raw is None:
+                    return
+                self._process(raw)
+        finally:
+            close_connection()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика приема обновлений"""
+        return {
+            "queue_depth": self.queue_depth,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def handle_webhook_request(
+    ingestor: UpdateIngestor, headers: Any, body: bytes, secret: str
+) -> Tuple[str, int, Dict[str, str]]:
+    """
+    Ответ на запрос Telegram к вебхуку: (тело, код, заголовки).
+    Без явного WEBHOOK_SECRET запрос без заголовка секрета принимается
+    (вебхук, зарегистрированный до появления секрета), неверный — нет.
+    """
+    header = headers.get(SECRET_HEADER)
+    if header is None and not Config.WEBHOOK_SECRET:
+        _warn_missing_secret()
+    elif not is_valid_secret(header, secret):
+        return "", 403, {}
+    if headers.get("content-type") != "application/json":
+        return "", 403, {}
+
+    status = ingestor.submit(body.decode("utf-8"))
+    if status == OVERLOADED:
+        logger.warning("⚠️ Очередь вебхука переполнена, Telegram повторит доставку")
+        return "", 429, {"Retry-After": str(Config.WEBHOOK_RETRY_AFTER)}
+    if status == STOPPED:
+        return "", 503, {"Retry-After": str(Config.WEBHOOK_RETRY_AFTER)}
+    if status == INVALID:
+        return "", 400, {}
+    return "", 200, {}